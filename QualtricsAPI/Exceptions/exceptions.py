@@ -37,4 +37,15 @@ class Qualtrics503Error(Exception):
 class Qualtrics504Error(Exception):
     '''This Exception handles errors associated with the HTTP 504 (Gateway Timeout) responses.'''
     def __init__(self, msg):
-        super().__init__(msg)
\ No newline at end of file
+        super().__init__(msg)
+
+class QualtricsCircuitOpenError(Exception):
+    '''This Exception is raised without contacting Qualtrics when the circuit breaker of an endpoint is open, because its
+    recent requests kept failing with server errors.'''
+    def __init__(self, msg):
+        super().__init__(msg)
+
+class QualtricsExportError(Exception):
+    '''This Exception is raised when a response export failed on Qualtrics, or was cancelled before its file was ready.'''
+    def __init__(self, msg):
+        super().__init__(msg)
@@ -1,4 +1,9 @@
-import numpy as np
+import io
+import json
+import re
+from QualtricsAPI.Setup.lazy import LazyModule
+
+np = LazyModule('numpy')
 
 class Parser(object):
 
@@ -72,3 +77,59 @@ class Parser(object):
             return np.array(elements).T
         else:
             return elements
+
+    def ndjson_records(self, stream):
+        '''This method reads newline-delimited JSON one record at a time, so a file of any size is parsed in constant memory.
+
+        :param stream: A binary file object, e.g. the member of an export zip.
+        :return: A generator of dicts
+        '''
+        for line in io.TextIOWrapper(stream, encoding='utf-8-sig'):
+            if line.strip():
+                yield json.loads(line)
+
+    def json_records(self, stream, key='responses', chunk_size=64 * 1024):
+        '''This method reads the objects of the array under key (e.g. {"responses": [...]}) one at a time, without loading
+        the whole document, so a file of any size is parsed in constant memory.
+
+        :param stream: A binary file object, e.g. the member of an export zip.
+        :param key: The key of the array of records. (Default: 'responses')
+        :type key: str
+        :param chunk_size: The number of characters read at a time. (Default: 65536)
+        :type chunk_size: int
+        :return: A generator of dicts
+        '''
+        decoder = json.JSONDecoder()
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig')
+        start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        buffer = ''
+        while True:
+            match = start.search(buffer)
+            if match is not None:
+                break
+            chunk = text.read(chunk_size)
+            if not chunk:
+                return
+            buffer += chunk
+        buffer, position = buffer[match.end():], 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            try:
+                if position == len(buffer):
+                    raise ValueError('The buffer holds no record.')
+                record, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                # The next record is not fully read yet
+                chunk = text.read(chunk_size)
+                if not chunk:
+                    if position < len(buffer):
+                        raise
+                    return
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            yield record
+            if position > chunk_size:
+                buffer, position = buffer[position:], 0
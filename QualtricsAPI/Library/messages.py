@@ -1,18 +1,19 @@
-import requests as r
 import zipfile
 import json
 import io
-import pandas as pd
-from QualtricsAPI.Setup import Credentials
+from QualtricsAPI.Setup import Credentials, LazyModule
 from QualtricsAPI.JSON import Parser
 
+pd = LazyModule('pandas')
+
 class Messages(Credentials):
     '''This is a child class to the Credentials class and it gathers information about Qualtric's Messages.'''
 
-    def __init__(self, token=None, directory_id=None, data_center=None):
+    def __init__(self, token=None, directory_id=None, data_center=None, config=None):
         self.token = token
         self.data_center = data_center
         self.directory_id = directory_id
+        self.config = self._resolve_config(config, token, data_center, directory_id)
         return
 
     def list_messages(self, library=None):
@@ -34,7 +35,7 @@ class Messages(Credentials):
         # Need Recursion to handle nextPage Errors
         headers, base_url = self.header_setup(xm=False, path='libraries')
         url = base_url + f"/{library}/messages/"
-        request = r.get(url, headers=headers)
+        request = self.api_request("GET", url, headers=headers)
         response = request.json()
         try:
             keys = ['id', 'description', 'category']
@@ -69,7 +70,7 @@ class Messages(Credentials):
 
         headers, base_url = self.header_setup(xm=False, path='libraries')
         url = base_url + f"/{library}/messages/{message}"
-        request = r.get(url, headers=headers)
+        request = self.api_request("GET", url, headers=headers)
         response = request.json()
         try:
             msg_html = response['result']['messages']['en']
@@ -1,4 +1,6 @@
 # __init__.py
+from .config import *
+from .lazy import *
 from .credentials import *
 
-__all__ = ['credentials']
+__all__ = ['config', 'lazy', 'credentials']
@@ -0,0 +1,71 @@
+from types import MappingProxyType
+
+class ClientConfig(object):
+    ''' This class holds the credentials of a single Qualtrics brand. It is immutable, and it builds the HTTP headers and
+    base urls once when it is created, so instances can be shared between threads and several brands can be used in the
+    same process. Its headers and json_headers are read-only mappings; copy them to add a header. Pass it to any module
+    with the config parameter (e.g. Responses(config=config)).
+
+    :param token: Your Qualtrics API Token
+    :type token: str
+    :param data_center: Your Qualtrics data center
+    :type data_center: str
+    :param directory_id: Your Qualtrics directory id (XM Directory Users-Only)
+    :type directory_id: str
+    :param api_url: The url the v3 API is served from, e.g. a proxy or the local stand-in server in
+    QualtricsAPI.tests.fake_server. (Default: "https://{data_center}.qualtrics.com/API/v3/")
+    :type api_url: str
+    '''
+
+    __slots__ = ('token', 'data_center', 'directory_id', 'headers', 'json_headers', 'api_url', 'xm_url', '_base_urls')
+
+    def __init__(self, token, data_center, directory_id=None, api_url=None):
+        assert isinstance(token, str) and len(token) == 40, 'Hey there! It looks like your api token is a the incorrect length. It needs to be 40 characters long. Please try again.'
+        assert isinstance(data_center, str) and len(data_center) > 0, 'Hey there! The data_center parameter must be a non-empty string.'
+        if directory_id:
+            assert len(directory_id) == 20, 'Hey there! It looks like your api directory ID is a the incorrect length. It needs to be 20 characters long. Please try again.'
+            assert directory_id[:5] == 'POOL_', 'Hey there! It looks like your directory ID is incorrect. You can find the directory ID on the Qualtrics site under your account settings. Please try again.'
+        assert api_url is None or isinstance(api_url, str), 'Hey there! The api_url parameter must be of type string.'
+
+        api_url = f"https://{data_center}.qualtrics.com/API/v3/" if api_url is None else api_url.rstrip('/') + '/'
+        set_attribute = super(ClientConfig, self).__setattr__
+        set_attribute('token', token)
+        set_attribute('data_center', data_center)
+        set_attribute('directory_id', directory_id or None)
+        set_attribute('headers', MappingProxyType({"x-api-token": token}))
+        set_attribute('json_headers', MappingProxyType({"x-api-token": token, "Content-Type": "application/json"}))
+        set_attribute('api_url', api_url)
+        set_attribute('xm_url', f"{api_url}directories/{directory_id}/" if directory_id else None)
+        set_attribute('_base_urls', {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Hey there! A ClientConfig cannot be changed once it is created. Please create a new one instead.')
+
+    def __delattr__(self, name):
+        raise AttributeError('Hey there! A ClientConfig cannot be changed once it is created. Please create a new one instead.')
+
+    def __eq__(self, other):
+        return isinstance(other, ClientConfig) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"ClientConfig(token='...{self.token[-4:]}', data_center='{self.data_center}', directory_id={self.directory_id!r})"
+
+    def _key(self):
+        return (self.token, self.data_center, self.directory_id, self.api_url)
+
+    def base_url(self, path=None):
+        '''This method returns the base url of a (non XM Directory) API path, e.g. 'surveys' or 'distributions'. Each url
+        is only built once. (Not a User-Facing Method)
+
+        :param path: The API path that follows "/API/v3/".
+        :type path: str
+        :return: The base url. (str)
+        '''
+        try:
+            return self._base_urls[path]
+        except KeyError:
+            url = self._base_urls[path] = f"{self.api_url}{path}"
+            return url
@@ -1,14 +1,135 @@
-import numpy as np
 import os
+import inspect
+import contextvars
+import functools
+import weakref
+from contextlib import nullcontext
+from QualtricsAPI.Transport import Transport, AsyncTransport, rate_limiter_setup, retry_policy_setup, concurrency_setup, breaker_setup, cache_setup, hooks_setup
+from QualtricsAPI.Setup.config import ClientConfig
+from QualtricsAPI.Setup.lazy import LazyModule
+from QualtricsAPI.Exceptions import Qualtrics500Error, Qualtrics503Error, Qualtrics504Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error, Qualtrics429Error
+
+# asyncio is only needed by AsyncCredentials, and takes longer to import than the rest of this module.
+asyncio = LazyModule('asyncio')
+
+def operation(function):
+    '''This decorator reports every call of a module method to the hooks of the transport as an operation span named
+    after the method. The string keyword arguments of the call (e.g. survey) become attributes of the span. When the
+    method returns a generator, the span lasts until the generator is exhausted or closed. (Not a User-Facing Function)'''
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def traced(self, *args, **kwargs):
+            hooks = self._hooks()
+            if hooks is None:
+                return await function(self, *args, **kwargs)
+            span = hooks.open_span(function.__name__, {name: value for name, value in kwargs.items() if isinstance(value, str)})
+            try:
+                with hooks.activate(span):
+                    result = await function(self, *args, **kwargs)
+            except BaseException as e:
+                hooks.close_span(span, e)
+                raise
+            return hooks.follow(span, result)
+    else:
+        @functools.wraps(function)
+        def traced(self, *args, **kwargs):
+            hooks = self._hooks()
+            if hooks is None:
+                return function(self, *args, **kwargs)
+            span = hooks.open_span(function.__name__, {name: value for name, value in kwargs.items() if isinstance(value, str)})
+            try:
+                with hooks.activate(span):
+                    result = function(self, *args, **kwargs)
+            except BaseException as e:
+                hooks.close_span(span, e)
+                raise
+            return hooks.follow(span, result)
+    return traced
 
 class Credentials(object):
     ''' This class handles the setup of credentials needed to setup the Qualtrics API Authorization. Use the
     qualtrics_api_credentials method to create enviornment variables that will automatically populate the correct
-    HTTP headers for the request that you are making. '''
+    HTTP headers for the request that you are making. Alternatively, pass a ClientConfig into the config parameter of any
+    module to keep each instance's credentials separate from the enviornment. '''
+
+    transport = None
+    config = None
+    environ_configs = {}
 
-    def __init__(self):
+    def __init__(self, config=None):
+        self.config = config
         return
 
+    @classmethod
+    def configure_transport(cls, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True, rate_limiter=True, retry_policy=True, concurrency=True, breaker=True, cache=False, hooks=False):
+        '''This method configures the connection pool that is shared by every Credentials subclass (Responses, XMDirectory,
+        MailingList, Distributions, Messages and Surveys). Any previously configured pool is closed.
+
+        :param pool_connections: The number of per-host connection pools to keep cached. (Default: 10)
+        :type pool_connections: int
+        :param pool_maxsize: The maximum number of connections to keep open to a single host. (Default: 10)
+        :type pool_maxsize: int
+        :param pool_block: If True, block when every connection to a host is in use instead of opening a throwaway one. (Default: False)
+        :type pool_block: bool
+        :param keep_alive: If False, ask the server to close the connection after every request. (Default: True)
+        :type keep_alive: bool
+        :param rate_limiter: True to throttle requests to the default Qualtrics call limits (see RateLimiter), False to send
+        them unthrottled, or a RateLimiter with your brand's limits. (Default: True)
+        :type rate_limiter: bool or RateLimiter
+        :param retry_policy: True to retry server errors and connection errors with the default RetryPolicy, False to send
+        every request once, or a RetryPolicy of your own. Its counters are available with transport.retry_policy.stats().
+        (Default: True)
+        :type retry_policy: bool or RetryPolicy
+        :param concurrency: True to shrink the number of requests in flight when Qualtrics answers with HTTP 429 and grow
+        it back while it does not (AIMD, up to pool_connections * pool_maxsize), False to not limit it, or an
+        AdaptiveConcurrency of your own. Its state is available with transport.concurrency.stats(). (Default: True)
+        :type concurrency: bool or AdaptiveConcurrency
+        :param breaker: True to fail fast with a QualtricsCircuitOpenError while an endpoint family of a data center keeps
+        failing with server errors, False to always send requests, or a CircuitBreaker of your own. The state of every
+        circuit is available with transport.breaker.stats(). (Default: True)
+        :type breaker: bool or CircuitBreaker
+        :param cache: A ResponseCache (e.g. ResponseCache(DiskCache('~/.qualtrics-cache'))) to serve repeated GET requests
+        such as get_list(), get_contact() and list_messages() from, True for an in-memory one, or False to send every
+        request. Changes made through this package invalidate the affected entries. (Default: False)
+        :type cache: bool or ResponseCache
+        :param hooks: Hooks (e.g. Hooks(LoggingSubscriber(), PrometheusSubscriber())) that every request and every
+        operation span is reported to, or False to not instrument the API calls. (Default: False)
+        :type hooks: bool or Hooks
+        :return: The shared Transport.
+        '''
+        if Credentials.transport is not None:
+            Credentials.transport.close()
+        Credentials.transport = Transport(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block, keep_alive=keep_alive, rate_limiter=rate_limiter, retry_policy=retry_policy, concurrency=concurrency, breaker=breaker, cache=cache, hooks=hooks)
+        return Credentials.transport
+
+    def api_request(self, method, url, **kwargs):
+        '''This method sends a request through the shared, pooled transport. (Not a User-Facing Method)
+
+        :param method: The HTTP method. ('GET', 'POST', 'PUT', 'DELETE')
+        :type method: str
+        :param url: The fully qualified url for the request.
+        :type url: str
+        :return: a requests.Response
+        '''
+        if Credentials.transport is None:
+            Credentials.configure_transport()
+        return Credentials.transport.request(method, url, **kwargs)
+
+    def span(self, name, **attributes):
+        '''This method times an operation, or a phase of one, for the hooks of the transport. It does nothing when the
+        transport has no hooks. (Not a User-Facing Method)
+
+        :param name: The name of the operation (e.g. 'get_survey_responses') or of the phase (e.g. 'poll').
+        :type name: str
+        :return: A context manager
+        '''
+        hooks = self._hooks()
+        return nullcontext() if hooks is None else hooks.span(name, **attributes)
+
+    def _hooks(self):
+        '''This method returns the Hooks of the shared transport, or None. (Not a User-Facing Method)'''
+        return None if Credentials.transport is None else Credentials.transport.hooks
+
     def qualtrics_api_credentials(self, token, data_center, directory_id=None):
         '''This method creates enviornment variables for the users Qualtrics API token, data center, and their directory id.
 
@@ -18,7 +139,8 @@ class Credentials(object):
         :type data_center: str
         :param directory_id: Your Qualtrics directory id (XM Directory Users-Only)
         :type directory_id: str
-        :return: Nothing explicitly, However you just create enviornment variables that will populate you HTTP Headers.
+        :return: A ClientConfig holding the same credentials. However you also create enviornment variables that will populate
+        you HTTP Headers for every module that is not given a config.
         '''
         assert len(token) == 40, 'Hey there! It looks like your api token is a the incorrect length. It needs to be 40 characters long. Please try again.'
         if directory_id: 
@@ -28,7 +150,26 @@ class Credentials(object):
 
         os.environ['token'] = token
         os.environ['data_center'] = data_center
-        return
+        return ClientConfig(token, data_center, directory_id)
+
+    def _resolve_config(self, config=None, token=None, data_center=None, directory_id=None):
+        '''This method returns the ClientConfig a module was created with, building one from the token, data_center and
+        directory_id parameters when only those were given. (Not a User-Facing Method)'''
+        if config is not None:
+            assert isinstance(config, ClientConfig), 'Hey there! The config parameter must be a ClientConfig.'
+            return config
+        if token is not None and data_center is not None:
+            return ClientConfig(token, data_center, directory_id)
+        return None
+
+    def _environ_config(self):
+        '''This method returns the ClientConfig matching the enviornment variables created by qualtrics_api_credentials().
+        One ClientConfig is kept per set of credentials so the headers are not rebuilt on every call. (Not a User-Facing Method)'''
+        key = (os.environ['token'], os.environ['data_center'], os.environ.get('directory_id'))
+        config = Credentials.environ_configs.get(key)
+        if config is None:
+            config = Credentials.environ_configs[key] = ClientConfig(*key)
+        return config
 
     def header_setup(self, content_type=False, xm=True, path=None):
         '''This method accepts the argument content_type and returns the correct header, and base url. (Not a User-Facing Method)
@@ -39,12 +180,130 @@ class Credentials(object):
         :param content_type: use to return json response.
         :return: a HTML header and base url.
         '''
+        config = self.config if self.config is not None else self._environ_config()
         if xm:
-            assert os.environ['directory_id'], 'Hey there! This endpoint is only accessible for XM Directory Users . If you have access to the XM Directory, then be sure to include your directory_id when you use the qualtrics_api_credentials() method. '
-            path = 'directories/{0}/'.format(os.environ['directory_id']) if xm else path
-
-        header = {"x-api-token": os.environ['token']}
-        base_url = f"https://{os.environ['data_center']}.qualtrics.com/API/v3/{path}"
-        if content_type is True:
-            header["Content-Type"] = "application/json"
+            assert config.directory_id, 'Hey there! This endpoint is only accessible for XM Directory Users . If you have access to the XM Directory, then be sure to include your directory_id when you use the qualtrics_api_credentials() method. '
+            base_url = config.xm_url
+        else:
+            base_url = config.base_url(path)
+        # A copy, so a caller that adds a header does not change the requests of every other caller of the config.
+        header = dict(config.json_headers if content_type is True else config.headers)
         return header, base_url
+
+    def _raise_for_meta(self, response):
+        '''This method raises the Qualtrics exception that matches the httpStatus of a response. (Not a User-Facing Method)'''
+        if response['meta']['httpStatus'] == '500 - Internal Server Error':
+            raise Qualtrics500Error('500 - Internal Server Error')
+        elif response['meta']['httpStatus'] == '503 - Temporary Internal Server Error':
+            raise Qualtrics503Error(
+                '503 - Temporary Internal Server Error')
+        elif response['meta']['httpStatus'] == '504 - Gateway Timeout':
+            raise Qualtrics504Error('504 - Gateway Timeout')
+        elif response['meta']['httpStatus'] == '400 - Bad Request':
+            raise Qualtrics400Error(
+                'Qualtrics Error\n(Http Error: 400 - Bad Request): There was something invalid about the request.')
+        elif response['meta']['httpStatus'] == '401 - Unauthorized':
+            raise Qualtrics401Error(
+                'Qualtrics Error\n(Http Error: 401 - Unauthorized): The Qualtrics API user could not be authenticated or does not have authorization to access the requested resource.')
+        elif response['meta']['httpStatus'] == '403 - Forbidden':
+            raise Qualtrics403Error(
+                'Qualtrics Error\n(Http Error: 403 - Forbidden): The Qualtrics API user was authenticated and made a valid request, but is not authorized to access this requested resource.')
+        elif response['meta']['httpStatus'] == '429 - Too Many Requests':
+            raise Qualtrics429Error(
+                'Qualtrics Error\n(Http Error: 429 - Too Many Requests): The Qualtrics API user has exceeded the rate limit for this endpoint.')
+
+
+class AsyncCredentials(Credentials):
+    ''' This class is the asyncio counterpart of the Credentials class. It reads the same credentials, but sends its
+    requests through a non-blocking AsyncTransport that is shared by every Async* class running on the same event loop.'''
+
+    transport_settings = {}
+    async_transports = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def configure_async_transport(cls, pool_connections=10, pool_maxsize=10, keep_alive=True, verify=True, rate_limiter=True, retry_policy=True, concurrency=True, breaker=True, cache=False, hooks=False):
+        '''This method configures the connection pool that is shared by every Async* class (AsyncResponses, AsyncXMDirectory,
+        AsyncMailingList and AsyncDistributions). A pool is opened lazily for each running event loop.
+
+        :param pool_connections: The number of hosts to keep pooled connections for. (Default: 10)
+        :type pool_connections: int
+        :param pool_maxsize: The maximum number of connections to keep open to a single host. (Default: 10)
+        :type pool_maxsize: int
+        :param keep_alive: If False, do not keep idle connections open between requests. (Default: True)
+        :type keep_alive: bool
+        :param verify: Either a bool or the path to a CA bundle used to verify the server's certificate. (Default: True)
+        :type verify: bool or str
+        :param rate_limiter: True to throttle requests to the default Qualtrics call limits (see RateLimiter), False to send
+        them unthrottled, or a RateLimiter with your brand's limits. One limiter is shared by the pools of every event loop.
+        (Default: True)
+        :type rate_limiter: bool or RateLimiter
+        :param retry_policy: True to retry server errors and connection errors with the default RetryPolicy, False to send
+        every request once, or a RetryPolicy of your own. One policy is shared by the pools of every event loop. (Default: True)
+        :type retry_policy: bool or RetryPolicy
+        :param concurrency: True to shrink the number of requests in flight when Qualtrics answers with HTTP 429 and grow
+        it back while it does not (AIMD, up to pool_connections * pool_maxsize), False to not limit it, or an
+        AdaptiveConcurrency of your own. One limit is shared by the pools of every event loop. (Default: True)
+        :type concurrency: bool or AdaptiveConcurrency
+        :param breaker: True to fail fast with a QualtricsCircuitOpenError while an endpoint family of a data center keeps
+        failing with server errors, False to always send requests, or a CircuitBreaker of your own. One breaker is shared
+        by the pools of every event loop. (Default: True)
+        :type breaker: bool or CircuitBreaker
+        :param cache: A ResponseCache to serve repeated GET requests from, True for an in-memory one, or False to send
+        every request. One cache is shared by the pools of every event loop. (Default: False)
+        :type cache: bool or ResponseCache
+        :param hooks: Hooks that every request and every operation span is reported to, or False to not instrument the
+        API calls. The same Hooks are shared by the pools of every event loop. (Default: False)
+        :type hooks: bool or Hooks
+        :return: Nothing
+        '''
+        assert isinstance(pool_connections, int) and pool_connections > 0, 'Hey there! The pool_connections parameter must be a positive integer.'
+        assert isinstance(pool_maxsize, int) and pool_maxsize > 0, 'Hey there! The pool_maxsize parameter must be a positive integer.'
+        AsyncCredentials.transport_settings = {'pool_connections': pool_connections, 'pool_maxsize': pool_maxsize,
+                                               'keep_alive': keep_alive, 'verify': verify,
+                                               'rate_limiter': rate_limiter_setup(rate_limiter),
+                                               'retry_policy': retry_policy_setup(retry_policy),
+                                               'concurrency': concurrency_setup(concurrency, pool_connections * pool_maxsize),
+                                               'breaker': breaker_setup(breaker),
+                                               'cache': cache_setup(cache),
+                                               'hooks': hooks_setup(hooks)}
+        AsyncCredentials.async_transports = weakref.WeakKeyDictionary()
+        return
+
+    def _hooks(self):
+        '''This method returns the Hooks shared by the async transports, or None. (Not a User-Facing Method)'''
+        return AsyncCredentials.transport_settings.get('hooks')
+
+    @classmethod
+    async def close_async_transport(cls):
+        '''This method closes the pool that belongs to the running event loop.'''
+        transport = AsyncCredentials.async_transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.close()
+        return
+
+    async def api_request(self, method, url, **kwargs):
+        '''This method sends a request through the shared AsyncTransport of the running event loop. (Not a User-Facing Method)
+
+        :param method: The HTTP method. ('GET', 'POST', 'PUT', 'DELETE')
+        :type method: str
+        :param url: The fully qualified url for the request.
+        :type url: str
+        :return: an httpx.Response
+        '''
+        loop = asyncio.get_running_loop()
+        transport = AsyncCredentials.async_transports.get(loop)
+        if transport is None:
+            if not AsyncCredentials.transport_settings:
+                AsyncCredentials.configure_async_transport()
+            transport = AsyncTransport(**AsyncCredentials.transport_settings)
+            AsyncCredentials.async_transports[loop] = transport
+        return await transport.request(method, url, **kwargs)
+
+    async def run_blocking(self, function, *args):
+        '''This method runs a blocking function, such as the parsing of an export file, in the default executor of the
+        running event loop, in a copy of the current context so its spans keep their parent. (Not a User-Facing Method)
+
+        :return: The result of the function.
+        '''
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(context.run, function, *args))
@@ -0,0 +1,23 @@
+import importlib
+
+class LazyModule(object):
+    ''' This class stands in for a module that is slow to import (e.g. pandas or numpy). The module is imported the first
+    time one of its attributes is used, so "import QualtricsAPI" and the methods that return JSON never pay for it.
+    (Not a User-Facing Class)
+
+    :param name: The name of the module, e.g. 'pandas'.
+    :type name: str
+    '''
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def __getattr__(self, attribute):
+        module = self.__dict__['_module']
+        if module is None:
+            module = self.__dict__['_module'] = importlib.import_module(self.__dict__['_name'])
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        return f"<LazyModule '{self._name}' ({'imported' if self._module is not None else 'not imported'})>"
@@ -1,5 +1,9 @@
 # __init__.py
+from .export_job import *
+from .watermarks import *
+from .definitions import *
+from .export_cache import *
 from .responses import *
 from .distributions import *
 
-__all__ = ['responses', 'distributions']
+__all__ = ['export_job', 'watermarks', 'definitions', 'export_cache', 'responses', 'distributions']
@@ -0,0 +1,76 @@
+import os
+import json
+import hashlib
+import threading
+
+class SurveyDefinitionCache(object):
+    ''' This class caches survey definitions for Responses().get_survey_definition(). Entries are keyed by a hash of the
+    API token, the data center and the survey id, so clients of different brands never share them. A definition younger than max_age seconds is returned without contacting Qualtrics;
+    an older one is checked against the LastModified date of the survey and fetched again only if the survey changed.
+
+    Set Responses.definition_cache to a SurveyDefinitionCache with a directory to keep the definitions between processes.
+
+    :param directory: The directory to keep the definitions in, as JSON files. (Default: None, in memory only)
+    :type directory: str
+    :param max_age: The number of seconds a definition is used without checking whether the survey changed. (Default: 300)
+    :type max_age: float
+    '''
+
+    def __init__(self, directory=None, max_age=300):
+        assert directory is None or isinstance(directory, str), 'Hey there! The directory parameter must be of type string.'
+        assert isinstance(max_age, (int, float)) and max_age >= 0, 'Hey there! The max_age parameter must be a non-negative number of seconds.'
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_age = max_age
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def key(self, token, url):
+        '''This method returns the key of a definition: a SHA-256 of the API token and the url of the survey, which holds
+        the data center and the survey id.'''
+        return hashlib.sha256(f'{token}\n{url}'.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        '''This method returns the cached entry of a key (its definition, last_modified and checked_at), or None.'''
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None or self.directory is None:
+            return entry
+        try:
+            with open(self.path(key), 'r', encoding='utf-8') as definition_file:
+                entry = json.load(definition_file)
+        except (OSError, ValueError):
+            return None
+        with self.lock:
+            self.entries[key] = entry
+        return entry
+
+    def set(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            if self.directory is not None:
+                temporary = f'{self.path(key)}.{threading.get_ident()}.tmp'
+                with open(temporary, 'w', encoding='utf-8') as definition_file:
+                    json.dump(entry, definition_file)
+                os.replace(temporary, self.path(key))
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+            if self.directory is not None:
+                try:
+                    os.remove(self.path(key))
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self.lock:
+            keys = list(self.entries)
+            if self.directory is not None:
+                keys += [name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json')]
+        for key in set(keys):
+            self.delete(key)
@@ -1,16 +1,23 @@
-import requests as r
-import pandas as pd
 from datetime import date, datetime, timedelta
-from QualtricsAPI.Setup import Credentials
+from QualtricsAPI.Setup import Credentials, AsyncCredentials, operation, LazyModule
 from QualtricsAPI.JSON import Parser
 
+pd = LazyModule('pandas')
+
 class Distributions(Credentials):
     '''This is a child class to the credentials class and gathers information about  Qualtric's Distributions.'''
 
-    def __init__(self, token=None, directory_id=None, data_center=None):
+    distribution_columns = ['id', 'parentDistributionId', 'ownerId', 'organizationId', 'requestStatus', 'requestType',
+                    'sendDate', 'createdDate', 'modifiedDate', 'headers', 'fromEmail', 'replyToEmail', 'fromName',
+                     'subject', 'recipients', 'mailingListId', 'contactId', 'sampleId', 'message', 'messageId',
+                     'messageText', 'surveyLink', 'surveyId', 'expirationDate', 'linkType', 'stats', 'sent', 'failed',
+                     'started', 'bounced', 'opened', 'skipped', 'finished', 'complaints', 'blocked', 'mailing_list_library_id', 'message_library_id']
+
+    def __init__(self, token=None, directory_id=None, data_center=None, config=None):
         self.token = token
         self.data_center = data_center
         self.directory_id = directory_id
+        self.config = self._resolve_config(config, token, data_center, directory_id)
         return
 
     def set_send_date(self, weeks=0, days=0, hours=0, minutes=0, seconds=0):
@@ -65,38 +72,8 @@ class Distributions(Credentials):
         :return: The Distribution ID. (str)
         '''
 
-        assert len(mailing_list) == 18, 'Hey, the parameter for "mailing_list" that was passed is the wrong length. It should have 18 characters.'
-        assert len(library) == 18, 'Hey, the parameter for "library" that was passed is the wrong length. It should have 18 characters.'
-        assert len(survey) == 18, 'Hey, the parameter for "survey" that was passed is the wrong length. It should have 18 characters.'
-        assert len(message) == 18, 'Hey, the parameter for "message" that was passed is the wrong length. It should have 18 characters.'
-        assert mailing_list[:3] == 'CG_', 'Hey there! It looks like your Mailing List ID is incorrect. You can find the Mailing List ID on the Qualtrics site under your account settings. It will begin with "CG_". Please try again.'
-        assert survey[:3] == 'SV_', 'Hey there! It looks like your SurveyID is incorrect. You can find the SurveyID on the Qualtrics site under your account settings. It will begin with "SV_". Please try again.'
-        assert message[:3] == 'MS_', 'Hey there! It looks like your MessageID is incorrect. You can find the MessageID by using the list messages method available in the Messages module of this Package. It will begin with "MS_". Please try again.'
-        assert library[:3] == 'UR_' or library[:3] == 'GR_', 'Hey there! It looks like your Library ID is incorrect. You can find the Library ID on the Qualtrics site under your account settings. It will begin with "UR_" or "GR_". Please try again.'
-
-        headers, url = self.header_setup(content_type=True, xm=False, path='distributions')
-        data = {
-            'header': {
-                'fromEmail': from_email,
-                'fromName': from_name,
-                'replyToEmail': reply_email,
-                'subject': subject
-            },
-            'surveyLink': {
-                'surveyId': survey,
-                'type': link_type
-            },
-            'recipients': {
-                'mailingListId': mailing_list
-            },
-            'sendDate': send_date,
-            'message': {
-                    'libraryId': library,
-                    'messageId': message
-            }
-        }
-
-        request = r.post(url, json=data, headers=headers)
+        headers, url, data = self._distribution_setup(subject, reply_email, from_email, from_name, mailing_list, library, survey, message, send_date, link_type)
+        request = self.api_request("POST", url, json=data, headers=headers)
         response = request.json()
         try:
             distribution_id = response['result']['id']
@@ -131,31 +108,8 @@ class Distributions(Credentials):
         :return: The "Reminder" Distribution ID. (str)
         '''
 
-        assert len(distribution) == 19, 'Hey, the parameter for "distribution" that was passed is the wrong length. It should have 19 characters.'
-        assert len(library) == 18, 'Hey, the parameter for "library" that was passed is the wrong length. It should have 18 characters.'
-        assert len(message) == 18, 'Hey, the parameter for "message" that was passed is the wrong length. It should have 18 characters.'
-        assert distribution[:4] == 'EMD_', 'Hey there! It looks like your distributionID is incorrect. You can find the distributionID by using the list_distributions method in this module. It will begin with "UMD_". Please try again.'
-        assert message[:3] == 'MS_', 'Hey there! It looks like your MessageID is incorrect. You can find the MessageID by using the list messages method available in the Messages module of this Package. It will begin with "MS_". Please try again.'
-        assert library[:3] == 'UR_' or library[:3] == 'GR_', 'Hey there! It looks like your Library ID is incorrect. You can find the Library ID on the Qualtrics site under your account settings. It will begin with "UR_" or "GR_". Please try again.'
-
-
-        headers, base_url = self.header_setup(content_type=True, xm=False, path='distributions')
-        url = f'{base_url}/{distribution}/reminders'
-        data = {
-            'header': {
-                'fromEmail': from_email,
-                'fromName': from_name,
-                'replyToEmail': reply_email,
-                'subject': subject
-            },
-            'sendDate': send_date,
-            'message': {
-                    'libraryId': library,
-                    'messageId': message
-            }
-        }
-
-        request = r.post(url, json=data, headers=headers)
+        headers, url, data = self._follow_up_setup(library, message, distribution, send_date, subject, reply_email, from_email, from_name, 'reminders')
+        request = self.api_request("POST", url, json=data, headers=headers)
         response = request.json()
         try:
             reminder_id = response['result']
@@ -190,29 +144,8 @@ class Distributions(Credentials):
         :return: The "Thank You" Distribution ID. (str)
         '''
 
-        assert len(distribution) == 19, 'Hey, the parameter for "distribution" that was passed is the wrong length. It should have 19 characters.'
-        assert len(library) == 18, 'Hey, the parameter for "library" that was passed is the wrong length. It should have 18 characters.'
-        assert len(message) == 18, 'Hey, the parameter for "message" that was passed is the wrong length. It should have 18 characters.'
-        assert distribution[:4] == 'EMD_', 'Hey there! It looks like your distributionID is incorrect. You can find the distributionID by using the list_distributions method in this module. It will begin with "UMD_". Please try again.'
-        assert message[:3] == 'MS_', 'Hey there! It looks like your MessageID is incorrect. You can find the MessageID by using the list messages method available in the Messages module of this Package. It will begin with "MS_". Please try again.'
-        assert library[:3] == 'UR_' or library[:3] == 'GR_', 'Hey there! It looks like your Library ID is incorrect. You can find the Library ID on the Qualtrics site under your account settings. It will begin with "UR_" or "GR_". Please try again.'
-
-        headers, base_url = self.header_setup(content_type=True, xm=False, path='distributions')
-        url = f'{base_url}/{distribution}/thankyous'
-        data = {
-            'header': {
-                'fromEmail': from_email,
-                'fromName': from_name,
-                'replyToEmail': reply_email,
-                'subject': subject
-            },
-            'sendDate': send_date,
-            'message': {
-                    'libraryId': library,
-                    'messageId': message
-            }
-        }
-        request = r.post(url, json=data, headers=headers)
+        headers, url, data = self._follow_up_setup(library, message, distribution, send_date, subject, reply_email, from_email, from_name, 'thankyous')
+        request = self.api_request("POST", url, json=data, headers=headers)
         response = request.json()
         try:
             thanks_id = response['result']
@@ -221,6 +154,7 @@ class Distributions(Credentials):
             print(f"\nServerError: QualtricsAPI Error Code: {response['meta']['error']['errorCode']}\nQualtricsAPI Error Message: {response['meta']['error']['errorMessage']}")
         return
 
+    @operation
     def list_distributions(self, survey):
         ''' This method will list all of the distributions corresponding with a given survey. Given that distributions are
         specific to individual surveys, we must pass the SurveyID as an arguement into the survey parameter for this method
@@ -237,26 +171,12 @@ class Distributions(Credentials):
 
         headers, base_url = self.header_setup(xm=False, path='distributions')
         url = f'{base_url}?surveyId={survey}'
-        columns = ['id', 'parentDistributionId', 'ownerId', 'organizationId', 'requestStatus', 'requestType',
-                    'sendDate', 'createdDate', 'modifiedDate', 'headers', 'fromEmail', 'replyToEmail', 'fromName',
-                     'subject', 'recipients', 'mailingListId', 'contactId', 'sampleId', 'message', 'messageId',
-                     'messageText', 'surveyLink', 'surveyId', 'expirationDate', 'linkType', 'stats', 'sent', 'failed',
-                     'started', 'bounced', 'opened', 'skipped', 'finished', 'complaints', 'blocked', 'mailing_list_library_id', 'message_library_id']
-        master = pd.DataFrame(columns=columns)
+        master = pd.DataFrame(columns=self.distribution_columns)
         def extract_distributions(url=url, master=master):
-            request = r.get(url, headers=headers)
+            request = self.api_request("GET", url, headers=headers)
             response = request.json()
             if response['meta']['httpStatus'] == '200 - OK':
-                keys = columns[:-2]
-                dists = Parser().json_parser(response=response, keys=keys, arr=False)
-                dist_df = pd.DataFrame(dists).transpose()
-                dist_df.columns = keys
-                library_ids = Parser().json_parser(response=response, keys=['libraryId'], arr=False)
-                dist_df['mailing_list_library_id'] = library_ids[0][:len(dist_df)]
-                dist_df['message_library_id'] = library_ids[0][len(dist_df):]
-                master = pd.concat([master, dist_df], sort=False).reset_index(drop=True)
-                next_page = response['result']['nextPage']
-                return master, next_page
+                return self._distributions_page(response, master)
             else:
                 print(response['meta'])
                 master, next_page = extract_distributions(url=url, master=master)
@@ -290,21 +210,10 @@ class Distributions(Credentials):
 
         headers, base_url = self.header_setup(xm=False, path='distributions')
         url = f'{base_url}/{distribution}?surveyId={survey}'
-        request = r.get(url, headers=headers)
+        request = self.api_request("GET", url, headers=headers)
         try:
             response = request.json()
-            keys = ['id', 'parentDistributionId', 'ownerId', 'organizationId', 'requestStatus', 'requestType',
-                    'sendDate', 'createdDate', 'modifiedDate', 'headers', 'fromEmail', 'replyToEmail', 'fromName',
-                     'subject', 'recipients', 'mailingListId', 'contactId', 'sampleId', 'message', 'messageId',
-                     'messageText', 'surveyLink', 'surveyId', 'expirationDate', 'linkType', 'stats', 'sent', 'failed',
-                     'started', 'bounced', 'opened', 'skipped', 'finished', 'complaints', 'blocked']
-            dists = Parser().json_parser(response=response, keys=keys, arr=False)
-            dist_df = pd.DataFrame(dists)
-            dist_df.index = keys
-            library_ids = Parser().json_parser(response=response, keys=['libraryId'], arr=False)
-            lib = pd.DataFrame(library_ids[0], index=['mailing_list_library_id', 'message_library_id'])
-            dist_df = dist_df.append(lib)
-            return dist_df
+            return self._distribution_frame(response)
         except:
             print(f"\nServerError: QualtricsAPI Error Code: {response['meta']['error']['errorCode']}\nQualtricsAPI Error Message: {response['meta']['error']['errorMessage']}")
 
@@ -332,6 +241,78 @@ class Distributions(Credentials):
         :return: The Distribution ID. (str)
         '''
 
+        headers, url, data = self._sms_distribution_setup(dist_name, mailing_list, library, survey, message, send_date, parentDistributionId, method)
+        request = self.api_request("POST", url, json=data, headers=headers)
+        response = request.json()
+        try:
+            distribution_id = response['result']['id']
+            return distribution_id
+        except:
+            print(f"\nServerError: QualtricsAPI Error Code: {response['meta']['error']['errorCode']}\nQualtricsAPI Error Message: {response['meta']['error']['errorMessage']}")
+        return
+
+    def _distribution_setup(self, subject, reply_email, from_email, from_name, mailing_list, library, survey, message, send_date, link_type):
+        '''This method validates the arguments of create_distribution and builds its url and payload. (Not a User-Facing Method)'''
+        assert len(mailing_list) == 18, 'Hey, the parameter for "mailing_list" that was passed is the wrong length. It should have 18 characters.'
+        assert len(library) == 18, 'Hey, the parameter for "library" that was passed is the wrong length. It should have 18 characters.'
+        assert len(survey) == 18, 'Hey, the parameter for "survey" that was passed is the wrong length. It should have 18 characters.'
+        assert len(message) == 18, 'Hey, the parameter for "message" that was passed is the wrong length. It should have 18 characters.'
+        assert mailing_list[:3] == 'CG_', 'Hey there! It looks like your Mailing List ID is incorrect. You can find the Mailing List ID on the Qualtrics site under your account settings. It will begin with "CG_". Please try again.'
+        assert survey[:3] == 'SV_', 'Hey there! It looks like your SurveyID is incorrect. You can find the SurveyID on the Qualtrics site under your account settings. It will begin with "SV_". Please try again.'
+        assert message[:3] == 'MS_', 'Hey there! It looks like your MessageID is incorrect. You can find the MessageID by using the list messages method available in the Messages module of this Package. It will begin with "MS_". Please try again.'
+        assert library[:3] == 'UR_' or library[:3] == 'GR_', 'Hey there! It looks like your Library ID is incorrect. You can find the Library ID on the Qualtrics site under your account settings. It will begin with "UR_" or "GR_". Please try again.'
+
+        headers, url = self.header_setup(content_type=True, xm=False, path='distributions')
+        data = {
+            'header': {
+                'fromEmail': from_email,
+                'fromName': from_name,
+                'replyToEmail': reply_email,
+                'subject': subject
+            },
+            'surveyLink': {
+                'surveyId': survey,
+                'type': link_type
+            },
+            'recipients': {
+                'mailingListId': mailing_list
+            },
+            'sendDate': send_date,
+            'message': {
+                    'libraryId': library,
+                    'messageId': message
+            }
+        }
+        return headers, url, data
+
+    def _follow_up_setup(self, library, message, distribution, send_date, subject, reply_email, from_email, from_name, kind):
+        '''This method validates the arguments of create_reminder and create_thank_you and builds their url and payload. (Not a User-Facing Method)'''
+        assert len(distribution) == 19, 'Hey, the parameter for "distribution" that was passed is the wrong length. It should have 19 characters.'
+        assert len(library) == 18, 'Hey, the parameter for "library" that was passed is the wrong length. It should have 18 characters.'
+        assert len(message) == 18, 'Hey, the parameter for "message" that was passed is the wrong length. It should have 18 characters.'
+        assert distribution[:4] == 'EMD_', 'Hey there! It looks like your distributionID is incorrect. You can find the distributionID by using the list_distributions method in this module. It will begin with "UMD_". Please try again.'
+        assert message[:3] == 'MS_', 'Hey there! It looks like your MessageID is incorrect. You can find the MessageID by using the list messages method available in the Messages module of this Package. It will begin with "MS_". Please try again.'
+        assert library[:3] == 'UR_' or library[:3] == 'GR_', 'Hey there! It looks like your Library ID is incorrect. You can find the Library ID on the Qualtrics site under your account settings. It will begin with "UR_" or "GR_". Please try again.'
+
+        headers, base_url = self.header_setup(content_type=True, xm=False, path='distributions')
+        url = f'{base_url}/{distribution}/{kind}'
+        data = {
+            'header': {
+                'fromEmail': from_email,
+                'fromName': from_name,
+                'replyToEmail': reply_email,
+                'subject': subject
+            },
+            'sendDate': send_date,
+            'message': {
+                    'libraryId': library,
+                    'messageId': message
+            }
+        }
+        return headers, url, data
+
+    def _sms_distribution_setup(self, dist_name, mailing_list, library, survey, message, send_date, parentDistributionId, method):
+        '''This method validates the arguments of create_sms_distribution and builds its url and payload. (Not a User-Facing Method)'''
         assert len(mailing_list) == 18, 'Hey, the parameter for "mailing_list" that was passed is the wrong length. It should have 18 characters.'
         assert len(library) == 18, 'Hey, the parameter for "library" that was passed is the wrong length. It should have 18 characters.'
         assert len(survey) == 18, 'Hey, the parameter for "survey" that was passed is the wrong length. It should have 18 characters.'
@@ -358,12 +339,140 @@ class Distributions(Credentials):
 
         if parentDistributionId != None: 
            data['parentDistributionId'] = parentDistributionId
+        return headers, url, data
 
-        request = r.post(url, json=data, headers=headers)
+    def _distributions_page(self, response, master):
+        '''This method appends a single page of distributions to the master DataFrame. (Not a User-Facing Method)'''
+        with self.span('parse'):
+            keys = self.distribution_columns[:-2]
+            dists = Parser().json_parser(response=response, keys=keys, arr=False)
+            dist_df = pd.DataFrame(dists).transpose()
+            dist_df.columns = keys
+            library_ids = Parser().json_parser(response=response, keys=['libraryId'], arr=False)
+            dist_df['mailing_list_library_id'] = library_ids[0][:len(dist_df)]
+            dist_df['message_library_id'] = library_ids[0][len(dist_df):]
+            master = pd.concat([master, dist_df], sort=False).reset_index(drop=True)
+            next_page = response['result']['nextPage']
+        return master, next_page
+
+    def _distribution_frame(self, response):
+        '''This method builds the DataFrame returned by get_distribution. (Not a User-Facing Method)'''
+        keys = self.distribution_columns[:-2]
+        dists = Parser().json_parser(response=response, keys=keys, arr=False)
+        dist_df = pd.DataFrame(dists)
+        dist_df.index = keys
+        library_ids = Parser().json_parser(response=response, keys=['libraryId'], arr=False)
+        lib = pd.DataFrame(library_ids[0], index=['mailing_list_library_id', 'message_library_id'])
+        dist_df = pd.concat([dist_df, lib])
+        return dist_df
+
+
+class AsyncDistributions(Distributions, AsyncCredentials):
+    '''This is the asyncio counterpart of the Distributions class. Its methods take the same parameters, run the same
+    validation and return the same shapes as their Distributions equivalents, but they must be awaited.'''
+
+    async def create_distribution(self, subject, reply_email, from_email, from_name, mailing_list, library, survey, message, send_date, link_type='Individual'):
+        '''This method gives users the ability to create a distribution for a given mailing list and survey. See
+        Distributions.create_distribution() for a description of each parameter.
+
+        :return: The Distribution ID. (str)
+        '''
+        headers, url, data = self._distribution_setup(subject, reply_email, from_email, from_name, mailing_list, library, survey, message, send_date, link_type)
+        request = await self.api_request("POST", url, json=data, headers=headers)
         response = request.json()
         try:
-            distribution_id = response['result']['id']
-            return distribution_id
+            return response['result']['id']
         except:
             print(f"\nServerError: QualtricsAPI Error Code: {response['meta']['error']['errorCode']}\nQualtricsAPI Error Message: {response['meta']['error']['errorMessage']}")
-        return
\ No newline at end of file
+        return
+
+    async def create_reminder(self, subject, reply_email, from_email, from_name, library, message, distribution, send_date):
+        '''This method gives users the ability to create a reminder for a given distribution. See
+        Distributions.create_reminder() for a description of each parameter.
+
+        :return: The "Reminder" Distribution ID. (str)
+        '''
+        headers, url, data = self._follow_up_setup(library, message, distribution, send_date, subject, reply_email, from_email, from_name, 'reminders')
+        request = await self.api_request("POST", url, json=data, headers=headers)
+        response = request.json()
+        try:
+            return response['result']
+        except:
+            print(f"\nServerError: QualtricsAPI Error Code: {response['meta']['error']['errorCode']}\nQualtricsAPI Error Message: {response['meta']['error']['errorMessage']}")
+        return
+
+    async def create_thank_you(self, subject, reply_email, from_email, from_name, library, message, distribution, send_date):
+        '''This method gives users the ability to create a thank you for a given distribution. See
+        Distributions.create_thank_you() for a description of each parameter.
+
+        :return: The "Thank You" Distribution ID. (str)
+        '''
+        headers, url, data = self._follow_up_setup(library, message, distribution, send_date, subject, reply_email, from_email, from_name, 'thankyous')
+        request = await self.api_request("POST", url, json=data, headers=headers)
+        response = request.json()
+        try:
+            return response['result']
+        except:
+            print(f"\nServerError: QualtricsAPI Error Code: {response['meta']['error']['errorCode']}\nQualtricsAPI Error Message: {response['meta']['error']['errorMessage']}")
+        return
+
+    @operation
+    async def list_distributions(self, survey):
+        ''' This method will list all of the distributions corresponding with a given survey.
+
+        :param survey: The Survey ID corresponding with the Survey that the distribution is to be sent to.
+        :type survey: str
+        :return: A Pandas DataFrame
+        '''
+        assert survey[:3] == 'SV_', 'Hey there! It looks like your SurveyID is incorrect. You can find the SurveyID on the Qualtrics site under your account settings. It will begin with "SV_". Please try again.'
+        assert len(survey) == 18, 'Hey, the parameter for "survey" that was passed is the wrong length. It should have 18 characters.'
+
+        headers, base_url = self.header_setup(xm=False, path='distributions')
+        next_page = f'{base_url}?surveyId={survey}'
+        master = pd.DataFrame(columns=self.distribution_columns)
+        while next_page != None:
+            request = await self.api_request("GET", next_page, headers=headers)
+            response = request.json()
+            if response['meta']['httpStatus'] == '200 - OK':
+                master, next_page = self._distributions_page(response, master)
+            else:
+                print(response['meta'])
+        return master
+
+    async def get_distribution(self, survey, distribution):
+        ''' This method gives users the ability to get a specific distribution corresponding with a given survey.
+
+        :param survey: The Survey ID corresponding with the Survey that the distribution is to be sent to.
+        :type survey: str
+        :param distribution: A specific Distribution ID associated with the given survey.
+        :type distribution: str
+        :return: A Pandas DataFrame
+        '''
+        assert survey[:3] == 'SV_', 'Hey there! It looks like your SurveyID is incorrect. You can find the SurveyID on the Qualtrics site under your account settings. It will begin with "SV_". Please try again.'
+        assert len(survey) == 18, 'Hey, the parameter for "survey" that was passed is the wrong length. It should have 18 characters.'
+        assert len(distribution) == 19, 'Hey, the parameter for "distribution" that was passed is the wrong length. It should have 19 characters.'
+        assert distribution[:4] == 'EMD_', 'Hey there! It looks like your distributionID is incorrect. You can find the distributionID by using the list_distributions method in this module. It will begin with "UMD_". Please try again.'
+
+        headers, base_url = self.header_setup(xm=False, path='distributions')
+        url = f'{base_url}/{distribution}?surveyId={survey}'
+        request = await self.api_request("GET", url, headers=headers)
+        try:
+            response = request.json()
+            return self._distribution_frame(response)
+        except:
+            print(f"\nServerError: QualtricsAPI Error Code: {response['meta']['error']['errorCode']}\nQualtricsAPI Error Message: {response['meta']['error']['errorMessage']}")
+
+    async def create_sms_distribution(self, dist_name, mailing_list, library, survey, message, send_date, parentDistributionId=None, method='Invite'):
+        '''This method gives users the ability to create a SMS distribution for a given mailing list and survey. See
+        Distributions.create_sms_distribution() for a description of each parameter.
+
+        :return: The Distribution ID. (str)
+        '''
+        headers, url, data = self._sms_distribution_setup(dist_name, mailing_list, library, survey, message, send_date, parentDistributionId, method)
+        request = await self.api_request("POST", url, json=data, headers=headers)
+        response = request.json()
+        try:
+            return response['result']['id']
+        except:
+            print(f"\nServerError: QualtricsAPI Error Code: {response['meta']['error']['errorCode']}\nQualtricsAPI Error Message: {response['meta']['error']['errorMessage']}")
+        return
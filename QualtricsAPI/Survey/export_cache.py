@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+class ExportCache(object):
+    ''' This class keeps the results of Responses().get_survey_responses() in a directory, so a repeat call with the same
+    survey and arguments is answered without creating, polling and downloading an export. Entries are keyed by a hash of
+    the API token, the survey and the canonical export payload. Set Responses.export_cache to an ExportCache to use it.
+
+    An entry is served for ttl seconds. Before it is served, the response counts and LastModified date of the survey are
+    checked with a single request, and an entry exported before the survey changed is exported again. The least recently
+    used entries are deleted once the cache takes up more than max_bytes.
+
+    :param directory: The directory to keep the entries in. It is created if it does not exist.
+    :type directory: str
+    :param ttl: The number of seconds an entry is served for. (Default: 3600)
+    :type ttl: float
+    :param max_bytes: The total size of the entries that is kept. (Default: 1 GB)
+    :type max_bytes: int
+    :param store: 'zip' to keep the downloaded export file, read again on every hit, or 'parquet' to keep the DataFrame it
+    was read into (needs the "pyarrow" package). (Default: 'zip')
+    :type store: str
+    :param check_freshness: If False, serve entries until their ttl without checking the survey. (Default: True)
+    :type check_freshness: bool
+    '''
+
+    def __init__(self, directory, ttl=3600, max_bytes=1024 ** 3, store='zip', check_freshness=True):
+        assert isinstance(directory, str), 'Hey there! The directory parameter must be of type string.'
+        assert isinstance(ttl, (int, float)) and ttl > 0, 'Hey there! The ttl parameter must be a positive number of seconds.'
+        assert isinstance(max_bytes, int) and max_bytes > 0, 'Hey there! The max_bytes parameter must be a positive integer.'
+        assert store in ('zip', 'parquet'), "Hey there! The store parameter must be 'zip' or 'parquet'."
+        assert isinstance(check_freshness, bool), 'Hey there! The check_freshness parameter must be of type bool.'
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.store = store
+        self.check_freshness = check_freshness
+        self.lock = threading.Lock()
+
+    def key(self, *parts):
+        '''This method returns the key of an entry: a SHA-256 of its parts written as canonical JSON.'''
+        canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.{self.store}')
+
+    def metadata_path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def paths(self):
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(('.zip', '.parquet'))]
+
+    def get(self, key, version=None):
+        '''This method returns the path of an entry, or None. An entry older than ttl, or stored for another version of the
+        survey, is deleted.'''
+        try:
+            with open(self.metadata_path(key), 'r', encoding='utf-8') as metadata_file:
+                metadata = json.load(metadata_file)
+            if time.time() - metadata['created'] >= self.ttl or (version is not None and metadata['version'] != version):
+                self.delete(key)
+                return None
+            os.utime(self.path(key))
+        except (OSError, ValueError, KeyError):
+            return None
+        return self.path(key)
+
+    def set(self, key, content, version=None):
+        '''This method stores an entry: an export file (a file object, read from its start) or a DataFrame, as Parquet.
+
+        :return: The path of the entry, or None if it is larger than max_bytes.
+        '''
+        path = self.path(key)
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        if self.store == 'parquet':
+            content.to_parquet(temporary)
+        else:
+            content.seek(0)
+            with open(temporary, 'wb') as entry_file:
+                shutil.copyfileobj(content, entry_file)
+            content.seek(0)
+        if os.path.getsize(temporary) > self.max_bytes:
+            os.remove(temporary)
+            return None
+        with self.lock:
+            os.replace(temporary, path)
+            with open(f'{temporary}.json', 'w', encoding='utf-8') as metadata_file:
+                json.dump({'created': time.time(), 'version': version}, metadata_file)
+            os.replace(f'{temporary}.json', self.metadata_path(key))
+            self.evict()
+        return path
+
+    def evict(self):
+        '''This method deletes the least recently used entries until the cache fits in max_bytes. The lock must be held.'''
+        files = sorted((os.path.getmtime(path), os.path.getsize(path), path) for path in self.paths())
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in files:
+            if size <= self.max_bytes:
+                break
+            self.remove(os.path.splitext(os.path.basename(path))[0])
+            size -= file_size
+
+    def remove(self, key):
+        '''This method deletes the files of an entry. The lock must be held.'''
+        for path in (self.metadata_path(key), self.path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def delete(self, key):
+        with self.lock:
+            self.remove(key)
+
+    def clear(self):
+        with self.lock:
+            for path in self.paths():
+                self.remove(os.path.splitext(os.path.basename(path))[0])
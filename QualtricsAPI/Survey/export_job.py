@@ -0,0 +1,279 @@
+import asyncio
+import threading
+import time
+from QualtricsAPI.Exceptions import QualtricsExportError
+
+class PollSchedule(object):
+    ''' This class decides how long to wait before the next progress check of an export. Once percentComplete moves, the
+    wait is half of the time the export needs to finish at the speed it has been moving, so a fast export is checked again
+    soon and a slow one is left alone. While percentComplete does not move, the wait grows by factor after every check.
+
+    :param initial: The number of seconds before the second check. (Default: 0.5)
+    :type initial: float
+    :param maximum: The longest wait in seconds between two checks. (Default: 10)
+    :type maximum: float
+    :param minimum: The shortest wait in seconds between two checks. (Default: 0.1)
+    :type minimum: float
+    :param factor: The growth of the wait after a check that saw no progress. (Default: 1.5)
+    :type factor: float
+    '''
+
+    def __init__(self, initial=0.5, maximum=10, minimum=0.1, factor=1.5):
+        assert 0 < minimum <= initial <= maximum, 'Hey there! The poll intervals must satisfy 0 < minimum <= initial <= maximum.'
+        assert factor >= 1, 'Hey there! The factor parameter must be at least 1.'
+        self.initial = initial
+        self.maximum = maximum
+        self.minimum = minimum
+        self.factor = factor
+        self.interval = None
+        self.last = None
+
+    def next_interval(self, percent, now=None):
+        '''This method records the percentComplete of a check and returns the number of seconds to wait before the next one.
+
+        :param percent: The percentComplete reported by the check.
+        :type percent: float
+        :return: A float
+        '''
+        now = time.monotonic() if now is None else now
+        percent = float(percent or 0)
+        if self.interval is None:
+            interval = self.initial
+        else:
+            elapsed, gained = now - self.last[0], percent - self.last[1]
+            if gained > 0 and elapsed > 0:
+                interval = (100 - percent) * elapsed / gained / 2
+            else:
+                interval = self.interval * self.factor
+        # The speed is measured from the last check that saw percentComplete move, so a stall slows it down.
+        if self.last is None or percent != self.last[1]:
+            self.last = (now, percent)
+        self.interval = min(max(interval, self.minimum), self.maximum)
+        return self.interval
+
+
+class ExportJob(object):
+    ''' This class is a response export that Qualtrics is building. It is returned by Responses().start_export(), and
+    checks the progress of the export only when asked to: status() sends one progress check, wait() sends them on a
+    PollSchedule until the file is ready, and result() downloads and reads it. A job can be waited on from several
+    threads at once, and cancel() stops every waiter.
+
+    :param client: The Responses instance that started the export.
+    :param survey: The id of the survey.
+    :type survey: str
+    :param progress_id: The progressId of the export.
+    :type progress_id: str
+    :param url: The export-responses url of the survey.
+    :type url: str
+    :param headers: The headers of the export requests.
+    :type headers: dict
+    :param payload: The payload the export was started with.
+    :type payload: dict
+    '''
+
+    def __init__(self, client, survey, progress_id, url, headers, payload, verify=None):
+        self.client = client
+        self.survey = survey
+        self.progress_id = progress_id
+        self.url = url
+        self.headers = headers
+        self.payload = payload
+        self.verify = verify
+        self.percent_complete = 0.0
+        self.file_id = None
+        self.polls = 0
+        self._status = 'inProgress'
+        self._checked = None
+        self._checking = False
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._wakers = []
+        self.schedule = PollSchedule(client.poll_interval, client.max_poll_interval)
+        self.schedule.next_interval(0.0)
+
+    def __repr__(self):
+        return f"<ExportJob {self.progress_id} {self._status} {self.percent_complete:g}%>"
+
+    def done(self):
+        '''This method returns True once the export is complete, has failed or was cancelled. It sends no request.'''
+        return self._status in ('complete', 'failed', 'cancelled')
+
+    def status(self):
+        '''This method checks the progress of the export once and returns its status: 'inProgress', 'complete', 'failed'
+        or 'cancelled'. A job that is done, is being checked by another thread, or was checked less than schedule.minimum
+        seconds ago, is not checked again.
+
+        :return: A str
+        '''
+        return self._check()[0]
+
+    def _check(self):
+        '''This method does the work of status(), and also returns whether this call sent the progress check. (Not a User-Facing Method)'''
+        with self._lock:
+            if self.done() or self._checking or self._recent():
+                return self._status, False
+            self._checking = True
+        # The request is sent without the lock, so cancel() does not wait for it.
+        try:
+            response = self.client.api_request("GET", self.url + self.progress_id, headers=self.headers, verify=self.verify).json()
+        except BaseException:
+            with self._lock:
+                self._checking = False
+            raise
+        with self._lock:
+            self._checking = False
+            return self._record(response), True
+
+    def _recent(self):
+        '''This method returns True if the job was checked less than schedule.minimum seconds ago. (Not a User-Facing Method)'''
+        return self._checked is not None and time.monotonic() - self._checked < self.schedule.minimum
+
+    def wait(self, timeout=None):
+        '''This method checks the progress of the export, sleeping on its PollSchedule in between, until the file is ready.
+
+        :param timeout: The maximum number of seconds to wait. (Default: None, wait until the export is done)
+        :type timeout: float
+        :return: The ExportJob, once its file is ready.
+        :raises TimeoutError: if the export is not ready after timeout seconds.
+        :raises QualtricsExportError: if the export failed or was cancelled.
+        '''
+        assert timeout is None or timeout >= 0, 'Hey there! The timeout parameter cannot be negative.'
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status, checked = self._check()
+            if status != 'inProgress':
+                break
+            self._cancelled.wait(self._next_wait(deadline, checked))
+        return self._finish()
+
+    def result(self, timeout=None, path=None, chunk_size=1024 ** 2, progress=None):
+        '''This method waits for the export, then downloads and reads its file, like Responses().get_survey_responses().
+
+        :param timeout: The maximum number of seconds to wait for the file. (Default: None)
+        :type timeout: float
+        :param path: If given, the downloaded export (a zip file) is written to this path and kept.
+        :type path: str
+        :return: a Pandas DataFrame
+        '''
+        self.client._validate_download(path, chunk_size, progress)
+        self.wait(timeout)
+        with self.client.span('download'):
+            export_file = self.client._download_export(self.download_url(), self.headers, path, chunk_size, progress)
+        with export_file, self.client.span('parse'):
+            return self.client._read_export(export_file, self.payload.get('format', 'csv'))
+
+    def cancel(self):
+        '''This method stops waiting for the export: every wait() returns with a QualtricsExportError and no further
+        progress checks are sent. Qualtrics has no endpoint to cancel an export, so it still finishes building the file.
+
+        :return: True if the job was cancelled, False if it was already done.
+        '''
+        with self._lock:
+            if self.done():
+                return False
+            self._status = 'cancelled'
+            self._cancelled.set()
+            wakers = list(self._wakers)
+        for loop, event in wakers:
+            loop.call_soon_threadsafe(event.set)
+        return True
+
+    def download_url(self):
+        '''This method returns the url of the export file, once it is ready.'''
+        assert self.file_id is not None, 'Hey there! The export file is not ready yet. Call wait() first.'
+        return self.url + self.file_id + '/file'
+
+    def _record(self, response):
+        '''This method updates the job from a progress response. (Not a User-Facing Method)'''
+        self.client._raise_for_meta(response)
+        result = response['result']
+        self.polls += 1
+        self._checked = time.monotonic()
+        self.percent_complete = float(result.get('percentComplete') or 0)
+        self.file_id = result.get('fileId', self.file_id)
+        if not self._cancelled.is_set():
+            self._status = result['status'] if result['status'] in ('complete', 'failed') or self.file_id is None else 'complete'
+        return self._status
+
+    def _next_wait(self, deadline, checked=True):
+        '''This method returns the seconds to sleep before the next check, or raises TimeoutError past the deadline. Only
+        the waiter that sent a check moves the PollSchedule on; the others sleep for its current interval. (Not a User-Facing Method)'''
+        interval = self.schedule.next_interval(self.percent_complete) if checked else self.schedule.interval
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f'The export {self.progress_id} of survey {self.survey} was still at {self.percent_complete:g}% when the wait timed out.')
+            interval = min(interval, remaining)
+        return interval
+
+    def _finish(self):
+        '''This method returns the job once its file is ready, or raises if it failed or was cancelled. (Not a User-Facing Method)'''
+        if self._status == 'complete':
+            return self
+        raise QualtricsExportError(f'The export {self.progress_id} of survey {self.survey} {"was cancelled" if self._status == "cancelled" else "failed"}.')
+
+
+class AsyncExportJob(ExportJob):
+    ''' This class is the asyncio counterpart of the ExportJob class, returned by AsyncResponses().start_export(). Its
+    status(), wait() and result() must be awaited and sleep without blocking the event loop. cancel() is not a coroutine,
+    and can be called from any thread or event loop.'''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._check_lock = asyncio.Lock()
+
+    async def status(self):
+        '''This method checks the progress of the export once and returns its status: 'inProgress', 'complete', 'failed'
+        or 'cancelled'. Like ExportJob.status(), a job that is being checked by another task is not checked again.
+
+        :return: A str
+        '''
+        return (await self._check())[0]
+
+    async def _check(self):
+        '''This method does the work of status(), and also returns whether this call sent the progress check. Tasks that
+        wait for a check in flight find the job just checked once it returns. (Not a User-Facing Method)'''
+        async with self._check_lock:
+            if self.done() or self._recent():
+                return self._status, False
+            request = await self.client.api_request("GET", self.url + self.progress_id, headers=self.headers, verify=self.verify)
+            with self._lock:
+                return self._record(request.json()), True
+
+    async def wait(self, timeout=None):
+        '''This method checks the progress of the export, sleeping on its PollSchedule in between, until the file is ready.
+        It takes the same parameters as ExportJob.wait().
+
+        :return: The AsyncExportJob, once its file is ready.
+        '''
+        assert timeout is None or timeout >= 0, 'Hey there! The timeout parameter cannot be negative.'
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waker = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._wakers.append(waker)
+        try:
+            while True:
+                status, checked = await self._check()
+                if status != 'inProgress':
+                    break
+                try:
+                    await asyncio.wait_for(waker[1].wait(), self._next_wait(deadline, checked))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                self._wakers.remove(waker)
+        return self._finish()
+
+    async def result(self, timeout=None, path=None, chunk_size=1024 ** 2, progress=None):
+        '''This method waits for the export, then downloads and reads its file. It takes the same parameters as
+        ExportJob.result().
+
+        :return: a Pandas DataFrame
+        '''
+        self.client._validate_download(path, chunk_size, progress)
+        await self.wait(timeout)
+        with self.client.span('download'):
+            export_file = await self.client._download_export(self.download_url(), self.headers, path, chunk_size, progress)
+        with export_file, self.client.span('parse'):
+            return await self.client.run_blocking(self.client._read_export, export_file, self.payload.get('format', 'csv'))
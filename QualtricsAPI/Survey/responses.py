@@ -1,23 +1,72 @@
-import requests as r
 import zipfile
 import io
+import csv
 import json
-import pandas as pd
-import numpy as np
+import re
+import html
 import os
-from datetime import date, datetime, timedelta
-from dateutil.parser import parse
-from QualtricsAPI.Setup import Credentials
+import hashlib
+import tempfile
+import itertools
+import contextvars
+from collections import deque
+from concurrent import futures
+from xml.etree import ElementTree
+from datetime import datetime, timedelta, timezone
+from QualtricsAPI.Setup import Credentials, AsyncCredentials, operation, LazyModule
 from QualtricsAPI.JSON import Parser
-from QualtricsAPI.Exceptions import Qualtrics500Error, Qualtrics503Error, Qualtrics504Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error
+from QualtricsAPI.Survey.export_job import ExportJob, AsyncExportJob, PollSchedule
+from QualtricsAPI.Survey.definitions import SurveyDefinitionCache
+from QualtricsAPI.Exceptions import Qualtrics500Error, Qualtrics503Error, Qualtrics504Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error, QualtricsExportError
 import warnings
 import time
+import requests
+import asyncio
+
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
 
 
 class Responses(Credentials):
     '''This is a child class to the credentials class that gathers the survey responses from Qualtrics surveys'''
 
-    def __init__(self):
+    # Export files up to this size are downloaded into memory, larger ones are spooled to a temporary file on disk.
+    spool_size = 32 * 1024 ** 2
+    # The number of times an export file is requested before a download that keeps dropping or failing its checks is given up.
+    download_attempts = 5
+    export_formats = ['csv', 'tsv', 'json', 'ndjson', 'spss', 'xml']
+    # The first and the longest wait in seconds between two progress checks of an export (see PollSchedule).
+    poll_interval = 0.5
+    max_poll_interval = 10
+    # The SurveyDefinitionCache of get_survey_definition(). An in-memory one is created on first use.
+    definition_cache = None
+    # The ExportCache get_survey_responses() is answered from, or None to always run the export.
+    export_cache = None
+    # The dtypes of the metadata columns of a csv or tsv export read with dtypes=True. The date columns are parsed as datetimes.
+    metadata_dtypes = {
+        'Status': 'category',
+        'Progress': 'Int8',
+        'Duration (in seconds)': 'Int64',
+        'Finished': 'boolean',
+        'DistributionChannel': 'category',
+        'UserLanguage': 'category',
+        'LocationLatitude': 'Float64',
+        'LocationLongitude': 'Float64',
+    }
+    date_columns = ['StartDate', 'EndDate', 'RecordedDate']
+    # The Arrow types of the export columns whose type Qualtrics fixes, by ImportId. Every other column is read as a string.
+    arrow_types = {
+        'startDate': 'timestamp[s]',
+        'endDate': 'timestamp[s]',
+        'recordedDate': 'timestamp[s]',
+        'progress': 'int64',
+        'duration': 'int64',
+        'locationLatitude': 'float64',
+        'locationLongitude': 'float64',
+    }
+
+    def __init__(self, config=None):
+        self.config = self._resolve_config(config)
         return
 
     def setup_request(self, file_format='csv', survey=None, verify=None):
@@ -34,7 +83,7 @@ class Responses(Credentials):
         headers, url = self.header_setup(
             content_type=True, xm=False, path='responseexports/')
         payload = {"format": file_format, "surveyId": survey}
-        request = r.request("POST", url, data=json.dumps(
+        request = self.api_request("POST", url, data=json.dumps(
             payload), headers=headers, verify=verify)
         response = request.json()
         try:
@@ -51,14 +100,18 @@ class Responses(Credentials):
             file_format=file_format, survey=survey)
         check_progress = 0
         progress_status = "in progress"
+        schedule = PollSchedule(self.poll_interval, self.max_poll_interval)
+        schedule.next_interval(check_progress)
         while check_progress < 100 and (progress_status != "complete") and (file is None):
             check_url = url + progress_id
-            check_response = r.request(
+            check_response = self.api_request(
                 "GET", check_url, headers=headers, verify=verify)
             file = check_response.json()["result"]["file"]
             check_progress = check_response.json()["result"]["percentComplete"]
+            if check_progress < 100 and file is None:
+                time.sleep(schedule.next_interval(check_progress))
         download_url = url + progress_id + '/file'
-        download_request = r.get(download_url, headers=headers, stream=True)
+        download_request = self.api_request("GET", download_url, headers=headers, stream=True)
         return download_request
 
     def get_responses(self, survey=None, verify=None):
@@ -101,26 +154,11 @@ class Responses(Credentials):
 
         headers, url = self.header_setup(
             content_type=True, xm=False, path=f'surveys/{survey}/export-responses/')
-        request = r.request("POST", url, data=json.dumps(
+        request = self.api_request("POST", url, data=json.dumps(
             payload), headers=headers, verify=verify)
         response = request.json()
         try:
-            if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                raise Qualtrics500Error('500 - Internal Server Error')
-            elif response['meta']['httpStatus'] == '503 - Temporary Internal Server Error':
-                raise Qualtrics503Error(
-                    '503 - Temporary Internal Server Error')
-            elif response['meta']['httpStatus'] == '504 - Gateway Timeout':
-                raise Qualtrics504Error('504 - Gateway Timeout')
-            elif response['meta']['httpStatus'] == '400 - Bad Request':
-                raise Qualtrics400Error(
-                    'Qualtrics Error\n(Http Error: 400 - Bad Request): There was something invalid about the request.')
-            elif response['meta']['httpStatus'] == '401 - Unauthorized':
-                raise Qualtrics401Error(
-                    'Qualtrics Error\n(Http Error: 401 - Unauthorized): The Qualtrics API user could not be authenticated or does not have authorization to access the requested resource.')
-            elif response['meta']['httpStatus'] == '403 - Forbidden':
-                raise Qualtrics403Error(
-                    'Qualtrics Error\n(Http Error: 403 - Forbidden): The Qualtrics API user was authenticated and made a valid request, but is not authorized to access this requested resource.')
+            self._raise_for_meta(response)
         except (Qualtrics500Error, Qualtrics503Error, Qualtrics504Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
             return print(e)
         else:
@@ -130,48 +168,117 @@ class Responses(Credentials):
     # Version 3 Code
     def send_request_v3(self, survey=None, payload=None, verify=None):
         '''This method sends the request, and sets up the download request.'''
-        is_file = None
-        progress_id, url, headers = self.setup_request_v3(
+        download_url, headers = self._export_file(survey=survey, payload=payload, verify=verify)
+        with self.span('download'):
+            return self.api_request("GET", download_url, headers=headers, stream=True)
+
+    def _export_file(self, survey=None, payload=None, verify=None):
+        '''This method starts an export and waits until its file is ready. (Not a User-Facing Method)
+
+        :return: A tuple of the url of the export file and the headers to download it with.
+        :raises QualtricsExportError: if the export failed, or a Qualtrics error if a progress check was refused.
+        '''
+        with self.span('create'):
+            job = self._start_export(survey, payload, verify)
+        with self.span('poll'):
+            job.wait()
+        return job.download_url(), job.headers
+
+    def _start_export(self, survey, payload, verify=None):
+        '''This method starts an export and returns its ExportJob. (Not a User-Facing Method)'''
+        request = self.setup_request_v3(
             survey=survey, payload=payload, verify=verify)
-        progress_status = "in progress"
-        while progress_status != "complete" and progress_status != "failed" and is_file is None:
-            check_url = url + progress_id
-            check_request = r.request(
-                "GET", check_url, headers=headers, verify=verify)
-            check_response = check_request.json()
-            try:
-                is_file = check_response["result"]["fileId"]
-            except KeyError:
-                pass
-            progress_status = check_response["result"]["status"]
-        try:
-            if check_response['meta']['httpStatus'] == '500 - Internal Server Error':
-                raise Qualtrics500Error('500 - Internal Server Error')
-            elif check_response['meta']['httpStatus'] == '503 - Temporary Internal Server Error':
-                raise Qualtrics503Error(
-                    '503 - Temporary Internal Server Error')
-            elif check_response['meta']['httpStatus'] == '504 - Gateway Timeout':
-                raise Qualtrics504Error('504 - Gateway Timeout')
-            elif check_response['meta']['httpStatus'] == '400 - Bad Request':
-                raise Qualtrics400Error(
-                    'Qualtrics Error\n(Http Error: 400 - Bad Request): There was something invalid about the request.')
-            elif check_response['meta']['httpStatus'] == '401 - Unauthorized':
-                raise Qualtrics401Error(
-                    'Qualtrics Error\n(Http Error: 401 - Unauthorized): The Qualtrics API user could not be authenticated or does not have authorization to access the requested resource.')
-            elif check_response['meta']['httpStatus'] == '403 - Forbidden':
-                raise Qualtrics403Error(
-                    'Qualtrics Error\n(Http Error: 403 - Forbidden): The Qualtrics API user was authenticated and made a valid request, but is not authorized to access this requested resource.')
-        except (Qualtrics500Error, Qualtrics503Error, Qualtrics504Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
-            return print(e)
-        else:
-            download_url = url + is_file + '/file'
-            download_request = r.get(
-                download_url, headers=headers, stream=True)
-            return download_request
+        if request is None:
+            raise QualtricsExportError(f'The export of survey {survey} could not be started.')
+        progress_id, url, headers = request
+        return ExportJob(self, survey, progress_id, url, headers, payload, verify)
+
+    @operation
+    def start_export(self, survey=None, verify=None, **kwargs):
+        '''This method starts a response export and returns at once with an ExportJob, instead of waiting for Qualtrics to
+        build the file. The job's status() checks the progress of the export, wait(timeout=...) waits for it with an
+        adaptive poll interval, result() returns its responses as a DataFrame, and cancel() stops waiting for it. It
+        accepts the same keyword arguments as get_survey_responses().
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :return: An ExportJob
+        '''
+        dynamic_payload = self._export_payload(**kwargs)
+        with self.span('create'):
+            return self._start_export(survey, dynamic_payload, verify)
+
+    @operation
+    def export_many(self, surveys=None, max_concurrency=4, verify=None, chunk_size=1024 ** 2, **kwargs):
+        '''This method exports the responses of many surveys at once, and returns a generator that yields a
+        (survey_id, result) tuple as each export completes, in the order they complete. Up to max_concurrency exports
+        are in progress at a time: one thread checks the progress of all of them, each on its own adaptive schedule,
+        and the files are downloaded and read on a pool of max_concurrency threads as soon as they are ready. A survey
+        whose export fails does not stop the others: its result is the exception instead of a DataFrame. It accepts
+        the same keyword arguments as get_survey_responses().
+
+        :param surveys: The ids of the surveys to export.
+        :type surveys: list
+        :param max_concurrency: The maximum number of exports started and not yet read. (Default: 4)
+        :type max_concurrency: int
+        :return: A generator of (str, Pandas DataFrame or Exception) tuples
+        '''
+        surveys = self._validate_many(surveys, max_concurrency)
+        self._validate_download(None, chunk_size, None)
+        dynamic_payload = self._export_payload(**kwargs)
+        return self._export_many([(survey, survey, dynamic_payload) for survey in surveys], max_concurrency, verify, chunk_size)
+
+    @operation
+    def sync_survey_responses(self, survey=None, store=None, snapshot=None, overlap=3600, verify=None, **kwargs):
+        '''This method exports only the responses recorded since the last sync of a survey. The store keeps a watermark for
+        each survey, the latest RecordedDate it has seen, and the next sync exports the responses recorded from overlap
+        seconds before it, so responses that reach the export late are not missed. The first sync of a survey exports
+        every response. With snapshot, the new responses are merged into the snapshot file, replacing the rows with the
+        same ResponseId, and the whole snapshot is returned. It accepts the keyword arguments of get_survey_responses()
+        except startDate and timeZone, with a csv (default) or tsv format.
+
+        Qualtrics filters exports on the recorded date only, so responses edited after they were recorded are picked up
+        only while they are inside the overlap window.
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :param store: Where to keep the watermarks, a JSONWatermarkStore or a SQLiteWatermarkStore.
+        :type store: JSONWatermarkStore or SQLiteWatermarkStore
+        :param snapshot: The path of a csv or .parquet file holding every response synced so far. (Default: None)
+        :type snapshot: str
+        :param overlap: The number of seconds before the watermark to export again. (Default: 3600)
+        :type overlap: float
+        :return: a Pandas DataFrame of the new responses, or of the whole snapshot when snapshot is given.
+        '''
+        state, dynamic_payload = self._sync_payload(survey, store, snapshot, overlap, kwargs)
+        export_file = self._export_to_file(survey, dynamic_payload, verify, None, 1024 ** 2, None)
+        return self._merge_sync(survey, store, state, snapshot, export_file, dynamic_payload['format'])
 
     # Version 3 Code
-    def get_survey_responses(self, survey=None, verify=None, **kwargs):
+    @operation
+    def get_survey_responses(self, survey=None, verify=None, path=None, chunk_size=1024 ** 2, progress=None, shards=None, shard_by='interval', dtypes=None, header=None, **kwargs):
         '''This function accepts the survey id, and returns the survey responses associated with that survey.
+
+        The export file is streamed in chunks into a temporary file (kept in memory while it is smaller than
+        Responses.spool_size), or into the file at path, and the responses are read back from there. When
+        Responses.export_cache is set, a repeat call without path or shards is answered from it.
+
+        :param path: If given, the downloaded export (a zip file) is written to this path and kept.
+        :type path: str
+        :param chunk_size: The number of bytes to download at a time. A download that drops resumes after the last complete chunk. (Default: 1 MB)
+        :type chunk_size: int
+        :param progress: A function called after every chunk with the bytes downloaded so far and the size of the file (or None if Qualtrics did not send it).
+        :type progress: callable
+        :param shards: If given, the startDate to endDate (or now) range is split into this many windows, exported in parallel and concatenated in order. It cannot be used with path, progress or limit. (Default: None)
+        :type shards: int
+        :param shard_by: How to split the range: 'interval' for windows of equal length, or 'count' for windows with about the same number of responses, found with a first export of the recorded dates only. (Default: 'interval')
+        :type shard_by: str
+        :param dtypes: If True, read a csv or tsv export with dtypes taken from the survey definition (see get_survey_definition): categoricals ordered by choice for multiple choice questions, nullable integers, timezone-aware datetimes for StartDate, EndDate and RecordedDate (in UTC, or in the timeZone of the export), and booleans for Finished. The question text and ImportId header rows are then not returned as rows. A dict of column names to dtypes also overrides them. It cannot be used with shards. (Default: None)
+        :type dtypes: bool or dict
+        :param header: What to do with the question text and ImportId header rows of a csv or tsv export. None keeps them as the first two rows (unless dtypes is given), 'attrs' reads them into df.attrs['columns'] (a dict of column name to its question and import_id), and 'multiindex' makes them the second and third levels of the column labels. The responses are then read with their own types. It cannot be used with shards. (Default: None)
+        :type header: str
+        :param format: The format of the export file: 'csv', 'tsv', 'json', 'ndjson', 'spss' (needs the "pyreadstat" package) or 'xml'. The csv and tsv exports keep their question text and ImportId header rows as the first two rows, json, ndjson and xml exports have a row per response with a column per field (named by ImportId), and spss exports keep their SPSS variable types. (Default: 'csv')
+        :type format: str
         :param useLabels: Instead of exporting the recode value for the answer choice, export the text of the answer choice. For more information on recode values, see Recode Values on the Qualtrics Support Page.
         :type useLabels: bool
         :param includeLabelColumns: For columns that have answer labels, export two columns: one that uses recode values and one that uses labels. The label column will has a IsLabelsColumn field in the 3rd header row. Note that this cannot be used with useLabels.
@@ -208,8 +315,101 @@ class Responses(Credentials):
         :return: a Pandas DataFrame
         '''
 
+        self._validate_download(path, chunk_size, progress)
+        dynamic_payload = self._export_payload(**kwargs)
+        self._validate_header(header, dynamic_payload)
+        if shards is not None:
+            assert dtypes is None and header is None, 'Hey there! The dtypes and header parameters cannot be used with shards.'
+            self._validate_shards(shards, shard_by, path, progress, dynamic_payload)
+            return self._sharded_export(survey, dynamic_payload, verify, chunk_size, shards, shard_by)
+        schema = None
+        if dtypes is not None:
+            self._validate_dtypes(dtypes, dynamic_payload)
+            schema = self._response_schema(self.get_survey_definition(survey=survey, verify=verify), dtypes, dynamic_payload)
+        if self.export_cache is not None and path is None:
+            return self._cached_export(survey, dynamic_payload, verify, chunk_size, progress, schema, (dtypes, header))
+        export_file = self._export_to_file(survey, dynamic_payload, verify, path, chunk_size, progress)
+        with export_file, self.span('parse'):
+            return self._read_export(export_file, dynamic_payload['format'], schema, header)
+
+    def _sharded_export(self, survey, payload, verify, chunk_size, shards, shard_by):
+        '''This method exports the date windows of a sharded get_survey_responses in parallel and concatenates them. (Not a User-Facing Method)'''
+        start, end = self._shard_range(payload)
+        if shard_by == 'count':
+            with self.span('probe'):
+                export_file = self._export_to_file(survey, self._probe_payload(payload, end), verify, None, chunk_size, None)
+                windows = self._count_windows(start, end, shards, self._probe_dates(export_file))
+        else:
+            windows = self._interval_windows(start, end, shards)
+        results = dict(self._export_many(self._shard_tasks(survey, payload, windows), len(windows), verify, chunk_size))
+        with self.span('merge'):
+            return self._merge_shards(results, payload['format'])
+
+    @operation
+    def iter_survey_responses(self, survey=None, verify=None, chunksize=10000, records=False, path=None, chunk_size=1024 ** 2, progress=None, dtypes=None, header=None, **kwargs):
+        '''This method exports the responses of a survey and returns a generator that reads them out of the export
+        file in batches of chunksize rows, so an export of any size can be processed in constant memory. It accepts the
+        same keyword arguments as get_survey_responses(). Unlike get_survey_responses(), the question text and ImportId
+        header rows are not returned as rows.
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :param chunksize: The number of responses in each batch. (Default: 10000)
+        :type chunksize: int
+        :param records: If True, yield each batch as a list of dicts (one per response) instead of a DataFrame. (Default: False)
+        :type records: bool
+        :param dtypes: If True (or a dict of overrides), read the batches of a csv or tsv export with the dtypes of the survey definition, like get_survey_responses(dtypes=True). (Default: None)
+        :type dtypes: bool or dict
+        :param header: 'attrs' or 'multiindex' to keep the question text and ImportIds of a csv or tsv export on every batch, like get_survey_responses(header=...). (Default: None)
+        :type header: str
+        :return: A generator of Pandas DataFrames (or lists of dicts)
+        '''
+        assert isinstance(chunksize, int) and chunksize > 0, 'Hey there! The chunksize parameter must be a positive integer.'
+        assert isinstance(records, bool), 'Hey there! The records parameter must be of type bool.'
+        self._validate_download(path, chunk_size, progress)
+        dynamic_payload = self._export_payload(**kwargs)
+        self._validate_header(header, dynamic_payload)
+        schema = None
+        if dtypes is not None:
+            self._validate_dtypes(dtypes, dynamic_payload)
+            schema = self._response_schema(self.get_survey_definition(survey=survey, verify=verify), dtypes, dynamic_payload)
+        export_file = self._export_to_file(survey, dynamic_payload, verify, path, chunk_size, progress)
+        return self._iter_export(export_file, chunksize, records, dynamic_payload['format'], schema, header)
+
+    def _cached_export(self, survey, payload, verify, chunk_size, progress, schema, reading):
+        '''This method answers get_survey_responses from Responses.export_cache, and runs the export and stores it
+        there when it has no fresh entry. (Not a User-Facing Method)'''
+        cache = self.export_cache
+        if cache.store == 'parquet':
+            self._pyarrow()
+        key = self._export_cache_key(survey, payload, reading)
+        version = None
+        if cache.check_freshness:
+            with self.span('check'):
+                headers, url = self.header_setup(content_type=True, xm=False, path=f'surveys/{survey}')
+                version = self._survey_version(self.api_request("GET", url, headers=headers, verify=verify).json())
+        cached = cache.get(key, version)
+        if cached is not None:
+            with self.span('parse'):
+                return self._read_cached(cached, payload['format'], schema, reading[1])
+        export_file = self._export_to_file(survey, payload, verify, None, chunk_size, progress)
+        with export_file, self.span('parse'):
+            return self._cache_export(key, export_file, payload['format'], schema, reading[1], version)
+
+    def _export_to_file(self, survey, payload, verify, path, chunk_size, progress):
+        '''This method runs an export and downloads its file, returned open and rewound. (Not a User-Facing Method)'''
+        download_url, headers = self._export_file(
+            survey=survey, payload=payload, verify=verify)
+        with self.span('download'):
+            return self._download_export(download_url, headers, path, chunk_size, progress)
+
+    def _export_payload(self, **kwargs):
+        '''This method validates the keyword arguments of get_survey_responses and builds the export payload. (Not a User-Facing Method)'''
+        from dateutil.parser import parse
+
         dynamic_payload = {"format": 'csv'}
         valid_keys = [
+            'format',
             'useLabels',
             'includeLabelColumns',
             'exportResponsesInProgress',
@@ -220,7 +420,7 @@ class Responses(Credentials):
             'startDate',
             'endDate',
             'timeZone',
-            'breakoutSets'
+            'breakoutSets',
             'sortByLastModifiedDate',
             'filterId',
             'embeddedDataIds',
@@ -229,8 +429,13 @@ class Responses(Credentials):
         ]
 
         for key in list(kwargs.keys()):
-            assert key in valid_keys, "Hey there! You can only pass in parameters with names in the list, ['useLabels', 'includeLabelColumns', 'exportResponsesInProgress', 'limit', 'seenUnansweredRecode', 'multiselectSeenUnansweredRecode', 'includeDisplayOrder', 'startDate', 'endDate', 'timeZone']"
-            if key == 'useLabels':
+            assert key in valid_keys, f"Hey there! You can only pass in parameters with names in the list, {valid_keys}"
+            if key == 'format':
+                assert kwargs['format'] in self.export_formats, 'Hey there, your "format" parameter needs to be one of "csv", "tsv", "json", "ndjson", "spss" or "xml"!'
+                if kwargs['format'] == 'spss':
+                    self._pyreadstat()
+                dynamic_payload.update({'format': kwargs[(key)]})
+            elif key == 'useLabels':
                 assert 'includeLabelColumns' not in list(kwargs.keys(
                 )), 'Hey there, you cannot pass both the "includeLabelColumns" and the "useLabels" parameters at the same time. Please pass just one and try again.'
                 assert isinstance(
@@ -309,25 +514,747 @@ class Responses(Credentials):
                 assert isinstance(
                     kwargs['surveyMetadataIds'], list), 'Hey there, your "surveyMetadataIds" parameter needs to be of type "list"!'
                 dynamic_payload.update({'surveyMetadataIds': kwargs[(key)]})
-        download_request = self.send_request_v3(
-            survey=survey, payload=dynamic_payload, verify=verify)
-        with zipfile.ZipFile(io.BytesIO(download_request.content)) as survey_zip:
-            for s in survey_zip.infolist():
-                df = pd.read_csv(survey_zip.open(s.filename))
-                return df
+        return dynamic_payload
+
+    def _validate_many(self, surveys, max_concurrency):
+        '''This method validates the parameters of export_many and returns the surveys as a list. (Not a User-Facing Method)'''
+        assert isinstance(surveys, (list, tuple)) and all(isinstance(survey, str) for survey in surveys), 'Hey there! The surveys parameter must be a list of survey IDs.'
+        assert isinstance(max_concurrency, int) and max_concurrency > 0, 'Hey there! The max_concurrency parameter must be a positive integer.'
+        return list(surveys)
+
+    def _export_many(self, tasks, max_concurrency, verify, chunk_size):
+        '''This generator runs a list of (key, survey, payload) exports and yields (key, result) as each completes.
+        Exports wait in jobs until their next progress check is due, then move to downloads, a pool of threads that
+        downloads and reads their files. (Not a User-Facing Method)'''
+        pending = deque(tasks)
+        jobs = {}
+        downloads = {}
+        with futures.ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            try:
+                while pending or jobs or downloads:
+                    while pending and len(jobs) + len(downloads) < max_concurrency:
+                        key, survey, payload = pending.popleft()
+                        try:
+                            with self.span('create', survey=survey):
+                                jobs[key] = (self._start_export(survey, payload, verify), time.monotonic())
+                        except Exception as error:
+                            yield key, error
+                    now = time.monotonic()
+                    for key, (job, due) in list(jobs.items()):
+                        if due > now:
+                            continue
+                        try:
+                            if job.status() == 'inProgress':
+                                jobs[key] = (job, now + job.schedule.next_interval(job.percent_complete))
+                                continue
+                            del jobs[key]
+                            job._finish()
+                        except Exception as error:
+                            jobs.pop(key, None)
+                            yield key, error
+                            continue
+                        # Each download runs in a copy of the context, so its spans are phases of export_many.
+                        downloads[pool.submit(contextvars.copy_context().run, job.result, chunk_size=chunk_size)] = key
+                    if not jobs and not downloads:
+                        continue
+                    timeout = max(min(due for job, due in jobs.values()) - time.monotonic(), 0) if jobs else None
+                    if downloads:
+                        done, _ = futures.wait(downloads, timeout=timeout, return_when=futures.FIRST_COMPLETED)
+                    else:
+                        done = ()
+                        time.sleep(timeout)
+                    for future in done:
+                        key = downloads.pop(future)
+                        error = future.exception()
+                        yield key, error if error is not None else future.result()
+            finally:
+                for job, due in jobs.values():
+                    job.cancel()
+
+    def _sync_payload(self, survey, store, snapshot, overlap, kwargs):
+        '''This method validates the parameters of sync_survey_responses, and returns the state of the survey and the
+        payload of the export of its new responses. (Not a User-Facing Method)'''
+        assert hasattr(store, 'get') and hasattr(store, 'set'), 'Hey there! The store parameter must be a JSONWatermarkStore or a SQLiteWatermarkStore.'
+        assert snapshot is None or isinstance(snapshot, str), 'Hey there! The snapshot parameter must be of type string.'
+        assert isinstance(overlap, (int, float)) and overlap >= 0, 'Hey there! The overlap parameter must be a non-negative number of seconds.'
+        assert 'startDate' not in kwargs and 'timeZone' not in kwargs, 'Hey there! The startDate and timeZone parameters are set by the sync. You cannot pass them to sync_survey_responses.'
+        state = store.get(survey)
+        if state is not None:
+            start = datetime.strptime(state['watermark'], '%Y-%m-%dT%H:%M:%SZ') - timedelta(seconds=overlap)
+            kwargs = dict(kwargs, startDate=start.strftime('%Y-%m-%dT%H:%M:%SZ'))
+        dynamic_payload = self._export_payload(**kwargs)
+        assert dynamic_payload['format'] in ('csv', 'tsv'), 'Hey there! Responses can only be synced from csv or tsv exports.'
+        return state, dynamic_payload
+
+    def _merge_sync(self, survey, store, state, snapshot, export_file, file_format):
+        '''This method reads the new responses of a sync, merges them into the snapshot and moves the watermark of the
+        survey forward. (Not a User-Facing Method)'''
+        with export_file, self.span('parse'):
+            delta = pd.concat(list(self._iter_export(export_file, 100000, False, file_format)) or [pd.DataFrame(columns=['ResponseId', 'RecordedDate'])], ignore_index=True)
+        with self.span('merge'):
+            responses = delta
+            if snapshot is not None and os.path.exists(snapshot):
+                responses = pd.concat([self._read_snapshot(snapshot), delta], ignore_index=True)
+            responses = responses.drop_duplicates('ResponseId', keep='last', ignore_index=True)
+            if snapshot is not None:
+                self._write_snapshot(responses, snapshot)
+        watermark = state['watermark'] if state is not None else None
+        if len(delta):
+            latest = pd.to_datetime(delta['RecordedDate']).max().strftime('%Y-%m-%dT%H:%M:%SZ')
+            watermark = latest if watermark is None else max(watermark, latest)
+        if watermark is not None:
+            store.set(survey, {'watermark': watermark, 'synced_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'), 'exported': len(delta)})
+        return responses
+
+    def _read_snapshot(self, snapshot):
+        '''This method reads the snapshot file of a sync. (Not a User-Facing Method)'''
+        return pd.read_parquet(snapshot) if snapshot.endswith('.parquet') else pd.read_csv(snapshot)
+
+    def _write_snapshot(self, responses, snapshot):
+        '''This method replaces the snapshot file of a sync atomically. (Not a User-Facing Method)'''
+        temporary = f'{snapshot}.tmp'
+        if snapshot.endswith('.parquet'):
+            responses.to_parquet(temporary, index=False)
+        else:
+            responses.to_csv(temporary, index=False)
+        os.replace(temporary, snapshot)
+
+    def _validate_shards(self, shards, shard_by, path, progress, payload):
+        '''This method validates the shards and shard_by parameters of get_survey_responses. (Not a User-Facing Method)'''
+        assert isinstance(shards, int) and shards > 0, 'Hey there! The shards parameter must be a positive integer.'
+        assert shard_by in ('interval', 'count'), 'Hey there! The shard_by parameter must be "interval" or "count".'
+        assert path is None and progress is None, 'Hey there! The path and progress parameters cannot be used with shards.'
+        assert 'limit' not in payload, 'Hey there! The limit parameter cannot be used with shards.'
+        assert 'startDate' in payload, 'Hey there! A sharded export needs a startDate to split the export from.'
+
+    def _shard_range(self, payload):
+        '''This method returns the start and end of the date range of a sharded export, as naive UTC datetimes. (Not a User-Facing Method)'''
+        start = datetime.strptime(payload['startDate'], '%Y-%m-%dT%H:%M:%SZ')
+        if 'endDate' in payload:
+            end = datetime.strptime(payload['endDate'], '%Y-%m-%dT%H:%M:%SZ')
+        else:
+            end = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) + timedelta(seconds=1)
+        assert end > start, 'Hey there! The endDate parameter must be after the startDate parameter.'
+        return start, end
+
+    def _interval_windows(self, start, end, shards):
+        '''This method splits a date range into shards windows of equal length, to the second. (Not a User-Facing Method)'''
+        step = (end - start) / shards
+        bounds = sorted(set([(start + step * index).replace(microsecond=0) for index in range(shards)] + [end]))
+        return list(zip(bounds, bounds[1:]))
+
+    def _count_windows(self, start, end, shards, recorded):
+        '''This method splits a date range into shards windows holding about the same number of the recorded dates. (Not a User-Facing Method)'''
+        recorded = sorted(recorded)
+        bounds = [start, end] + [recorded[len(recorded) * index // shards].replace(microsecond=0) for index in range(1, shards) if recorded]
+        bounds = sorted(set(bound for bound in bounds if start <= bound <= end))
+        return list(zip(bounds, bounds[1:]))
+
+    def _probe_payload(self, payload, end):
+        '''This method returns the payload of the export that counts the responses of a sharded export: the same
+        responses, with their recorded date only. (Not a User-Facing Method)'''
+        probe = {key: value for key, value in payload.items() if key in ('startDate', 'filterId', 'exportResponsesInProgress')}
+        probe.update({'format': 'csv', 'endDate': end.strftime('%Y-%m-%dT%H:%M:%SZ'), 'surveyMetadataIds': ['recordedDate'],
+                      'questionIds': [], 'embeddedDataIds': []})
+        return probe
+
+    def _probe_dates(self, export_file):
+        '''This method reads the recorded dates out of the export of _probe_payload. (Not a User-Facing Method)'''
+        dates = []
+        for chunk in self._iter_export(export_file, 100000, False, 'csv'):
+            dates.extend(pd.to_datetime(chunk['RecordedDate']).dt.to_pydatetime())
+        return dates
+
+    def _shard_tasks(self, survey, payload, windows):
+        '''This method returns the (index, survey, payload) exports of the windows of a sharded export. (Not a User-Facing Method)'''
+        return [(index, survey, dict(payload, startDate=start.strftime('%Y-%m-%dT%H:%M:%SZ'), endDate=end.strftime('%Y-%m-%dT%H:%M:%SZ')))
+                for index, (start, end) in enumerate(windows)]
+
+    def _merge_shards(self, results, file_format):
+        '''This method concatenates the DataFrames of the windows of a sharded export in order, keeping the header rows
+        of csv and tsv exports once, and raises the error of the first window that failed. (Not a User-Facing Method)'''
+        frames = []
+        for index in sorted(results):
+            if isinstance(results[index], Exception):
+                raise results[index]
+            frames.append(results[index] if not frames or file_format not in ('csv', 'tsv') else results[index].iloc[2:])
+        return pd.concat(frames, ignore_index=True)
+
+    def _validate_dtypes(self, dtypes, payload):
+        '''This method validates the dtypes parameter of get_survey_responses. (Not a User-Facing Method)'''
+        assert dtypes is True or isinstance(dtypes, dict), 'Hey there! The dtypes parameter must be True or a dict of column names to dtypes.'
+        assert payload['format'] in ('csv', 'tsv'), 'Hey there! The dtypes parameter can only be used with csv or tsv exports.'
+
+    def _response_schema(self, definition, dtypes, payload):
+        '''This method maps the columns of a csv or tsv export to dtypes, from the metadata columns Qualtrics always
+        exports and from the question types of the survey definition. (Not a User-Facing Method)
+
+        :return: A dict with the read_csv dtype of each column, the choices of each categorical column in order, the date
+        columns and the timeZone of the export.
+        '''
+        column_types = dict(self.metadata_dtypes)
+        categories = {}
+        for column, question_id in ((definition or {}).get('columns') or {}).items():
+            question = definition['questions'].get(question_id) or {}
+            if question.get('selector') == 'NPS':
+                column_types[column] = 'Int8'
+            elif question.get('type') == 'MC' and question.get('choices') and not column.endswith('_TEXT'):
+                column_types[column] = 'category'
+                choices = question['choices']
+                categories[column] = list(choices.values() if payload.get('useLabels') else choices)
+            elif question.get('type') in ('Slider', 'CS'):
+                column_types[column] = 'Float64'
+        dates = list(self.date_columns)
+        if isinstance(dtypes, dict):
+            column_types.update(dtypes)
+            dates = [column for column in dates if column not in dtypes]
+            categories = {column: choices for column, choices in categories.items() if column_types.get(column) == 'category'}
+        column_types = {column: dtype for column, dtype in column_types.items() if column not in dates}
+        # read_csv parses nullable numbers and booleans string by string; the C parser's own numbers are converted after the read instead.
+        nullable = {column: dtype for column, dtype in column_types.items() if re.fullmatch(r'U?Int(8|16|32|64)|Float(32|64)|boolean', str(dtype))}
+        return {'dtype': {column: dtype for column, dtype in column_types.items() if column not in nullable}, 'nullable': nullable, 'categories': categories, 'dates': dates,
+                'time_zone': payload.get('timeZone')}
+
+    def _apply_schema(self, df, schema):
+        '''This method parses the date columns of a DataFrame read with a schema into timezone-aware datetimes (UTC, or the
+        timeZone the export was made in), and orders the categories of its choice columns like the choices of their
+        questions. Values that are not choices (e.g. seen-but-unanswered recodes) are kept as extra categories. Dates that
+        cannot be parsed become NaT. (Not a User-Facing Method)'''
+        for column in schema['dates']:
+            if column in df.columns:
+                if schema.get('time_zone'):
+                    dates = pd.to_datetime(df[column], errors='coerce')
+                    df[column] = dates.dt.tz_localize(schema['time_zone'], ambiguous='NaT', nonexistent='NaT')
+                else:
+                    df[column] = pd.to_datetime(df[column], utc=True, errors='coerce')
+        for column, dtype in schema['nullable'].items():
+            if column in df.columns:
+                df[column] = df[column].astype(dtype)
+        for column, choices in schema['categories'].items():
+            if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype):
+                extra = [value for value in df[column].cat.categories if value not in choices]
+                df[column] = df[column].cat.set_categories(choices + extra)
+        return df
+
+    def _export_cache_key(self, survey, payload, reading):
+        '''This method returns the export cache key of an export: a hash of the API token, the export url and the payload,
+        and of the dtypes and header parameters when the cache keeps DataFrames. (Not a User-Facing Method)'''
+        headers, url = self.header_setup(content_type=True, xm=False, path=f'surveys/{survey}/export-responses')
+        return self.export_cache.key(headers.get('x-api-token'), url, payload, reading if self.export_cache.store == 'parquet' else None)
+
+    def _survey_version(self, response):
+        '''This method reads what an export cache entry must match to be fresh out of a survey response: the response
+        counts and the LastModified date of the survey. (Not a User-Facing Method)'''
+        self._raise_for_meta(response)
+        result = response['result']
+        return {'responses': result.get('responseCounts'), 'last_modified': result.get('lastModifiedDate')}
+
+    def _read_cached(self, path, file_format, schema, header):
+        '''This method reads the responses of an export cache entry. (Not a User-Facing Method)'''
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path)
+        with open(path, 'rb') as export_file:
+            return self._read_export(export_file, file_format, schema, header)
+
+    def _cache_export(self, key, export_file, file_format, schema, header, version):
+        '''This method reads a downloaded export and stores the file, or the DataFrame, in the export cache. (Not a User-Facing Method)'''
+        if self.export_cache.store == 'zip':
+            self.export_cache.set(key, export_file, version)
+        df = self._read_export(export_file, file_format, schema, header)
+        if self.export_cache.store == 'parquet':
+            self.export_cache.set(key, df, version)
+        return df
+
+    def _validate_header(self, header, payload):
+        '''This method validates the header parameter of get_survey_responses. (Not a User-Facing Method)'''
+        assert header in (None, 'attrs', 'multiindex'), "Hey there! The header parameter must be None, 'attrs' or 'multiindex'."
+        assert header is None or payload['format'] in ('csv', 'tsv'), 'Hey there! The header parameter can only be used with csv or tsv exports.'
+
+    def _read_delimited(self, export_member, file_format, schema=None, chunksize=None):
+        '''This method reads a csv or tsv export in one pass: its three header rows are consumed off the top of the stream,
+        and read_csv parses the responses from where they end, so every column gets the type of its responses and no
+        header row has to be dropped from the DataFrame afterwards. (Not a User-Facing Method)
+
+        :return: The header (see _export_header), and the DataFrame (or a reader of DataFrames of chunksize rows).
+        '''
+        columns, text = self._header_rows(export_member, file_format)
+        names = [name for name, _, _ in columns]
+        options = {'sep': '\t'} if file_format == 'tsv' else {}
+        return columns, pd.read_csv(text, header=None, names=names, dtype=schema and schema['dtype'], chunksize=chunksize, **options)
+
+    def _label_columns(self, df, columns, header):
+        '''This method attaches the header rows of an export to a DataFrame read without them, as df.attrs['columns']
+        or as the levels of a column MultiIndex. (Not a User-Facing Method)'''
+        if header == 'attrs':
+            df.attrs['columns'] = {name: {'question': question, 'import_id': import_id} for name, question, import_id in columns}
+        elif header == 'multiindex':
+            df.columns = pd.MultiIndex.from_tuples(columns, names=['name', 'question', 'import_id'])
+        return df
+
+    def _validate_download(self, path, chunk_size, progress):
+        '''This method validates the download parameters of get_survey_responses. (Not a User-Facing Method)'''
+        assert path is None or isinstance(path, str), 'Hey there! The path parameter must be of type string.'
+        assert isinstance(chunk_size, int) and chunk_size > 0, 'Hey there! The chunk_size parameter must be a positive integer.'
+        assert progress is None or callable(progress), 'Hey there! The progress parameter must be a function.'
+
+    def _open_download(self, path, download_url):
+        '''This method opens the file an export is downloaded into: a spooled temporary file, or the partial file of
+        path, which keeps the bytes of an earlier download of the same export file. (Not a User-Facing Method)'''
+        if path is None:
+            return tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        return open(self._partial_path(path, download_url), 'a+b')
+
+    def _partial_path(self, path, download_url):
+        '''This method returns the path an export file is downloaded to until it is complete. It is named after the url of
+        the export file, so only a download of the same file resumes it. (Not a User-Facing Method)'''
+        return f"{path}.{hashlib.sha1(download_url.encode('utf-8')).hexdigest()[:12]}.part"
+
+    def _download_export(self, download_url, headers, path=None, chunk_size=1024 ** 2, progress=None):
+        '''This method streams an export file in chunks into a spooled temporary file, or into the file at path, and
+        returns it open and rewound. A download that drops is resumed with a Range request from the last byte received,
+        and a file that fails the checks of _verify_download is downloaded again in full, up to download_attempts
+        requests. The export job is never started again. (Not a User-Facing Method)'''
+        export_file = self._open_download(path, download_url)
+        downloaded, attempt = export_file.seek(0, io.SEEK_END), 1
+        try:
+            while True:
+                download_request = self.api_request("GET", download_url, headers=self._range_headers(headers, downloaded), stream=True)
+                try:
+                    downloaded, total = self._start_download(export_file, download_request, downloaded)
+                    # A 416 means every byte is already downloaded; its body is an error message, not part of the file.
+                    if download_request.status_code != 416:
+                        for chunk in download_request.iter_content(chunk_size=chunk_size):
+                            export_file.write(chunk)
+                            downloaded += len(chunk)
+                            if progress is not None:
+                                progress(downloaded, total)
+                except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError):
+                    if attempt >= self.download_attempts:
+                        raise
+                else:
+                    if self._verify_download(export_file, downloaded, total):
+                        break
+                    if attempt >= self.download_attempts:
+                        raise QualtricsExportError(f'The export file {download_url} was still incomplete or corrupt after {attempt} downloads.')
+                    downloaded = self._restart_download(export_file)
+                finally:
+                    download_request.close()
+                attempt += 1
+        except BaseException:
+            export_file.close()
+            raise
+        return self._finish_download(export_file, path, download_url)
+
+    def _range_headers(self, headers, downloaded):
+        '''This method returns the headers of a download request, asking for the bytes after the first downloaded ones. (Not a User-Facing Method)'''
+        return dict(headers, Range=f'bytes={downloaded}-') if downloaded else headers
+
+    def _start_download(self, export_file, response, downloaded):
+        '''This method checks the response to a download request and returns how many bytes of the export file are already
+        downloaded, and its size (or None). A server that ignores the Range header sends the whole file again, so the
+        partial file is emptied. A 416 answers a Range request that starts at the end of the file: its body must not be
+        read into the file. (Not a User-Facing Method)'''
+        status = response.status_code
+        if status == 206 or (status == 416 and downloaded):
+            size = response.headers.get('Content-Range', '').rpartition('/')[2]
+            return downloaded, int(size) if size.isdigit() else None
+        if status != 200:
+            raise QualtricsExportError(f'The export file could not be downloaded (HTTP {status}).')
+        if downloaded:
+            downloaded = self._restart_download(export_file)
+        size = response.headers.get('Content-Length')
+        return downloaded, int(size) if size is not None else None
+
+    def _restart_download(self, export_file):
+        '''This method empties a partially downloaded export file. (Not a User-Facing Method)'''
+        export_file.seek(0)
+        export_file.truncate()
+        return 0
+
+    def _verify_download(self, export_file, downloaded, total):
+        '''This method checks that a downloaded export file has every byte announced by Qualtrics and opens as a zip file.
+        The CRC of its content is checked by zipfile as the responses are read. (Not a User-Facing Method)'''
+        if total is not None and downloaded != total:
+            return False
+        export_file.seek(0)
+        try:
+            with zipfile.ZipFile(export_file) as survey_zip:
+                return len(survey_zip.infolist()) > 0
+        except zipfile.BadZipFile:
+            return False
+
+    def _finish_download(self, export_file, path, download_url):
+        '''This method returns a verified export file open and rewound. The partial file of path is renamed to path. (Not a User-Facing Method)'''
+        if path is None:
+            export_file.seek(0)
+            return export_file
+        export_file.close()
+        os.replace(self._partial_path(path, download_url), path)
+        return open(path, 'rb')
+
+    def _read_export(self, content, file_format='csv', schema=None, header=None):
+        '''This method reads the survey responses out of a downloaded export file, given as bytes or a file object. A csv
+        or tsv export read with the schema of _response_schema(), or with a header layout, does not return its two header
+        rows below the column names as rows. (Not a User-Facing Method)'''
+        with zipfile.ZipFile(io.BytesIO(content) if isinstance(content, bytes) else content) as survey_zip:
+            member = survey_zip.infolist()[0]
+            if file_format == 'spss':
+                with tempfile.TemporaryDirectory() as directory:
+                    return pd.read_spss(survey_zip.extract(member, directory))
+            with survey_zip.open(member.filename) as export_member:
+                if file_format in ('csv', 'tsv') and (schema is not None or header is not None):
+                    columns, df = self._read_delimited(export_member, file_format, schema)
+                    return self._label_columns(df if schema is None else self._apply_schema(df, schema), columns, header)
+                if file_format in ('csv', 'tsv'):
+                    return pd.read_csv(export_member, **self._delimited_options(file_format, export_member))
+                return pd.DataFrame(list(self._export_records(export_member, file_format)))
+
+    def _iter_export(self, export_file, chunksize, records, file_format='csv', schema=None, header=None):
+        '''This generator reads the responses out of a downloaded export file in batches of chunksize rows, without the
+        two header rows below the column names of csv and tsv files. The file is closed once the generator is exhausted
+        or closed. (Not a User-Facing Method)'''
+        with export_file, zipfile.ZipFile(export_file) as survey_zip:
+            member = survey_zip.infolist()[0]
+            if file_format == 'spss':
+                pyreadstat = self._pyreadstat()
+                with tempfile.TemporaryDirectory() as directory:
+                    path = survey_zip.extract(member, directory)
+                    for chunk, _ in pyreadstat.read_file_in_chunks(pyreadstat.read_sav, path, chunksize=chunksize):
+                        yield chunk.to_dict('records') if records else chunk
+                return
+            with survey_zip.open(member.filename) as export_member:
+                if file_format in ('csv', 'tsv'):
+                    columns, reader = self._read_delimited(export_member, file_format, schema, chunksize)
+                    with reader:
+                        for chunk in reader:
+                            chunk = self._label_columns(chunk if schema is None else self._apply_schema(chunk, schema), columns, header)
+                            yield chunk.to_dict('records') if records else chunk
+                    return
+                batch, start = [], 0
+                for record in self._export_records(export_member, file_format):
+                    batch.append(record)
+                    if len(batch) == chunksize:
+                        yield batch if records else pd.DataFrame(batch, index=pd.RangeIndex(start, start + len(batch)))
+                        batch, start = [], start + len(batch)
+                if batch:
+                    yield batch if records else pd.DataFrame(batch, index=pd.RangeIndex(start, start + len(batch)))
+
+    def _delimited_options(self, file_format, export_member):
+        '''This method returns the read_csv options of a csv or tsv export. Qualtrics writes tsv files as UTF-16. (Not a User-Facing Method)'''
+        if file_format == 'csv':
+            return {}
+        head = export_member.peek(2)[:2]
+        if head in (b'\xff\xfe', b'\xfe\xff'):
+            encoding = 'utf-16'
+        elif head[1:] == b'\x00':
+            encoding = 'utf-16-le'
+        else:
+            encoding = 'utf-8-sig'
+        return {'sep': '\t', 'encoding': encoding}
+
+    def _export_records(self, export_member, file_format):
+        '''This generator reads the responses of a json, ndjson or xml export one at a time, as flat dicts of the
+        response id and its fields. (Not a User-Facing Method)'''
+        if file_format == 'xml':
+            for _, element in ElementTree.iterparse(export_member, events=('end',)):
+                if element.tag == 'Response':
+                    yield {field.tag: field.text for field in element}
+                    element.clear()
+            return
+        parser = Parser()
+        records = parser.ndjson_records(export_member) if file_format == 'ndjson' else parser.json_records(export_member, key='responses')
+        for record in records:
+            yield {'responseId': record.get('responseId'), **record.get('values', {})}
+
+    def _pyarrow(self):
+        '''This method imports the pyarrow package that Arrow batches and Parquet files are built with. (Not a User-Facing Method)'''
+        try:
+            import pyarrow
+            import pyarrow.csv
+        except ImportError:
+            raise ImportError('Hey there! Arrow and Parquet exports need the "pyarrow" package. You can install it with "pip install QualtricsAPI[parquet]".')
+        return pyarrow
+
+    def _validate_arrow(self, batch_size, schema):
+        '''This method validates the parameters of iter_survey_record_batches. (Not a User-Facing Method)'''
+        self._pyarrow()
+        assert isinstance(batch_size, int) and batch_size > 0, 'Hey there! The batch_size parameter must be a positive integer.'
+        assert schema is None or isinstance(schema, dict), 'Hey there! The schema parameter must be of type dict.'
+
+    def _validate_parquet(self, destination, compression, partition_cols):
+        '''This method validates the parameters of write_survey_responses_to_parquet. (Not a User-Facing Method)'''
+        assert isinstance(destination, str), 'Hey there! The destination parameter must be of type string.'
+        assert compression in ('snappy', 'gzip', 'brotli', 'zstd', 'lz4', 'none'), 'Hey there! The compression parameter must be one of "snappy", "gzip", "brotli", "zstd", "lz4" or "none".'
+        assert partition_cols is None or (isinstance(partition_cols, list) and len(partition_cols) > 0), 'Hey there! The partition_cols parameter must be a list of column names.'
+
+    def _export_header(self, survey_zip, member, file_format):
+        '''This method reads the three header rows of a csv or tsv export: the column names, the question texts and the
+        ImportIds. (Not a User-Facing Method)
+
+        :return: A list of (name, question, import_id) tuples, one per column.
+        '''
+        with survey_zip.open(member.filename) as export_member:
+            return self._header_rows(export_member, file_format)[0]
+
+    def _header_rows(self, export_member, file_format):
+        '''This method reads the three header rows off the top of a csv or tsv export stream. (Not a User-Facing Method)
+
+        :return: The header (see _export_header), and the text stream of the export positioned on its first response.
+        '''
+        encoding = self._delimited_options(file_format, export_member).get('encoding', 'utf-8-sig')
+        text = io.TextIOWrapper(export_member, encoding=encoding, newline='')
+        reader = csv.reader(text, delimiter='\t' if file_format == 'tsv' else ',')
+        names, questions, import_ids = next(reader, []), next(reader, []), next(reader, [])
+        questions, import_ids = questions + [''] * (len(names) - len(questions)), import_ids + [''] * (len(names) - len(import_ids))
+        header = []
+        for name, question, import_id in zip(names, questions, import_ids):
+            try:
+                import_id = json.loads(import_id).get('ImportId', name)
+            except (ValueError, AttributeError):
+                import_id = name
+            header.append((name, question, import_id))
+        return header, text
+
+    def _arrow_schema(self, header, overrides=None):
+        '''This method builds the Arrow schema of an export from its header rows. (Not a User-Facing Method)'''
+        pa = self._pyarrow()
+        overrides = overrides or {}
+        fields = []
+        for name, question, import_id in header:
+            arrow_type = overrides.get(name, overrides.get(import_id, self.arrow_types.get(import_id, 'string')))
+            if isinstance(arrow_type, str):
+                arrow_type = pa.type_for_alias(arrow_type)
+            fields.append(pa.field(name, arrow_type, metadata={'question': question, 'import_id': import_id}))
+        return pa.schema(fields)
+
+    def _iter_record_batches(self, export_file, file_format, batch_size, overrides=None):
+        '''This generator reads a csv or tsv export file as Arrow record batches of batch_size rows. The file is closed
+        once the generator is exhausted or closed. (Not a User-Facing Method)'''
+        pa = self._pyarrow()
+        with export_file, zipfile.ZipFile(export_file) as survey_zip:
+            member = survey_zip.infolist()[0]
+            schema = self._arrow_schema(self._export_header(survey_zip, member, file_format), overrides)
+            with survey_zip.open(member.filename) as export_member:
+                encoding = self._delimited_options(file_format, export_member).get('encoding', 'utf8')
+                reader = pa.csv.open_csv(
+                    export_member,
+                    read_options=pa.csv.ReadOptions(column_names=schema.names, skip_rows=3, encoding=encoding),
+                    parse_options=pa.csv.ParseOptions(delimiter='\t' if file_format == 'tsv' else ',', newlines_in_values=True),
+                    convert_options=pa.csv.ConvertOptions(column_types=schema, strings_can_be_null=True))
+                # The csv reader drops the field metadata, so the batches are rebuilt with the schema of the header rows.
+                pending, rows = [], 0
+                for batch in reader:
+                    pending.append(pa.RecordBatch.from_arrays(batch.columns, schema=schema))
+                    rows += batch.num_rows
+                    while rows >= batch_size:
+                        table = pa.Table.from_batches(pending, schema=schema)
+                        yield from table.slice(0, batch_size).combine_chunks().to_batches()
+                        rest = table.slice(batch_size)
+                        pending, rows = rest.to_batches(), rest.num_rows
+                if rows:
+                    yield from pa.Table.from_batches(pending, schema=schema).combine_chunks().to_batches()
+
+    def _write_parquet(self, batches, destination, compression, row_group_size, partition_cols=None):
+        '''This method writes record batches to a Parquet file, or to a Hive-partitioned Parquet dataset. (Not a User-Facing Method)'''
+        pa = self._pyarrow()
+        import pyarrow.parquet
+        written = 0
+        if partition_cols is None:
+            writer = None
+            try:
+                for batch in batches:
+                    if writer is None:
+                        writer = pa.parquet.ParquetWriter(destination, batch.schema, compression=compression)
+                    writer.write_batch(batch, row_group_size=row_group_size)
+                    written += batch.num_rows
+            finally:
+                if writer is not None:
+                    writer.close()
+            return written
+        import pyarrow.dataset
+
+        def counted(batches):
+            nonlocal written
+            for batch in batches:
+                written += batch.num_rows
+                yield batch
+        first = next(batches, None)
+        if first is None:
+            return 0
+        batches = counted(itertools.chain([first], batches))
+        pa.dataset.write_dataset(batches, destination, schema=first.schema, format='parquet', partitioning=partition_cols,
+                                 partitioning_flavor='hive', max_rows_per_group=row_group_size, existing_data_behavior='overwrite_or_ignore',
+                                 file_options=pa.dataset.ParquetFileFormat().make_write_options(compression=compression))
+        return written
+
+    def _pyreadstat(self):
+        '''This method imports the pyreadstat package that SPSS exports are read with. (Not a User-Facing Method)'''
+        try:
+            import pyreadstat
+        except ImportError:
+            raise ImportError('Hey there! Reading SPSS exports needs the "pyreadstat" package. You can install it with "pip install QualtricsAPI[spss]".')
+        return pyreadstat
+
+    @operation
+    def iter_survey_record_batches(self, survey=None, verify=None, batch_size=65536, schema=None, path=None, chunk_size=1024 ** 2, progress=None, **kwargs):
+        '''This method exports the responses of a survey and returns a generator of pyarrow RecordBatches of batch_size
+        responses, read straight out of the export file without building a DataFrame. The schema comes from the header
+        rows of the export: the columns listed in Responses.arrow_types are typed, the others are strings, and every
+        field keeps its question text and ImportId as metadata. It accepts the same keyword arguments as
+        get_survey_responses(), with a csv (default) or tsv format. It needs the "pyarrow" package.
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :param batch_size: The number of responses in each batch. (Default: 65536)
+        :type batch_size: int
+        :param schema: The Arrow types of columns, by column name or ImportId, e.g. {'QID1': 'int64'}. (Default: None)
+        :type schema: dict
+        :return: A generator of pyarrow.RecordBatch
+        '''
+        self._validate_arrow(batch_size, schema)
+        self._validate_download(path, chunk_size, progress)
+        dynamic_payload = self._export_payload(**kwargs)
+        assert dynamic_payload['format'] in ('csv', 'tsv'), 'Hey there! Arrow record batches can only be read from csv or tsv exports.'
+        export_file = self._export_to_file(survey, dynamic_payload, verify, path, chunk_size, progress)
+        return self._iter_record_batches(export_file, dynamic_payload['format'], batch_size, schema)
+
+    @operation
+    def write_survey_responses_to_parquet(self, survey=None, destination=None, verify=None, compression='snappy', row_group_size=100000, partition_cols=None, schema=None, path=None, chunk_size=1024 ** 2, progress=None, **kwargs):
+        '''This method exports the responses of a survey straight into Parquet, one row group at a time, so an export of
+        any size is written without building a DataFrame. It accepts the same keyword arguments as
+        iter_survey_record_batches(). It needs the "pyarrow" package.
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :param destination: The Parquet file to write, or the directory of the dataset when partition_cols is given.
+        :type destination: str
+        :param compression: The compression codec: 'snappy', 'gzip', 'brotli', 'zstd', 'lz4' or 'none'. (Default: 'snappy')
+        :type compression: str
+        :param row_group_size: The number of responses in each row group. (Default: 100000)
+        :type row_group_size: int
+        :param partition_cols: The columns to partition a Hive-style dataset by, e.g. ['UserLanguage']. (Default: None)
+        :type partition_cols: list
+        :param schema: The Arrow types of columns, by column name or ImportId, e.g. {'QID1': 'int64'}. (Default: None)
+        :type schema: dict
+        :return: The number of responses written.
+        '''
+        self._validate_parquet(destination, compression, partition_cols)
+        batches = self.iter_survey_record_batches(survey=survey, verify=verify, batch_size=row_group_size, schema=schema, path=path,
+                                                  chunk_size=chunk_size, progress=progress, **kwargs)
+        with self.span('write'):
+            return self._write_parquet(batches, destination, compression, row_group_size, partition_cols)
 
     # Version 3 Code
-    def get_survey_questions(self, survey=None, verify=None, **kwargs):
-        '''This method returns a DataFrame containing the survey questions and the Question IDs.
+    @operation
+    def get_survey_questions(self, survey=None, verify=None, from_definition=True, **kwargs):
+        '''This method returns a DataFrame containing the survey questions, indexed by their export column (e.g. Q1 or
+        Q4_TEXT), with their question text ('Questions'), QuestionID, type and choices. It reads the cached survey
+        definition (see get_survey_definition) instead of exporting responses, so the metadata columns (StartDate,
+        ResponseId, ...) are not listed.
 
         :param survey: This is the id associated with a given survey.
+        :param from_definition: If False, or if export keyword arguments (e.g. useLabels) are given, read the question
+        text row of a 2-response export instead, as in earlier releases: a single 'Questions' column indexed by every
+        export column, metadata columns included. (Default: True)
+        :type from_definition: bool
         :return: a Pandas DataFrame
         '''
-        df = self.get_survey_responses(
-            survey=survey, limit=2, verify=verify, **kwargs)
-        questions = pd.DataFrame(df[:1].T)
-        questions.columns = ['Questions']
-        return questions
+        assert isinstance(from_definition, bool), 'Hey there! The from_definition parameter must be of type bool.'
+        if kwargs or not from_definition:
+            df = self.get_survey_responses(
+                survey=survey, limit=2, verify=verify, **kwargs)
+            questions = pd.DataFrame(df[:1].T)
+            questions.columns = ['Questions']
+            return questions
+        definition = self.get_survey_definition(survey=survey, verify=verify)
+        return None if definition is None else self._questions_frame(definition)
+
+    @operation
+    def get_survey_definition(self, survey=None, verify=None, refresh=False):
+        '''This method returns the definition of a survey: its name, LastModified date, questions (text, type, selector
+        and choices by recode) and the question of each export column. Definitions are kept in Responses.definition_cache
+        and are only fetched again once the survey has changed, so repeat calls return without a full round trip.
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :param refresh: If True, fetch the definition even if it is cached. (Default: False)
+        :type refresh: bool
+        :return: A dict with the keys survey, name, last_modified, questions and columns.
+        '''
+        cache, key, entry = self._cached_definition(survey, refresh)
+        try:
+            if entry is not None and time.time() - entry['checked_at'] < cache.max_age:
+                return entry['definition']
+            if entry is not None:
+                with self.span('check'):
+                    headers, url = self.header_setup(content_type=True, xm=False, path=f'survey-definitions/{survey}/metadata')
+                    last_modified = self._last_modified(self.api_request("GET", url, headers=headers, verify=verify).json())
+                if last_modified == entry['last_modified']:
+                    cache.set(key, dict(entry, checked_at=time.time()))
+                    return entry['definition']
+            with self.span('fetch'):
+                headers, url = self.header_setup(content_type=True, xm=False, path=f'surveys/{survey}')
+                definition = self._parse_definition(self.api_request("GET", url, headers=headers, verify=verify).json())
+        except (Qualtrics500Error, Qualtrics503Error, Qualtrics504Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+            return print(e)
+        cache.set(key, {'last_modified': definition['last_modified'], 'checked_at': time.time(), 'definition': definition})
+        return definition
+
+    def _cached_definition(self, survey, refresh):
+        '''This method validates the parameters of get_survey_definition, and returns the definition cache, the key of the
+        survey for this client's token and data center, and its cached entry (None if it is not cached or refresh is
+        True). (Not a User-Facing Method)'''
+        assert survey != None, 'Hey There! The survey parameter cannot be None. You need to pass in a survey ID as a string into the survey parameter.'
+        assert isinstance(
+            survey, str) == True, 'Hey There! The survey parameter must be of type string.'
+        assert len(survey) == 18, 'Hey there! It looks like your survey ID is a the incorrect length. It needs to be 18 characters long. Please try again.'
+        assert survey[:3] == 'SV_', 'Hey there! It looks like your survey ID is incorrect. You can find the survey ID on the Qualtrics site under your account settings. Please try again.'
+        assert isinstance(refresh, bool), 'Hey there! The refresh parameter must be of type bool.'
+        if Responses.definition_cache is None:
+            Responses.definition_cache = SurveyDefinitionCache()
+        cache = Responses.definition_cache
+        headers, url = self.header_setup(content_type=True, xm=False, path=f'surveys/{survey}')
+        key = cache.key(headers.get('x-api-token'), url)
+        return cache, key, None if refresh else cache.get(key)
+
+    def _last_modified(self, response):
+        '''This method reads the LastModified date out of a survey metadata response. (Not a User-Facing Method)'''
+        self._raise_for_meta(response)
+        return response['result']['LastModified']
+
+    def _parse_definition(self, response):
+        '''This method builds the definition returned by get_survey_definition out of a survey response. Question and
+        choice texts are stripped of their HTML. (Not a User-Facing Method)'''
+        self._raise_for_meta(response)
+        result = response['result']
+
+        def plain(text):
+            return html.unescape(re.sub(r'<[^>]+>', '', text or '')).strip()
+        questions = {}
+        for question_id, question in (result.get('questions') or {}).items():
+            question_type = question.get('questionType') or {}
+            questions[question_id] = {
+                'name': question.get('questionName'),
+                'text': plain(question.get('questionText')),
+                'type': question_type.get('type'),
+                'selector': question_type.get('selector'),
+                'sub_selector': question_type.get('subSelector'),
+                'choices': {str(choice.get('recode', key)): plain(choice.get('choiceText') or choice.get('description'))
+                            for key, choice in (question.get('choices') or {}).items()},
+            }
+        columns = {column: mapping.get('question') for column, mapping in (result.get('exportColumnMap') or {}).items()}
+        return {'survey': result.get('id'), 'name': result.get('name'), 'last_modified': result.get('lastModifiedDate'),
+                'questions': questions, 'columns': columns}
+
+    def _questions_frame(self, definition):
+        '''This method turns a survey definition into the DataFrame of get_survey_questions. (Not a User-Facing Method)'''
+        columns = definition['columns'] or {question['name']: question_id for question_id, question in definition['questions'].items()}
+        rows = []
+        for column, question_id in columns.items():
+            question = definition['questions'].get(question_id, {})
+            rows.append({'Questions': question.get('text'), 'QuestionID': question_id, 'Type': question.get('type'),
+                         'Selector': question.get('selector'), 'Choices': question.get('choices') or None})
+        return pd.DataFrame(rows, index=pd.Index(list(columns), name=None), columns=['Questions', 'QuestionID', 'Type', 'Selector', 'Choices'])
 
     def get_survey_response(self, survey=None, response=None, verbose=False, verify=None):
         ''' This method retrieves a single response from a given survey. '''
@@ -345,28 +1272,10 @@ class Responses(Credentials):
 
         headers, url = self.header_setup(
             content_type=True, xm=False, path=f'/surveys/{survey}/responses/{response}')
-        request = r.request("GET", url, headers=headers, verify=verify)
+        request = self.api_request("GET", url, headers=headers, verify=verify)
         response = request.json()
         try:
-            if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                raise Qualtrics500Error('500 - Internal Server Error')
-            elif response['meta']['httpStatus'] == '503 - Temporary Internal Server Error':
-                raise Qualtrics503Error(
-                    '503 - Temporary Internal Server Error')
-            elif response['meta']['httpStatus'] == '504 - Gateway Timeout':
-                raise Qualtrics504Error('504 - Gateway Timeout')
-            elif response['meta']['httpStatus'] == '400 - Bad Request':
-                raise Qualtrics400Error(
-                    'Qualtrics Error\n(Http Error: 400 - Bad Request): There was something invalid about the request.')
-            elif response['meta']['httpStatus'] == '401 - Unauthorized':
-                raise Qualtrics401Error(
-                    'Qualtrics Error\n(Http Error: 401 - Unauthorized): The Qualtrics API user could not be authenticated or does not have authorization to access the requested resource.')
-            elif response['meta']['httpStatus'] == '403 - Forbidden':
-                raise Qualtrics403Error(
-                    'Qualtrics Error\n(Http Error: 403 - Forbidden): The Qualtrics API user was authenticated and made a valid request, but is not authorized to access this requested resource.')
-        except (Qualtrics503Error, Qualtrics504Error) as e:
-            # Recursive call to handle Internal Server Errors
-            return self.get_survey_response(self, survey=survey, response=response, verbose=verbose)
+            self._raise_for_meta(response)
         except (Qualtrics500Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
             # Handle Authorization/Bad Request Errors
             return print(e)
@@ -388,28 +1297,10 @@ class Responses(Credentials):
 
         headers, url = self.header_setup(
             content_type=True, xm=False, path=f'/surveys/{survey}/responses')
-        request = r.post(url, json=dynamic_payload, headers=headers)
+        request = self.api_request("POST", url, json=dynamic_payload, headers=headers)
         response = request.json()
         try:
-            if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                raise Qualtrics500Error('500 - Internal Server Error')
-            elif response['meta']['httpStatus'] == '503 - Temporary Internal Server Error':
-                raise Qualtrics503Error(
-                    '503 - Temporary Internal Server Error')
-            elif response['meta']['httpStatus'] == '504 - Gateway Timeout':
-                raise Qualtrics504Error('504 - Gateway Timeout')
-            elif response['meta']['httpStatus'] == '400 - Bad Request':
-                raise Qualtrics400Error(
-                    'Qualtrics Error\n(Http Error: 400 - Bad Request): There was something invalid about the request.')
-            elif response['meta']['httpStatus'] == '401 - Unauthorized':
-                raise Qualtrics401Error(
-                    'Qualtrics Error\n(Http Error: 401 - Unauthorized): The Qualtrics API user could not be authenticated or does not have authorization to access the requested resource.')
-            elif response['meta']['httpStatus'] == '403 - Forbidden':
-                raise Qualtrics403Error(
-                    'Qualtrics Error\n(Http Error: 403 - Forbidden): The Qualtrics API user was authenticated and made a valid request, but is not authorized to access this requested resource.')
-        except (Qualtrics503Error, Qualtrics504Error) as e:
-            # Recursive call to handle Internal Server Errors
-            return self.create_survey_response(self, survey=survey, dynamic_payload=dynamic_payload, verify=verify)
+            self._raise_for_meta(response)
         except (Qualtrics500Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
             # Handle Authorization/Bad Request Errors
             return print(e, response['meta'])
@@ -435,42 +1326,25 @@ class Responses(Credentials):
         assert len(response_id) == 17, 'Hey there! It looks like your response_id ID is a the incorrect length. It needs to be 18 characters long. Please try again.'
         assert response_id[:2] == 'R_', 'Hey there! It looks like your response_id ID is incorrect. You can find the response_id ID on the Qualtrics site under your survey response data & analysis page. Please try again.'
         assert embedded_data != {}, 'Hey there! You are not passing any data to be updated. You must pass at least one key value pair in the embedded_data parameter'
-        assert self.__validate_embedded_data(
+        assert self._validate_embedded_data(
             embedded_data=embedded_data), 'Hey there! Your embedded_data is not formatted correctly. all items must be key value pairs where both key and value are string type.'
 
         headers, url = self.header_setup(
             content_type=True, xm=False, path=f'/responses/{response_id}')
         payload = {'surveyId': survey, 'resetRecordedDate': reset_recorded_date,
                    'embeddedData': embedded_data}
-        request = r.put(url, json=payload, headers=headers)
+        request = self.api_request("PUT", url, json=payload, headers=headers)
         response = request.json()
 
         try:
-            if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                raise Qualtrics500Error('500 - Internal Server Error')
-            elif response['meta']['httpStatus'] == '503 - Temporary Internal Server Error':
-                raise Qualtrics503Error(
-                    '503 - Temporary Internal Server Error')
-            elif response['meta']['httpStatus'] == '504 - Gateway Timeout':
-                raise Qualtrics504Error('504 - Gateway Timeout')
-            elif response['meta']['httpStatus'] == '400 - Bad Request':
-                raise Qualtrics400Error(
-                    'Qualtrics Error\n(Http Error: 400 - Bad Request): There was something invalid about the request.')
-            elif response['meta']['httpStatus'] == '401 - Unauthorized':
-                raise Qualtrics401Error(
-                    'Qualtrics Error\n(Http Error: 401 - Unauthorized): The Qualtrics API user could not be authenticated or does not have authorization to access the requested resource.')
-            elif response['meta']['httpStatus'] == '403 - Forbidden':
-                raise Qualtrics403Error(
-                    'Qualtrics Error\n(Http Error: 403 - Forbidden): The Qualtrics API user was authenticated and made a valid request, but is not authorized to access this requested resource.')
-        except (Qualtrics503Error, Qualtrics504Error) as e:
-            # Recursive call to handle Internal Server Errors
-            return self.update_survey_response_embedded_data(survey, response_id, embedded_data, reset_recorded_date)
+            self._raise_for_meta(response)
         except (Qualtrics500Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
             # Handle Authorization/Bad Request Errors
             return print(e, response['meta'])
         else:
             return response['meta']
 
+    @operation
     def bulk_update_many_responses_from_dataframe(self, survey=None, df=None, update_cols=[], rid_col='ResponseId', chunk_size=5000, reset_recorded_date=False):
         """
         This method updates large volumes of survey responses based on the provided dataframe dataframe. It chunks the data and sends updates in batches to Qualtrics API.
@@ -500,51 +1374,54 @@ class Responses(Credentials):
 
         headers, url = self.header_setup(
             content_type=True, xm=False, path=f'/surveys/{survey}/update-responses')
-        chunks = self.__dataframe_chunks(df, chunk_size)
+        chunks = self._dataframe_chunks(df, chunk_size)
         running_total = 0
         total_records = df.shape[0]
         for chunk in chunks:
-            updates = []
-            for idx, row in chunk.iterrows():
-                updates.append(self.__make_update_object(
-                    row, update_cols, rid_col, reset_recorded_date))
-            payload = json.loads(json.dumps(
-                {"updates": updates, "ignoreMissingResponses": True}, cls=self.__NpEncoder))
+            with self.span('build'):
+                updates = []
+                for idx, row in chunk.iterrows():
+                    updates.append(self._make_update_object(
+                        row, update_cols, rid_col, reset_recorded_date))
+                payload = json.loads(json.dumps(
+                    {"updates": updates, "ignoreMissingResponses": True}, cls=self._NpEncoder))
             if len(updates) > 0:
                 running_total += len(updates)
-                request = r.post(url, json=payload, headers=headers)
+                with self.span('upload'):
+                    request = self.api_request("POST", url, json=payload, headers=headers)
                 response = request.json()
 
-                exception_result = self.__handle_qualtrics_exceptions(response)
+                exception_result = self._handle_qualtrics_exceptions(response)
                 if exception_result:
                     return print(exception_result)
 
                 progress_id = response['result']['progressId']
-                is_processing = True
-                while is_processing:
-                    headers, check_progress_url = self.header_setup(
-                        content_type=True, xm=False, path=f'/surveys/{survey}/update-responses/{progress_id}')
-                    progress_request = r.get(
-                        check_progress_url, headers=headers)
-                    progress_response = progress_request.json()
-                    progress_exception_result = self.__handle_qualtrics_exceptions(
-                        response=progress_response)
-                    if progress_exception_result:
-                        print("problem checking progress of bulk update:",
-                              progress_exception_result)
-                        time.sleep(3)
-                        continue
-                    progress_status = progress_response['result']['status']
-                    if progress_status == 'complete':
-                        is_processing = False
-                    time.sleep(1.5)
+                with self.span('poll'):
+                    is_processing = True
+                    while is_processing:
+                        headers, check_progress_url = self.header_setup(
+                            content_type=True, xm=False, path=f'/surveys/{survey}/update-responses/{progress_id}')
+                        progress_request = self.api_request(
+                            "GET", check_progress_url, headers=headers)
+                        progress_response = progress_request.json()
+                        progress_exception_result = self._handle_qualtrics_exceptions(
+                            response=progress_response)
+                        if progress_exception_result:
+                            print("problem checking progress of bulk update:",
+                                  progress_exception_result)
+                            time.sleep(3)
+                            continue
+                        progress_status = progress_response['result']['status']
+                        if progress_status == 'complete':
+                            is_processing = False
+                        time.sleep(1.5)
                 print(
                     f'Processed {running_total} of {total_records} - updating {", ".join(update_cols)} fields on survey {survey}')
         print("Completed processing {} records".format(running_total))
 
     # This is a utility method to validate dictionary formatting for embedded data updates
 
-    def __validate_embedded_data(self, embedded_data):
+    def _validate_embedded_data(self, embedded_data):
         if not isinstance(embedded_data, dict):
             return False
 
@@ -554,11 +1431,11 @@ class Responses(Credentials):
 
         return True
 
-    def __dataframe_chunks(self, df, chunk_size):
+    def _dataframe_chunks(self, df, chunk_size):
         for start in range(0, len(df), chunk_size):
             yield df[start:start + chunk_size]
 
-    def __make_update_object(self, row, update_cols, rid_col, reset_recorded_date=False):
+    def _make_update_object(self, row, update_cols, rid_col, reset_recorded_date=False):
         update_object = {
             'responseId': row[rid_col],
             'embeddedData': {},
@@ -570,33 +1447,16 @@ class Responses(Credentials):
 
         return update_object
 
-    def __handle_qualtrics_exceptions(self, response):
+    def _handle_qualtrics_exceptions(self, response):
         """Private method to handle and raise custom exceptions based on Qualtrics API response."""
         try:
-            if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                raise Qualtrics500Error('500 - Internal Server Error')
-            elif response['meta']['httpStatus'] == '503 - Temporary Internal Server Error':
-                raise Qualtrics503Error(
-                    '503 - Temporary Internal Server Error')
-            elif response['meta']['httpStatus'] == '504 - Gateway Timeout':
-                raise Qualtrics504Error('504 - Gateway Timeout')
-            elif response['meta']['httpStatus'] == '400 - Bad Request':
-                raise Qualtrics400Error(
-                    'Qualtrics Error\n(Http Error: 400 - Bad Request): There was something invalid about the request.')
-            elif response['meta']['httpStatus'] == '401 - Unauthorized':
-                raise Qualtrics401Error(
-                    'Qualtrics Error\n(Http Error: 401 - Unauthorized): The Qualtrics API user could not be authenticated or does not have authorization to access the requested resource.')
-            elif response['meta']['httpStatus'] == '403 - Forbidden':
-                raise Qualtrics403Error(
-                    'Qualtrics Error\n(Http Error: 403 - Forbidden): The Qualtrics API user was authenticated and made a valid request, but is not authorized to access this requested resource.')
-        except (Qualtrics503Error, Qualtrics504Error) as e:
-            # Potential strategy for retry logic for retryable internal errors
-            return None
-        except (Qualtrics500Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+            self._raise_for_meta(response)
+        except (Qualtrics500Error, Qualtrics503Error, Qualtrics504Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+            # Retryable errors have already been retried by the transport's RetryPolicy
             return str(e), response['meta']
         return None
 
-    class __NpEncoder(json.JSONEncoder):
+    class _NpEncoder(json.JSONEncoder):
         def default(self, obj):
             if isinstance(obj, np.bool_):
                 return bool(obj)
@@ -607,3 +1467,506 @@ class Responses(Credentials):
             if isinstance(obj, np.ndarray):
                 return obj.tolist()
             return json.JSONEncoder.default(self, obj)
+
+
+class AsyncResponses(Responses, AsyncCredentials):
+    '''This is the asyncio counterpart of the Responses class. Its methods take the same parameters, run the same validation
+    and return the same shapes as their Responses equivalents, but they must be awaited and never block the event loop: the
+    export files they download are parsed, cached and written in the default executor of the running loop. Once awaited,
+    iter_survey_responses() and iter_survey_record_batches() return async generators that read each batch there too.'''
+
+    def __init__(self, config=None):
+        self.config = self._resolve_config(config)
+        return
+
+    # The deprecated version 2 methods are not ported. They are overridden so that calling one fails at once, instead of
+    # calling .json() on a coroutine.
+    def setup_request(self, file_format='csv', survey=None, verify=None):
+        '''This method is not available on AsyncResponses. Use "await AsyncResponses().start_export()" instead.'''
+        self._version_2('setup_request', 'start_export')
+
+    def send_request(self, file_format='csv', survey=None, verify=None):
+        '''This method is not available on AsyncResponses. Use "await AsyncResponses().get_survey_responses()" instead.'''
+        self._version_2('send_request', 'get_survey_responses')
+
+    def get_responses(self, survey=None, verify=None):
+        '''This method is not available on AsyncResponses. Use "await AsyncResponses().get_survey_responses()" instead.'''
+        self._version_2('get_responses', 'get_survey_responses')
+
+    def get_questions(self, survey=None, verify=None):
+        '''This method is not available on AsyncResponses. Use "await AsyncResponses().get_survey_questions()" instead.'''
+        self._version_2('get_questions', 'get_survey_questions')
+
+    def _version_2(self, name, replacement):
+        '''This method raises the error of a version 2 method called on AsyncResponses. (Not a User-Facing Method)'''
+        raise AttributeError(f'Hey there! AsyncResponses has no version 2 method "{name}". Please use "await AsyncResponses().{replacement}()" instead.')
+
+    async def setup_request_v3(self, survey=None, payload=None, verify=None):
+        ''' This method sets up the request and handles the setup of the request for the survey.'''
+
+        assert survey != None, 'Hey There! The survey parameter cannot be None. You need to pass in a survey ID as a string into the survey parameter.'
+        assert isinstance(
+            survey, str) == True, 'Hey There! The survey parameter must be of type string.'
+        assert len(survey) == 18, 'Hey there! It looks like your survey ID is a the incorrect length. It needs to be 18 characters long. Please try again.'
+        assert survey[:3] == 'SV_', 'Hey there! It looks like your survey ID is incorrect. You can find the survey ID on the Qualtrics site under your account settings. Please try again.'
+
+        headers, url = self.header_setup(
+            content_type=True, xm=False, path=f'surveys/{survey}/export-responses/')
+        request = await self.api_request("POST", url, data=json.dumps(
+            payload), headers=headers, verify=verify)
+        response = request.json()
+        try:
+            self._raise_for_meta(response)
+        except (Qualtrics500Error, Qualtrics503Error, Qualtrics504Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+            return print(e)
+        else:
+            progress_id = response['result']['progressId']
+            return progress_id, url, headers
+
+    async def send_request_v3(self, survey=None, payload=None, verify=None):
+        '''This method sends the request, and sets up the download request.'''
+        download_url, headers = await self._export_file(survey=survey, payload=payload, verify=verify)
+        with self.span('download'):
+            return await self.api_request("GET", download_url, headers=headers, stream=True)
+
+    async def _export_file(self, survey=None, payload=None, verify=None):
+        '''This method starts an export and waits until its file is ready. (Not a User-Facing Method)
+
+        :return: A tuple of the url of the export file and the headers to download it with.
+        :raises QualtricsExportError: if the export failed, or a Qualtrics error if a progress check was refused.
+        '''
+        with self.span('create'):
+            job = await self._start_export(survey, payload, verify)
+        with self.span('poll'):
+            await job.wait()
+        return job.download_url(), job.headers
+
+    async def _start_export(self, survey, payload, verify=None):
+        '''This method starts an export and returns its AsyncExportJob. (Not a User-Facing Method)'''
+        request = await self.setup_request_v3(
+            survey=survey, payload=payload, verify=verify)
+        if request is None:
+            raise QualtricsExportError(f'The export of survey {survey} could not be started.')
+        progress_id, url, headers = request
+        return AsyncExportJob(self, survey, progress_id, url, headers, payload, verify)
+
+    @operation
+    async def start_export(self, survey=None, verify=None, **kwargs):
+        '''This method starts a response export and returns with an AsyncExportJob, whose status(), wait() and result()
+        must be awaited. It accepts the same keyword arguments as Responses.start_export().
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :return: An AsyncExportJob
+        '''
+        dynamic_payload = self._export_payload(**kwargs)
+        with self.span('create'):
+            return await self._start_export(survey, dynamic_payload, verify)
+
+    async def _download_export(self, download_url, headers, path=None, chunk_size=1024 ** 2, progress=None):
+        '''This method streams an export file in chunks into a spooled temporary file, or into the file at path, and
+        returns it open and rewound. Dropped downloads are resumed like in Responses._download_export(). (Not a User-Facing Method)'''
+        import httpx
+        export_file = self._open_download(path, download_url)
+        downloaded, attempt = export_file.seek(0, io.SEEK_END), 1
+        try:
+            while True:
+                download_request = await self.api_request("GET", download_url, headers=self._range_headers(headers, downloaded), stream=True)
+                try:
+                    downloaded, total = self._start_download(export_file, download_request, downloaded)
+                    # A 416 means every byte is already downloaded; its body is an error message, not part of the file.
+                    if download_request.status_code != 416:
+                        async for chunk in download_request.aiter_bytes(chunk_size=chunk_size):
+                            export_file.write(chunk)
+                            downloaded += len(chunk)
+                            if progress is not None:
+                                progress(downloaded, total)
+                except httpx.TransportError:
+                    if attempt >= self.download_attempts:
+                        raise
+                else:
+                    if self._verify_download(export_file, downloaded, total):
+                        break
+                    if attempt >= self.download_attempts:
+                        raise QualtricsExportError(f'The export file {download_url} was still incomplete or corrupt after {attempt} downloads.')
+                    downloaded = self._restart_download(export_file)
+                finally:
+                    await download_request.aclose()
+                attempt += 1
+        except BaseException:
+            export_file.close()
+            raise
+        return self._finish_download(export_file, path, download_url)
+
+    @operation
+    async def export_many(self, surveys=None, max_concurrency=4, verify=None, chunk_size=1024 ** 2, **kwargs):
+        '''This method exports the responses of many surveys at once, and returns an async generator that yields a
+        (survey_id, result) tuple as each export completes. It takes the same parameters as Responses.export_many().
+
+        :param surveys: The ids of the surveys to export.
+        :type surveys: list
+        :return: An async generator of (str, Pandas DataFrame or Exception) tuples
+        '''
+        surveys = self._validate_many(surveys, max_concurrency)
+        self._validate_download(None, chunk_size, None)
+        dynamic_payload = self._export_payload(**kwargs)
+        return self._export_many([(survey, survey, dynamic_payload) for survey in surveys], max_concurrency, verify, chunk_size)
+
+    async def _export_many(self, tasks, max_concurrency, verify, chunk_size):
+        '''This async generator runs a list of (key, survey, payload) exports, each in its own task, with at most
+        max_concurrency of them started and not yet read, and yields (key, result) as each completes. (Not a User-Facing Method)'''
+        slots = asyncio.Semaphore(max_concurrency)
+
+        async def export(key, survey, payload):
+            async with slots:
+                try:
+                    with self.span('create', survey=survey):
+                        job = await self._start_export(survey, payload, verify)
+                    return key, await job.result(chunk_size=chunk_size)
+                except Exception as error:
+                    return key, error
+        running = [asyncio.ensure_future(export(*task)) for task in tasks]
+        try:
+            for task in asyncio.as_completed(running):
+                yield await task
+        finally:
+            for task in running:
+                task.cancel()
+
+    @operation
+    async def sync_survey_responses(self, survey=None, store=None, snapshot=None, overlap=3600, verify=None, **kwargs):
+        '''This method exports only the responses recorded since the last sync of a survey. It takes the same parameters
+        as Responses.sync_survey_responses().
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :return: a Pandas DataFrame of the new responses, or of the whole snapshot when snapshot is given.
+        '''
+        state, dynamic_payload = self._sync_payload(survey, store, snapshot, overlap, kwargs)
+        export_file = await self._export_to_file(survey, dynamic_payload, verify, None, 1024 ** 2, None)
+        return await self.run_blocking(self._merge_sync, survey, store, state, snapshot, export_file, dynamic_payload['format'])
+
+    @operation
+    async def get_survey_responses(self, survey=None, verify=None, path=None, chunk_size=1024 ** 2, progress=None, shards=None, shard_by='interval', dtypes=None, header=None, **kwargs):
+        '''This function accepts the survey id, and returns the survey responses associated with that survey. It accepts
+        the same keyword arguments as Responses.get_survey_responses(), and streams the export file the same way.
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :return: a Pandas DataFrame
+        '''
+        self._validate_download(path, chunk_size, progress)
+        dynamic_payload = self._export_payload(**kwargs)
+        self._validate_header(header, dynamic_payload)
+        if shards is not None:
+            assert dtypes is None and header is None, 'Hey there! The dtypes and header parameters cannot be used with shards.'
+            self._validate_shards(shards, shard_by, path, progress, dynamic_payload)
+            return await self._sharded_export(survey, dynamic_payload, verify, chunk_size, shards, shard_by)
+        schema = None
+        if dtypes is not None:
+            self._validate_dtypes(dtypes, dynamic_payload)
+            schema = self._response_schema(await self.get_survey_definition(survey=survey, verify=verify), dtypes, dynamic_payload)
+        if self.export_cache is not None and path is None:
+            return await self._cached_export(survey, dynamic_payload, verify, chunk_size, progress, schema, (dtypes, header))
+        export_file = await self._export_to_file(survey, dynamic_payload, verify, path, chunk_size, progress)
+        with export_file, self.span('parse'):
+            return await self.run_blocking(self._read_export, export_file, dynamic_payload['format'], schema, header)
+
+    async def _sharded_export(self, survey, payload, verify, chunk_size, shards, shard_by):
+        '''This method exports the date windows of a sharded get_survey_responses concurrently and concatenates them. (Not a User-Facing Method)'''
+        start, end = self._shard_range(payload)
+        if shard_by == 'count':
+            with self.span('probe'):
+                export_file = await self._export_to_file(survey, self._probe_payload(payload, end), verify, None, chunk_size, None)
+                windows = self._count_windows(start, end, shards, await self.run_blocking(self._probe_dates, export_file))
+        else:
+            windows = self._interval_windows(start, end, shards)
+        results = {key: result async for key, result in self._export_many(self._shard_tasks(survey, payload, windows), len(windows), verify, chunk_size)}
+        with self.span('merge'):
+            return await self.run_blocking(self._merge_shards, results, payload['format'])
+
+    @operation
+    async def iter_survey_responses(self, survey=None, verify=None, chunksize=10000, records=False, path=None, chunk_size=1024 ** 2, progress=None, dtypes=None, header=None, **kwargs):
+        '''This method runs the export of a survey and, once awaited, returns an async generator of batches of its
+        responses, each read in the default executor. It accepts the same parameters as Responses.iter_survey_responses().
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :return: An async generator of Pandas DataFrames (or lists of dicts)
+        '''
+        assert isinstance(chunksize, int) and chunksize > 0, 'Hey there! The chunksize parameter must be a positive integer.'
+        assert isinstance(records, bool), 'Hey there! The records parameter must be of type bool.'
+        self._validate_download(path, chunk_size, progress)
+        dynamic_payload = self._export_payload(**kwargs)
+        self._validate_header(header, dynamic_payload)
+        schema = None
+        if dtypes is not None:
+            self._validate_dtypes(dtypes, dynamic_payload)
+            schema = self._response_schema(await self.get_survey_definition(survey=survey, verify=verify), dtypes, dynamic_payload)
+        export_file = await self._export_to_file(survey, dynamic_payload, verify, path, chunk_size, progress)
+        return self._iter_blocking(self._iter_export(export_file, chunksize, records, dynamic_payload['format'], schema, header))
+
+    async def _iter_blocking(self, generator):
+        '''This async generator reads each item of a generator in the default executor, so reading an export file in
+        batches does not block the event loop. The generator is closed when this one is. (Not a User-Facing Method)'''
+        try:
+            while True:
+                item = await self.run_blocking(next, generator, None)
+                if item is None:
+                    return
+                yield item
+        finally:
+            await self.run_blocking(generator.close)
+
+    async def _cached_export(self, survey, payload, verify, chunk_size, progress, schema, reading):
+        '''This method answers get_survey_responses from Responses.export_cache, like Responses._cached_export(). (Not a User-Facing Method)'''
+        cache = self.export_cache
+        if cache.store == 'parquet':
+            self._pyarrow()
+        key = self._export_cache_key(survey, payload, reading)
+        version = None
+        if cache.check_freshness:
+            with self.span('check'):
+                headers, url = self.header_setup(content_type=True, xm=False, path=f'surveys/{survey}')
+                request = await self.api_request("GET", url, headers=headers, verify=verify)
+                version = self._survey_version(request.json())
+        cached = cache.get(key, version)
+        if cached is not None:
+            with self.span('parse'):
+                return await self.run_blocking(self._read_cached, cached, payload['format'], schema, reading[1])
+        export_file = await self._export_to_file(survey, payload, verify, None, chunk_size, progress)
+        with export_file, self.span('parse'):
+            return await self.run_blocking(self._cache_export, key, export_file, payload['format'], schema, reading[1], version)
+
+    async def _export_to_file(self, survey, payload, verify, path, chunk_size, progress):
+        '''This method runs an export and downloads its file, returned open and rewound. (Not a User-Facing Method)'''
+        download_url, headers = await self._export_file(
+            survey=survey, payload=payload, verify=verify)
+        with self.span('download'):
+            return await self._download_export(download_url, headers, path, chunk_size, progress)
+
+    @operation
+    async def iter_survey_record_batches(self, survey=None, verify=None, batch_size=65536, schema=None, path=None, chunk_size=1024 ** 2, progress=None, **kwargs):
+        '''This method runs the export of a survey and, once awaited, returns an async generator of pyarrow RecordBatches
+        of its responses, each read in the default executor. It accepts the same parameters as
+        Responses.iter_survey_record_batches().
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :return: An async generator of pyarrow.RecordBatch
+        '''
+        return self._iter_blocking(await self._record_batches(survey, verify, batch_size, schema, path, chunk_size, progress, kwargs))
+
+    async def _record_batches(self, survey, verify, batch_size, schema, path, chunk_size, progress, kwargs):
+        '''This method runs the export of iter_survey_record_batches() and returns a generator of its batches. (Not a User-Facing Method)'''
+        self._validate_arrow(batch_size, schema)
+        self._validate_download(path, chunk_size, progress)
+        dynamic_payload = self._export_payload(**kwargs)
+        assert dynamic_payload['format'] in ('csv', 'tsv'), 'Hey there! Arrow record batches can only be read from csv or tsv exports.'
+        export_file = await self._export_to_file(survey, dynamic_payload, verify, path, chunk_size, progress)
+        return self._iter_record_batches(export_file, dynamic_payload['format'], batch_size, schema)
+
+    @operation
+    async def write_survey_responses_to_parquet(self, survey=None, destination=None, verify=None, compression='snappy', row_group_size=100000, partition_cols=None, schema=None, path=None, chunk_size=1024 ** 2, progress=None, **kwargs):
+        '''This method exports the responses of a survey straight into Parquet. It accepts the same parameters as
+        Responses.write_survey_responses_to_parquet().
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :return: The number of responses written.
+        '''
+        self._validate_parquet(destination, compression, partition_cols)
+        batches = await self._record_batches(survey, verify, row_group_size, schema, path, chunk_size, progress, kwargs)
+        with self.span('write'):
+            return await self.run_blocking(self._write_parquet, batches, destination, compression, row_group_size, partition_cols)
+
+    @operation
+    async def get_survey_questions(self, survey=None, verify=None, from_definition=True, **kwargs):
+        '''This method returns a DataFrame containing the survey questions, read from the cached survey definition. It
+        takes the same parameters as Responses.get_survey_questions().
+
+        :param survey: This is the id associated with a given survey.
+        :return: a Pandas DataFrame
+        '''
+        assert isinstance(from_definition, bool), 'Hey there! The from_definition parameter must be of type bool.'
+        if kwargs or not from_definition:
+            df = await self.get_survey_responses(
+                survey=survey, limit=2, verify=verify, **kwargs)
+            questions = pd.DataFrame(df[:1].T)
+            questions.columns = ['Questions']
+            return questions
+        definition = await self.get_survey_definition(survey=survey, verify=verify)
+        return None if definition is None else self._questions_frame(definition)
+
+    @operation
+    async def get_survey_definition(self, survey=None, verify=None, refresh=False):
+        '''This method returns the cached definition of a survey. It takes the same parameters as
+        Responses.get_survey_definition().
+
+        :param survey: This is the id associated with a given survey.
+        :type survey: str
+        :return: A dict with the keys survey, name, last_modified, questions and columns.
+        '''
+        cache, key, entry = self._cached_definition(survey, refresh)
+        try:
+            if entry is not None and time.time() - entry['checked_at'] < cache.max_age:
+                return entry['definition']
+            if entry is not None:
+                with self.span('check'):
+                    headers, url = self.header_setup(content_type=True, xm=False, path=f'survey-definitions/{survey}/metadata')
+                    request = await self.api_request("GET", url, headers=headers, verify=verify)
+                    last_modified = self._last_modified(request.json())
+                if last_modified == entry['last_modified']:
+                    cache.set(key, dict(entry, checked_at=time.time()))
+                    return entry['definition']
+            with self.span('fetch'):
+                headers, url = self.header_setup(content_type=True, xm=False, path=f'surveys/{survey}')
+                request = await self.api_request("GET", url, headers=headers, verify=verify)
+                definition = self._parse_definition(request.json())
+        except (Qualtrics500Error, Qualtrics503Error, Qualtrics504Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+            return print(e)
+        cache.set(key, {'last_modified': definition['last_modified'], 'checked_at': time.time(), 'definition': definition})
+        return definition
+
+    async def get_survey_response(self, survey=None, response=None, verbose=False, verify=None):
+        ''' This method retrieves a single response from a given survey. '''
+
+        assert survey != None, 'Hey There! The survey parameter cannot be None. You need to pass in a survey ID as a string into the survey parameter.'
+        assert response != None, 'Hey There! The response parameter cannot be None. You need to pass in a response ID as a string into the response parameter.'
+        assert isinstance(
+            survey, str) == True, 'Hey There! The survey parameter must be of type string.'
+        assert isinstance(
+            response, str) == True, 'Hey There! The response parameter must be of type string.'
+        assert len(survey) == 18, 'Hey there! It looks like your survey ID is a the incorrect length. It needs to be 18 characters long. Please try again.'
+        assert len(response) == 17, 'Hey there! It looks like your response ID is a the incorrect length. It needs to be 17 characters long. Please try again.'
+        assert survey[:3] == 'SV_', 'Hey there! It looks like your survey ID is incorrect. You can find the survey ID on the Qualtrics site under your account settings. Please try again.'
+        assert response[:2] == 'R_', 'Hey there! It looks like your response ID is incorrect. You can find the response ID on the Qualtrics site under your account settings. Please try again.'
+
+        headers, url = self.header_setup(
+            content_type=True, xm=False, path=f'/surveys/{survey}/responses/{response}')
+        request = await self.api_request("GET", url, headers=headers, verify=verify)
+        response = request.json()
+        try:
+            self._raise_for_meta(response)
+        except (Qualtrics500Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+            return print(e)
+        else:
+            if verbose == True:
+                return response['meta']['httpStatus'], response['result']
+            else:
+                return response['result']
+
+    async def create_survey_response(self, survey=None, dynamic_payload={}, verbose=False, verify=None):
+        ''' This method creates a single response for a given survey. '''
+
+        assert survey != None, 'Hey There! The survey parameter cannot be None. You need to pass in a survey ID as a string into the survey parameter.'
+        assert isinstance(
+            survey, str) == True, 'Hey There! The survey parameter must be of type string.'
+        assert len(survey) == 18, 'Hey there! It looks like your survey ID is a the incorrect length. It needs to be 18 characters long. Please try again.'
+        assert survey[:3] == 'SV_', 'Hey there! It looks like your survey ID is incorrect. You can find the survey ID on the Qualtrics site under your account settings. Please try again.'
+
+        headers, url = self.header_setup(
+            content_type=True, xm=False, path=f'/surveys/{survey}/responses')
+        request = await self.api_request("POST", url, json=dynamic_payload, headers=headers)
+        response = request.json()
+        try:
+            self._raise_for_meta(response)
+        except (Qualtrics500Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+            return print(e, response['meta'])
+        else:
+            if verbose == True:
+                return response['meta'], response['result']
+            else:
+                return response['result']
+
+    async def update_survey_response_embedded_data(self, survey=None, response_id=None, embedded_data={}, reset_recorded_date=False):
+        ''' This method updates the embedded data on a single survey response.
+        It requires a survey ID, Response ID, and a dictionary of key value pairs for the header and value of the embedded data to be updated'''
+
+        assert survey != None, 'Hey There! The survey parameter cannot be None. You need to pass in a survey ID as a string into the survey parameter.'
+        assert isinstance(
+            survey, str) == True, 'Hey There! The survey parameter must be of type string.'
+        assert len(survey) == 18, 'Hey there! It looks like your survey ID is a the incorrect length. It needs to be 18 characters long. Please try again.'
+        assert survey[:3] == 'SV_', 'Hey there! It looks like your survey ID is incorrect. You can find the survey ID on the Qualtrics site under your account settings. Please try again.'
+        assert response_id != None, 'Hey There! The response_id parameter cannot be None. You need to pass in a response_id ID as a string into the response_id parameter.'
+        assert isinstance(
+            response_id, str) == True, 'Hey There! The response_id parameter must be of type string.'
+        assert len(response_id) == 17, 'Hey there! It looks like your response_id ID is a the incorrect length. It needs to be 18 characters long. Please try again.'
+        assert response_id[:2] == 'R_', 'Hey there! It looks like your response_id ID is incorrect. You can find the response_id ID on the Qualtrics site under your survey response data & analysis page. Please try again.'
+        assert embedded_data != {}, 'Hey there! You are not passing any data to be updated. You must pass at least one key value pair in the embedded_data parameter'
+        assert self._validate_embedded_data(
+            embedded_data=embedded_data), 'Hey there! Your embedded_data is not formatted correctly. all items must be key value pairs where both key and value are string type.'
+
+        headers, url = self.header_setup(
+            content_type=True, xm=False, path=f'/responses/{response_id}')
+        payload = {'surveyId': survey, 'resetRecordedDate': reset_recorded_date,
+                   'embeddedData': embedded_data}
+        request = await self.api_request("PUT", url, json=payload, headers=headers)
+        response = request.json()
+        try:
+            self._raise_for_meta(response)
+        except (Qualtrics500Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+            return print(e, response['meta'])
+        else:
+            return response['meta']
+
+    @operation
+    async def bulk_update_many_responses_from_dataframe(self, survey=None, df=None, update_cols=[], rid_col='ResponseId', chunk_size=5000, reset_recorded_date=False):
+        '''This method updates large volumes of survey responses based on the provided dataframe. It accepts the same
+        parameters as Responses.bulk_update_many_responses_from_dataframe().'''
+        assert isinstance(survey, str) and len(survey) == 18 and survey.startswith(
+            "SV_"), "Invalid survey ID. Must be a string of length 18 starting with 'SV_'."
+        assert isinstance(df, pd.DataFrame), "df must be a pandas DataFrame."
+        assert df.shape[1] >= 2 and df.shape[0] >= 1, "DataFrame must have at least two columns and one row."
+        assert isinstance(update_cols, list) and len(
+            update_cols) >= 1, "update_cols must be a list containing at least one string."
+        assert all(
+            col in df.columns for col in update_cols), "All columns in update_cols must exist in the DataFrame."
+        assert isinstance(
+            rid_col, str) and rid_col in df.columns, "rid_col must be a string and must exist as a header in the DataFrame."
+        assert isinstance(
+            chunk_size, int) and 0 < chunk_size <= 10000, "chunk_size must be an integer between 1 and 10000."
+        assert isinstance(reset_recorded_date,
+                          bool), "reset_recorded_date must be a boolean."
+
+        headers, url = self.header_setup(
+            content_type=True, xm=False, path=f'/surveys/{survey}/update-responses')
+        running_total = 0
+        total_records = df.shape[0]
+        for chunk in self._dataframe_chunks(df, chunk_size):
+            with self.span('build'):
+                updates = [self._make_update_object(row, update_cols, rid_col, reset_recorded_date) for idx, row in chunk.iterrows()]
+                payload = json.loads(json.dumps(
+                    {"updates": updates, "ignoreMissingResponses": True}, cls=self._NpEncoder))
+            if len(updates) > 0:
+                running_total += len(updates)
+                with self.span('upload'):
+                    request = await self.api_request("POST", url, json=payload, headers=headers)
+                response = request.json()
+
+                exception_result = self._handle_qualtrics_exceptions(response)
+                if exception_result:
+                    return print(exception_result)
+
+                progress_id = response['result']['progressId']
+                with self.span('poll'):
+                    is_processing = True
+                    while is_processing:
+                        headers, check_progress_url = self.header_setup(
+                            content_type=True, xm=False, path=f'/surveys/{survey}/update-responses/{progress_id}')
+                        progress_request = await self.api_request(
+                            "GET", check_progress_url, headers=headers)
+                        progress_response = progress_request.json()
+                        progress_exception_result = self._handle_qualtrics_exceptions(
+                            response=progress_response)
+                        if progress_exception_result:
+                            print("problem checking progress of bulk update:",
+                                  progress_exception_result)
+                            await asyncio.sleep(3)
+                            continue
+                        if progress_response['result']['status'] == 'complete':
+                            is_processing = False
+                        await asyncio.sleep(1.5)
+                print(
+                    f'Processed {running_total} of {total_records} - updating {", ".join(update_cols)} fields on survey {survey}')
+        print("Completed processing {} records".format(running_total))
@@ -0,0 +1,98 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+class JSONWatermarkStore(object):
+    ''' This class keeps the sync state of each survey (its watermark, when it was last synced and how many responses it
+    exported) in a JSON file, for Responses().sync_survey_responses(). The file is rewritten atomically on every change.
+
+    :param path: The path of the JSON file. It is created on the first sync.
+    :type path: str
+    '''
+
+    def __init__(self, path):
+        assert isinstance(path, str), 'Hey there! The path parameter must be of type string.'
+        self.path = path
+        self.lock = threading.Lock()
+
+    def read(self):
+        '''This method returns the state of every survey, keyed by survey id.'''
+        try:
+            with open(self.path, 'r', encoding='utf-8') as state_file:
+                return json.load(state_file)
+        except FileNotFoundError:
+            return {}
+
+    def get(self, survey):
+        '''This method returns the state of a survey, or None if it was never synced.'''
+        return self.read().get(survey)
+
+    def set(self, survey, state):
+        with self.lock:
+            states = self.read()
+            states[survey] = state
+            self.write(states)
+
+    def delete(self, survey):
+        '''This method forgets the state of a survey, so its next sync exports every response again.'''
+        with self.lock:
+            states = self.read()
+            if states.pop(survey, None) is not None:
+                self.write(states)
+
+    def write(self, states):
+        '''This method replaces the file with the given states. The lock must be held.'''
+        temporary = f'{self.path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as state_file:
+            json.dump(states, state_file, indent=2, sort_keys=True)
+        os.replace(temporary, self.path)
+
+class SQLiteWatermarkStore(object):
+    ''' This class keeps the sync state of each survey in a SQLite database, for Responses().sync_survey_responses(). Unlike
+    a JSONWatermarkStore, it can be shared by several processes syncing different surveys at the same time.
+
+    :param path: The path of the database file. It is created if it does not exist.
+    :type path: str
+    :param table: The name of the table to keep the states in. (Default: 'qualtrics_watermarks')
+    :type table: str
+    '''
+
+    def __init__(self, path, table='qualtrics_watermarks'):
+        assert isinstance(path, str), 'Hey there! The path parameter must be of type string.'
+        assert isinstance(table, str) and table.isidentifier(), 'Hey there! The table parameter must be a valid SQL identifier.'
+        self.path = path
+        self.table = table
+        with self.connect() as connection:
+            connection.execute(f'CREATE TABLE IF NOT EXISTS {table} (survey TEXT PRIMARY KEY, state TEXT NOT NULL)')
+
+    @contextmanager
+    def connect(self):
+        '''This method opens a connection to the database, commits its transaction and closes it. (Not a User-Facing Method)'''
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def read(self):
+        '''This method returns the state of every survey, keyed by survey id.'''
+        with self.connect() as connection:
+            return {survey: json.loads(state) for survey, state in connection.execute(f'SELECT survey, state FROM {self.table}')}
+
+    def get(self, survey):
+        '''This method returns the state of a survey, or None if it was never synced.'''
+        with self.connect() as connection:
+            row = connection.execute(f'SELECT state FROM {self.table} WHERE survey = ?', (survey,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, survey, state):
+        with self.connect() as connection:
+            connection.execute(f'INSERT OR REPLACE INTO {self.table} (survey, state) VALUES (?, ?)', (survey, json.dumps(state, sort_keys=True)))
+
+    def delete(self, survey):
+        '''This method forgets the state of a survey, so its next sync exports every response again.'''
+        with self.connect() as connection:
+            connection.execute(f'DELETE FROM {self.table} WHERE survey = ?', (survey,))
@@ -0,0 +1,11 @@
+# __init__.py
+from .endpoints import *
+from .ratelimit import *
+from .retry import *
+from .concurrency import *
+from .breaker import *
+from .cache import *
+from .hooks import *
+from .transport import *
+
+__all__ = ['endpoints', 'ratelimit', 'retry', 'concurrency', 'breaker', 'cache', 'hooks', 'transport']
@@ -0,0 +1,129 @@
+import threading
+import time as t
+from QualtricsAPI.Transport.endpoints import endpoint_family, data_center
+from QualtricsAPI.Exceptions import QualtricsCircuitOpenError
+
+class CircuitBreaker(object):
+    ''' This class stops requests to an endpoint that keeps failing. There is one circuit per endpoint family (see
+    endpoint_family()) and data center, so an incident on the export endpoints of one data center does not stop the
+    directory calls, or other data centers.
+
+    A circuit starts "closed". After failure_threshold consecutive server errors (5xx) or connection errors it "opens",
+    and every request to it raises a QualtricsCircuitOpenError straight away instead of waiting on Qualtrics. After
+    reset_timeout seconds it is "half_open": up to half_open_probes requests are let through, and the circuit closes
+    again if they succeed or re-opens if one of them fails.
+
+    :param failure_threshold: The number of consecutive failures that opens a circuit. (Default: 5)
+    :type failure_threshold: int
+    :param reset_timeout: The number of seconds a circuit stays open before it is probed. (Default: 30)
+    :type reset_timeout: float
+    :param half_open_probes: The number of requests let through at once while a circuit is half open. (Default: 1)
+    :type half_open_probes: int
+    '''
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, half_open_probes=1):
+        assert isinstance(failure_threshold, int) and failure_threshold > 0, 'Hey there! The failure_threshold parameter must be a positive integer.'
+        assert reset_timeout > 0, 'Hey there! The reset_timeout parameter must be greater than 0.'
+        assert isinstance(half_open_probes, int) and half_open_probes > 0, 'Hey there! The half_open_probes parameter must be a positive integer.'
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.circuits = {}
+        self.lock = threading.Lock()
+
+    def key(self, method, url):
+        '''This method returns the circuit a request belongs to: its (endpoint family, data center). (Not a User-Facing Method)'''
+        return (endpoint_family(method, url), data_center(url))
+
+    def circuit(self, key):
+        '''This method returns the state of a circuit, creating it on first use. The lock must be held. (Not a User-Facing Method)'''
+        circuit = self.circuits.get(key)
+        if circuit is None:
+            circuit = self.circuits[key] = {'state': 'closed', 'failures': 0, 'opened_at': None, 'probes': 0,
+                                            'opened': 0, 'rejected': 0, 'successes': 0, 'errors': 0}
+        return circuit
+
+    def state(self, key):
+        '''This method returns "closed", "open" or "half_open" for a circuit. (Not a User-Facing Method)'''
+        with self.lock:
+            return self.refresh(self.circuit(key))
+
+    def refresh(self, circuit):
+        '''This method moves an open circuit to half open once its reset_timeout has passed. The lock must be held. (Not a User-Facing Method)'''
+        if circuit['state'] == 'open' and t.monotonic() - circuit['opened_at'] >= self.reset_timeout:
+            circuit['state'] = 'half_open'
+            circuit['probes'] = 0
+        return circuit['state']
+
+    def admit(self, key):
+        '''This method lets a request through, or raises a QualtricsCircuitOpenError if its circuit is open. (Not a User-Facing Method)
+
+        :param key: The circuit of the request, from key().
+        :type key: tuple
+        :return: Nothing
+        '''
+        with self.lock:
+            circuit = self.circuit(key)
+            state = self.refresh(circuit)
+            if state == 'closed':
+                return
+            if state == 'half_open' and circuit['probes'] < self.half_open_probes:
+                circuit['probes'] += 1
+                return
+            circuit['rejected'] += 1
+            retry_in = max(0.0, self.reset_timeout - (t.monotonic() - circuit['opened_at']))
+        raise QualtricsCircuitOpenError(f'Qualtrics Error\n(Circuit Open): The requests to the "{key[0]}" endpoints of {key[1]} kept failing, so they are paused. Please try again in {retry_in:.0f} seconds.')
+
+    def record(self, key, status=None, error=None):
+        '''This method records the outcome of a request that was admitted. Server errors (5xx) and connection errors count
+        as failures, every other response counts as a success. (Not a User-Facing Method)
+
+        :param key: The circuit of the request, from key().
+        :type key: tuple
+        :param status: The HTTP status code of the response.
+        :type status: int
+        :param error: The exception raised while sending the request.
+        :type error: Exception
+        :return: Nothing
+        '''
+        failed = error is not None or (status is not None and status >= 500)
+        with self.lock:
+            circuit = self.circuit(key)
+            if circuit['state'] == 'half_open':
+                circuit['probes'] = max(0, circuit['probes'] - 1)
+            if failed:
+                circuit['errors'] += 1
+                circuit['failures'] += 1
+                if circuit['state'] == 'half_open' or (circuit['state'] == 'closed' and circuit['failures'] >= self.failure_threshold):
+                    circuit['state'] = 'open'
+                    circuit['opened_at'] = t.monotonic()
+                    circuit['opened'] += 1
+            elif status is not None:
+                circuit['successes'] += 1
+                circuit['failures'] = 0
+                if circuit['state'] == 'half_open':
+                    circuit['state'] = 'closed'
+        return
+
+    def abandon(self, key):
+        '''This method frees the probe of an admitted request that ended without an outcome. (Not a User-Facing Method)'''
+        with self.lock:
+            circuit = self.circuit(key)
+            if circuit['state'] == 'half_open':
+                circuit['probes'] = max(0, circuit['probes'] - 1)
+        return
+
+    def stats(self):
+        '''This method returns the metrics of every circuit, keyed by "family@data_center": its state, its current run of
+        consecutive failures, and how many times it opened, rejected a request, succeeded and failed.
+
+        :return: A dict
+        '''
+        with self.lock:
+            metrics = {}
+            for (family, host), circuit in self.circuits.items():
+                self.refresh(circuit)
+                metrics[f'{family}@{host}'] = {'state': circuit['state'], 'consecutive_failures': circuit['failures'],
+                                               'opened': circuit['opened'], 'rejected': circuit['rejected'],
+                                               'successes': circuit['successes'], 'errors': circuit['errors']}
+        return metrics
@@ -0,0 +1,326 @@
+import os
+import json
+import hashlib
+import threading
+import time as t
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from QualtricsAPI.Transport.endpoints import endpoint_family, data_center
+
+class CachedResponse(object):
+    ''' This class is a response served from a ResponseCache. It has the attributes and methods of a requests.Response
+    that the modules use (status_code, headers, content, text, json()), so callers cannot tell it apart. (Not a User-Facing Class)'''
+
+    def __init__(self, entry):
+        self.url = entry['url']
+        self.status_code = entry['status_code']
+        self.headers = dict(entry['headers'])
+        self.content = entry['content']
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self, **kwargs):
+        return json.loads(self.content, **kwargs)
+
+    def close(self):
+        return
+
+class MemoryCache(object):
+    ''' This class stores cached responses in memory and evicts the least recently used ones once their bodies take up more
+    than max_bytes.
+
+    :param max_bytes: The total size of the cached bodies that is kept. (Default: 64 MB)
+    :type max_bytes: int
+    '''
+
+    def __init__(self, max_bytes=64 * 1024 ** 2):
+        assert isinstance(max_bytes, int) and max_bytes > 0, 'Hey there! The max_bytes parameter must be a positive integer.'
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key)['content'])
+            if len(entry['content']) > self.max_bytes:
+                return
+            self.entries[key] = entry
+            self.size += len(entry['content'])
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted['content'])
+
+    def delete(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= len(entry['content'])
+
+    def items(self):
+        '''This method returns a snapshot of the (key, entry) pairs, used to find the entries to invalidate.'''
+        with self.lock:
+            return list(self.entries.items())
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+class DiskCache(object):
+    ''' This class stores cached responses as files in a directory, so they survive between processes. The least recently
+    used files are deleted once the bodies take up more than max_bytes.
+
+    :param directory: The directory to keep the cache in. It is created if it does not exist.
+    :type directory: str
+    :param max_bytes: The total size of the cached bodies that is kept. (Default: 512 MB)
+    :type max_bytes: int
+    '''
+
+    def __init__(self, directory, max_bytes=512 * 1024 ** 2):
+        assert isinstance(directory, str), 'Hey there! The directory parameter must be of type string.'
+        assert isinstance(max_bytes, int) and max_bytes > 0, 'Hey there! The max_bytes parameter must be a positive integer.'
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.size = sum(os.path.getsize(path) for path in self.paths())
+
+    def paths(self):
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.cache')]
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.cache')
+
+    def read(self, path):
+        '''This method reads a cache file: a line of JSON metadata followed by the raw body.'''
+        with open(path, 'rb') as cache_file:
+            entry = json.loads(cache_file.readline())
+            entry['content'] = cache_file.read()
+        return entry
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            entry = self.read(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def set(self, key, entry):
+        metadata = {name: value for name, value in entry.items() if name != 'content'}
+        data = json.dumps(metadata).encode('utf-8') + b'\n' + entry['content']
+        if len(data) > self.max_bytes:
+            return
+        path = self.path(key)
+        with self.lock:
+            if os.path.exists(path):
+                self.size -= os.path.getsize(path)
+            temporary = f'{path}.{threading.get_ident()}.tmp'
+            with open(temporary, 'wb') as cache_file:
+                cache_file.write(data)
+            os.replace(temporary, path)
+            self.size += len(data)
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        '''This method deletes the least recently used files until the cache fits in max_bytes. The lock must be held.'''
+        files = sorted((os.path.getmtime(path), path) for path in self.paths())
+        self.size = sum(os.path.getsize(path) for _, path in files)
+        for _, path in files:
+            if self.size <= self.max_bytes:
+                break
+            self.size -= os.path.getsize(path)
+            os.remove(path)
+
+    def delete(self, key):
+        path = self.path(key)
+        with self.lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self.size -= size
+            except OSError:
+                pass
+
+    def items(self):
+        '''This method returns a snapshot of the (key, entry) pairs, used to find the entries to invalidate.'''
+        items = []
+        for path in self.paths():
+            try:
+                items.append((os.path.basename(path)[:-len('.cache')], self.read(path)))
+            except (OSError, ValueError):
+                continue
+        return items
+
+    def clear(self):
+        with self.lock:
+            for path in self.paths():
+                os.remove(path)
+            self.size = 0
+
+class ResponseCache(object):
+    ''' This class caches the responses of read-only (GET) requests. It is opt-in: pass one to
+    Credentials.configure_transport(cache=...).
+
+    Only the endpoint families listed in ttls are cached, each for its own number of seconds. Once an entry is stale it is
+    revalidated with If-None-Match / If-Modified-Since when Qualtrics sent an ETag or Last-Modified header, and refetched
+    otherwise. Every POST, PUT or DELETE invalidates the cached entries of the resource it changes and of the collections
+    above it (e.g. rename_list() invalidates get_list() and list_lists()), and a change to any contact invalidates every
+    cached contact page of that data center. Entries are kept per API token, so brands never share them.
+
+    :param backend: Where to keep the entries, a MemoryCache or a DiskCache. (Default: MemoryCache())
+    :type backend: MemoryCache or DiskCache
+    :param ttls: The number of seconds to cache each endpoint family for. Families that are not given keep the values in
+    ResponseCache.default_ttls, and a ttl of 0 turns caching off for that family. (Default: None)
+    :type ttls: dict
+    '''
+
+    default_ttls = {
+        'surveys': 300,
+        'mailinglists': 300,
+        'contacts': 300,
+        'distributions': 300,
+        'libraries': 3600,
+    }
+
+    def __init__(self, backend=None, ttls=None):
+        assert ttls is None or isinstance(ttls, dict), 'Hey there! The ttls parameter must be of type dict.'
+        self.backend = MemoryCache() if backend is None else backend
+        self.ttls = dict(ResponseCache.default_ttls, **(ttls or {}))
+        self.lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0, 'invalidated': 0}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def stats(self):
+        '''This method returns how many requests were served from the cache (hits), sent to Qualtrics (misses), confirmed
+        unchanged by Qualtrics (revalidated), stored, and invalidated.
+
+        :return: A dict
+        '''
+        with self.lock:
+            return dict(self.counters)
+
+    def ttl(self, method, url):
+        '''This method returns the number of seconds a request may be cached for, or 0 if it is not cached. (Not a User-Facing Method)'''
+        if method.upper() != 'GET':
+            return 0
+        return self.ttls.get(endpoint_family(method, url), 0)
+
+    def key(self, url, headers):
+        '''This method returns the cache key of a request: a hash of its API token and url. (Not a User-Facing Method)'''
+        token = (headers or {}).get('x-api-token', '')
+        return hashlib.sha256(f'{token}\n{url}'.encode('utf-8')).hexdigest()
+
+    def lookup(self, method, url, headers):
+        '''This method looks a request up. (Not a User-Facing Method)
+
+        :return: A tuple of the CachedResponse to return straight away (or None), and the stale entry to revalidate (or None).
+        '''
+        if self.ttl(method, url) <= 0:
+            return None, None
+        key = self.key(url, headers)
+        entry = self.backend.get(key)
+        if entry is None:
+            self.count('misses')
+            return None, None
+        if entry['expires'] > t.time():
+            self.count('hits')
+            return CachedResponse(entry), None
+        self.count('misses')
+        return None, entry
+
+    def conditional_headers(self, headers, entry):
+        '''This method adds the revalidation headers of a stale entry to the headers of a request. (Not a User-Facing Method)'''
+        headers = dict(headers or {})
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, method, url, headers, response, entry=None):
+        '''This method stores the response of a cacheable request, or refreshes a stale entry that Qualtrics confirmed is
+        unchanged (HTTP 304). It returns the response the caller should get. (Not a User-Facing Method)'''
+        ttl = self.ttl(method, url)
+        if ttl <= 0:
+            return response
+        key = self.key(url, headers)
+        if response.status_code == 304 and entry is not None:
+            entry['expires'] = t.time() + ttl
+            self.backend.set(key, entry)
+            self.count('revalidated')
+            return CachedResponse(entry)
+        if response.status_code != 200:
+            return response
+        entry = {'url': url, 'status_code': 200, 'content': response.content, 'expires': t.time() + ttl,
+                 'family': endpoint_family(method, url), 'host': data_center(url), 'path': self.path(url),
+                 'headers': {'Content-Type': response.headers.get('Content-Type', 'application/json')},
+                 'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+        self.backend.set(key, entry)
+        self.count('stores')
+        return response
+
+    def path(self, url):
+        '''This method returns the path of a url below "/API/v3", without repeated or trailing slashes. (Not a User-Facing Method)'''
+        path = urlsplit(url).path.split('/API/v3', 1)[-1]
+        return '/' + '/'.join(part for part in path.split('/') if part)
+
+    def invalidate_for(self, method, url):
+        '''This method invalidates the entries a POST, PUT or DELETE request may have changed. (Not a User-Facing Method)'''
+        if method.upper() == 'GET':
+            return
+        family = endpoint_family(method, url)
+        host = data_center(url)
+        changed = self.path(url)
+        stale = []
+        for key, entry in self.backend.items():
+            if entry['host'] != host:
+                continue
+            path = entry['path']
+            below = path == changed or path.startswith(changed + '/')
+            above = changed.startswith(path + '/')
+            if below or above or (family == 'contacts' and entry['family'] == 'contacts'):
+                stale.append(key)
+        for key in stale:
+            self.backend.delete(key)
+        self.count('invalidated', len(stale))
+
+    def invalidate(self, url=None):
+        '''This method explicitly invalidates every cached entry below a url (e.g. "https://ca1.qualtrics.com/API/v3/mailinglists"),
+        or the whole cache if no url is given.
+
+        :param url: The url prefix of the entries to invalidate. (Default: None)
+        :type url: str
+        :return: Nothing
+        '''
+        if url is None:
+            self.backend.clear()
+            return
+        host = data_center(url)
+        prefix = self.path(url)
+        stale = [key for key, entry in self.backend.items()
+                 if entry['host'] == host and (entry['path'] == prefix or entry['path'].startswith(prefix.rstrip('/') + '/'))]
+        for key in stale:
+            self.backend.delete(key)
+        self.count('invalidated', len(stale))
@@ -0,0 +1,119 @@
+import threading
+import time as t
+from collections import deque
+
+class AdaptiveConcurrency(object):
+    ''' This class limits how many requests a client has in flight at once, and adapts that limit to the throttling it
+    sees (AIMD). Every successful response raises the limit by increase / limit (about +increase per round of requests),
+    and every HTTP 429 multiplies it by decrease. A Retry-After header also pauses every new request from the client until
+    it has passed. Bulk jobs therefore converge on the highest concurrency Qualtrics accepts instead of failing or
+    hammering the API.
+
+    The same instance can be shared by threads (acquire) and by coroutines on any event loop (acquire_async).
+
+    :param maximum: The highest number of requests allowed in flight. (Default: 100)
+    :type maximum: int
+    :param minimum: The lowest number of requests allowed in flight. (Default: 1)
+    :type minimum: int
+    :param initial: The number of requests allowed in flight before any throttling is seen. (Default: maximum)
+    :type initial: int
+    :param increase: The additive increase per round of successful requests. (Default: 1)
+    :type increase: float
+    :param decrease: The multiplicative decrease applied on every HTTP 429. (Default: 0.5)
+    :type decrease: float
+    '''
+
+    def __init__(self, maximum=100, minimum=1, initial=None, increase=1, decrease=0.5):
+        assert isinstance(minimum, int) and minimum > 0, 'Hey there! The minimum parameter must be a positive integer.'
+        assert isinstance(maximum, int) and maximum >= minimum, 'Hey there! The maximum parameter must be an integer of at least the minimum.'
+        assert initial is None or minimum <= initial <= maximum, 'Hey there! The initial parameter must be between the minimum and the maximum.'
+        assert increase > 0, 'Hey there! The increase parameter must be greater than 0.'
+        assert 0 < decrease < 1, 'Hey there! The decrease parameter must be between 0 and 1.'
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum if initial is None else initial)
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.waiters = deque()
+
+    def stats(self):
+        '''This method returns the current limit, the number of requests in flight and the number of 429s seen.
+
+        :return: A dict
+        '''
+        with self.lock:
+            return {'limit': int(self.limit), 'in_flight': self.in_flight, 'throttled': self.throttled,
+                    'paused_for': max(0.0, self.paused_until - t.monotonic())}
+
+    def pause_remaining(self):
+        '''This method returns how long new requests must wait for a Retry-After to pass. (Not a User-Facing Method)'''
+        return max(0.0, self.paused_until - t.monotonic())
+
+    def acquire(self):
+        '''This method blocks the calling thread until a request may be sent. (Not a User-Facing Method)'''
+        with self.condition:
+            while self.waiters or self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+        return
+
+    async def acquire_async(self):
+        '''This method waits, without blocking the event loop, until a request may be sent. (Not a User-Facing Method)'''
+        import asyncio
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if not self.waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            future = loop.create_future()
+            self.waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self.lock:
+                queued = (loop, future) in self.waiters
+                if queued:
+                    self.waiters.remove((loop, future))
+            # A slot that was handed over before the cancellation must be given back. If the handover is still pending,
+            # _wake() gives it back instead.
+            if not queued and not future.cancelled():
+                self.release()
+            raise
+        return
+
+    def release(self, status=None, retry_after=None):
+        '''This method frees the slot of a finished request and adapts the limit to its outcome. (Not a User-Facing Method)
+
+        :param status: The HTTP status code of the response, or None if the request failed without one.
+        :type status: int
+        :param retry_after: The number of seconds the server asked the client to wait.
+        :type retry_after: float
+        :return: Nothing
+        '''
+        with self.condition:
+            self.in_flight -= 1
+            if status == 429:
+                self.throttled += 1
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, t.monotonic() + retry_after)
+            elif status is not None and status < 500:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            while self.waiters and self.in_flight < int(self.limit):
+                loop, future = self.waiters.popleft()
+                self.in_flight += 1
+                loop.call_soon_threadsafe(self._wake, future)
+            self.condition.notify_all()
+        return
+
+    def _wake(self, future):
+        '''This method hands a free slot to a waiting coroutine, or frees it again if that coroutine was cancelled. (Not a User-Facing Method)'''
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
@@ -0,0 +1,45 @@
+import re
+from urllib.parse import urlsplit
+
+# Each pattern is matched against the path that follows "/API/v3". Paths are normalised first because several modules
+# join their base url and path with a double slash (e.g. "directories/POOL_.../" + "/contacts").
+endpoint_patterns = [
+    ('export_file', None, re.compile(r'/(?:surveys/[^/]+/export-responses|responseexports)/[^/]+/file$')),
+    ('export_start', 'POST', re.compile(r'/(?:surveys/[^/]+/export-responses|responseexports)$')),
+    ('export_progress', 'GET', re.compile(r'/(?:surveys/[^/]+/export-responses|responseexports)/[^/]+$')),
+    ('contacts', None, re.compile(r'/contacts(?:/|$)')),
+    ('mailinglists', None, re.compile(r'/mailinglists(?:/|$)')),
+    ('distributions', None, re.compile(r'^/distributions(?:/|$)')),
+    ('responses', None, re.compile(r'/(?:responses|update-responses)(?:/|$)')),
+    ('libraries', None, re.compile(r'^/libraries(?:/|$)')),
+    ('surveys', None, re.compile(r'^/surveys(?:/|$)')),
+]
+
+def endpoint_family(method, url):
+    '''This function classifies a request into the endpoint family that Qualtrics applies its call limits to, e.g.
+    'export_start', 'export_progress', 'export_file', 'contacts' or 'distributions'. Requests that do not belong to a
+    known family return 'default'. (Not a User-Facing Method)
+
+    :param method: The HTTP method. ('GET', 'POST', 'PUT', 'DELETE')
+    :type method: str
+    :param url: The fully qualified url for the request.
+    :type url: str
+    :return: The endpoint family. (str)
+    '''
+    path = urlsplit(url).path
+    path = re.sub(r'/+', '/', path.split('/API/v3', 1)[-1]).rstrip('/')
+    method = method.upper()
+    for family, family_method, pattern in endpoint_patterns:
+        if (family_method is None or family_method == method) and pattern.search(path):
+            return family
+    return 'default'
+
+def data_center(url):
+    '''This function returns the host of a request (e.g. "ca1.qualtrics.com"), which identifies the data center that
+    serves it. (Not a User-Facing Method)
+
+    :param url: The fully qualified url for the request.
+    :type url: str
+    :return: The host. (str)
+    '''
+    return urlsplit(url).netloc.lower()
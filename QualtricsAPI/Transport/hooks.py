@@ -0,0 +1,441 @@
+import bisect
+import contextvars
+import inspect
+import logging
+import threading
+import time as t
+from contextlib import contextmanager
+from QualtricsAPI.Transport.endpoints import endpoint_family, data_center
+
+logger = logging.getLogger('QualtricsAPI')
+current_span = contextvars.ContextVar('qualtrics_span', default=None)
+
+class RequestEvent(object):
+    ''' This class describes one request sent through a transport, including every retry of it. It is passed to the
+    on_request() method of every subscriber once the request has finished.
+
+    method, url, endpoint (the endpoint family, see endpoint_family()) and data_center identify the request. status is
+    the HTTP status of the final response (None if it failed without one, and then error holds the exception name).
+    bytes_out and bytes_in are the sizes of the request and response bodies (bytes_in is None for a streamed download
+    without a Content-Length). latency is the number of seconds from the first attempt to the final response, attempts
+    and retries count the attempts, from_cache is True when the response cache answered, and span is the operation
+    span the request was sent in (or None).
+    '''
+
+    def __init__(self, method, url):
+        self.method = method.upper()
+        self.url = url
+        self.endpoint = endpoint_family(method, url)
+        self.data_center = data_center(url)
+        self.status = None
+        self.error = None
+        self.bytes_out = 0
+        self.bytes_in = None
+        self.latency = None
+        self.attempts = 0
+        self.from_cache = False
+        self.span = None
+        self.start = t.time()
+
+    @property
+    def retries(self):
+        return max(0, self.attempts - 1)
+
+    def as_dict(self):
+        '''This method returns the event as a dict, e.g. to log it as JSON.'''
+        return {'method': self.method, 'url': self.url, 'endpoint': self.endpoint, 'data_center': self.data_center,
+                'status': self.status, 'error': self.error, 'bytes_out': self.bytes_out, 'bytes_in': self.bytes_in,
+                'latency': self.latency, 'attempts': self.attempts, 'retries': self.retries, 'from_cache': self.from_cache,
+                'operation': None if self.span is None else self.span.operation,
+                'phase': None if self.span is None else self.span.phase}
+
+class Span(object):
+    ''' This class times one operation (e.g. a get_survey_responses() call) or one phase of it (e.g. "poll"). Phases are
+    child spans of their operation, so span.operation is always the name of the outermost span and span.phase is the
+    name of a child span ('' for the operation itself).
+
+    start is the wall time it started at, duration the number of seconds it took once it ended, requests the number of
+    requests sent within it (including its phases), and error the name of the exception it ended with (or None).
+    '''
+
+    def __init__(self, name, attributes=None, parent=None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.operation = name if parent is None else parent.operation
+        self.phase = '' if parent is None else name
+        self.start = t.time()
+        self.started = t.monotonic()
+        self.duration = None
+        self.requests = 0
+        self.error = None
+
+    def __repr__(self):
+        return f"Span(operation='{self.operation}', phase='{self.phase}', duration={self.duration})"
+
+class Subscriber(object):
+    ''' This class is the base of every subscriber to Hooks. Override the methods you need: on_request() is called after
+    every request, on_span_start() and on_span_end() around every operation and phase.'''
+
+    def on_request(self, event):
+        return
+
+    def on_span_start(self, span):
+        return
+
+    def on_span_end(self, span):
+        return
+
+class Hooks(object):
+    ''' This class is the instrumentation surface of the transports. Pass one to Credentials.configure_transport(hooks=...)
+    (or AsyncCredentials.configure_async_transport()) and every request of every module is reported to its subscribers as
+    a RequestEvent, and the main operations (e.g. get_survey_responses(), list_contacts_in_directory()) as spans split
+    into phases, such as "create", "poll", "download" and "parse" for a response export.
+
+    A subscriber is any object with on_request(event), on_span_start(span) and on_span_end(span) methods (see
+    Subscriber). LoggingSubscriber, PrometheusSubscriber and OpenTelemetrySubscriber are included. An exception raised
+    by a subscriber is logged and never interrupts the API call.
+
+    :param subscribers: The subscribers to notify.
+    :type subscribers: Subscriber
+    '''
+
+    def __init__(self, *subscribers):
+        self.subscribers = list(subscribers)
+        self.lock = threading.Lock()
+
+    def subscribe(self, subscriber):
+        '''This method adds a subscriber.
+
+        :param subscriber: An object with on_request, on_span_start and on_span_end methods.
+        :type subscriber: Subscriber
+        :return: The subscriber
+        '''
+        with self.lock:
+            self.subscribers = self.subscribers + [subscriber]
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        '''This method removes a subscriber.'''
+        with self.lock:
+            self.subscribers = [other for other in self.subscribers if other is not subscriber]
+        return
+
+    def dispatch(self, name, item):
+        '''This method calls one method of every subscriber. (Not a User-Facing Method)'''
+        for subscriber in self.subscribers:
+            try:
+                getattr(subscriber, name)(item)
+            except Exception:
+                logger.warning('A QualtricsAPI hook subscriber raised an exception in %s.', name, exc_info=True)
+        return
+
+    @contextmanager
+    def span(self, name, **attributes):
+        '''This method times an operation, or a phase when it is used within another span. (Not a User-Facing Method)
+
+        :param name: The name of the operation (e.g. 'get_survey_responses') or phase (e.g. 'poll').
+        :type name: str
+        :return: A context manager that yields the Span
+        '''
+        span = self.open_span(name, attributes)
+        try:
+            with self.activate(span):
+                yield span
+        except BaseException as e:
+            self.close_span(span, e)
+            raise
+        self.close_span(span)
+
+    def open_span(self, name, attributes=None):
+        '''This method starts a span within the current span, without making it current. (Not a User-Facing Method)'''
+        span = Span(name, attributes, current_span.get())
+        self.dispatch('on_span_start', span)
+        return span
+
+    def close_span(self, span, error=None):
+        '''This method ends a span, with the exception it ended with. (Not a User-Facing Method)'''
+        if error is not None:
+            span.error = type(error).__name__
+        span.duration = t.monotonic() - span.started
+        self.dispatch('on_span_end', span)
+        return
+
+    @contextmanager
+    def activate(self, span):
+        '''This method makes a span the current span within a block, so the requests and phases of the block are counted
+        in it. (Not a User-Facing Method)'''
+        token = current_span.set(span)
+        try:
+            yield span
+        finally:
+            current_span.reset(token)
+
+    def follow(self, span, result):
+        '''This method ends the span of an operation, or, when the operation returned a generator, returns a generator of
+        the same items that keeps the span open until it is exhausted or closed. (Not a User-Facing Method)'''
+        if inspect.isgenerator(result):
+            return self._follow_generator(span, result)
+        if inspect.isasyncgen(result):
+            return self._follow_async_generator(span, result)
+        self.close_span(span)
+        return result
+
+    def _follow_generator(self, span, generator):
+        '''This generator yields the items of a generator with its span current while each is read. (Not a User-Facing Method)'''
+        error = None
+        try:
+            while True:
+                with self.activate(span):
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                yield item
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self.activate(span):
+                generator.close()
+            self.close_span(span, error)
+
+    async def _follow_async_generator(self, span, generator):
+        '''This async generator yields the items of an async generator with its span current while each is read. (Not a User-Facing Method)'''
+        error = None
+        try:
+            while True:
+                with self.activate(span):
+                    try:
+                        item = await generator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                yield item
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self.activate(span):
+                await generator.aclose()
+            self.close_span(span, error)
+
+    def request(self, event):
+        '''This method reports a finished request to the subscribers. (Not a User-Facing Method)'''
+        event.span = current_span.get()
+        span = event.span
+        while span is not None:
+            span.requests += 1
+            span = span.parent
+        self.dispatch('on_request', event)
+        return
+
+class LoggingSubscriber(Subscriber):
+    ''' This class logs every request and every finished operation and phase. Failed requests and spans are logged as
+    warnings. The event is also attached to each record as record.qualtrics (a dict).
+
+    :param logger: The logger to write to. (Default: logging.getLogger('QualtricsAPI'))
+    :type logger: logging.Logger
+    :param level: The level of the records of successful requests and spans. (Default: logging.INFO)
+    :type level: int
+    :param spans_only: If True, do not log the individual requests. (Default: False)
+    :type spans_only: bool
+    '''
+
+    def __init__(self, logger=None, level=logging.INFO, spans_only=False):
+        self.logger = logger if logger is not None else logging.getLogger('QualtricsAPI')
+        self.level = level
+        self.spans_only = spans_only
+
+    def on_request(self, event):
+        if self.spans_only:
+            return
+        failed = event.error is not None or (event.status is not None and event.status >= 400)
+        outcome = event.error if event.status is None else event.status
+        cached = ' from cache' if event.from_cache else ''
+        self.logger.log(logging.WARNING if failed else self.level,
+                        '%s %s %s in %.3fs%s (%s bytes sent, %s bytes received, %s retries)', event.method, event.endpoint,
+                        outcome, event.latency or 0.0, cached, event.bytes_out, event.bytes_in, event.retries,
+                        extra={'qualtrics': event.as_dict()})
+
+    def on_span_end(self, span):
+        name = span.operation if not span.phase else f'{span.operation}.{span.phase}'
+        outcome = f'failed with {span.error}' if span.error else 'took'
+        self.logger.log(logging.WARNING if span.error else self.level, '%s %s %.3fs (%s requests)', name, outcome,
+                        span.duration, span.requests,
+                        extra={'qualtrics': {'operation': span.operation, 'phase': span.phase, 'duration': span.duration,
+                                             'requests': span.requests, 'error': span.error, **span.attributes}})
+
+class PrometheusSubscriber(Subscriber):
+    ''' This class keeps Prometheus-style counters and histograms of the requests and operations, and renders them in
+    the Prometheus text exposition format, e.g. for a /metrics endpoint or a Pushgateway. It does not need the
+    prometheus_client package.
+
+        {namespace}_requests_total{method, endpoint, status}
+        {namespace}_request_retries_total{method, endpoint}
+        {namespace}_request_bytes_sent_total{endpoint} and {namespace}_request_bytes_received_total{endpoint}
+        {namespace}_request_duration_seconds{method, endpoint} (histogram)
+        {namespace}_operation_duration_seconds{operation, phase} (histogram)
+        {namespace}_operation_errors_total{operation, phase, error}
+
+    :param namespace: The prefix of every metric name. (Default: 'qualtrics')
+    :type namespace: str
+    :param buckets: The upper bounds of the histogram buckets in seconds. (Default: PrometheusSubscriber.default_buckets)
+    :type buckets: list
+    '''
+
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+    def __init__(self, namespace='qualtrics', buckets=None):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets or PrometheusSubscriber.default_buckets))
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def increment(self, name, labels, amount=1):
+        '''This method adds to a counter. (Not a User-Facing Method)'''
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        '''This method records a value in a histogram. (Not a User-Facing Method)'''
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                histogram['buckets'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def on_request(self, event):
+        status = str(event.status) if event.status is not None else event.error
+        self.increment('requests_total', {'method': event.method, 'endpoint': event.endpoint, 'status': status})
+        if event.retries:
+            self.increment('request_retries_total', {'method': event.method, 'endpoint': event.endpoint}, event.retries)
+        self.increment('request_bytes_sent_total', {'endpoint': event.endpoint}, event.bytes_out or 0)
+        self.increment('request_bytes_received_total', {'endpoint': event.endpoint}, event.bytes_in or 0)
+        self.observe('request_duration_seconds', {'method': event.method, 'endpoint': event.endpoint}, event.latency or 0.0)
+
+    def on_span_end(self, span):
+        labels = {'operation': span.operation, 'phase': span.phase}
+        self.observe('operation_duration_seconds', labels, span.duration)
+        if span.error:
+            self.increment('operation_errors_total', dict(labels, error=span.error))
+
+    def value(self, name, **labels):
+        '''This method returns the value of a counter, or the count of a histogram, for the given labels.
+
+        :param name: The metric name without the namespace, e.g. 'requests_total'.
+        :type name: str
+        :return: A number
+        '''
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if key in self.histograms:
+                return self.histograms[key]['count']
+            return self.counters.get(key, 0)
+
+    def render(self):
+        '''This method renders every metric in the Prometheus text exposition format.
+
+        :return: A str
+        '''
+        def label_text(labels):
+            escaped = ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in labels)
+            return '{' + escaped + '}' if escaped else ''
+
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f'{self.namespace}_{name}'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric}{label_text(labels)} {value}')
+        for (name, labels), histogram in histograms:
+            metric = f'{self.namespace}_{name}'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f'# TYPE {metric} histogram')
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram['buckets']):
+                cumulative += count
+                lines.append(f'{metric}_bucket{label_text(labels + (("le", repr(float(bound))),))} {cumulative}')
+            lines.append(f'{metric}_bucket{label_text(labels + (("le", "+Inf"),))} {histogram["count"]}')
+            lines.append(f'{metric}_sum{label_text(labels)} {histogram["sum"]}')
+            lines.append(f'{metric}_count{label_text(labels)} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+class OpenTelemetrySubscriber(Subscriber):
+    ''' This class turns the operations, phases and requests into OpenTelemetry spans. Phases are children of their
+    operation and requests are children of the phase they were sent in, so a trace shows where a slow job spends its time.
+
+    :param tracer: The tracer to create the spans with. (Default: opentelemetry.trace.get_tracer('QualtricsAPI'), which
+    needs the "opentelemetry-api" package)
+    :type tracer: opentelemetry.trace.Tracer
+    '''
+
+    def __init__(self, tracer=None):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            trace = None
+        if tracer is None:
+            assert trace is not None, 'Hey there! The OpenTelemetrySubscriber needs the "opentelemetry-api" package. You can install it with "pip install opentelemetry-api", or pass in your own tracer.'
+            tracer = trace.get_tracer('QualtricsAPI')
+        self.trace = trace
+        self.tracer = tracer
+        self.spans = {}
+        self.lock = threading.Lock()
+
+    def context(self, span):
+        '''This method returns the OpenTelemetry context of the span a child starts in. (Not a User-Facing Method)'''
+        with self.lock:
+            parent = self.spans.get(span)
+        if parent is None or self.trace is None:
+            return None
+        return self.trace.set_span_in_context(parent)
+
+    def on_span_start(self, span):
+        attributes = {'qualtrics.operation': span.operation, 'qualtrics.phase': span.phase}
+        attributes.update((f'qualtrics.{name}', value) for name, value in span.attributes.items() if isinstance(value, (str, bool, int, float)))
+        name = span.operation if not span.phase else f'{span.operation}.{span.phase}'
+        otel_span = self.tracer.start_span(name, context=self.context(span.parent), attributes=attributes)
+        with self.lock:
+            self.spans[span] = otel_span
+
+    def on_span_end(self, span):
+        with self.lock:
+            otel_span = self.spans.pop(span, None)
+        if otel_span is None:
+            return
+        otel_span.set_attribute('qualtrics.requests', span.requests)
+        if span.error:
+            otel_span.set_attribute('error.type', span.error)
+        otel_span.end()
+
+    def on_request(self, event):
+        attributes = {'http.request.method': event.method, 'url.full': event.url, 'server.address': event.data_center,
+                      'qualtrics.endpoint': event.endpoint, 'qualtrics.retries': event.retries,
+                      'qualtrics.from_cache': event.from_cache, 'qualtrics.bytes_out': event.bytes_out or 0}
+        if event.status is not None:
+            attributes['http.response.status_code'] = event.status
+        if event.bytes_in is not None:
+            attributes['qualtrics.bytes_in'] = event.bytes_in
+        if event.error is not None:
+            attributes['error.type'] = event.error
+        start = int(event.start * 1e9)
+        otel_span = self.tracer.start_span(f'{event.method} {event.endpoint}', context=self.context(event.span),
+                                           attributes=attributes, start_time=start)
+        otel_span.end(end_time=start + int((event.latency or 0.0) * 1e9))
@@ -0,0 +1,100 @@
+import threading
+import time as t
+from QualtricsAPI.Transport.endpoints import endpoint_family, data_center
+
+class TokenBucket(object):
+    ''' This class is a thread-safe token bucket. Tokens refill continuously at the given rate up to the capacity, and each
+    request reserves one token. When the bucket is empty the reservation still succeeds, but the caller is told how long
+    to wait, so concurrent callers are queued fairly instead of spinning.
+
+    :param rate: The number of tokens added per second.
+    :type rate: float
+    :param capacity: The maximum number of tokens the bucket can hold (the allowed burst).
+    :type capacity: float
+    '''
+
+    def __init__(self, rate, capacity):
+        assert rate > 0, 'Hey there! The rate parameter must be greater than 0.'
+        assert capacity >= 1, 'Hey there! The capacity parameter must be at least 1.'
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = t.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        '''This method reserves tokens from the bucket. (Not a User-Facing Method)
+
+        :param tokens: The number of tokens to reserve. (Default: 1)
+        :type tokens: float
+        :return: The number of seconds the caller must wait before sending its request. (float)
+        '''
+        with self.lock:
+            now = t.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class RateLimiter(object):
+    ''' This class throttles requests to the Qualtrics call limits. Every request reserves a token from the bucket of its
+    endpoint family (see endpoint_family()) and from the brand-wide 'default' bucket of its data center, and waits for
+    whichever of the two is the most constrained.
+
+    Any object with a reserve(method, url) method that returns the seconds to wait can be passed to
+    Credentials.configure_transport() in its place.
+
+    :param limits: The calls per minute allowed for each endpoint family. Families that are not given keep the values
+    in RateLimiter.default_limits. (Default: None)
+    :type limits: dict
+    :param headroom: The share of each per-minute limit that may be spent in a single burst. The remainder refills evenly
+    over the minute, so a full burst followed by a steady stream never exceeds the limit. (Default: 0.1)
+    :type headroom: float
+    '''
+
+    default_limits = {
+        'default': 3000,
+        'export_start': 100,
+        'export_progress': 1000,
+        'export_file': 100,
+        'contacts': 3000,
+        'distributions': 3000,
+    }
+
+    def __init__(self, limits=None, headroom=0.1):
+        assert limits is None or isinstance(limits, dict), 'Hey there! The limits parameter must be of type dict.'
+        assert 0 < headroom < 1, 'Hey there! The headroom parameter must be between 0 and 1.'
+        self.limits = dict(RateLimiter.default_limits, **(limits or {}))
+        for family, limit in self.limits.items():
+            assert limit > 0, f'Hey there! The limit for "{family}" must be greater than 0.'
+        self.headroom = headroom
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, family, host):
+        '''This method returns the bucket of an endpoint family on a data center, creating it on first use. (Not a User-Facing Method)'''
+        key = (family, host)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self.lock:
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    limit = self.limits[family]
+                    bucket = self.buckets[key] = TokenBucket(rate=limit * (1 - self.headroom) / 60, capacity=max(1, limit * self.headroom))
+        return bucket
+
+    def reserve(self, method, url):
+        '''This method reserves a call for a request. (Not a User-Facing Method)
+
+        :param method: The HTTP method. ('GET', 'POST', 'PUT', 'DELETE')
+        :type method: str
+        :param url: The fully qualified url for the request.
+        :type url: str
+        :return: The number of seconds the caller must wait before sending the request. (float)
+        '''
+        host = data_center(url)
+        family = endpoint_family(method, url)
+        wait = self.bucket('default', host).reserve()
+        if family in self.limits and family != 'default':
+            wait = max(wait, self.bucket(family, host).reserve())
+        return wait
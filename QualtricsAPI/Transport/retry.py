@@ -0,0 +1,134 @@
+import random
+import threading
+import time as t
+
+class RetryPolicy(object):
+    ''' This class decides whether, and after how long, a failed request is sent again. Every transport retries through
+    one RetryPolicy, so a long outage ends with an error after a bounded number of attempts instead of an endless chain of
+    recursive calls, and a short one is retried after milliseconds rather than a fixed 5 or 10 seconds.
+
+    The delay before retry n is drawn uniformly between 0 and min(max_backoff, backoff * 2 ** (n - 1)) ("full jitter"),
+    so many workers retrying the same outage do not do so in lockstep.
+
+    :param max_attempts: The maximum number of times a request is sent, including the first attempt. (Default: 5)
+    :type max_attempts: int
+    :param deadline: The maximum number of seconds to spend on a request, including every retry. (Default: 120)
+    :type deadline: float
+    :param backoff: The base delay in seconds before the first retry. (Default: 0.25)
+    :type backoff: float
+    :param max_backoff: The maximum delay in seconds before a single retry. (Default: 30)
+    :type max_backoff: float
+    :param jitter: If False, wait the full exponential delay instead of a random share of it. (Default: True)
+    :type jitter: bool
+    :param retry_statuses: The HTTP status codes that are retried. (Default: 429, 500, 502, 503 and 504)
+    :type retry_statuses: tuple
+    :param retry_methods: The HTTP methods whose connection errors and timeouts are retried. A POST that timed out may
+    already have created a response or started an export, so it is only retried if you add it. (Default: GET, PUT,
+    DELETE, HEAD and OPTIONS)
+    :type retry_methods: tuple
+    '''
+
+    def __init__(self, max_attempts=5, deadline=120, backoff=0.25, max_backoff=30, jitter=True, retry_statuses=(429, 500, 502, 503, 504), retry_methods=('GET', 'PUT', 'DELETE', 'HEAD', 'OPTIONS')):
+        assert isinstance(max_attempts, int) and max_attempts > 0, 'Hey there! The max_attempts parameter must be a positive integer.'
+        assert deadline is None or deadline > 0, 'Hey there! The deadline parameter must be greater than 0.'
+        assert backoff >= 0 and max_backoff >= backoff, 'Hey there! The backoff parameter must be between 0 and max_backoff.'
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+        self.lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self):
+        '''This method sets every counter back to 0.'''
+        with self.lock:
+            self.counters = {'requests': 0, 'attempts': 0, 'retries': 0, 'exhausted': 0, 'retry_seconds': 0.0, 'statuses': {}, 'errors': {}}
+        return
+
+    def stats(self):
+        '''This method returns a copy of the retry counters, which can be used to tune throughput against server error rates.
+
+        requests: the number of requests sent through the policy.
+        attempts: the number of times they were sent, including retries.
+        retries: the number of retries.
+        exhausted: the number of requests that were still failing when the policy gave up.
+        retry_seconds: the total time spent waiting between retries.
+        statuses: the number of retryable responses by HTTP status code.
+        errors: the number of connection errors by exception name.
+
+        :return: A dict
+        '''
+        with self.lock:
+            counters = dict(self.counters)
+            counters['statuses'] = dict(self.counters['statuses'])
+            counters['errors'] = dict(self.counters['errors'])
+        return counters
+
+    def retryable(self, status=None, error=None, method=None):
+        '''This method classifies the outcome of a single attempt. Connection errors and timeouts are retryable when the
+        method is in retry_methods, responses are retryable when their status is in retry_statuses. (Not a User-Facing Method)
+
+        :param status: The HTTP status code of the response.
+        :type status: int
+        :param error: The exception raised while sending the request.
+        :type error: Exception
+        :param method: The HTTP method of the request. (Default: None, treated as retryable)
+        :type method: str
+        :return: A bool
+        '''
+        if error is not None:
+            return method is None or method.upper() in self.retry_methods
+        return status in self.retry_statuses
+
+    def delay(self, attempt):
+        '''This method returns the backoff before the given retry. (Not a User-Facing Method)
+
+        :param attempt: The number of attempts made so far.
+        :type attempt: int
+        :return: The number of seconds to wait. (float)
+        '''
+        ceiling = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling) if self.jitter else ceiling
+
+    def next_delay(self, attempt, started, status=None, error=None, minimum=0, method=None):
+        '''This method records the outcome of an attempt and decides whether to retry it. (Not a User-Facing Method)
+
+        :param attempt: The number of attempts made so far, including this one.
+        :type attempt: int
+        :param started: The time.monotonic() value when the first attempt was sent.
+        :type started: float
+        :param status: The HTTP status code of the response.
+        :type status: int
+        :param error: The exception raised while sending the request.
+        :type error: Exception
+        :param minimum: The least number of seconds to wait, e.g. the Retry-After the server asked for. (Default: 0)
+        :type minimum: float
+        :param method: The HTTP method of the request.
+        :type method: str
+        :return: The number of seconds to wait before the next attempt, or None if the request must not be retried.
+        '''
+        retry = self.retryable(status=status, error=error, method=method)
+        delay = max(minimum, self.delay(attempt)) if retry else None
+        if retry and attempt >= self.max_attempts:
+            delay = None
+        if delay is not None and self.deadline is not None and t.monotonic() - started + delay > self.deadline:
+            delay = None
+        with self.lock:
+            self.counters['attempts'] += 1
+            if attempt == 1:
+                self.counters['requests'] += 1
+            if retry:
+                if error is not None:
+                    name = type(error).__name__
+                    self.counters['errors'][name] = self.counters['errors'].get(name, 0) + 1
+                else:
+                    self.counters['statuses'][status] = self.counters['statuses'].get(status, 0) + 1
+                if delay is None:
+                    self.counters['exhausted'] += 1
+                else:
+                    self.counters['retries'] += 1
+                    self.counters['retry_seconds'] += delay
+        return delay
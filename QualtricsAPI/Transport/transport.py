@@ -0,0 +1,424 @@
+import time as t
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import requests as r
+from requests.adapters import HTTPAdapter
+from QualtricsAPI.Transport.ratelimit import RateLimiter
+from QualtricsAPI.Transport.retry import RetryPolicy
+from QualtricsAPI.Transport.concurrency import AdaptiveConcurrency
+from QualtricsAPI.Transport.breaker import CircuitBreaker
+from QualtricsAPI.Transport.cache import ResponseCache
+from QualtricsAPI.Transport.hooks import Hooks, RequestEvent
+from QualtricsAPI.Exceptions import Qualtrics429Error
+
+def rate_limiter_setup(rate_limiter):
+    '''This function turns the rate_limiter parameter of a transport into a limiter. True builds a RateLimiter with the
+    default Qualtrics call limits, False or None turns throttling off, and any other object must have a
+    reserve(method, url) method. (Not a User-Facing Method)'''
+    if rate_limiter is True:
+        return RateLimiter()
+    if rate_limiter is False or rate_limiter is None:
+        return None
+    assert callable(getattr(rate_limiter, 'reserve', None)), 'Hey there! The rate_limiter parameter must be True, False or an object with a reserve(method, url) method.'
+    return rate_limiter
+
+def retry_policy_setup(retry_policy):
+    '''This function turns the retry_policy parameter of a transport into a RetryPolicy. True builds a RetryPolicy with its
+    defaults, False or None sends every request once. (Not a User-Facing Method)'''
+    if retry_policy is True:
+        return RetryPolicy()
+    if retry_policy is False or retry_policy is None:
+        return None
+    assert isinstance(retry_policy, RetryPolicy), 'Hey there! The retry_policy parameter must be True, False or a RetryPolicy.'
+    return retry_policy
+
+def concurrency_setup(concurrency, maximum):
+    '''This function turns the concurrency parameter of a transport into an AdaptiveConcurrency. True builds one that
+    allows up to "maximum" requests in flight, False or None does not limit concurrency. (Not a User-Facing Method)'''
+    if concurrency is True:
+        return AdaptiveConcurrency(maximum=maximum)
+    if concurrency is False or concurrency is None:
+        return None
+    assert isinstance(concurrency, AdaptiveConcurrency), 'Hey there! The concurrency parameter must be True, False or an AdaptiveConcurrency.'
+    return concurrency
+
+def breaker_setup(breaker):
+    '''This function turns the breaker parameter of a transport into a CircuitBreaker. True builds one with its defaults,
+    False or None never stops requests. (Not a User-Facing Method)'''
+    if breaker is True:
+        return CircuitBreaker()
+    if breaker is False or breaker is None:
+        return None
+    assert isinstance(breaker, CircuitBreaker), 'Hey there! The breaker parameter must be True, False or a CircuitBreaker.'
+    return breaker
+
+def cache_setup(cache):
+    '''This function turns the cache parameter of a transport into a ResponseCache. True builds an in-memory one with the
+    default ttls, False or None does not cache. (Not a User-Facing Method)'''
+    if cache is True:
+        return ResponseCache()
+    if cache is False or cache is None:
+        return None
+    assert isinstance(cache, ResponseCache), 'Hey there! The cache parameter must be True, False or a ResponseCache.'
+    return cache
+
+def hooks_setup(hooks):
+    '''This function turns the hooks parameter of a transport into Hooks. True builds Hooks without subscribers (add them
+    later with transport.hooks.subscribe()), False or None does not instrument requests. (Not a User-Facing Method)'''
+    if hooks is True:
+        return Hooks()
+    if hooks is False or hooks is None:
+        return None
+    assert isinstance(hooks, Hooks), 'Hey there! The hooks parameter must be True, False or Hooks.'
+    return hooks
+
+def body_sizes(response, streamed=False):
+    '''This function returns the number of bytes a request sent and received in its bodies. The received size is None for
+    a streamed download without a Content-Length header. (Not a User-Facing Method)'''
+    request = getattr(response, 'request', None)
+    body = getattr(request, 'body', None)
+    if body is None and request is not None and not isinstance(request, r.PreparedRequest):
+        try:
+            body = request.content
+        except Exception:
+            body = None
+    sent = len(body.encode('utf-8') if isinstance(body, str) else body) if isinstance(body, (str, bytes)) else 0
+    length = response.headers.get('Content-Length')
+    if length is not None and length.isdigit():
+        return sent, int(length)
+    return sent, None if streamed else len(response.content)
+
+def retry_after(response):
+    '''This function returns the number of seconds a throttled (429) or unavailable (503) response asked the client to
+    wait in its Retry-After header, or None if it did not ask. (Not a User-Facing Method)
+
+    :param response: a requests.Response or an httpx.Response
+    :return: The number of seconds. (float)
+    '''
+    if response.status_code not in (429, 503):
+        return None
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class BaseTransport(object):
+    ''' This class holds what Transport and AsyncTransport do around a request: reporting it to the hooks, serving it from
+    the response cache, and around every attempt checking the circuit breaker, waiting for the rate limiter and for any
+    Retry-After pause, releasing the concurrency slot, and asking the retry policy whether to try again. (Not a User-Facing Class)'''
+
+    def setup(self, pool_connections, pool_maxsize, keep_alive, rate_limiter, retry_policy, concurrency, breaker, cache, hooks):
+        '''This method validates and stores the settings shared by both transports. (Not a User-Facing Method)'''
+        assert isinstance(pool_connections, int) and pool_connections > 0, 'Hey there! The pool_connections parameter must be a positive integer.'
+        assert isinstance(pool_maxsize, int) and pool_maxsize > 0, 'Hey there! The pool_maxsize parameter must be a positive integer.'
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.rate_limiter = rate_limiter_setup(rate_limiter)
+        self.retry_policy = retry_policy_setup(retry_policy)
+        self.concurrency = concurrency_setup(concurrency, pool_connections * pool_maxsize)
+        self.breaker = breaker_setup(breaker)
+        self.cache = cache_setup(cache)
+        self.hooks = hooks_setup(hooks)
+
+    def observe(self, event, started, streamed, response=None, error=None):
+        '''This method completes the RequestEvent of a finished request and reports it to the hooks. (Not a User-Facing Method)'''
+        event.latency = t.monotonic() - started
+        if response is not None:
+            event.status = response.status_code
+            event.from_cache = getattr(response, 'from_cache', False)
+            event.bytes_out, event.bytes_in = body_sizes(response, streamed=streamed)
+        if error is not None:
+            event.error = type(error).__name__
+        self.hooks.request(event)
+
+    def from_cache(self, method, url, kwargs):
+        '''This method returns a fresh cached response for a request, or None. When the cached entry is stale it adds the
+        revalidation headers to kwargs and returns the entry as well. (Not a User-Facing Method)'''
+        if self.cache is None:
+            return None, None
+        cached, stale = self.cache.lookup(method, url, kwargs.get('headers'))
+        if stale is not None:
+            kwargs['headers'] = self.cache.conditional_headers(kwargs.get('headers'), stale)
+        return cached, stale
+
+    def finish(self, method, url, kwargs, response, stale=None):
+        '''This method stores the final response of a request in the cache, or invalidates the entries that a POST, PUT
+        or DELETE changed, and returns the response the caller should get. (Not a User-Facing Method)'''
+        if self.cache is None:
+            return response
+        if method.upper() != 'GET':
+            self.cache.invalidate_for(method, url)
+            return response
+        return self.cache.store(method, url, kwargs.get('headers'), response, stale)
+
+    def admit(self, method, url):
+        '''This method raises a QualtricsCircuitOpenError if the circuit of a request is open, and otherwise returns that
+        circuit's key (None when there is no breaker). (Not a User-Facing Method)'''
+        if self.breaker is None:
+            return None
+        key = self.breaker.key(method, url)
+        self.breaker.admit(key)
+        return key
+
+    def wait_before(self, method, url):
+        '''This method returns how long to wait before sending an attempt. (Not a User-Facing Method)'''
+        wait = 0.0
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.reserve(method, url)
+        if self.concurrency is not None:
+            wait = max(wait, self.concurrency.pause_remaining())
+        return wait
+
+    def after_attempt(self, method, attempt, started, key=None, response=None, error=None):
+        '''This method records the outcome of an attempt. It returns the number of seconds to wait before retrying it, or
+        None if the response (or error) is final. A 429 that will not be retried raises a Qualtrics429Error.
+        (Not a User-Facing Method)'''
+        status = None if response is None else response.status_code
+        wait = None if response is None else retry_after(response)
+        if self.concurrency is not None:
+            self.concurrency.release(status=status, retry_after=wait if status == 429 else None)
+        if self.breaker is not None:
+            self.breaker.record(key, status=status, error=error)
+        delay = None
+        if self.retry_policy is not None:
+            delay = self.retry_policy.next_delay(attempt, started, status=status, error=error, minimum=wait or 0, method=method)
+        if delay is None and status == 429:
+            raise Qualtrics429Error('Qualtrics Error\n(Http Error: 429 - Too Many Requests): The Qualtrics API user has exceeded the rate limit for this endpoint.')
+        return delay
+
+    def release_on_error(self, key=None):
+        '''This method releases the concurrency slot and circuit probe of an attempt that was interrupted by an unexpected
+        exception. (Not a User-Facing Method)'''
+        if self.concurrency is not None:
+            self.concurrency.release()
+        if key is not None:
+            self.breaker.abandon(key)
+
+class Transport(BaseTransport):
+    ''' This class owns the pooled, keep-alive HTTP session that every Credentials subclass sends its requests through.
+    Reusing one session means that paginated calls and export polling reuse the same TCP+TLS connection to
+    "{data_center}.qualtrics.com" rather than opening a new one for every request.
+
+    :param pool_connections: The number of per-host connection pools to keep cached. (Default: 10)
+    :type pool_connections: int
+    :param pool_maxsize: The maximum number of connections to keep open to a single host. (Default: 10)
+    :type pool_maxsize: int
+    :param pool_block: If True, block when every connection to a host is in use instead of opening a throwaway one. (Default: False)
+    :type pool_block: bool
+    :param keep_alive: If False, ask the server to close the connection after every request. (Default: True)
+    :type keep_alive: bool
+    :param rate_limiter: True to throttle requests to the default Qualtrics call limits, False to send them unthrottled, or
+    a RateLimiter (or any object with a reserve(method, url) method) to use instead. (Default: True)
+    :type rate_limiter: bool or RateLimiter
+    :param retry_policy: True to retry throttling, server errors and connection errors with the default RetryPolicy, False
+    to send every request once, or a RetryPolicy to use instead. (Default: True)
+    :type retry_policy: bool or RetryPolicy
+    :param concurrency: True to adapt the number of requests in flight to HTTP 429 responses (up to
+    pool_connections * pool_maxsize), False to not limit it, or an AdaptiveConcurrency to use instead. (Default: True)
+    :type concurrency: bool or AdaptiveConcurrency
+    :param breaker: True to stop sending requests to an endpoint family of a data center while it keeps failing with
+    server errors (see CircuitBreaker), False to always send them, or a CircuitBreaker to use instead. (Default: True)
+    :type breaker: bool or CircuitBreaker
+    :param cache: A ResponseCache to serve repeated GET requests from (True for an in-memory one with the default ttls),
+    or False to send every request. (Default: False)
+    :type cache: bool or ResponseCache
+    :param hooks: Hooks to report every request to (see Hooks), or False to not instrument requests. (Default: False)
+    :type hooks: bool or Hooks
+    '''
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True, rate_limiter=True, retry_policy=True, concurrency=True, breaker=True, cache=False, hooks=False):
+        self.setup(pool_connections, pool_maxsize, keep_alive, rate_limiter, retry_policy, concurrency, breaker, cache, hooks)
+        self.pool_block = pool_block
+        self.session = r.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    def request(self, method, url, **kwargs):
+        '''This method sends a single HTTP request over the pooled session. It waits for the rate limiter before every
+        attempt, and retries throttling, server errors and connection errors through the retry policy.
+        (Not a User-Facing Method)
+
+        :param method: The HTTP method. ('GET', 'POST', 'PUT', 'DELETE')
+        :type method: str
+        :param url: The fully qualified url for the request.
+        :type url: str
+        :return: a requests.Response
+        '''
+        if self.hooks is None:
+            return self.send(method, url, kwargs)
+        event, started = RequestEvent(method, url), t.monotonic()
+        try:
+            response = self.send(method, url, kwargs, event)
+        except BaseException as e:
+            self.observe(event, started, kwargs.get('stream', False), error=e)
+            raise
+        self.observe(event, started, kwargs.get('stream', False), response=response)
+        return response
+
+    def send(self, method, url, kwargs, event=None):
+        '''This method sends a request and its retries, counting the attempts in event. (Not a User-Facing Method)'''
+        cached, stale = self.from_cache(method, url, kwargs)
+        if cached is not None:
+            return cached
+        started = t.monotonic()
+        attempt = 1
+        while True:
+            if event is not None:
+                event.attempts = attempt
+            wait = self.wait_before(method, url)
+            if wait > 0:
+                t.sleep(wait)
+            if self.concurrency is not None:
+                self.concurrency.acquire()
+            key = None
+            try:
+                key = self.admit(method, url)
+                response = self.session.request(method, url, **kwargs)
+            except (r.exceptions.ConnectionError, r.exceptions.Timeout) as e:
+                delay = self.after_attempt(method, attempt, started, key, error=e)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.release_on_error(key)
+                raise
+            else:
+                if event is not None:
+                    # Kept for a final 429 that after_attempt raises as a Qualtrics429Error
+                    event.status = response.status_code
+                delay = self.after_attempt(method, attempt, started, key, response=response)
+                if delay is None:
+                    return self.finish(method, url, kwargs, response, stale)
+                response.close()
+            t.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        '''This method closes every pooled connection held by the session.'''
+        self.session.close()
+
+class AsyncTransport(BaseTransport):
+    ''' This class is the asyncio counterpart of Transport. It owns one pooled, keep-alive httpx.AsyncClient that every
+    Async* class (AsyncResponses, AsyncXMDirectory, AsyncMailingList and AsyncDistributions) sends its requests through,
+    so hundreds of calls can be in flight from one event loop without blocking it.
+
+    :param pool_connections: The number of hosts to keep pooled connections for. (Default: 10)
+    :type pool_connections: int
+    :param pool_maxsize: The maximum number of connections to keep open to a single host. (Default: 10)
+    :type pool_maxsize: int
+    :param keep_alive: If False, do not keep idle connections open between requests. (Default: True)
+    :type keep_alive: bool
+    :param verify: Either a bool or the path to a CA bundle used to verify the server's certificate. (Default: True)
+    :type verify: bool or str
+    :param rate_limiter: True to throttle requests to the default Qualtrics call limits, False to send them unthrottled, or
+    a RateLimiter (or any object with a reserve(method, url) method) to use instead. (Default: True)
+    :type rate_limiter: bool or RateLimiter
+    :param retry_policy: True to retry throttling, server errors and connection errors with the default RetryPolicy, False
+    to send every request once, or a RetryPolicy to use instead. (Default: True)
+    :type retry_policy: bool or RetryPolicy
+    :param concurrency: True to adapt the number of requests in flight to HTTP 429 responses (up to
+    pool_connections * pool_maxsize), False to not limit it, or an AdaptiveConcurrency to use instead. (Default: True)
+    :type concurrency: bool or AdaptiveConcurrency
+    :param breaker: True to stop sending requests to an endpoint family of a data center while it keeps failing with
+    server errors (see CircuitBreaker), False to always send them, or a CircuitBreaker to use instead. (Default: True)
+    :type breaker: bool or CircuitBreaker
+    :param cache: A ResponseCache to serve repeated GET requests from (True for an in-memory one with the default ttls),
+    or False to send every request. (Default: False)
+    :type cache: bool or ResponseCache
+    :param hooks: Hooks to report every request to (see Hooks), or False to not instrument requests. (Default: False)
+    :type hooks: bool or Hooks
+    '''
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, keep_alive=True, verify=True, rate_limiter=True, retry_policy=True, concurrency=True, breaker=True, cache=False, hooks=False):
+        self.setup(pool_connections, pool_maxsize, keep_alive, rate_limiter, retry_policy, concurrency, breaker, cache, hooks)
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError('Hey there! The async client is built on the "httpx" package. You can install it with "pip install QualtricsAPI[async]".')
+
+        limits = httpx.Limits(max_connections=pool_connections * pool_maxsize,
+                              max_keepalive_connections=pool_maxsize if keep_alive else 0)
+        self.httpx = httpx
+        self.client = httpx.AsyncClient(limits=limits, verify=verify, timeout=None)
+
+    async def request(self, method, url, **kwargs):
+        '''This method sends a single HTTP request over the pooled client. It accepts the same keyword arguments as
+        Transport.request(). (Not a User-Facing Method)
+
+        :param method: The HTTP method. ('GET', 'POST', 'PUT', 'DELETE')
+        :type method: str
+        :param url: The fully qualified url for the request.
+        :type url: str
+        :return: an httpx.Response
+        '''
+        # httpx only verifies certificates per client. A streamed response must be read with aiter_bytes() and closed
+        # with aclose() by the caller.
+        stream = kwargs.pop('stream', False)
+        kwargs.pop('verify', None)
+        if isinstance(kwargs.get('data'), (str, bytes)):
+            kwargs['content'] = kwargs.pop('data')
+        if self.hooks is None:
+            return await self.send(method, url, kwargs, stream=stream)
+        event, started = RequestEvent(method, url), t.monotonic()
+        try:
+            response = await self.send(method, url, kwargs, event, stream=stream)
+        except BaseException as e:
+            self.observe(event, started, stream, error=e)
+            raise
+        self.observe(event, started, stream, response=response)
+        return response
+
+    async def send(self, method, url, kwargs, event=None, stream=False):
+        '''This method sends a request and its retries, counting the attempts in event. (Not a User-Facing Method)'''
+        import asyncio
+        cached, stale = self.from_cache(method, url, kwargs)
+        if cached is not None:
+            return cached
+        started = t.monotonic()
+        attempt = 1
+        while True:
+            if event is not None:
+                event.attempts = attempt
+            wait = self.wait_before(method, url)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if self.concurrency is not None:
+                await self.concurrency.acquire_async()
+            key = None
+            try:
+                key = self.admit(method, url)
+                if stream:
+                    response = await self.client.send(self.client.build_request(method, url, **kwargs), stream=True)
+                else:
+                    response = await self.client.request(method, url, **kwargs)
+            except self.httpx.TransportError as e:
+                delay = self.after_attempt(method, attempt, started, key, error=e)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.release_on_error(key)
+                raise
+            else:
+                if event is not None:
+                    # Kept for a final 429 that after_attempt raises as a Qualtrics429Error
+                    event.status = response.status_code
+                delay = self.after_attempt(method, attempt, started, key, response=response)
+                if delay is None:
+                    return self.finish(method, url, kwargs, response, stale)
+                await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        '''This method closes every pooled connection held by the client.'''
+        await self.client.aclose()
@@ -1,18 +1,17 @@
-import time as t
-import requests as r
-import pandas as pd
-from QualtricsAPI.Setup import Credentials
+from QualtricsAPI.Setup import Credentials, AsyncCredentials, operation, LazyModule
 from QualtricsAPI.JSON import Parser
-from QualtricsAPI.Exceptions import Qualtrics500Error
+
+pd = LazyModule('pandas')
 
 class MailingList(Credentials):
     ''' This class contains methods that give users the ability to work with their users Mailing list's and
     their users Mailing Lists contact data within the XMDirectory.'''
 
-    def __init__(self, token=None, directory_id=None, data_center=None):
+    def __init__(self, token=None, directory_id=None, data_center=None, config=None):
         self.token = token
         self.data_center = data_center
         self.directory_id = directory_id
+        self.config = self._resolve_config(config, token, data_center, directory_id)
         return
 
     def create_list(self, name=None):
@@ -27,7 +26,7 @@ class MailingList(Credentials):
         headers, base_url = self.header_setup(content_type=True, xm=True)
         url = f"{base_url}/mailinglists"
         data = {"name": "{0}".format(name)}
-        request = r.post(url, json=data, headers=headers)
+        request = self.api_request("POST", url, json=data, headers=headers)
         response = request.json()
         try:
             list_id = Parser().json_parser(response=response, keys=['id'], arr=False)[0][0]
@@ -35,6 +34,7 @@ class MailingList(Credentials):
         except:
             print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
 
+    @operation
     def list_lists(self, page_size=100):
         '''This method lists all the mailing lists in the directory for the specified user token. You won't typically need to adjust
         the pre-defined parameters.
@@ -51,16 +51,9 @@ class MailingList(Credentials):
         try:
           def get_page(mailing_lists=mailing_lists, url=url):
             ''' This method is a nested method that extracts a single page of mailing lists. '''
-            request = r.get(url, headers=headers)
+            request = self.api_request("GET", url, headers=headers)
             response = request.json()
-            keys = ['mailingListId', 'name', 'ownerId', 'lastModifiedDate', 'creationDate','contactCount', 'nextPage']
-            lists = Parser().json_parser(response=response, keys=keys, arr=False)
-            single_page = pd.DataFrame(lists).transpose()
-            single_page.columns = keys
-            single_page['creationDate'] = pd.to_datetime(single_page['creationDate'], unit='ms')
-            single_page['lastModifiedDate'] = pd.to_datetime(single_page['lastModifiedDate'], unit='ms')
-            mailing_lists = pd.concat([mailing_lists, single_page]).reset_index(drop=True)
-            next_page = str(response['result']['nextPage'])
+            mailing_lists, next_page = self._lists_page(response, mailing_lists)
             return mailing_lists, next_page, response
           mailing_lists, next_page, response = get_page(mailing_lists=mailing_lists, url=url)
           while next_page != 'None':
@@ -83,21 +76,10 @@ class MailingList(Credentials):
 
         headers, base_url = self.header_setup(xm=True)
         url = f"{base_url}/mailinglists/{mailing_list}"
-        request = r.get(url, headers=headers)
+        request = self.api_request("GET", url, headers=headers)
         response = request.json()
         try:
-            list_info = {
-                        "mailingListId": response['result']['mailingListId'],
-                        "name": response['result']['name'],
-                        "ownerId": response['result']['ownerId'],
-                        "lastModifiedDate": response['result']['lastModifiedDate'],
-                        "creationDate": response['result']['creationDate'],
-                        "contactCount": response['result']['contactCount']
-            }
-            df = pd.DataFrame.from_dict(list_info, orient='index').transpose()
-            df['creationDate'] = pd.to_datetime(df['creationDate'], unit='ms')
-            df['lastModifiedDate'] = pd.to_datetime(df['lastModifiedDate'], unit='ms')
-            return df
+            return self._list_frame(response)
         except:
             print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
 
@@ -120,7 +102,7 @@ class MailingList(Credentials):
         data = {"name": f"{name}"}
         headers, base_url = self.header_setup(content_type=True, xm=True)
         url = f"{base_url}/mailinglists/{mailing_list}"
-        request = r.put(url, json=data, headers=headers)
+        request = self.api_request("PUT", url, json=data, headers=headers)
         response = request.json()
         try:
             if response['meta']['httpStatus'] == '200 - OK':
@@ -145,7 +127,7 @@ class MailingList(Credentials):
         data = {"name": f"{mailing_list}"}
         headers, base_url = self.header_setup(xm=True)
         url = f"{base_url}/mailinglists/{mailing_list}"
-        request = r.delete(url, json=data, headers=headers)
+        request = self.api_request("DELETE", url, json=data, headers=headers)
         response = request.json()
         try:
             if response['meta']['httpStatus'] == '200 - OK':
@@ -154,6 +136,7 @@ class MailingList(Credentials):
             print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
         return
 
+    @operation
     def list_contacts(self, mailing_list=None, page_size=100):
         '''This method creates a pandas DataFrame of all the contacts information within the defined mailing list.
 
@@ -172,15 +155,9 @@ class MailingList(Credentials):
         url = base_url + f"/mailinglists/{mailing_list}/contacts?pageSize={page_size}"
         try:
           def get_page(mailing_list=mailing_list, contact_list=contact_list, url=url):
-            request = r.get(url, headers=headers)
+            request = self.api_request("GET", url, headers=headers)
             response = request.json()
-            keys = ['contactId','firstName','lastName','email','phone','extRef','language','unsubscribed']
-            contact_lists = Parser().json_parser(response=response, keys=keys, arr=False)
-            single_page = pd.DataFrame(contact_lists).transpose()
-            single_page.columns = keys
-            single_page['mailing_list'] = mailing_list
-            contact_list = pd.concat([contact_list, single_page]).reset_index(drop=True)
-            next_page = str(response['result']['nextPage'])
+            contact_list, next_page = self._list_contacts_page(response, mailing_list, contact_list)
             return contact_list, next_page, response
           contact_list, next_page, response = get_page(mailing_list=mailing_list, contact_list=contact_list, url=url)
           while next_page != 'None':
@@ -217,6 +194,62 @@ class MailingList(Credentials):
         assert len(mailing_list) == 18, 'Hey there! The parameter for "mailing_list" that was passed is the wrong length. It should have 18 characters.'
         assert mailing_list[:3] == 'CG_', 'Hey there! It looks like your Mailing List ID is incorrect. You can find the Mailing List ID on the Qualtrics site under your account settings. Please try again.'
 
+        dynamic_payload = self._contact_payload(**kwargs)
+
+        headers, base_url = self.header_setup(content_type=True, xm=True)
+        url = base_url + f"/mailinglists/{mailing_list}/contacts"
+        request = self.api_request("POST", url, json=dynamic_payload, headers=headers)
+        response = request.json()
+        try:
+            contact_id = response['result']['id']
+        except Exception:
+            print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
+        else:
+            contact_list_id = response['result']['contactLookupId']
+            return contact_id, contact_list_id
+
+    def _lists_page(self, response, mailing_lists):
+        '''This method appends a single page of mailing lists to the mailing_lists DataFrame. (Not a User-Facing Method)'''
+        with self.span('parse'):
+            keys = ['mailingListId', 'name', 'ownerId', 'lastModifiedDate', 'creationDate','contactCount', 'nextPage']
+            lists = Parser().json_parser(response=response, keys=keys, arr=False)
+            single_page = pd.DataFrame(lists).transpose()
+            single_page.columns = keys
+            single_page['creationDate'] = pd.to_datetime(single_page['creationDate'], unit='ms')
+            single_page['lastModifiedDate'] = pd.to_datetime(single_page['lastModifiedDate'], unit='ms')
+            mailing_lists = pd.concat([mailing_lists, single_page]).reset_index(drop=True)
+            next_page = str(response['result']['nextPage'])
+        return mailing_lists, next_page
+
+    def _list_frame(self, response):
+        '''This method builds the single-row DataFrame returned by get_list. (Not a User-Facing Method)'''
+        list_info = {
+                    "mailingListId": response['result']['mailingListId'],
+                    "name": response['result']['name'],
+                    "ownerId": response['result']['ownerId'],
+                    "lastModifiedDate": response['result']['lastModifiedDate'],
+                    "creationDate": response['result']['creationDate'],
+                    "contactCount": response['result']['contactCount']
+        }
+        df = pd.DataFrame.from_dict(list_info, orient='index').transpose()
+        df['creationDate'] = pd.to_datetime(df['creationDate'], unit='ms')
+        df['lastModifiedDate'] = pd.to_datetime(df['lastModifiedDate'], unit='ms')
+        return df
+
+    def _list_contacts_page(self, response, mailing_list, contact_list):
+        '''This method appends a single page of mailing list contacts to the contact_list DataFrame. (Not a User-Facing Method)'''
+        with self.span('parse'):
+            keys = ['contactId','firstName','lastName','email','phone','extRef','language','unsubscribed']
+            contact_lists = Parser().json_parser(response=response, keys=keys, arr=False)
+            single_page = pd.DataFrame(contact_lists).transpose()
+            single_page.columns = keys
+            single_page['mailing_list'] = mailing_list
+            contact_list = pd.concat([contact_list, single_page]).reset_index(drop=True)
+            next_page = str(response['result']['nextPage'])
+        return contact_list, next_page
+
+    def _contact_payload(self, **kwargs):
+        '''This method validates the keyword arguments of create_contact_in_list and builds its payload. (Not a User-Facing Method)'''
         dynamic_payload = {}
         for key in list(kwargs.keys()):
             assert key in ['first_name', 'last_name', 'email', 'unsubscribed', 'language', 'external_ref', 'metadata', 'phone'], "Hey there! You can only pass in parameters with names in the list, ['first_name', 'last_name', 'email', 'unsubscribed', 'language', 'external_ref', 'metadata']"
@@ -239,29 +272,175 @@ class MailingList(Credentials):
             elif key == 'metadata':
                 assert isinstance(kwargs['metadata'], dict), 'Hey there, your metadata parameter needs to be of type "dict"!'
                 dynamic_payload.update({'embeddedData': kwargs[str(key)]})
+        return dynamic_payload
+
+
+class AsyncMailingList(MailingList, AsyncCredentials):
+    '''This is the asyncio counterpart of the MailingList class. Its methods take the same parameters, run the same
+    validation and return the same shapes as their MailingList equivalents, but they must be awaited.'''
+
+    async def create_list(self, name=None):
+        '''This method will create a mailing list in the XM Directory for the your specified user's account.
+
+        :param list_name: the name of the list to be created.
+        :return: tuple containing the Mailing List's and the Mailing List's new id.
+        '''
+        assert name != None, 'Hey there! The name parameter cannot be None. You need to pass in a new Mailing List name as a string into the name parameter.'
+        assert isinstance(name, str) == True, 'Hey there! The name parameter must be of type string.'
+
+        headers, base_url = self.header_setup(content_type=True, xm=True)
+        url = f"{base_url}/mailinglists"
+        data = {"name": "{0}".format(name)}
+        request = await self.api_request("POST", url, json=data, headers=headers)
+        response = request.json()
+        try:
+            list_id = Parser().json_parser(response=response, keys=['id'], arr=False)[0][0]
+            return name, list_id
+        except:
+            print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
+
+    @operation
+    async def list_lists(self, page_size=100):
+        '''This method lists all the mailing lists in the directory for the specified user token.
+
+        :param page_size: The number of mailing lists to return per call.
+        :type page_size: int
+        :return: A Pandas DataFrame
+        '''
+        assert page_size != 0, 'Hey there! You need to have a page size greater than 1'
+
+        mailing_lists = pd.DataFrame()
+        headers, base_url = self.header_setup(xm=True)
+        next_page = base_url + f"/mailinglists/?pageSize={page_size}"
+        try:
+            while next_page != 'None':
+                request = await self.api_request("GET", next_page, headers=headers)
+                response = request.json()
+                mailing_lists, next_page = self._lists_page(response, mailing_lists)
+            return mailing_lists
+        except:
+            print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
+
+    async def get_list(self, mailing_list=None):
+        '''This function gets the list specfied by the mailing list param and returns the list members.
+
+        :param mailing_list: Your mailing list id that you are interested in getting information on.
+        :type mailing_list: str
+        :return: A Pandas DataFrame
+        '''
+        assert mailing_list != None, 'Hey there! The mailing_list parameter cannot be None. You need to pass in a Mailing List ID as a string into the mailing_list parameter.'
+        assert isinstance(mailing_list, str) == True, 'Hey there! The mailing_list parameter must be of type string.'
+        assert len(mailing_list) == 18, 'Hey, the parameter for "mailing_list" that was passed is the wrong length. It should have 18 characters.'
+        assert mailing_list[:3] == 'CG_', 'Hey there! It looks like your Mailing List ID is incorrect. You can find the Mailing List ID on the Qualtrics site under your account settings. It will begin with "CG_". Please try again.'
+
+        headers, base_url = self.header_setup(xm=True)
+        url = f"{base_url}/mailinglists/{mailing_list}"
+        request = await self.api_request("GET", url, headers=headers)
+        response = request.json()
+        try:
+            return self._list_frame(response)
+        except:
+            print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
+
+    async def rename_list(self, mailing_list=None, name=None):
+        '''This method takes an existing mailing list name and updates it to reflect the name defined in the name parameter.
+
+        :param mailing_list: the mailing list that you want to rename.
+        :type mailing_list: str
+        :param name: The new name for the mailing list.
+        :type name: str
+        :return: A string indicating the success or failure of the method call.
+        '''
+        assert mailing_list != None, 'Hey there! The mailing_list parameter cannot be None. You need to pass in a Mailing List ID as a string into the mailing_list parameter.'
+        assert isinstance(mailing_list, str) == True, 'Hey there! The mailing_list parameter must be of type string.'
+        assert name != None, 'Hey there! The name parameter cannot be None. You need to pass in a new Mailing List name as a string into the name parameter.'
+        assert isinstance(name, str) == True, 'Hey there! The name parameter must be of type string.'
+        assert len(mailing_list) == 18, 'Hey there! The parameter for "mailing_list" that was passed is the wrong length. It should have 18 characters.'
+        assert mailing_list[:3] == 'CG_', 'Hey there! It looks like your Mailing List ID is incorrect. You can find the Mailing List ID on the Qualtrics site under your account settings. Please try again.'
+
+        data = {"name": f"{name}"}
+        headers, base_url = self.header_setup(content_type=True, xm=True)
+        url = f"{base_url}/mailinglists/{mailing_list}"
+        request = await self.api_request("PUT", url, json=data, headers=headers)
+        response = request.json()
+        try:
+            if response['meta']['httpStatus'] == '200 - OK':
+                print(f'Your mailing list "{mailing_list}" has been renamed to {name} in the XM Directory.')
+        except:
+            print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
+        return
+
+    async def delete_list(self, mailing_list=None):
+        '''This method will delete the specified mailing list from the given users XM Directory.
+
+        :param mailing_list: Your mailing list id that you are interested in deleting.
+        :type mailing_list: str
+        :return: A string indicating the success or failure of the method call.
+        '''
+        assert mailing_list != None, 'Hey, the mailing_list parameter cannot be None. You need to pass in a Mailing List ID as a string into the mailing_list parameter.'
+        assert isinstance(mailing_list, str) == True, 'Hey there, the mailing_list parameter must be of type string.'
+        assert len(mailing_list) == 18, 'Hey there! The parameter for "mailing_list" that was passed is the wrong length. It should have 18 characters.'
+        assert mailing_list[:3] == 'CG_', 'Hey there! It looks like your Mailing List ID is incorrect. You can find the Mailing List ID on the Qualtrics site under your account settings. Please try again.'
+
+        data = {"name": f"{mailing_list}"}
+        headers, base_url = self.header_setup(xm=True)
+        url = f"{base_url}/mailinglists/{mailing_list}"
+        request = await self.api_request("DELETE", url, json=data, headers=headers)
+        response = request.json()
+        try:
+            if response['meta']['httpStatus'] == '200 - OK':
+                print(f'Your mailing list "{mailing_list}" has been deleted from the XM Directory.')
+        except:
+            print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
+        return
+
+    @operation
+    async def list_contacts(self, mailing_list=None, page_size=100):
+        '''This method creates a pandas DataFrame of all the contacts information within the defined mailing list.
+
+        :param mailing_list: the mailing list id
+        :type mailing_list: str
+        :param page_size: The number of contacts in the mailing list to return per call. (typically this doesn't not need to be changed.)
+        :type page_size: int
+        :return: A Pandas DataFrame
+        '''
+        assert len(mailing_list) == 18, 'Hey, the parameter for "mailing_list" that was passed is the wrong length. It should have 18 characters.'
+        assert mailing_list[:3] == 'CG_', 'Hey there! It looks like your Mailing List ID is incorrect. You can find the Mailing List ID on the Qualtrics site under your account settings. It will begin with "CG_". Please try again.'
+        assert page_size != 0, 'Hey there! You need to have a page size greater than 1'
+
+        contact_list = pd.DataFrame()
+        headers, base_url = self.header_setup(xm=True)
+        next_page = base_url + f"/mailinglists/{mailing_list}/contacts?pageSize={page_size}"
+        try:
+            while next_page != 'None':
+                request = await self.api_request("GET", next_page, headers=headers)
+                response = request.json()
+                contact_list, next_page = self._list_contacts_page(response, mailing_list, contact_list)
+            return contact_list
+        except:
+            print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
+
+    async def create_contact_in_list(self, mailing_list=None, **kwargs):
+        '''This method creates contacts in the specified mailing list. It accepts the same keyword arguments as
+        MailingList.create_contact_in_list().
+
+        :param mailing_list: The mailing list id for the list that you want to add the contact too.
+        :type mailing_list: str
+        :return: the contact id (contact_id) in XMDirectory, and the contact id (contact_list_id) in the mailing list.
+        '''
+        assert len(mailing_list) == 18, 'Hey there! The parameter for "mailing_list" that was passed is the wrong length. It should have 18 characters.'
+        assert mailing_list[:3] == 'CG_', 'Hey there! It looks like your Mailing List ID is incorrect. You can find the Mailing List ID on the Qualtrics site under your account settings. Please try again.'
+
+        dynamic_payload = self._contact_payload(**kwargs)
 
         headers, base_url = self.header_setup(content_type=True, xm=True)
         url = base_url + f"/mailinglists/{mailing_list}/contacts"
-        request = r.post(url, json=dynamic_payload, headers=headers)
+        request = await self.api_request("POST", url, json=dynamic_payload, headers=headers)
         response = request.json()
         try:
-            if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                raise Qualtrics500Error('500 - Internal Server Error')
             contact_id = response['result']['id']
-        except Qualtrics500Error:
-            attempt = 0
-            while attempt < 20:
-                request = r.post(url, json=dynamic_payload, headers=headers)
-                response = request.json()
-                if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                    attempt+=1
-                    t.sleep(0.25)
-                    continue
-                elif response['meta']['httpStatus'] == '200 - OK':
-                    return response['result']['id'], response['result']['contactLookupId']
-            return print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
         except Exception:
             print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
         else:
             contact_list_id = response['result']['contactLookupId']
-            return contact_id, contact_list_id
\ No newline at end of file
+            return contact_id, contact_list_id
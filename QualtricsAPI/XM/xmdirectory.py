@@ -1,20 +1,20 @@
-import time as t
 import io
 import json
-import requests as r
-import pandas as pd
-from QualtricsAPI.Setup import Credentials
+from QualtricsAPI.Setup import Credentials, AsyncCredentials, operation, LazyModule
 from QualtricsAPI.JSON import Parser
-from QualtricsAPI.Exceptions import Qualtrics500Error, Qualtrics503Error, Qualtrics504Error, Qualtrics400Error, Qualtrics401Error, Qualtrics403Error
+from QualtricsAPI.Exceptions import Qualtrics400Error, Qualtrics401Error, Qualtrics403Error
+
+pd = LazyModule('pandas')
 
 class XMDirectory(Credentials):
     ''' This class contains methods that give users the ability to work with their contact data within the
     XMDirectory.'''
 
-    def __init__(self, token=None, directory_id=None, data_center=None):
+    def __init__(self, token=None, directory_id=None, data_center=None, config=None):
         self.token = token
         self.data_center = data_center
         self.directory_id = directory_id
+        self.config = self._resolve_config(config, token, data_center, directory_id)
 
     def create_contact_in_XM(self, **kwargs):
         '''This function gives you the ability to create a contact in your XM Directory. This method does re-list not each
@@ -39,54 +39,14 @@ class XMDirectory(Credentials):
         :type return: str
         '''
         
-        dynamic_payload={}
-        verbose = False
-        for key in list(kwargs.keys()):
-            assert key in ['first_name', 'last_name', 'email', 'unsubscribed', 'language', 'external_ref', 'metadata', 'phone', 'verbose', 'dynamic_payload'], "Hey there! You can only pass in parameters with names in the list, ['first_name', 'last_name', 'email', 'unsubscribed', 'language', 'external_ref', 'metadata']"
-            if key == 'first_name':
-                dynamic_payload.update({'firstName': kwargs[str(key)]})
-            elif key == 'last_name':
-                dynamic_payload.update({'lastName': kwargs[str(key)]})
-            elif key == 'email':
-                dynamic_payload.update({'email': kwargs[str(key)]})
-            elif key == 'phone':
-                dynamic_payload.update({'phone': kwargs[str(key)]})
-            elif key == 'language':
-                dynamic_payload.update({'language': kwargs[str(key)]})
-            elif key == 'external_ref':
-                dynamic_payload.update({'extRef': kwargs[str(key)]})
-            elif key == 'unsubscribed':
-                dynamic_payload.update({'unsubscribed': kwargs[str(key)]})
-            elif key == 'phone':
-                dynamic_payload.update({'phone': kwargs[str(key)]})
-            elif key == 'metadata':
-                assert isinstance(kwargs['metadata'], dict), 'Hey there, your metadata parameter needs to be of type "dict"!'
-                dynamic_payload.update({'embeddedData': kwargs[str(key)]})
-            elif key == 'dynamic_payload':
-              dynamic_payload = dict(kwargs[str(key)])
-            elif key == 'verbose':
-              verbose = True
+        dynamic_payload, verbose = self._create_contact_payload(**kwargs)
 
         headers, base_url = self.header_setup(content_type=True, xm=True)
         url = f"{base_url}/contacts"
-        request = r.post(url, json=dynamic_payload, headers=headers)
+        request = self.api_request("POST", url, json=dynamic_payload, headers=headers)
         response = request.json()
         try:
-            if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                raise Qualtrics500Error('500 - Internal Server Error')
-            elif response['meta']['httpStatus'] == '503 - Temporary Internal Server Error':
-                raise Qualtrics503Error('503 - Temporary Internal Server Error')
-            elif response['meta']['httpStatus'] == '504 - Gateway Timeout':
-                raise Qualtrics504Error('504 - Gateway Timeout')
-            elif response['meta']['httpStatus'] == '400 - Bad Request':
-                raise Qualtrics400Error('Qualtrics Error\n(Http Error: 400 - Bad Request): There was something invalid about the request.')
-            elif response['meta']['httpStatus'] == '401 - Unauthorized':
-                raise Qualtrics401Error('Qualtrics Error\n(Http Error: 401 - Unauthorized): The Qualtrics API user could not be authenticated or does not have authorization to access the requested resource.')
-            elif response['meta']['httpStatus'] == '403 - Forbidden':
-                raise Qualtrics403Error('Qualtrics Error\n(Http Error: 403 - Forbidden): The Qualtrics API user was authenticated and made a valid request, but is not authorized to access this requested resource.')
-        except (Qualtrics500Error, Qualtrics503Error, Qualtrics504Error) as e:
-            # Recursive call to handle Internal Server Errors
-            return self.create_contact_in_XM(dynamic_payload=dynamic_payload)
+            self._raise_for_meta(response)
         except (Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
             # Handle Authorization/Bad Request Errors
             return print(e)
@@ -110,7 +70,7 @@ class XMDirectory(Credentials):
 
         headers, base_url = self.header_setup(xm=True)
         url = f"{base_url}/contacts/{contact_id}"
-        request = r.delete(url, headers=headers)
+        request = self.api_request("DELETE", url, headers=headers)
         response = request.json()
         try:
             if response['meta']['httpStatus'] == '200 - OK':
@@ -146,6 +106,122 @@ class XMDirectory(Credentials):
         assert len(contact_id) == 19, 'Hey, the parameter for "contact_id" that was passed is the wrong length. It should have 19 characters.'
         assert contact_id[:4] == 'CID_', 'Hey there! It looks like the Contact ID that was entered is incorrect. It should begin with "CID_". Please try again.'
 
+        dynamic_payload = self._update_contact_payload(**kwargs)
+
+        headers, base_url = self.header_setup(xm=True)
+        url = f"{base_url}/contacts/{contact_id}"
+        request = self.api_request("PUT", url, json=dynamic_payload, headers=headers)
+        response = request.json()
+        if response['meta']['httpStatus'] == '500 - Internal Server Error':
+            return print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
+        return f'The contact ({contact_id}) was updated in the XM Directory.'
+
+    @operation
+    def list_contacts_in_directory(self):
+        '''This method will list the top-level information about the contacts in your XM Directory. As a word of caution,
+        this method may take a while to complete depending on the size of your XM Directory. There exists some latency
+        with between
+
+        :return: A Pandas DataFrame
+        '''
+
+        page_size=1000
+        master = pd.DataFrame(columns=['contactId','firstName', 'lastName', 'email', 'phone','unsubscribed', 'language', 'extRef'])
+        headers, base_url = self.header_setup(xm=True)
+        next_page = base_url + f"/contacts?pageSize={page_size}&useNewPaginationScheme=true"
+        while next_page is not None:
+            request = self.api_request("GET", next_page, headers=headers)
+            response = request.json()
+            try:
+                self._raise_for_meta(response)
+            except (Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+                return print(e)
+            master, next_page = self._contacts_page(response, master)
+        return master
+
+    def get_contact(self, contact_id=None):
+        ''' This method is similar to the 'list_contacts_in_directory' method. Except it will just return a single contact's
+        information.
+
+        :param contact_id: The unique id associated with each contact in the XM Directory.
+        :type contact_id: str
+        :return: A Pandas DataFrame
+        '''
+        assert contact_id != None, 'Hey, the contact_id parameter cannot be None. You need to pass in a XM Directory Contact ID as a string into the contact_id parameter.'
+        assert isinstance(contact_id, str) == True, 'Hey there, the contact_id parameter must be of type string.'
+        assert len(contact_id) == 19, 'Hey, the parameter for "contact_id" that was passed is the wrong length. It should have 19 characters.'
+        assert contact_id[:4] == 'CID_', 'Hey there! It looks like the Contact ID that was entered is incorrect. It should begin with "CID_". Please try again.'
+
+        headers, base_url = self.header_setup(xm=True)
+        url = base_url + f'/contacts/{str(contact_id)}'
+        request = self.api_request("GET", url, headers=headers)
+        response = request.json()
+        try:
+            return self._contact_frame(response)
+        except:
+            print(f"ServerError:\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
+
+    def get_contact_additional_info(self, contact_id=None, content=None):
+        ''' This method will return the additional "nested" information associated with a contact in the XMDirectory.
+        To get these different nested pieces of infomation you can pass one of three arguements to the 'content' parameter. If you
+        pass 'mailinglistmembership', you will return the different Mailing Lists that the contact is associated with in the form of a
+        pandas DataFrame. If you pass 'stats', you will return the response statistics associated with the contact, again in the form
+        of a Pandas DataFrame. Finally, if you pass the 'embeddedData' argument, you will return any emmbedded data associated with
+        the given contact, and as you guessed it, in the form of a Pandas DataFrame.
+
+        :param contact_id: The unique id associated with each contact in the XM Directory.
+        :type contact_id: str
+        :param content: A string representing either 'mailingListMembership', 'stats', 'embeddedData'
+        :type content: str
+        :return: A Pandas DataFrame
+        '''
+        assert contact_id != None, 'Hey, the contact_id parameter cannot be None. You need to pass in a XM Directory Contact ID as a string into the contact_id parameter.'
+        assert isinstance(contact_id, str) == True, 'Hey there, the contact_id parameter must be of type string.'
+        assert len(contact_id) == 19, 'Hey, the parameter for "contact_id" that was passed is the wrong length. It should have 19 characters.'
+        assert contact_id[:4] == 'CID_', 'Hey there! It looks like the Contact ID that was entered is incorrect. It should begin with "CID_". Please try again.'
+        assert content != None, 'Hey there, you need to pass an argument ("embeddedData", or "mailingListMembership") to the "content" parameter.'
+
+        try:
+            primary = self.get_contact(contact_id=contact_id)
+            keys = Parser().extract_keys(primary[content][0])
+            data = pd.DataFrame.from_dict(primary[content][0], orient='index').transpose()
+            return data
+        except:
+            print('Hey there! Something went wrong please try again.')
+
+    def _create_contact_payload(self, **kwargs):
+        '''This method validates the keyword arguments of create_contact_in_XM and builds its payload. (Not a User-Facing Method)'''
+        dynamic_payload = {}
+        verbose = False
+        for key in list(kwargs.keys()):
+            assert key in ['first_name', 'last_name', 'email', 'unsubscribed', 'language', 'external_ref', 'metadata', 'phone', 'verbose', 'dynamic_payload'], "Hey there! You can only pass in parameters with names in the list, ['first_name', 'last_name', 'email', 'unsubscribed', 'language', 'external_ref', 'metadata']"
+            if key == 'first_name':
+                dynamic_payload.update({'firstName': kwargs[str(key)]})
+            elif key == 'last_name':
+                dynamic_payload.update({'lastName': kwargs[str(key)]})
+            elif key == 'email':
+                dynamic_payload.update({'email': kwargs[str(key)]})
+            elif key == 'phone':
+                dynamic_payload.update({'phone': kwargs[str(key)]})
+            elif key == 'language':
+                dynamic_payload.update({'language': kwargs[str(key)]})
+            elif key == 'external_ref':
+                dynamic_payload.update({'extRef': kwargs[str(key)]})
+            elif key == 'unsubscribed':
+                dynamic_payload.update({'unsubscribed': kwargs[str(key)]})
+            elif key == 'phone':
+                dynamic_payload.update({'phone': kwargs[str(key)]})
+            elif key == 'metadata':
+                assert isinstance(kwargs['metadata'], dict), 'Hey there, your metadata parameter needs to be of type "dict"!'
+                dynamic_payload.update({'embeddedData': kwargs[str(key)]})
+            elif key == 'dynamic_payload':
+              dynamic_payload = dict(kwargs[str(key)])
+            elif key == 'verbose':
+              verbose = True
+        return dynamic_payload, verbose
+
+    def _update_contact_payload(self, **kwargs):
+        '''This method validates the keyword arguments of update_contact and builds its payload. (Not a User-Facing Method)'''
         dynamic_payload = {}
         for key in list(kwargs.keys()):
             assert key in ['first_name', 'last_name', 'email', 'unsubscribed', 'language', 'external_ref', 'metadata', 'phone'], "Hey there! You can only pass in parameters with names in the list, ['first_name', 'last_name', 'email', 'unsubscribed', 'language', 'external_ref', 'metadata']"
@@ -168,89 +244,121 @@ class XMDirectory(Credentials):
             elif key == 'metadata':
                 assert isinstance(kwargs['metadata'], dict), 'Hey there, your metadata parameter needs to be of type "dict"!'
                 dynamic_payload.update({'embeddedData': kwargs[str(key)]})
-    
+        return dynamic_payload
+
+    def _contacts_page(self, response, master):
+        '''This method appends a single page of directory contacts to the master DataFrame. (Not a User-Facing Method)'''
+        with self.span('parse'):
+            keys = ['contactId','firstName', 'lastName', 'email', 'phone','unsubscribed', 'language', 'extRef']
+            contact_lists = Parser().json_parser(response=response, keys=keys, arr=False)
+            next_page = response['result']['nextPage']
+            single_contact_list = pd.DataFrame(contact_lists).transpose()
+            single_contact_list.columns = keys
+            master = pd.concat([master, single_contact_list]).reset_index(drop=True)
+        return master, next_page
+
+    def _contact_frame(self, response):
+        '''This method builds the single-row DataFrame returned by get_contact. (Not a User-Facing Method)'''
+        primary = pd.DataFrame.from_dict(response['result'], orient='index').transpose()
+        primary['creationDate'] = pd.to_datetime(primary['creationDate'],unit='ms')
+        primary['lastModified'] = pd.to_datetime(primary['lastModified'],unit='ms')
+        return primary
+
+
+class AsyncXMDirectory(XMDirectory, AsyncCredentials):
+    '''This is the asyncio counterpart of the XMDirectory class. Its methods take the same parameters, run the same
+    validation and return the same shapes as their XMDirectory equivalents, but they must be awaited.'''
+
+    async def create_contact_in_XM(self, **kwargs):
+        '''This function gives you the ability to create a contact in your XM Directory. It accepts the same keyword
+        arguments as XMDirectory.create_contact_in_XM().
+
+        :return: The newly created contact id (CID) in XMDirectory.
+        :type return: str
+        '''
+        dynamic_payload, verbose = self._create_contact_payload(**kwargs)
+
+        headers, base_url = self.header_setup(content_type=True, xm=True)
+        url = f"{base_url}/contacts"
+        request = await self.api_request("POST", url, json=dynamic_payload, headers=headers)
+        response = request.json()
+        try:
+            self._raise_for_meta(response)
+        except (Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+            return print(e)
+        else:
+            if verbose == True:
+                return response['meta']['httpStatus'], response['result']['id']
+            else:
+                return response['result']['id']
+
+    async def delete_contact(self, contact_id=None):
+        '''This method will delete a contact from your XMDirectory. (Caution this cannot be reversed once deleted!)
+
+        :param contact_id: The unique id associated with each contact in the XM Directory.
+        :type contact_id: str
+        :return:  A string indicating the success or failure of the method call.
+        '''
+        assert contact_id != None, 'Hey, the contact_id parameter cannot be None. You need to pass in a XM Directory Contact ID as a string into the contact_id parameter.'
+        assert isinstance(contact_id, str) == True, 'Hey there, the contact_id parameter must be of type string.'
+        assert len(contact_id) == 19, 'Hey, the parameter for "contact_id" that was passed is the wrong length. It should have 19 characters.'
+        assert contact_id[:4] == 'CID_', 'Hey there! It looks like the Contact ID that was entered is incorrect. It should begin with "CID_". Please try again.'
+
         headers, base_url = self.header_setup(xm=True)
         url = f"{base_url}/contacts/{contact_id}"
-        request = r.put(url, json=dynamic_payload, headers=headers)
+        request = await self.api_request("DELETE", url, headers=headers)
         response = request.json()
         try:
-            if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                raise Qualtrics500Error('500 - Internal Server Error')
-        except Qualtrics500Error:
-            attempt = 0
-            while attempt < 20:
-                request = r.put(url, json=dynamic_payload, headers=headers)
-                response = request.json()
-                if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                    attempt+=1
-                    t.sleep(0.25)
-                    continue
-                elif response['meta']['httpStatus'] == '200 - OK':
-                    return f'The contact ({contact_id}) was updated in the XM Directory.'
+            if response['meta']['httpStatus'] == '200 - OK':
+                return f'Your XM Contact"{contact_id}" has been deleted from the XM Directory.'
+        except:
+            print(f"ServerError:\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
+
+    async def update_contact(self, contact_id=None, **kwargs):
+        '''This method will update a contact from your XMDirectory. It accepts the same keyword arguments as
+        XMDirectory.update_contact().
+
+        :param contact_id: The unique id associated with each contact in the XM Directory.
+        :type contact_id: str
+        :return: A string indicating the success or failure of the method call.
+        '''
+        assert contact_id != None, 'Hey, the contact_id parameter cannot be None. You need to pass in a XM Directory Contact ID as a string into the contact_id parameter.'
+        assert isinstance(contact_id, str) == True, 'Hey there, the contact_id parameter must be of type string.'
+        assert len(contact_id) == 19, 'Hey, the parameter for "contact_id" that was passed is the wrong length. It should have 19 characters.'
+        assert contact_id[:4] == 'CID_', 'Hey there! It looks like the Contact ID that was entered is incorrect. It should begin with "CID_". Please try again.'
+
+        dynamic_payload = self._update_contact_payload(**kwargs)
+
+        headers, base_url = self.header_setup(xm=True)
+        url = f"{base_url}/contacts/{contact_id}"
+        request = await self.api_request("PUT", url, json=dynamic_payload, headers=headers)
+        response = request.json()
+        if response['meta']['httpStatus'] == '500 - Internal Server Error':
             return print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
-        except Exception:
-            print(f"ServerError: {response['meta']['httpStatus']}\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
-        else:
-            return f'The contact ({contact_id}) was updated in the XM Directory.'
+        return f'The contact ({contact_id}) was updated in the XM Directory.'
 
-    def list_contacts_in_directory(self):
-        '''This method will list the top-level information about the contacts in your XM Directory. As a word of caution,
-        this method may take a while to complete depending on the size of your XM Directory. There exists some latency
-        with between
+    @operation
+    async def list_contacts_in_directory(self):
+        '''This method will list the top-level information about the contacts in your XM Directory.
 
         :return: A Pandas DataFrame
         '''
-
         page_size=1000
-        i=1000
         master = pd.DataFrame(columns=['contactId','firstName', 'lastName', 'email', 'phone','unsubscribed', 'language', 'extRef'])
         headers, base_url = self.header_setup(xm=True)
-        url = base_url + f"/contacts?pageSize={page_size}&useNewPaginationScheme=true"
-
-        def extract_page(url=url, master=master, page_size=page_size):
-            ''' This is a method that extracts a single page of contacts in a mailing list.'''
+        next_page = base_url + f"/contacts?pageSize={page_size}&useNewPaginationScheme=true"
+        while next_page is not None:
+            request = await self.api_request("GET", next_page, headers=headers)
+            response = request.json()
             try:
-                request = r.get(url, headers=headers)
-                response = request.json()
-                if response['meta']['httpStatus'] == '500 - Internal Server Error':
-                    raise Qualtrics500Error('500 - Internal Server Error')
-                elif response['meta']['httpStatus'] == '503 - Temporary Internal Server Error':
-                    raise Qualtrics503Error('503 - Temporary Internal Server Error')
-                elif response['meta']['httpStatus'] == '504 - Gateway Timeout':
-                    raise Qualtrics504Error('504 - Gateway Timeout')
-            except (Qualtrics500Error, Qualtrics503Error):
-                t.sleep(0.25)
-                extract_page(url=url, master=master)
-            except Qualtrics504Error:
-                t.sleep(5)
-                extract_page(url=url, master=master)
-            except:
-                t.sleep(10)
-                extract_page(url=url, master=master)
-            else:
-                keys = ['contactId','firstName', 'lastName', 'email', 'phone','unsubscribed', 'language', 'extRef']
-                contact_lists = Parser().json_parser(response=response, keys=keys, arr=False)
-                next_page = response['result']['nextPage']
-                single_contact_list = pd.DataFrame(contact_lists).transpose()
-                single_contact_list.columns = keys
-                master = pd.concat([master, single_contact_list]).reset_index(drop=True)
-                return master, next_page
-
-        master, next_page = extract_page()
-        
-        print(i)
-        if next_page is None:
-            return master
-        else:
-          while next_page is not None:
-              master, next_page = extract_page(url=next_page, master=master)
-              i+=1000
-              print(i)
-          return master
+                self._raise_for_meta(response)
+            except (Qualtrics400Error, Qualtrics401Error, Qualtrics403Error) as e:
+                return print(e)
+            master, next_page = self._contacts_page(response, master)
+        return master
 
-    def get_contact(self, contact_id=None):
-        ''' This method is similar to the 'list_contacts_in_directory' method. Except it will just return a single contact's
-        information.
+    async def get_contact(self, contact_id=None):
+        ''' This method returns a single contact's information.
 
         :param contact_id: The unique id associated with each contact in the XM Directory.
         :type contact_id: str
@@ -263,23 +371,15 @@ class XMDirectory(Credentials):
 
         headers, base_url = self.header_setup(xm=True)
         url = base_url + f'/contacts/{str(contact_id)}'
-        request = r.get(url, headers=headers)
+        request = await self.api_request("GET", url, headers=headers)
         response = request.json()
         try:
-            primary = pd.DataFrame.from_dict(response['result'], orient='index').transpose()
-            primary['creationDate'] = pd.to_datetime(primary['creationDate'],unit='ms')
-            primary['lastModified'] = pd.to_datetime(primary['lastModified'],unit='ms')
-            return primary
+            return self._contact_frame(response)
         except:
             print(f"ServerError:\nError Code: {response['meta']['error']['errorCode']}\nError Message: {response['meta']['error']['errorMessage']}")
 
-    def get_contact_additional_info(self, contact_id=None, content=None):
+    async def get_contact_additional_info(self, contact_id=None, content=None):
         ''' This method will return the additional "nested" information associated with a contact in the XMDirectory.
-        To get these different nested pieces of infomation you can pass one of three arguements to the 'content' parameter. If you
-        pass 'mailinglistmembership', you will return the different Mailing Lists that the contact is associated with in the form of a
-        pandas DataFrame. If you pass 'stats', you will return the response statistics associated with the contact, again in the form
-        of a Pandas DataFrame. Finally, if you pass the 'embeddedData' argument, you will return any emmbedded data associated with
-        the given contact, and as you guessed it, in the form of a Pandas DataFrame.
 
         :param contact_id: The unique id associated with each contact in the XM Directory.
         :type contact_id: str
@@ -294,8 +394,7 @@ class XMDirectory(Credentials):
         assert content != None, 'Hey there, you need to pass an argument ("embeddedData", or "mailingListMembership") to the "content" parameter.'
 
         try:
-            primary = self.get_contact(contact_id=contact_id)
-            keys = Parser().extract_keys(primary[content][0])
+            primary = await self.get_contact(contact_id=contact_id)
             data = pd.DataFrame.from_dict(primary[content][0], orient='index').transpose()
             return data
         except:
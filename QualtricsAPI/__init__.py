@@ -1,9 +1,28 @@
 # __init__.py
-from QualtricsAPI.Setup import Credentials
-from QualtricsAPI.Survey import Responses
-from QualtricsAPI.JSON import Parser
-from QualtricsAPI.XM import MailingList
-from QualtricsAPI.XM import XMDirectory
-from QualtricsAPI.Library import Messages
+import importlib
+
+# The classes are imported on first use (PEP 562), so "import QualtricsAPI" stays fast for short-lived scripts.
+_exports = {
+    'Credentials': 'QualtricsAPI.Setup',
+    'ClientConfig': 'QualtricsAPI.Setup',
+    'Responses': 'QualtricsAPI.Survey',
+    'Parser': 'QualtricsAPI.JSON',
+    'MailingList': 'QualtricsAPI.XM',
+    'XMDirectory': 'QualtricsAPI.XM',
+    'Messages': 'QualtricsAPI.Library',
+}
 
 __all__ = ["Setup", "JSON", "Contacts", "Survey", "Library"]
+
+def __getattr__(name):
+    if name in _exports:
+        value = getattr(importlib.import_module(_exports[name]), name)
+    elif name in ('Setup', 'JSON', 'Survey', 'Library', 'XM', 'Users', 'Exceptions', 'Transport'):
+        value = importlib.import_module(f'QualtricsAPI.{name}')
+    else:
+        raise AttributeError(f"module 'QualtricsAPI' has no attribute '{name}'")
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
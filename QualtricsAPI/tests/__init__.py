@@ -1,3 +1,4 @@
+from .fake_server import *
 from .test import *
 
-__all__ = ['test']
+__all__ = ['fake_server', 'test']
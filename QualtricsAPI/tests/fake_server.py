@@ -0,0 +1,620 @@
+import codecs
+import csv
+import io
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time as t
+import zipfile
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from xml.sax.saxutils import escape
+from dateutil.parser import parse
+from QualtricsAPI.Setup import ClientConfig
+from QualtricsAPI.Transport import endpoint_family
+
+class FakeQualtricsHandler(BaseHTTPRequestHandler):
+    ''' This handler passes every request on to the FakeQualtrics server it belongs to. (Not a User-Facing Class)'''
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.fake.count('connections')
+
+    def do_GET(self):
+        self.server.fake.handle(self, 'GET')
+
+    def do_POST(self):
+        self.server.fake.handle(self, 'POST')
+
+    def do_PUT(self):
+        self.server.fake.handle(self, 'PUT')
+
+    def do_DELETE(self):
+        self.server.fake.handle(self, 'DELETE')
+
+    def log_message(self, *args):
+        return
+
+class FakeQualtrics(object):
+    ''' This class is an in-process stand-in for the Qualtrics v3 API, so the HTTP paths of this package can be tested
+    and benchmarked offline and reproducibly. It serves response export jobs (start, progress and a zipped csv, tsv, json, ndjson or xml file),
+    paginated surveys, directory contacts, mailing lists and their contacts, distributions, library messages,
+    update-responses jobs and single responses, with the same payload shapes as Qualtrics.
+
+    Every dataset is generated from the index of its items, so any size can be served without holding it in memory and
+    every run sees the same data. Changes (POST, PUT, DELETE) are acknowledged and counted, but do not change the datasets.
+
+        with FakeQualtrics(responses=100000, latency=0.01) as fake:
+            df = Responses(config=fake.config()).get_survey_responses(survey=fake.survey_id())
+            fake.stats()
+
+    :param responses: The number of responses in the export of every survey. (Default: 1000)
+    :type responses: int
+    :param surveys: The number of surveys of the user. (Default: 100)
+    :type surveys: int
+    :param contacts: The number of contacts in the directory. (Default: 1000)
+    :type contacts: int
+    :param mailing_lists: The number of mailing lists in the directory. (Default: 10)
+    :type mailing_lists: int
+    :param list_contacts: The number of contacts in every mailing list. (Default: 100)
+    :type list_contacts: int
+    :param distributions: The number of distributions of every survey. (Default: 100)
+    :type distributions: int
+    :param messages: The number of messages in every library. (Default: 20)
+    :type messages: int
+    :param max_page_size: The largest page served by the paginated endpoints, whatever pageSize asks for. (Default: None)
+    :type max_page_size: int
+    :param latency: The number of seconds added to every response. (Default: 0)
+    :type latency: float
+    :param export_polls: The number of progress checks an export job takes to complete. (Default: 1)
+    :type export_polls: int
+    :param export_seconds: The number of seconds an export job takes to complete, with percentComplete growing steadily. (Default: 0)
+    :type export_seconds: float
+    :param error_rates: The share of requests that fail with each status, e.g. {503: 0.05, 429: 0.01}. (Default: None)
+    :type error_rates: dict
+    :param retry_after: The Retry-After header sent with the injected 429 and 503 errors. (Default: None)
+    :type retry_after: int
+    :param seed: The seed of the random injected errors. (Default: 0)
+    :type seed: int
+    '''
+
+    token = 'FakeQualtricsToken'.ljust(40, '0')
+    directory_id = 'POOL_FAKEQUALTRICS0'.ljust(20, '0')
+    library_id = 'UR_FAKELIBRARY'.ljust(18, '0')
+    epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    export_formats = ['csv', 'tsv', 'json', 'ndjson', 'xml']
+    statuses = {200: '200 - OK', 400: '400 - Bad Request', 401: '401 - Unauthorized', 404: '404 - Not Found',
+                429: '429 - Too Many Requests', 500: '500 - Internal Server Error',
+                503: '503 - Temporary Internal Server Error', 504: '504 - Gateway Timeout'}
+    columns = [('StartDate', 'Start Date', 'startDate'), ('EndDate', 'End Date', 'endDate'),
+               ('Status', 'Response Type', 'status'), ('IPAddress', 'IP Address', 'ipAddress'),
+               ('Progress', 'Progress', 'progress'), ('Duration (in seconds)', 'Duration (in seconds)', 'duration'),
+               ('Finished', 'Finished', 'finished'), ('RecordedDate', 'Recorded Date', 'recordedDate'),
+               ('ResponseId', 'Response ID', '_recordId'), ('ExternalReference', 'External Data Reference', 'externalDataReference'),
+               ('DistributionChannel', 'Distribution Channel', 'distributionChannel'), ('UserLanguage', 'User Language', 'userLanguage'),
+               ('Q1', 'How satisfied are you with our service?', 'QID1'), ('Q2', 'How likely are you to recommend us?', 'QID2'),
+               ('Q3', 'Which department did you contact?', 'QID3'), ('Q4_TEXT', 'Anything else you would like to tell us?', 'QID4_TEXT')]
+
+    def __init__(self, responses=1000, surveys=100, contacts=1000, mailing_lists=10, list_contacts=100, distributions=100,
+                 messages=20, max_page_size=None, latency=0, export_polls=1, export_seconds=0, error_rates=None, retry_after=None, seed=0):
+        for name, value in (('responses', responses), ('surveys', surveys), ('contacts', contacts), ('mailing_lists', mailing_lists),
+                            ('list_contacts', list_contacts), ('distributions', distributions), ('messages', messages)):
+            assert isinstance(value, int) and value >= 0, f'Hey there! The {name} parameter must be a non-negative integer.'
+        assert max_page_size is None or (isinstance(max_page_size, int) and max_page_size > 0), 'Hey there! The max_page_size parameter must be a positive integer.'
+        assert latency >= 0, 'Hey there! The latency parameter cannot be negative.'
+        assert isinstance(export_polls, int) and export_polls > 0, 'Hey there! The export_polls parameter must be a positive integer.'
+        assert export_seconds >= 0, 'Hey there! The export_seconds parameter cannot be negative.'
+        assert error_rates is None or all(status in FakeQualtrics.statuses for status in error_rates), 'Hey there! The error_rates parameter can only use the statuses 400, 401, 404, 429, 500, 503 and 504.'
+        self.initial_sizes = {'responses': responses, 'surveys': surveys, 'contacts': contacts, 'mailinglists': mailing_lists,
+                              'list_contacts': list_contacts, 'distributions': distributions, 'messages': messages}
+        self.max_page_size = max_page_size
+        self.latency = latency
+        self.export_polls = export_polls
+        self.export_seconds = export_seconds
+        self.error_rates = dict(error_rates or {})
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.failures = []
+        self.jobs = {}
+        self.exports = {}
+        self.server = None
+        self.reset()
+        self.routes = [(method, re.compile(pattern + '$'), getattr(self, name)) for method, pattern, name in (
+            ('GET', r'/surveys', 'list_surveys'),
+            ('GET', r'/surveys/(SV_\w+)', 'get_survey'),
+            ('GET', r'/survey-definitions/(SV_\w+)/metadata', 'survey_metadata'),
+            ('POST', r'/surveys/(SV_\w+)/permissions/collaborations', 'acknowledge'),
+            ('POST', r'/surveys/(SV_\w+)/export-responses', 'start_export'),
+            ('GET', r'/surveys/(SV_\w+)/export-responses/(ES_\w+)', 'export_progress'),
+            ('GET', r'/surveys/(SV_\w+)/export-responses/([\w-]+)/file', 'export_file'),
+            ('POST', r'/surveys/(SV_\w+)/update-responses', 'start_update'),
+            ('GET', r'/surveys/(SV_\w+)/update-responses/(\w+)', 'update_progress'),
+            ('POST', r'/surveys/(SV_\w+)/responses', 'create_response'),
+            ('GET', r'/surveys/(SV_\w+)/responses/(R_\w+)', 'get_response'),
+            ('PUT', r'/responses/(R_\w+)', 'acknowledge'),
+            ('GET', r'/directories/(POOL_\w+)/contacts', 'list_contacts'),
+            ('POST', r'/directories/(POOL_\w+)/contacts', 'create_contact'),
+            ('GET', r'/directories/(POOL_\w+)/contacts/(CID_\w+)', 'get_contact'),
+            ('PUT', r'/directories/(POOL_\w+)/contacts/(CID_\w+)', 'acknowledge'),
+            ('DELETE', r'/directories/(POOL_\w+)/contacts/(CID_\w+)', 'acknowledge'),
+            ('GET', r'/directories/(POOL_\w+)/mailinglists', 'list_lists'),
+            ('POST', r'/directories/(POOL_\w+)/mailinglists', 'create_list'),
+            ('GET', r'/directories/(POOL_\w+)/mailinglists/(CG_\w+)', 'get_list'),
+            ('PUT', r'/directories/(POOL_\w+)/mailinglists/(CG_\w+)', 'acknowledge'),
+            ('DELETE', r'/directories/(POOL_\w+)/mailinglists/(CG_\w+)', 'acknowledge'),
+            ('GET', r'/directories/(POOL_\w+)/mailinglists/(CG_\w+)/contacts', 'list_list_contacts'),
+            ('POST', r'/directories/(POOL_\w+)/mailinglists/(CG_\w+)/contacts', 'create_contact'),
+            ('GET', r'/distributions', 'list_distributions'),
+            ('POST', r'/distributions', 'create_distribution'),
+            ('POST', r'/distributions/sms', 'create_distribution'),
+            ('GET', r'/distributions/(EMD_\w+)', 'get_distribution'),
+            ('POST', r'/distributions/(EMD_\w+)/(?:reminders|thankyous)', 'create_follow_up'),
+            ('GET', r'/libraries/(\w+)/messages', 'list_messages'),
+            ('GET', r'/libraries/(\w+)/messages/(MS_\w+)', 'get_message'))]
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        '''This method starts serving on a free local port in a background thread.
+
+        :return: The FakeQualtrics server.
+        '''
+        assert self.server is None, 'Hey there! This FakeQualtrics server is already running.'
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeQualtricsHandler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        return self
+
+    def stop(self):
+        '''This method stops the server and closes its port.'''
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        return
+
+    @property
+    def api_url(self):
+        '''The url of the stand-in v3 API, e.g. "http://127.0.0.1:8123/API/v3/".'''
+        return f'http://127.0.0.1:{self.server.server_address[1]}/API/v3/'
+
+    def config(self, directory_id=None):
+        '''This method returns a ClientConfig that sends the requests of a module to this server.
+
+        :param directory_id: The directory id of the config. (Default: FakeQualtrics.directory_id)
+        :type directory_id: str
+        :return: A ClientConfig
+        '''
+        return ClientConfig(FakeQualtrics.token, 'fake', directory_id or FakeQualtrics.directory_id, api_url=self.api_url)
+
+    def survey_id(self, index=0):
+        '''This method returns the id of one of the generated surveys.'''
+        return self.ident('SV_', index, 18)
+
+    def reset(self):
+        '''This method sets every counter back to 0, forgets the injected failures and drops, and undoes any change to
+        sizes, last_modified and accept_ranges.'''
+        with self.lock:
+            self.counters = {'requests': 0, 'connections': 0, 'bytes_sent': 0, 'errors_injected': 0, 'updated_responses': 0,
+                             'families': {}, 'methods': {}, 'statuses': {}}
+            self.failures = []
+            self.drops = []
+            self.sizes = dict(self.initial_sizes)
+            self.last_modified = '2024-01-01T00:00:00Z'
+            self.accept_ranges = True
+        return
+
+    def stats(self):
+        '''This method returns how many requests and connections the server saw, by endpoint family, method and status,
+        how many bytes it sent, how many errors it injected and how many responses were updated.
+
+        :return: A dict
+        '''
+        with self.lock:
+            counters = dict(self.counters)
+            for name in ('families', 'methods', 'statuses'):
+                counters[name] = dict(self.counters[name])
+        return counters
+
+    def count(self, name, amount=1, key=None):
+        '''This method adds to a counter, or to one key of a counter. (Not a User-Facing Method)'''
+        with self.lock:
+            if key is None:
+                self.counters[name] += amount
+            else:
+                self.counters[name][key] = self.counters[name].get(key, 0) + amount
+        return
+
+    def fail(self, status, times=1, family=None, retry_after=None):
+        '''This method makes the next requests fail with an HTTP error, e.g. fail(503, times=2, family='export_start').
+
+        :param status: The HTTP status to answer with. (400, 401, 404, 429, 500, 503 or 504)
+        :type status: int
+        :param times: The number of requests to fail. (Default: 1)
+        :type times: int
+        :param family: Only fail the requests of this endpoint family (see endpoint_family()). (Default: every request)
+        :type family: str
+        :param retry_after: The Retry-After header to send with the errors. (Default: None)
+        :type retry_after: int
+        :return: Nothing
+        '''
+        assert status in FakeQualtrics.statuses and status != 200, 'Hey there! The status parameter must be 400, 401, 404, 429, 500, 503 or 504.'
+        assert isinstance(times, int) and times > 0, 'Hey there! The times parameter must be a positive integer.'
+        with self.lock:
+            self.failures.append({'status': status, 'times': times, 'family': family, 'retry_after': retry_after})
+        return
+
+    def drop(self, after, times=1):
+        '''This method makes the next export file downloads stop after sending a number of bytes of their body, as if the
+        connection dropped mid-stream. Set accept_ranges to False to ignore the Range header of the downloads that resume.
+
+        :param after: The number of bytes of the body to send before closing the connection.
+        :type after: int
+        :param times: The number of downloads to drop. (Default: 1)
+        :type times: int
+        :return: Nothing
+        '''
+        assert isinstance(after, int) and after >= 0, 'Hey there! The after parameter must be a non-negative integer.'
+        assert isinstance(times, int) and times > 0, 'Hey there! The times parameter must be a positive integer.'
+        with self.lock:
+            self.drops.extend([after] * times)
+        return
+
+    def injected_error(self, family):
+        '''This method returns the (status, retry_after) of the error a request must fail with, or None. (Not a User-Facing Method)'''
+        with self.lock:
+            for failure in self.failures:
+                if failure['times'] > 0 and failure['family'] in (None, family):
+                    failure['times'] -= 1
+                    return failure['status'], failure['retry_after']
+            for status, rate in self.error_rates.items():
+                if self.random.random() < rate:
+                    return status, self.retry_after if status in (429, 503) else None
+        return None
+
+    def handle(self, handler, method):
+        '''This method answers a single request. (Not a User-Facing Method)'''
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        split = urlsplit(handler.path)
+        path = '/' + '/'.join(part for part in split.path.split('/API/v3', 1)[-1].split('/') if part)
+        query = {name: values[-1] for name, values in parse_qs(split.query).items()}
+        family = endpoint_family(method, f'http://fake{path}')
+        self.count('requests')
+        self.count('families', key=family)
+        self.count('methods', key=method)
+        if self.latency:
+            t.sleep(self.latency)
+
+        retry_after = None
+        if handler.headers.get('x-api-token') != FakeQualtrics.token:
+            status, result = 401, None
+        else:
+            injected = self.injected_error(family)
+            if injected is not None:
+                (status, retry_after), result = injected, None
+                self.count('errors_injected')
+            else:
+                status, result = self.route(method, path, query, body)
+        self.respond(handler, status, result, retry_after)
+
+    def route(self, method, path, query, body):
+        '''This method finds the endpoint of a request and returns its (status, result). (Not a User-Facing Method)'''
+        for route_method, pattern, endpoint in self.routes:
+            match = pattern.match(path)
+            if route_method == method and match:
+                try:
+                    payload = json.loads(body) if body else {}
+                except ValueError:
+                    return 400, None
+                return endpoint(query, payload, *match.groups())
+        return 404, None
+
+    def respond(self, handler, status, result, retry_after=None):
+        '''This method sends a JSON envelope (meta and result), or the bytes of an export file from the start of its Range
+        header. (Not a User-Facing Method)'''
+        content_range, drop = None, None
+        if isinstance(result, bytes):
+            content_type, data = 'application/octet-stream', result
+            match = re.match(r'bytes=(\d+)-$', handler.headers.get('Range') or '')
+            if match and self.accept_ranges:
+                start = int(match.group(1))
+                if start >= len(result):
+                    error = {'errorCode': 'FAKE_416', 'errorMessage': 'Requested Range Not Satisfiable'}
+                    data = json.dumps({'meta': {'httpStatus': '416 - Requested Range Not Satisfiable', 'error': error}}).encode('utf-8')
+                    status, content_type, content_range = 416, 'application/json', f'bytes */{len(result)}'
+                else:
+                    status, data, content_range = 206, result[start:], f'bytes {start}-{len(result) - 1}/{len(result)}'
+            with self.lock:
+                drop = self.drops.pop(0) if self.drops else None
+        else:
+            meta = {'httpStatus': FakeQualtrics.statuses[status], 'requestId': f'fake-{self.counters["requests"]}'}
+            envelope = {'meta': meta}
+            if status == 200:
+                envelope['result'] = result
+            else:
+                meta['error'] = {'errorCode': f'FAKE_{status}', 'errorMessage': FakeQualtrics.statuses[status]}
+            content_type, data = 'application/json', json.dumps(envelope).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(data)))
+        if isinstance(result, bytes):
+            handler.send_header('Accept-Ranges', 'bytes' if self.accept_ranges else 'none')
+        if content_range is not None:
+            handler.send_header('Content-Range', content_range)
+        if retry_after is not None:
+            handler.send_header('Retry-After', str(retry_after))
+        handler.end_headers()
+        if drop is not None and drop < len(data):
+            data = data[:drop]
+            handler.close_connection = True
+        handler.wfile.write(data)
+        self.count('bytes_sent', len(data))
+        self.count('statuses', key=status)
+
+    def ident(self, prefix, index, length):
+        '''This method builds a Qualtrics-style id, e.g. ident('CG_', 7, 18) => "CG_000000000000007". (Not a User-Facing Method)'''
+        return prefix + str(index).zfill(length - len(prefix))
+
+    def index(self, ident, prefix):
+        '''This method returns the index a generated id was built from. (Not a User-Facing Method)'''
+        digits = ident[len(prefix):]
+        return int(digits) if digits.isdigit() else 0
+
+    def timestamp(self, index):
+        '''This method returns the creation date of a generated item in milliseconds. (Not a User-Facing Method)'''
+        return int((FakeQualtrics.epoch + timedelta(minutes=index)).timestamp() * 1000)
+
+    def page(self, query, total, item, path, default_size=100, extra=''):
+        '''This method returns one page of a paginated endpoint, with the full url of the next page. (Not a User-Facing Method)'''
+        size = int(query.get('pageSize') or default_size)
+        if self.max_page_size is not None:
+            size = min(size, self.max_page_size)
+        start = int(query.get('skipToken') or query.get('offset') or 0)
+        end = min(total, start + size)
+        next_page = f'{self.api_url}{path.lstrip("/")}?pageSize={size}&skipToken={end}{extra}' if end < total else None
+        return 200, {'elements': [item(index) for index in range(start, end)], 'nextPage': next_page}
+
+    def acknowledge(self, query, payload, *ids):
+        return 200, {}
+
+    def list_surveys(self, query, payload):
+        def survey(index):
+            return {'id': self.survey_id(index), 'name': f'Survey {index}', 'ownerId': 'UR_FAKEOWNER0000', 'isActive': index % 2 == 0,
+                    'lastModified': '2024-01-01T00:00:00Z', 'creationDate': '2024-01-01T00:00:00Z'}
+        return self.page(query, self.sizes['surveys'], survey, '/surveys')
+
+    def get_survey(self, query, payload, survey):
+        choices = {'QID1': [str(value) for value in range(1, 6)], 'QID2': [str(value) for value in range(11)], 'QID3': ['Sales', 'Support', 'Billing']}
+        questions = {}
+        for column, text, import_id in FakeQualtrics.columns[12:]:
+            question = import_id.split('_')[0]
+            questions[question] = {'questionName': column.split('_')[0], 'questionText': f'<p>{text}</p>', 'questionLabel': None,
+                                   'questionType': {'type': 'TE', 'selector': 'SL', 'subSelector': None} if question not in choices else
+                                                   {'type': 'MC', 'selector': 'SAVR', 'subSelector': 'TX'},
+                                   'choices': {str(position + 1): {'recode': choice, 'description': choice, 'choiceText': choice}
+                                               for position, choice in enumerate(choices.get(question, []))}}
+        export_column_map = {column: {'question': import_id.split('_')[0]} for column, text, import_id in FakeQualtrics.columns[12:]}
+        return 200, {'id': survey, 'name': f'Survey {self.index(survey, "SV_")}', 'ownerId': 'UR_FAKEOWNER0000', 'isActive': True,
+                     'creationDate': '2024-01-01T00:00:00Z', 'lastModifiedDate': self.last_modified, 'questions': questions,
+                     'exportColumnMap': export_column_map,
+                     'responseCounts': {'auditable': self.sizes['responses'], 'generated': 0, 'deleted': 0}}
+
+    def survey_metadata(self, query, payload, survey):
+        return 200, {'SurveyID': survey, 'SurveyName': f'Survey {self.index(survey, "SV_")}', 'SurveyStatus': 'Active',
+                     'LastModified': self.last_modified}
+
+    def contact(self, index):
+        return {'contactId': self.ident('CID_', index, 19), 'firstName': f'First{index}', 'lastName': f'Last{index}',
+                'email': f'contact{index}@example.com', 'phone': f'555{index % 10000000:07d}', 'unsubscribed': False,
+                'language': 'EN', 'extRef': f'EXT{index}'}
+
+    def list_contacts(self, query, payload, directory):
+        return self.page(query, self.sizes['contacts'], self.contact, f'/directories/{directory}/contacts')
+
+    def get_contact(self, query, payload, directory, contact):
+        index = self.index(contact, 'CID_')
+        result = dict(self.contact(index), creationDate=self.timestamp(index), lastModified=self.timestamp(index),
+                      embeddedData={'Department': f'D{index % 5}'}, stats={'sent': index % 3},
+                      mailingListMembership={self.ident('CG_', index % max(1, self.sizes['mailinglists']), 18): {'unsubscribed': False}})
+        return 200, result
+
+    def create_contact(self, query, payload, directory, mailing_list=None):
+        index = self.sizes['contacts'] + self.counters['requests']
+        return 200, {'id': self.ident('CID_', index, 19), 'contactLookupId': self.ident('CGC_', index, 19)}
+
+    def mailing_list(self, index):
+        return {'mailingListId': self.ident('CG_', index, 18), 'name': f'List {index}', 'ownerId': 'UR_FAKEOWNER0000',
+                'lastModifiedDate': self.timestamp(index), 'creationDate': self.timestamp(index),
+                'contactCount': self.sizes['list_contacts']}
+
+    def list_lists(self, query, payload, directory):
+        return self.page(query, self.sizes['mailinglists'], self.mailing_list, f'/directories/{directory}/mailinglists')
+
+    def get_list(self, query, payload, directory, mailing_list):
+        return 200, self.mailing_list(self.index(mailing_list, 'CG_'))
+
+    def create_list(self, query, payload, directory):
+        return 200, {'id': self.ident('CG_', self.sizes['mailinglists'] + self.counters['requests'], 18)}
+
+    def list_list_contacts(self, query, payload, directory, mailing_list):
+        def member(index):
+            return dict(self.contact(index), contactLookupId=self.ident('CGC_', index, 19))
+        return self.page(query, self.sizes['list_contacts'], member, f'/directories/{directory}/mailinglists/{mailing_list}/contacts')
+
+    def distribution(self, index, survey):
+        return {'id': self.ident('EMD_', index, 19), 'parentDistributionId': None, 'ownerId': 'UR_FAKEOWNER0000',
+                'organizationId': 'fake', 'requestStatus': 'Done', 'requestType': 'Invite',
+                'sendDate': '2024-01-01T00:00:00Z', 'createdDate': '2024-01-01T00:00:00Z', 'modifiedDate': '2024-01-01T00:00:00Z',
+                'headers': {'fromEmail': 'noreply@example.com', 'replyToEmail': 'noreply@example.com', 'fromName': 'Fake', 'subject': 'Survey'},
+                'recipients': {'mailingListId': self.ident('CG_', 0, 18), 'contactId': None, 'libraryId': FakeQualtrics.library_id, 'sampleId': None},
+                'message': {'libraryId': FakeQualtrics.library_id, 'messageId': self.ident('MS_', 0, 18), 'messageText': None},
+                'surveyLink': {'surveyId': survey, 'expirationDate': '2025-01-01T00:00:00Z', 'linkType': 'Individual'},
+                'stats': {'sent': 10, 'failed': 0, 'started': 5, 'bounced': 0, 'opened': 7, 'skipped': 0, 'finished': 4,
+                          'complaints': 0, 'blocked': 0}}
+
+    def list_distributions(self, query, payload):
+        survey = query.get('surveyId')
+        if survey is None:
+            return 400, None
+        return self.page(query, self.sizes['distributions'], lambda index: self.distribution(index, survey), '/distributions',
+                         extra=f'&surveyId={survey}')
+
+    def get_distribution(self, query, payload, distribution):
+        return 200, self.distribution(self.index(distribution, 'EMD_'), query.get('surveyId'))
+
+    def create_distribution(self, query, payload):
+        return 200, {'id': self.ident('EMD_', self.sizes['distributions'] + self.counters['requests'], 19)}
+
+    def create_follow_up(self, query, payload, distribution):
+        return 200, {'distributionId': self.ident('EMD_', self.sizes['distributions'] + self.counters['requests'], 19)}
+
+    def message(self, index):
+        categories = ['invite', 'reminder', 'thankYou', 'smsInvite', 'emailSubject', 'general', 'endOfSurvey']
+        return {'id': self.ident('MS_', index, 18), 'description': f'Message {index}', 'category': categories[index % len(categories)]}
+
+    def list_messages(self, query, payload, library):
+        return self.page(query, self.sizes['messages'], self.message, f'/libraries/{library}/messages')
+
+    def get_message(self, query, payload, library, message):
+        result = self.message(self.index(message, 'MS_'))
+        result['messages'] = {'en': f'<p>{result["description"]}</p>'}
+        return 200, result
+
+    def create_response(self, query, payload, survey):
+        return 200, {'responseId': self.ident('R_', self.sizes['responses'] + self.counters['requests'], 17)}
+
+    def get_response(self, query, payload, survey, response):
+        index = self.index(response, 'R_')
+        row = self.response_row(index)
+        values = {column[2]: value for column, value in zip(FakeQualtrics.columns, row)}
+        return 200, {'responseId': response, 'values': values, 'labels': {}, 'displayedFields': [], 'displayedValues': {}}
+
+    def start_update(self, query, payload, survey):
+        self.count('updated_responses', len(payload.get('updates', [])))
+        with self.lock:
+            progress_id = self.ident('BPR_', len(self.jobs), 19)
+            self.jobs[progress_id] = {'polls': 0}
+        return 200, {'progressId': progress_id}
+
+    def update_progress(self, query, payload, survey, progress_id):
+        return 200, {'percentComplete': 100.0, 'status': 'complete'}
+
+    def start_export(self, query, payload, survey):
+        if payload.get('format', 'csv') not in FakeQualtrics.export_formats:
+            return 400, None
+        with self.lock:
+            progress_id = self.ident('ES_', len(self.jobs), 18)
+            self.jobs[progress_id] = {'polls': 0, 'survey': survey, 'payload': payload, 'started': t.monotonic()}
+        return 200, {'progressId': progress_id, 'percentComplete': 0.0, 'status': 'inProgress'}
+
+    def export_progress(self, query, payload, survey, progress_id):
+        with self.lock:
+            job = self.jobs.get(progress_id)
+            if job is None:
+                return 404, None
+            job['polls'] += 1
+            polls = job['polls']
+        share = polls / self.export_polls
+        if self.export_seconds:
+            share = min(share, (t.monotonic() - job['started']) / self.export_seconds)
+        if share < 1:
+            return 200, {'percentComplete': round(100.0 * share, 1), 'status': 'inProgress'}
+        return 200, {'percentComplete': 100.0, 'status': 'complete', 'fileId': f'{progress_id}-file'}
+
+    def export_file(self, query, payload, survey, file_id):
+        job = self.jobs.get(file_id[:-len('-file')])
+        if job is None or not file_id.endswith('-file'):
+            return 404, None
+        rows = self.export_rows(job['payload'])
+        file_format = job['payload'].get('format', 'csv')
+        key = (rows.start, rows.stop, file_format)
+        with self.lock:
+            content = self.exports.get(key)
+        if content is None:
+            content = self.export_zip(survey, rows, file_format)
+            with self.lock:
+                self.exports[key] = content
+        return 200, content
+
+    def export_rows(self, payload):
+        '''This method returns the range of responses an export includes, after its startDate, endDate and limit. (Not a User-Facing Method)'''
+        def first_recorded_at(date):
+            date = parse(date)
+            date = date if date.tzinfo is not None else date.replace(tzinfo=timezone.utc)
+            return math.ceil((date - FakeQualtrics.epoch).total_seconds() / 60)
+
+        start, stop = 0, self.sizes['responses']
+        if payload.get('startDate'):
+            start = max(start, first_recorded_at(payload['startDate']))
+        if payload.get('endDate'):
+            stop = min(stop, first_recorded_at(payload['endDate']))
+        stop = max(start, stop)
+        if payload.get('limit') is not None:
+            stop = min(stop, start + payload['limit'])
+        return range(start, stop)
+
+    def response_row(self, index):
+        '''This method returns the values of a generated response. Response n is recorded n minutes after 2024-01-01. (Not a User-Facing Method)'''
+        recorded = FakeQualtrics.epoch + timedelta(minutes=index)
+        duration = 60 + index % 600
+        started = recorded - timedelta(seconds=duration)
+        return [started.strftime('%Y-%m-%d %H:%M:%S'), recorded.strftime('%Y-%m-%d %H:%M:%S'), 0,
+                f'10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}', 100, duration, 1,
+                recorded.strftime('%Y-%m-%d %H:%M:%S'), self.ident('R_', index, 17), f'EXT{index}', 'anonymous', 'EN',
+                index % 5 + 1, index % 11, ['Sales', 'Support', 'Billing'][index % 3],
+                '' if index % 4 else f'Comment number {index}, with "quotes" and commas']
+
+    def response_record(self, index):
+        '''This method returns a generated response as a record of a json or ndjson export, whose values are keyed by
+        import id. Unanswered questions are left out. (Not a User-Facing Method)'''
+        row = self.response_row(index)
+        values = {column[2]: value for column, value in zip(FakeQualtrics.columns, row) if value != ''}
+        return {'responseId': row[8], 'values': values, 'labels': {}, 'displayedFields': list(values), 'displayedValues': {}}
+
+    def export_zip(self, survey, rows, file_format='csv'):
+        '''This method writes the zipped file of an export. csv and tsv (UTF-16, like Qualtrics writes it) files have 3
+        header rows (column names, question texts and import ids) followed by one row per response, json files hold
+        {"responses": [...]}, ndjson files a response per line and xml files a <Response> element per response.
+        (Not a User-Facing Method)'''
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as export_zip:
+            with export_zip.open(f'Survey {survey}.{file_format}', 'w') as export_file:
+                if file_format == 'tsv':
+                    export_file.write(codecs.BOM_UTF16_LE)
+                text = io.TextIOWrapper(export_file, encoding='utf-16-le' if file_format == 'tsv' else 'utf-8', newline='')
+                if file_format in ('csv', 'tsv'):
+                    writer = csv.writer(text, delimiter='\t' if file_format == 'tsv' else ',')
+                    writer.writerow([column[0] for column in FakeQualtrics.columns])
+                    writer.writerow([column[1] for column in FakeQualtrics.columns])
+                    writer.writerow([json.dumps({'ImportId': column[2]}) for column in FakeQualtrics.columns])
+                    writer.writerows(self.response_row(index) for index in rows)
+                elif file_format == 'ndjson':
+                    text.writelines(json.dumps(self.response_record(index)) + '\n' for index in rows)
+                elif file_format == 'json':
+                    text.write('{"responses":[')
+                    text.write(','.join(json.dumps(self.response_record(index)) for index in rows))
+                    text.write(']}')
+                else:
+                    text.write('<?xml version="1.0" encoding="UTF-8"?>\n<Responses>')
+                    for index in rows:
+                        fields = ''.join(f'<{column[2]}>{escape(str(value))}</{column[2]}>'
+                                         for column, value in zip(FakeQualtrics.columns, self.response_row(index)))
+                        text.write(f'<Response>{fields}</Response>')
+                    text.write('</Responses>')
+                text.flush()
+                text.detach()
+        return buffer.getvalue()
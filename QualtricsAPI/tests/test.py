@@ -2,15 +2,39 @@
 ## python3 -m unittest QualtricsAPI/tests/test.py
 
 import unittest
+import asyncio
+import subprocess
+import sys
+import inspect
+import threading
+import json
+import time
+import os
+import tempfile
+import zipfile
+import io
+import importlib.util
+import requests
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pandas as pd
-from QualtricsAPI.Setup import Credentials
+from QualtricsAPI.Setup import Credentials, AsyncCredentials, ClientConfig, LazyModule
+from QualtricsAPI.Transport import RateLimiter, TokenBucket, RetryPolicy, AdaptiveConcurrency, CircuitBreaker, endpoint_family
+from QualtricsAPI.Transport import ResponseCache, MemoryCache, DiskCache
+from QualtricsAPI.Transport import Hooks, Subscriber, LoggingSubscriber, PrometheusSubscriber, OpenTelemetrySubscriber
+from QualtricsAPI.Users import Surveys
+from QualtricsAPI.tests.fake_server import FakeQualtrics
+from QualtricsAPI.Exceptions import Qualtrics400Error, Qualtrics503Error, Qualtrics429Error, QualtricsCircuitOpenError, QualtricsExportError
 from QualtricsAPI.Survey import Responses
 from QualtricsAPI.JSON import Parser
 from QualtricsAPI.XM import MailingList
 from QualtricsAPI.XM import XMDirectory
 from QualtricsAPI.Library import Messages
 from QualtricsAPI.Survey import Distributions
-from datetime import date, datetime, timedelta
+from QualtricsAPI.Survey import AsyncResponses, AsyncDistributions
+from QualtricsAPI.Survey import ExportJob, AsyncExportJob, PollSchedule, JSONWatermarkStore, SQLiteWatermarkStore, SurveyDefinitionCache, ExportCache
+from QualtricsAPI.XM import AsyncMailingList, AsyncXMDirectory
+from datetime import datetime, timedelta
 from time import gmtime
 
 # Setup Tests Class
@@ -1478,5 +1502,1842 @@ class TestQualtricsAPI(unittest.TestCase):
     #     with self.assertRaises(AssertionError):
     #         XMDirectory().create_contact_in_XM(metadata=tupleMetadata)
 
+#UnitTest Class: Transport
+class TestTransport(unittest.TestCase):
+
+    def tearDown(self):
+        Credentials.configure_transport()
+
+    def test_transport_shared_across_subclasses(self):
+        '''This method tests that every Credentials subclass sends its requests through the same pooled transport.'''
+        transport = Credentials.configure_transport(pool_connections=4, pool_maxsize=8)
+        self.assertIs(Responses().transport, transport)
+        self.assertIs(XMDirectory().transport, transport)
+        self.assertIs(MailingList().transport, transport)
+        self.assertEqual(transport.session.get_adapter('https://fake.qualtrics.com')._pool_maxsize, 8)
+
+    def test_transport_keep_alive_off(self):
+        '''This method tests that disabling keep-alive asks the server to close each connection.'''
+        transport = Credentials.configure_transport(keep_alive=False)
+        self.assertEqual(transport.session.headers['Connection'], 'close')
+
+    def test_transport_bad_pool_size(self):
+        '''This method tests that an assertion is raised when the user configures a pool size that is not a positive integer.'''
+        with self.assertRaises(AssertionError):
+            Credentials.configure_transport(pool_maxsize=0)
+
+class TestAsyncClient(unittest.TestCase):
+
+    def tearDown(self):
+        AsyncCredentials.configure_async_transport()
+
+    def test_async_classes_await_requests(self):
+        '''This method tests that each Async* class keeps the interface of its synchronous parent but must be awaited.'''
+        for async_class, sync_class in [(AsyncResponses, Responses), (AsyncXMDirectory, XMDirectory), (AsyncMailingList, MailingList), (AsyncDistributions, Distributions)]:
+            self.assertTrue(issubclass(async_class, sync_class))
+            self.assertTrue(inspect.iscoroutinefunction(async_class.api_request))
+
+    def test_async_transport_shared_per_loop(self):
+        '''This method tests that every Async* class running on the same event loop shares one pooled transport.'''
+        AsyncCredentials.configure_async_transport(pool_connections=2, pool_maxsize=4, retry_policy=False)
+
+        async def transports():
+            loop = asyncio.get_running_loop()
+            for client in [AsyncResponses(), AsyncXMDirectory(), AsyncMailingList(), AsyncDistributions()]:
+                try:
+                    await client.api_request("GET", "http://127.0.0.1:9/")
+                except Exception:
+                    pass
+            transport = AsyncCredentials.async_transports[loop]
+            await AsyncCredentials.close_async_transport()
+            return transport, len(AsyncCredentials.async_transports)
+
+        transport, remaining = asyncio.run(transports())
+        self.assertEqual(transport.pool_maxsize, 4)
+        self.assertEqual(remaining, 0)
+
+    def test_async_ml_bad_ml_id_rename(self):
+        '''This method tests that the async client runs the same validation as the synchronous client.'''
+        with self.assertRaises(AssertionError):
+            asyncio.run(AsyncMailingList().rename_list(mailing_list='ThisIsaFakeIDwo/CG', name='Fake'))
+
+    def test_async_dist_bad_survey_id(self):
+        '''This method tests that an assertion is raised in the async Distributions Module when the user enters a survey id that is incorrect.'''
+        with self.assertRaises(AssertionError):
+            asyncio.run(AsyncDistributions().list_distributions(survey='ThisIsaFakeSurveyID'))
+
+    def test_async_setup_request_not_available(self):
+        '''This method tests that the version 2 setup_request method of AsyncResponses raises at once and names its replacement.'''
+        with self.assertRaisesRegex(AttributeError, 'start_export'):
+            AsyncResponses().setup_request(survey='SV_000000000000000')
+
+    def test_async_send_request_not_available(self):
+        '''This method tests that the version 2 send_request method of AsyncResponses raises at once and names its replacement.'''
+        with self.assertRaisesRegex(AttributeError, 'get_survey_responses'):
+            AsyncResponses().send_request(survey='SV_000000000000000')
+
+    def test_async_get_responses_not_available(self):
+        '''This method tests that the version 2 get_responses method of AsyncResponses raises at once and names its replacement.'''
+        with self.assertRaisesRegex(AttributeError, 'get_survey_responses'):
+            AsyncResponses().get_responses(survey='SV_000000000000000')
+
+    def test_async_get_questions_not_available(self):
+        '''This method tests that the version 2 get_questions method of AsyncResponses raises at once and names its replacement.'''
+        with self.assertRaisesRegex(AttributeError, 'get_survey_questions'):
+            AsyncResponses().get_questions(survey='SV_000000000000000')
+
+    def test_async_bad_pool_size(self):
+        '''This method tests that an assertion is raised when the user configures an async pool size that is not a positive integer.'''
+        with self.assertRaises(AssertionError):
+            AsyncCredentials.configure_async_transport(pool_connections=0)
+
+class TestClientConfig(unittest.TestCase):
+
+    token = 'ThisIsaFakeAPITokenAndIsTooShortToWork!!'
+    other_token = 'ThisIsAnotherFakeAPITokenForTheTestCase!'
+    directory_id = 'POOL_ThisIsaFakeID!!'
+
+    def test_config_precomputes_headers(self):
+        '''This method tests that a ClientConfig builds the headers and base urls for its own brand.'''
+        config = ClientConfig(self.token, 'FAKE', self.directory_id)
+        self.assertEqual(config.headers, {'x-api-token': self.token})
+        self.assertEqual(config.json_headers['Content-Type'], 'application/json')
+        self.assertEqual(config.xm_url, f'https://FAKE.qualtrics.com/API/v3/directories/{self.directory_id}/')
+        self.assertIs(config.base_url('surveys'), config.base_url('surveys'))
+
+    def test_config_is_immutable(self):
+        '''This method tests that a ClientConfig cannot be changed once it is created.'''
+        config = ClientConfig(self.token, 'FAKE')
+        with self.assertRaises(AttributeError):
+            config.token = self.other_token
+
+    def test_config_bad_token(self):
+        '''This method tests that an assertion is raised when a ClientConfig is created with an api token that is too short.'''
+        with self.assertRaises(AssertionError):
+            ClientConfig(setup_tests().setup_test_token(short=True), 'FAKE')
+
+    def test_config_per_instance(self):
+        '''This method tests that two modules in one process use their own brand's credentials.'''
+        first = XMDirectory(config=ClientConfig(self.token, 'FAKE', self.directory_id))
+        second = Responses(config=ClientConfig(self.other_token, 'OTHER'))
+        headers, base_url = first.header_setup(xm=True)
+        self.assertEqual(headers['x-api-token'], self.token)
+        self.assertTrue(base_url.startswith('https://FAKE.qualtrics.com'))
+        headers, base_url = second.header_setup(content_type=True, xm=False, path='surveys')
+        self.assertEqual(headers['x-api-token'], self.other_token)
+        self.assertEqual(base_url, 'https://OTHER.qualtrics.com/API/v3/surveys')
+
+    def test_config_headers_are_read_only(self):
+        '''This method tests that a header added by a caller does not leak into the later requests of a ClientConfig.'''
+        responses = Responses(config=ClientConfig(self.token, 'FAKE'))
+        headers, _ = responses.header_setup(content_type=True, xm=False, path='surveys')
+        headers['Accept'] = 'text/csv'
+        self.assertNotIn('Accept', responses.header_setup(content_type=True, xm=False, path='surveys')[0])
+        with self.assertRaises(TypeError):
+            responses.config.headers['Accept'] = 'text/csv'
+
+    def test_config_from_module_parameters(self):
+        '''This method tests that the token, data_center and directory_id parameters of a module build its ClientConfig.'''
+        ml = MailingList(token=self.token, directory_id=self.directory_id, data_center='FAKE')
+        self.assertEqual(ml.config, ClientConfig(self.token, 'FAKE', self.directory_id))
+
+    def test_config_xm_without_directory(self):
+        '''This method tests that an assertion is raised when an XM Directory endpoint is used without a directory id.'''
+        with self.assertRaises(AssertionError):
+            XMDirectory(config=ClientConfig(self.token, 'FAKE')).header_setup(xm=True)
+
+class TestRateLimiter(unittest.TestCase):
+
+    base_url = 'https://FAKE.qualtrics.com/API/v3/'
+
+    def tearDown(self):
+        Credentials.configure_transport()
+
+    def test_endpoint_families(self):
+        '''This method tests that requests are classified into the endpoint families that Qualtrics limits separately.'''
+        self.assertEqual(endpoint_family('POST', self.base_url + 'surveys/SV_ThisIsaFakeID!!/export-responses/'), 'export_start')
+        self.assertEqual(endpoint_family('GET', self.base_url + 'surveys/SV_ThisIsaFakeID!!/export-responses/ES_Fake'), 'export_progress')
+        self.assertEqual(endpoint_family('GET', self.base_url + 'surveys/SV_ThisIsaFakeID!!/export-responses/FILE_Fake/file'), 'export_file')
+        self.assertEqual(endpoint_family('GET', self.base_url + 'directories/POOL_ThisIsaFakeID!!//contacts?pageSize=100'), 'contacts')
+        self.assertEqual(endpoint_family('GET', self.base_url + 'directories/POOL_ThisIsaFakeID!!//mailinglists/CG_Fake/contacts'), 'contacts')
+        self.assertEqual(endpoint_family('POST', self.base_url + 'distributions'), 'distributions')
+        self.assertEqual(endpoint_family('GET', self.base_url + 'libraries/UR_Fake/messages/'), 'libraries')
+
+    def test_token_bucket_waits_when_empty(self):
+        '''This method tests that a token bucket allows its burst and then asks callers to wait for the refill.'''
+        bucket = TokenBucket(rate=10, capacity=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, places=2)
+
+    def test_token_bucket_thread_safe(self):
+        '''This method tests that concurrent reservations never hand out the same token twice.'''
+        bucket = TokenBucket(rate=0.001, capacity=100)
+        waits = []
+        threads = [threading.Thread(target=lambda: waits.extend(bucket.reserve() for _ in range(50))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(1 for wait in waits if wait == 0), 100)
+
+    def test_rate_limiter_per_endpoint(self):
+        '''This method tests that each endpoint family spends its own budget as well as the brand-wide budget.'''
+        limiter = RateLimiter(limits={'export_start': 10, 'default': 600}, headroom=0.2)
+        start = self.base_url + 'surveys/SV_ThisIsaFakeID!!/export-responses/'
+        self.assertEqual([limiter.reserve('POST', start) for _ in range(2)], [0, 0])
+        self.assertGreater(limiter.reserve('POST', start), 0)
+        self.assertEqual(limiter.reserve('GET', self.base_url + 'surveys'), 0)
+
+    def test_rate_limiter_pluggable(self):
+        '''This method tests that the transport accepts its own limiter, or none at all.'''
+        limiter = RateLimiter(limits={'contacts': 60})
+        self.assertIs(Credentials.configure_transport(rate_limiter=limiter).rate_limiter, limiter)
+        self.assertIsNone(Credentials.configure_transport(rate_limiter=False).rate_limiter)
+        with self.assertRaises(AssertionError):
+            Credentials.configure_transport(rate_limiter='fast')
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    '''This handler fails the first "failures" requests with a 503 and then answers with an empty page of surveys.'''
+
+    failures = 0
+    requests = 0
+    status = 503
+    retry_after = None
+    messages = {503: '503 - Temporary Internal Server Error', 429: '429 - Too Many Requests', 200: '200 - OK'}
+
+    def do_GET(self):
+        FlakyHandler.requests += 1
+        failed = FlakyHandler.requests <= FlakyHandler.failures
+        status = FlakyHandler.status if failed else 200
+        meta = {'httpStatus': FlakyHandler.messages[status]}
+        body = json.dumps({'meta': meta, 'result': {'elements': [], 'nextPage': None}}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if failed and FlakyHandler.retry_after is not None:
+            self.send_header('Retry-After', FlakyHandler.retry_after)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return
+
+class TestRetryPolicy(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}/API/v3/surveys'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FlakyHandler.requests = 0
+        FlakyHandler.status = 503
+        FlakyHandler.retry_after = None
+
+    def tearDown(self):
+        Credentials.configure_transport()
+
+    def test_retry_backoff_is_bounded(self):
+        '''This method tests that the jittered backoff grows exponentially up to max_backoff.'''
+        policy = RetryPolicy(backoff=0.5, max_backoff=4)
+        for attempt, ceiling in [(1, 0.5), (2, 1), (3, 2), (4, 4), (10, 4)]:
+            self.assertTrue(0 <= policy.delay(attempt) <= ceiling)
+        self.assertEqual(RetryPolicy(backoff=0.5, max_backoff=4, jitter=False).delay(3), 2)
+
+    def test_retry_classification(self):
+        '''This method tests that server errors and connection errors are retried, but client errors are not.'''
+        policy = RetryPolicy()
+        self.assertTrue(policy.retryable(status=503))
+        self.assertTrue(policy.retryable(error=ConnectionError()))
+        self.assertFalse(policy.retryable(status=401))
+        self.assertFalse(policy.retryable(status=200))
+        self.assertTrue(policy.retryable(error=ConnectionError(), method='GET'))
+        self.assertFalse(policy.retryable(error=ConnectionError(), method='POST'))
+        self.assertTrue(policy.retryable(status=503, method='POST'))
+        self.assertTrue(RetryPolicy(retry_methods=('GET', 'POST')).retryable(error=ConnectionError(), method='post'))
+
+    def test_post_connection_errors_not_retried(self):
+        '''This method tests that a POST that fails without a response is not sent again, while a GET is.'''
+        policy = RetryPolicy(max_attempts=3, backoff=0)
+        transport = Credentials.configure_transport(rate_limiter=False, breaker=False, retry_policy=policy)
+        unreachable = 'http://127.0.0.1:9/API/v3/surveys'
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            transport.request('POST', unreachable)
+        self.assertEqual(policy.stats()['retries'], 0)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            transport.request('GET', unreachable)
+        self.assertEqual(policy.stats()['retries'], 2)
+
+    def test_retry_max_attempts_and_deadline(self):
+        '''This method tests that a request is no longer retried once max_attempts or the deadline is reached.'''
+        policy = RetryPolicy(max_attempts=3, backoff=0)
+        started = time.monotonic()
+        self.assertIsNotNone(policy.next_delay(1, started, status=503))
+        self.assertIsNotNone(policy.next_delay(2, started, status=503))
+        self.assertIsNone(policy.next_delay(3, started, status=503))
+        self.assertIsNone(RetryPolicy(deadline=1, backoff=5, jitter=False).next_delay(1, started, status=503))
+        stats = policy.stats()
+        self.assertEqual((stats['requests'], stats['attempts'], stats['retries'], stats['exhausted']), (1, 3, 2, 1))
+        self.assertEqual(stats['statuses'], {503: 3})
+
+    def test_transport_retries_server_errors(self):
+        '''This method tests that the transport retries a 503 until it succeeds and counts the retries.'''
+        FlakyHandler.failures = 2
+        policy = RetryPolicy(backoff=0.01)
+        transport = Credentials.configure_transport(rate_limiter=False, retry_policy=policy)
+        self.assertEqual(transport.request('GET', self.url).status_code, 200)
+        self.assertEqual(FlakyHandler.requests, 3)
+        self.assertEqual(policy.stats()['retries'], 2)
+
+    def test_transport_gives_up(self):
+        '''This method tests that a module raises the Qualtrics error once the retry policy is exhausted, instead of retrying forever.'''
+        FlakyHandler.failures = 100
+        Credentials.configure_transport(rate_limiter=False, retry_policy=RetryPolicy(max_attempts=2, backoff=0.01))
+        surveys = Surveys(config=ClientConfig('ThisIsaFakeAPITokenAndIsTooShortToWork!!', 'FAKE'))
+        surveys.header_setup = lambda content_type=False, xm=False, path=None: ({}, self.url)
+        with self.assertRaises(Qualtrics503Error):
+            surveys.list_user_surveys()
+        self.assertEqual(FlakyHandler.requests, 2)
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}/API/v3/surveys'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FlakyHandler.requests = 0
+        FlakyHandler.status = 429
+        FlakyHandler.retry_after = None
+
+    def tearDown(self):
+        Credentials.configure_transport()
+
+    def test_aimd_limit(self):
+        '''This method tests that a 429 halves the concurrency limit and successful responses grow it back additively.'''
+        concurrency = AdaptiveConcurrency(maximum=8, minimum=2)
+        concurrency.acquire()
+        concurrency.release(status=429)
+        self.assertEqual(concurrency.stats()['limit'], 4)
+        for _ in range(3):
+            concurrency.acquire()
+            concurrency.release(status=429)
+        self.assertEqual(concurrency.stats()['limit'], 2)
+        for _ in range(8):
+            concurrency.acquire()
+            concurrency.release(status=200)
+        self.assertEqual(concurrency.stats()['limit'], 4)
+        self.assertEqual(concurrency.stats()['throttled'], 4)
+
+    def test_concurrency_shared_by_threads_and_coroutines(self):
+        '''This method tests that no more requests than the limit are ever in flight, from threads or coroutines.'''
+        concurrency = AdaptiveConcurrency(maximum=2)
+        peak = []
+
+        def work():
+            concurrency.acquire()
+            peak.append(concurrency.stats()['in_flight'])
+            time.sleep(0.01)
+            concurrency.release(status=200)
+
+        async def async_work():
+            await concurrency.acquire_async()
+            peak.append(concurrency.stats()['in_flight'])
+            await asyncio.sleep(0.01)
+            concurrency.release(status=200)
+
+        async def run_all():
+            await asyncio.gather(*[async_work() for _ in range(6)])
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        asyncio.run(run_all())
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(peak), 12)
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(concurrency.stats()['in_flight'], 0)
+
+    def test_transport_honors_retry_after(self):
+        '''This method tests that the transport waits for the Retry-After of a 429 before retrying, and shrinks its concurrency.'''
+        FlakyHandler.failures = 1
+        FlakyHandler.retry_after = '0.2'
+        transport = Credentials.configure_transport(rate_limiter=False, retry_policy=RetryPolicy(backoff=0.01))
+        started = time.monotonic()
+        self.assertEqual(transport.request('GET', self.url).status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(FlakyHandler.requests, 2)
+        self.assertEqual(transport.concurrency.stats()['throttled'], 1)
+
+    def test_transport_raises_429(self):
+        '''This method tests that a Qualtrics429Error is raised once the retry policy stops retrying a throttled request.'''
+        FlakyHandler.failures = 100
+        Credentials.configure_transport(rate_limiter=False, retry_policy=False)
+        with self.assertRaises(Qualtrics429Error):
+            Credentials().api_request('GET', self.url)
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    export_url = 'https://FAKE.qualtrics.com/API/v3/surveys/SV_ThisIsaFakeID!!/export-responses/'
+    contacts_url = 'https://FAKE.qualtrics.com/API/v3/directories/POOL_ThisIsaFakeID!!/contacts'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}/API/v3/surveys'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def tearDown(self):
+        Credentials.configure_transport()
+
+    def test_breaker_opens_and_recovers(self):
+        '''This method tests that a circuit opens after consecutive failures, probes once half open, and closes on success.'''
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        key = breaker.key('POST', self.export_url)
+        for _ in range(2):
+            breaker.admit(key)
+            breaker.record(key, status=503)
+        self.assertEqual(breaker.state(key), 'open')
+        with self.assertRaises(QualtricsCircuitOpenError):
+            breaker.admit(key)
+        time.sleep(0.06)
+        self.assertEqual(breaker.state(key), 'half_open')
+        breaker.admit(key)
+        with self.assertRaises(QualtricsCircuitOpenError):
+            breaker.admit(key)
+        breaker.record(key, status=200)
+        self.assertEqual(breaker.state(key), 'closed')
+        stats = breaker.stats()['export_start@fake.qualtrics.com']
+        self.assertEqual((stats['opened'], stats['rejected'], stats['errors']), (1, 2, 2))
+
+    def test_breaker_half_open_failure_reopens(self):
+        '''This method tests that a failed probe opens the circuit again.'''
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        key = breaker.key('GET', self.contacts_url)
+        breaker.record(key, error=ConnectionError())
+        time.sleep(0.06)
+        breaker.admit(key)
+        breaker.record(key, status=500)
+        self.assertEqual(breaker.state(key), 'open')
+
+    def test_breaker_keyed_by_family_and_data_center(self):
+        '''This method tests that an open circuit does not stop other endpoint families or other data centers.'''
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record(breaker.key('POST', self.export_url), status=500)
+        breaker.admit(breaker.key('GET', self.contacts_url))
+        breaker.admit(breaker.key('POST', self.export_url.replace('FAKE', 'OTHER')))
+        with self.assertRaises(QualtricsCircuitOpenError):
+            breaker.admit(breaker.key('POST', self.export_url))
+
+    def test_transport_fails_fast(self):
+        '''This method tests that the transport stops contacting Qualtrics once the circuit of an endpoint is open.'''
+        FlakyHandler.requests = 0
+        FlakyHandler.failures = 100
+        FlakyHandler.status = 503
+        FlakyHandler.retry_after = None
+        Credentials.configure_transport(rate_limiter=False, retry_policy=False, breaker=CircuitBreaker(failure_threshold=2))
+        for _ in range(2):
+            self.assertEqual(Credentials().api_request('GET', self.url).status_code, 503)
+        with self.assertRaises(QualtricsCircuitOpenError):
+            Credentials().api_request('GET', self.url)
+        self.assertEqual(FlakyHandler.requests, 2)
+
+class ETagHandler(BaseHTTPRequestHandler):
+    '''This handler serves a mailing list with an ETag, answers 304 when the client already has it, and accepts changes.'''
+
+    requests = []
+
+    def respond(self, status, body=b'', etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        ETagHandler.requests.append(('GET', self.path, self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == '"v1"':
+            return self.respond(304, etag='"v1"')
+        body = json.dumps({'meta': {'httpStatus': '200 - OK'}, 'result': {'name': 'List', 'path': self.path}}).encode()
+        self.respond(200, body, etag='"v1"')
+
+    def do_PUT(self):
+        ETagHandler.requests.append(('PUT', self.path, None))
+        self.respond(200, json.dumps({'meta': {'httpStatus': '200 - OK'}}).encode())
+
+    do_DELETE = do_PUT
+
+    def log_message(self, *args):
+        return
+
+class TestResponseCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ETagHandler)
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}/API/v3'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        Credentials.configure_transport()
+
+    def setUp(self):
+        ETagHandler.requests = []
+        self.headers = {'x-api-token': 'TOKEN'}
+        self.list_url = f'{self.base}/directories/POOL_1/mailinglists/CG_1'
+        self.lists_url = f'{self.base}/directories/POOL_1/mailinglists'
+
+    def entry(self, size):
+        return {'content': b'x' * size, 'host': 'fake', 'path': '/', 'family': 'surveys'}
+
+    def get(self, url, headers=None):
+        return Credentials.transport.request('GET', url, headers=headers or self.headers)
+
+    def test_memory_cache_evicts_least_recently_used(self):
+        '''This method tests that the memory backend evicts the least recently used entries once it is full.'''
+        backend = MemoryCache(max_bytes=10)
+        backend.set('a', self.entry(4))
+        backend.set('b', self.entry(4))
+        backend.get('a')
+        backend.set('c', self.entry(4))
+        self.assertIsNotNone(backend.get('a'))
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.size, 8)
+
+    def test_disk_cache_persists_and_evicts(self):
+        '''This method tests that the disk backend is shared between instances and stays within max_bytes.'''
+        with tempfile.TemporaryDirectory() as directory:
+            DiskCache(directory).set('a', self.entry(100))
+            self.assertEqual(DiskCache(directory).get('a')['content'], b'x' * 100)
+            backend = DiskCache(directory, max_bytes=400)
+            backend.set('b', self.entry(300))
+            self.assertLessEqual(backend.size, 400)
+            self.assertIsNone(backend.get('a'))
+            self.assertIsNotNone(backend.get('b'))
+
+    def test_cache_hit_and_ttl(self):
+        '''This method tests that a cached GET is served without a request until its ttl has passed.'''
+        cache = ResponseCache(ttls={'mailinglists': 0.2})
+        Credentials.configure_transport(rate_limiter=False, retry_policy=False, cache=cache)
+        first = self.get(self.list_url)
+        second = self.get(self.list_url)
+        self.assertEqual(second.json(), first.json())
+        self.assertTrue(second.from_cache)
+        self.assertEqual(len(ETagHandler.requests), 1)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_stale_entry_is_revalidated_with_etag(self):
+        '''This method tests that a stale entry is revalidated with If-None-Match and served again on a 304.'''
+        cache = ResponseCache(ttls={'mailinglists': 0.05})
+        Credentials.configure_transport(rate_limiter=False, retry_policy=False, cache=cache)
+        self.get(self.list_url)
+        time.sleep(0.06)
+        response = self.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['result']['name'], 'List')
+        self.assertEqual(ETagHandler.requests[-1][2], '"v1"')
+        self.assertEqual(cache.stats()['revalidated'], 1)
+
+    def test_changes_invalidate_resource_and_collection(self):
+        '''This method tests that a PUT on a mailing list invalidates it and the list of lists, but not its siblings.'''
+        cache = ResponseCache()
+        Credentials.configure_transport(rate_limiter=False, retry_policy=False, cache=cache)
+        sibling_url = f'{self.lists_url}/CG_10'
+        for url in (self.list_url, self.lists_url, sibling_url):
+            self.get(url)
+        Credentials.transport.request('PUT', self.list_url, headers=self.headers, data='{}')
+        for url in (self.list_url, self.lists_url, sibling_url):
+            self.get(url)
+        gets = [path for method, path, _ in ETagHandler.requests if method == 'GET']
+        self.assertEqual(len(gets), 5)
+        self.assertNotIn('/API/v3/directories/POOL_1/mailinglists/CG_10', gets[3:])
+        self.assertEqual(cache.stats()['invalidated'], 2)
+
+    def test_entries_are_kept_per_token(self):
+        '''This method tests that two API tokens never share a cached response.'''
+        Credentials.configure_transport(rate_limiter=False, retry_policy=False, cache=True)
+        self.get(self.list_url)
+        self.get(self.list_url, headers={'x-api-token': 'OTHER'})
+        self.assertEqual(len(ETagHandler.requests), 2)
+
+    def test_uncached_families_and_explicit_invalidation(self):
+        '''This method tests that the response endpoints are never cached and that invalidate() drops matching entries.'''
+        cache = ResponseCache()
+        self.assertEqual(cache.ttl('GET', f'{self.base}/surveys/SV_1/export-responses/ES_1'), 0)
+        self.assertEqual(cache.ttl('POST', self.lists_url), 0)
+        Credentials.configure_transport(rate_limiter=False, retry_policy=False, cache=cache)
+        self.get(self.list_url)
+        cache.invalidate(self.lists_url)
+        self.get(self.list_url)
+        self.assertEqual(len(ETagHandler.requests), 2)
+
+class FakeQualtricsTestCase(unittest.TestCase):
+    '''This test case runs one FakeQualtrics server, started with fake_options, for all the tests of a class. Before every
+    test the server is reset and the shared transport is configured with transport_options, and after it the default
+    transports are restored.'''
+
+    fake_options = {}
+    transport_options = {'rate_limiter': False}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeQualtrics(**cls.fake_options).start()
+        cls.config = cls.fake.config()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        Credentials.configure_transport(**self.transport_options)
+        self.fake.reset()
+
+    def tearDown(self):
+        Credentials.configure_transport()
+        AsyncCredentials.configure_async_transport()
+
+class TestFakeQualtrics(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 50, 'contacts': 250, 'mailing_lists': 3, 'list_contacts': 30, 'distributions': 12, 'export_polls': 2}
+    transport_options = {'rate_limiter': False, 'retry_policy': RetryPolicy(backoff=0, max_backoff=0)}
+
+    def test_export_job(self):
+        '''This method tests that an export is started, polled until complete, downloaded and read.'''
+        df = Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id())
+        self.assertEqual(len(df), 52)
+        self.assertEqual(df['ResponseId'][2], 'R_000000000000000')
+        self.assertEqual(self.fake.stats()['families'], {'export_start': 1, 'export_progress': 2, 'export_file': 1})
+
+    def test_export_limit_and_dates(self):
+        '''This method tests that the limit, startDate and endDate of an export select the generated responses.'''
+        responses = Responses(config=self.config)
+        self.assertEqual(len(responses.get_survey_responses(survey=self.fake.survey_id(), limit=5)), 7)
+        df = responses.get_survey_responses(survey=self.fake.survey_id(), startDate='2024-01-01T00:10:00Z', endDate='2024-01-01T00:20:00Z')
+        self.assertEqual(list(df['ResponseId'][2:4]), ['R_000000000000010', 'R_000000000000011'])
+        self.assertEqual(len(df), 12)
+
+    def test_pagination(self):
+        '''This method tests that the paginated endpoints are followed to the last page, without printing a page counter.'''
+        with redirect_stdout(io.StringIO()) as stdout:
+            contacts = XMDirectory(config=self.config).list_contacts_in_directory()
+        self.assertEqual(len(contacts), 250)
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertEqual(len(MailingList(config=self.config).list_lists(page_size=2)), 3)
+        self.assertEqual(len(MailingList(config=self.config).list_contacts(mailing_list='CG_000000000000001', page_size=7)), 30)
+        self.assertEqual(len(Distributions(config=self.config).list_distributions(survey=self.fake.survey_id())), 12)
+        self.assertEqual(len(Surveys(config=self.config).list_user_surveys()), 100)
+
+    def test_single_items(self):
+        '''This method tests the endpoints that return a single contact, mailing list, message and response.'''
+        contact = XMDirectory(config=self.config).get_contact(contact_id='CID_000000000000007')
+        self.assertEqual(contact['email'][0], 'contact7@example.com')
+        self.assertEqual(MailingList(config=self.config).get_list(mailing_list='CG_000000000000002')['name'][0], 'List 2')
+        message = Messages(config=self.config).get_message(library=self.fake.library_id, message='MS_000000000000001')
+        self.assertEqual(message, ('MS_000000000000001', 'reminder', 'Message 1'))
+        response = Responses(config=self.config).get_survey_response(survey=self.fake.survey_id(), response='R_000000000000003')
+        self.assertEqual(response['values']['QID1'], 4)
+
+    def test_injected_errors_are_retried(self):
+        '''This method tests that injected server errors are retried by the transport.'''
+        self.fake.fail(503, times=2, family='surveys')
+        self.assertEqual(len(Surveys(config=self.config).list_user_surveys()), 100)
+        stats = self.fake.stats()
+        self.assertEqual((stats['errors_injected'], stats['statuses'][503]), (2, 2))
+
+    def test_injected_429_raises_once_retries_run_out(self):
+        '''This method tests that a 429 with a Retry-After is honored, and raised once the retries run out.'''
+        Credentials.configure_transport(rate_limiter=False, retry_policy=RetryPolicy(max_attempts=2, backoff=0, max_backoff=0))
+        self.fake.fail(429, times=2, retry_after=0)
+        with self.assertRaises(Qualtrics429Error):
+            MailingList(config=self.config).get_list(mailing_list='CG_000000000000002')
+
+    def test_error_rates_and_tokens(self):
+        '''This method tests the random error rates and that requests without the fake token are unauthorized.'''
+        fake = FakeQualtrics(error_rates={500: 1.0}).start()
+        try:
+            Credentials.configure_transport(rate_limiter=False, retry_policy=False)
+            request = Credentials().api_request('GET', fake.config().base_url('surveys'), headers=fake.config().headers)
+            self.assertEqual(request.status_code, 500)
+            request = Credentials().api_request('GET', fake.config().base_url('surveys'), headers={'x-api-token': 'wrong'})
+            self.assertEqual(request.json()['meta']['httpStatus'], '401 - Unauthorized')
+        finally:
+            fake.stop()
+
+    def test_update_responses_are_counted(self):
+        '''This method tests that update-responses jobs complete and count the updated responses.'''
+        Responses(config=self.config).update_survey_response_embedded_data(survey=self.fake.survey_id(), response_id='R_000000000000003', embedded_data={'a': 'b'})
+        headers, url = Responses(config=self.config).header_setup(content_type=True, xm=False, path=f'surveys/{self.fake.survey_id()}/update-responses')
+        request = Credentials().api_request('POST', url, json={'updates': [{'responseId': 'R_000000000000001'}] * 3}, headers=headers)
+        self.assertEqual(self.fake.stats()['updated_responses'], 3)
+        progress = Credentials().api_request('GET', f"{url}/{request.json()['result']['progressId']}", headers=headers)
+        self.assertEqual(progress.json()['result']['status'], 'complete')
+
+class TestHooks(FakeQualtricsTestCase):
+
+    class Recorder(Subscriber):
+        '''This subscriber records the events and spans it is given.'''
+
+        def __init__(self):
+            self.events, self.started, self.ended = [], [], []
+
+        def on_request(self, event):
+            self.events.append(event)
+
+        def on_span_start(self, span):
+            self.started.append(span)
+
+        def on_span_end(self, span):
+            self.ended.append(span)
+
+    class Tracer(object):
+        '''This tracer stands in for an OpenTelemetry tracer and records the spans it creates.'''
+
+        class Span(object):
+            def __init__(self, name, attributes, start_time):
+                self.name, self.attributes, self.start_time, self.end_time, self.ended = name, dict(attributes), start_time, None, False
+
+            def set_attribute(self, name, value):
+                self.attributes[name] = value
+
+            def end(self, end_time=None):
+                self.end_time, self.ended = end_time, True
+
+        def __init__(self):
+            self.spans = []
+
+        def start_span(self, name, context=None, attributes=None, start_time=None):
+            span = TestHooks.Tracer.Span(name, attributes or {}, start_time)
+            self.spans.append(span)
+            return span
+
+    fake_options = {'responses': 20, 'contacts': 30, 'max_page_size': 10}
+
+    def setUp(self):
+        self.recorder = TestHooks.Recorder()
+        self.hooks = Hooks(self.recorder)
+        self.transport_options = {'rate_limiter': False, 'retry_policy': RetryPolicy(backoff=0, max_backoff=0), 'hooks': self.hooks}
+        super().setUp()
+
+    def test_request_events(self):
+        '''This method tests that every request is reported with its endpoint, status, sizes and retries.'''
+        self.fake.fail(503, times=1, family='contacts')
+        XMDirectory(config=self.config).get_contact(contact_id='CID_000000000000007')
+        event = self.recorder.events[-1]
+        self.assertEqual((event.method, event.endpoint, event.status, event.attempts, event.retries), ('GET', 'contacts', 200, 2, 1))
+        self.assertEqual(event.data_center, self.fake.api_url.split('/')[2])
+        self.assertGreater(event.bytes_in, 0)
+        self.assertGreaterEqual(event.latency, 0)
+        self.assertIsNone(event.span)
+
+    def test_export_spans(self):
+        '''This method tests that an export is reported as an operation with create, poll, download and parse phases.'''
+        df = Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id())
+        self.assertEqual(len(df), 22)
+        phases = [span.phase for span in self.recorder.ended]
+        self.assertEqual(phases, ['create', 'poll', 'download', 'parse', ''])
+        operation = self.recorder.ended[-1]
+        self.assertEqual((operation.name, operation.attributes), ('get_survey_responses', {'survey': self.fake.survey_id()}))
+        self.assertEqual(operation.requests, self.fake.stats()['requests'])
+        self.assertTrue(all(span.operation == 'get_survey_responses' for span in self.recorder.ended))
+        download = [event for event in self.recorder.events if event.endpoint == 'export_file'][0]
+        self.assertEqual(download.span.phase, 'download')
+        self.assertGreater(download.bytes_in, 0)
+
+    def test_generator_spans(self):
+        '''This method tests that the span of a method returning a generator lasts until the generator is exhausted, and
+        that the phases run while it is read, including on the download threads of export_many(), are its children.'''
+        batches = Responses(config=self.config).iter_survey_responses(survey=self.fake.survey_id(), chunksize=5)
+        self.assertEqual([span.phase for span in self.recorder.ended], ['create', 'poll', 'download'])
+        self.assertEqual(sum(len(batch) for batch in batches), 20)
+        self.assertEqual(self.recorder.ended[-1].name, 'iter_survey_responses')
+        self.assertEqual(self.recorder.ended[-1].requests, self.fake.stats()['requests'])
+        self.recorder.ended.clear()
+        results = dict(Responses(config=self.config).export_many([self.fake.survey_id()] * 2, max_concurrency=2))
+        self.assertEqual(len(results), 1)
+        operation = self.recorder.ended[-1]
+        self.assertEqual(operation.name, 'export_many')
+        self.assertTrue(all(span.operation == 'export_many' for span in self.recorder.ended))
+        self.assertIn('parse', [span.phase for span in self.recorder.ended])
+
+    def test_closed_generator_span(self):
+        '''This method tests that the span of a generator closed before it is exhausted ends without an error.'''
+        batches = Responses(config=self.config).iter_survey_responses(survey=self.fake.survey_id(), chunksize=5)
+        next(batches)
+        self.assertNotEqual(self.recorder.ended[-1].name, 'iter_survey_responses')
+        batches.close()
+        self.assertEqual((self.recorder.ended[-1].name, self.recorder.ended[-1].error), ('iter_survey_responses', None))
+
+    def test_pagination_spans(self):
+        '''This method tests that every page of a paginated call is parsed in its own phase.'''
+        XMDirectory(config=self.config).list_contacts_in_directory()
+        self.assertEqual([span.phase for span in self.recorder.ended], ['parse', 'parse', 'parse', ''])
+        self.assertEqual(self.recorder.ended[-1].requests, 3)
+
+    def test_prometheus_subscriber(self):
+        '''This method tests the counters and histograms of the PrometheusSubscriber and their text rendering.'''
+        prometheus = PrometheusSubscriber()
+        self.hooks.subscribe(prometheus)
+        self.fake.fail(503, times=1, family='surveys')
+        Surveys(config=self.config).list_user_surveys()
+        self.assertEqual(prometheus.value('requests_total', method='GET', endpoint='surveys', status='200'), 10)
+        self.assertEqual(prometheus.value('request_retries_total', method='GET', endpoint='surveys'), 1)
+        self.assertEqual(prometheus.value('operation_duration_seconds', operation='list_user_surveys', phase=''), 1)
+        self.assertEqual(prometheus.value('operation_duration_seconds', operation='list_user_surveys', phase='parse'), 10)
+        text = prometheus.render()
+        self.assertIn('# TYPE qualtrics_requests_total counter', text)
+        self.assertIn('qualtrics_requests_total{endpoint="surveys",method="GET",status="200"} 10', text)
+        self.assertIn('qualtrics_request_duration_seconds_bucket{endpoint="surveys",method="GET",le="+Inf"} 10', text)
+
+    def test_logging_subscriber(self):
+        '''This method tests that the LoggingSubscriber logs requests and operations, and warns about failures.'''
+        self.hooks.subscribe(LoggingSubscriber())
+        with self.assertLogs('QualtricsAPI', level='INFO') as logs:
+            MailingList(config=self.config).list_lists()
+        self.assertTrue(any('GET mailinglists 200' in line for line in logs.output))
+        self.assertTrue(any(line.startswith('INFO:QualtricsAPI:list_lists took') for line in logs.output))
+        Credentials.configure_transport(rate_limiter=False, retry_policy=False, hooks=self.hooks)
+        self.fake.fail(500, times=1, family='contacts')
+        with self.assertLogs('QualtricsAPI', level='WARNING') as logs:
+            with redirect_stdout(io.StringIO()):
+                XMDirectory(config=self.config).get_contact(contact_id='CID_000000000000007')
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('GET contacts 500', logs.output[0])
+        Credentials.configure_transport(rate_limiter=False, hooks=Hooks(LoggingSubscriber(spans_only=True)))
+        with self.assertLogs('QualtricsAPI', level='INFO') as logs:
+            MailingList(config=self.config).list_lists()
+        self.assertEqual([line.split(' ')[0] for line in logs.output], ['INFO:QualtricsAPI:list_lists.parse', 'INFO:QualtricsAPI:list_lists'])
+
+    def test_open_telemetry_subscriber(self):
+        '''This method tests that the OpenTelemetrySubscriber creates a span for every operation, phase and request.'''
+        tracer = TestHooks.Tracer()
+        self.hooks.subscribe(OpenTelemetrySubscriber(tracer=tracer))
+        XMDirectory(config=self.config).list_contacts_in_directory()
+        names = [span.name for span in tracer.spans]
+        self.assertEqual(names[0], 'list_contacts_in_directory')
+        self.assertEqual(names.count('GET contacts'), 3)
+        self.assertEqual(names.count('list_contacts_in_directory.parse'), 3)
+        self.assertTrue(all(span.ended for span in tracer.spans))
+        self.assertEqual(tracer.spans[0].attributes['qualtrics.requests'], 3)
+        request = tracer.spans[1]
+        self.assertEqual(request.attributes['http.response.status_code'], 200)
+        self.assertGreaterEqual(request.end_time, request.start_time)
+
+    def test_failing_subscriber(self):
+        '''This method tests that an exception in a subscriber is logged and does not break the call.'''
+        class Broken(Subscriber):
+            def on_request(self, event):
+                raise RuntimeError('broken subscriber')
+        self.hooks.subscribe(Broken())
+        with self.assertLogs('QualtricsAPI', level='WARNING'):
+            contact = XMDirectory(config=self.config).get_contact(contact_id='CID_000000000000007')
+        self.assertEqual(contact['email'][0], 'contact7@example.com')
+        self.assertEqual(len(self.recorder.events), 1)
+
+    def test_errors_are_recorded(self):
+        '''This method tests that a request that raises ends the operation span with the error.'''
+        Credentials.configure_transport(rate_limiter=False, retry_policy=RetryPolicy(max_attempts=1), hooks=self.hooks)
+        self.fake.fail(429, times=1, retry_after=0)
+        with self.assertRaises(Qualtrics429Error):
+            Surveys(config=self.config).list_user_surveys()
+        self.assertEqual(self.recorder.events[-1].status, 429)
+        self.assertEqual(self.recorder.ended[-1].error, 'Qualtrics429Error')
+
+    def test_async_hooks(self):
+        '''This method tests that the async transport reports the same events and spans.'''
+        AsyncCredentials.configure_async_transport(rate_limiter=False, retry_policy=False, hooks=self.hooks)
+        async def export():
+            return await AsyncResponses(config=self.config).get_survey_responses(survey=self.fake.survey_id())
+        try:
+            df = asyncio.run(export())
+        finally:
+            AsyncCredentials.configure_async_transport()
+        self.assertEqual(len(df), 22)
+        self.assertEqual([span.phase for span in self.recorder.ended], ['create', 'poll', 'download', 'parse', ''])
+        self.assertEqual([event.endpoint for event in self.recorder.events][-1], 'export_file')
+        self.assertTrue(all(event.span is not None for event in self.recorder.events))
+
+    def test_async_generator_spans(self):
+        '''This method tests that the span of the async export_many() lasts until its async generator is exhausted.'''
+        AsyncCredentials.configure_async_transport(rate_limiter=False, retry_policy=False, hooks=self.hooks)
+        async def export():
+            try:
+                return [item async for item in await AsyncResponses(config=self.config).export_many([self.fake.survey_id()])]
+            finally:
+                await AsyncCredentials.close_async_transport()
+        try:
+            results = asyncio.run(export())
+        finally:
+            AsyncCredentials.configure_async_transport()
+        self.assertEqual(len(results[0][1]), 22)
+        self.assertEqual(self.recorder.ended[-1].name, 'export_many')
+        self.assertEqual(self.recorder.ended[-1].requests, self.fake.stats()['requests'])
+        self.assertTrue(all(span.operation == 'export_many' for span in self.recorder.ended))
+
+class TestLazyImports(unittest.TestCase):
+
+    script = '''
+import json, sys
+from QualtricsAPI import Credentials, ClientConfig
+from QualtricsAPI.Survey import Responses
+from QualtricsAPI.XM import XMDirectory, MailingList
+from QualtricsAPI.Library import Messages
+config = ClientConfig(sys.argv[1], 'fake', sys.argv[2], api_url=sys.argv[3])
+Credentials.configure_transport(rate_limiter=False)
+response = Responses(config=config).get_survey_response(survey=sys.argv[4], response='R_000000000000003')
+print(json.dumps({'value': response['values']['QID1'], 'modules': sorted(name for name in ('pandas', 'numpy') if name in sys.modules)}))
+'''
+
+    def test_import_does_not_load_pandas(self):
+        '''This method tests that importing the package and calling a JSON-returning method does not import pandas or numpy.'''
+        with FakeQualtrics(responses=5) as fake:
+            completed = subprocess.run([sys.executable, '-c', TestLazyImports.script, fake.token, fake.directory_id, fake.api_url, fake.survey_id()],
+                                       capture_output=True, text=True, timeout=60)
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(json.loads(completed.stdout), {'value': 4, 'modules': []})
+
+    def test_credentials_do_not_load_asyncio(self):
+        '''This method tests that importing Credentials does not import asyncio, which only the Async* classes need.'''
+        completed = subprocess.run([sys.executable, '-c', "import sys\nfrom QualtricsAPI import Credentials\nprint('asyncio' in sys.modules)"],
+                                   capture_output=True, text=True, timeout=60)
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(completed.stdout.strip(), 'False')
+
+    def test_lazy_attributes(self):
+        '''This method tests that the package attributes and LazyModule resolve on first use.'''
+        import QualtricsAPI
+        self.assertIs(QualtricsAPI.Responses, Responses)
+        self.assertIs(QualtricsAPI.Credentials, Credentials)
+        self.assertIn('XMDirectory', dir(QualtricsAPI))
+        with self.assertRaises(AttributeError):
+            QualtricsAPI.NotAClass
+        lazy = LazyModule('json')
+        self.assertIn('not imported', repr(lazy))
+        self.assertEqual(lazy.dumps([1]), '[1]')
+        self.assertIn("'json' (imported)", repr(lazy))
+
+class TestExportDownload(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 300}
+
+    def test_progress_and_chunks(self):
+        '''This method tests that the export file is downloaded in chunks and reported to the progress callback.'''
+        calls = []
+        df = Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), chunk_size=1024, progress=lambda done, total: calls.append((done, total)))
+        self.assertEqual(len(df), 302)
+        self.assertGreater(len(calls), 1)
+        self.assertEqual(calls[-1][0], calls[-1][1])
+        self.assertTrue(all(done <= 1024 * (index + 1) for index, (done, total) in enumerate(calls)))
+
+    def test_download_to_path(self):
+        '''This method tests that the export file is kept at a caller-supplied path.'''
+        with tempfile.TemporaryDirectory() as directory:
+            path = f'{directory}/export.zip'
+            df = Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), path=path)
+            with zipfile.ZipFile(path) as export_zip:
+                self.assertEqual(export_zip.namelist(), [f'Survey {self.fake.survey_id()}.csv'])
+        self.assertEqual(df['ResponseId'][301], 'R_000000000000299')
+
+    def test_spooled_to_disk(self):
+        '''This method tests that an export larger than spool_size is spooled to disk and read back the same.'''
+        responses = Responses(config=self.config)
+        responses.spool_size = 1024
+        download_url, headers = responses._export_file(survey=self.fake.survey_id(), payload={'format': 'csv'})
+        with responses._download_export(download_url, headers, chunk_size=512) as export_file:
+            self.assertTrue(export_file._rolled)
+            df = responses._read_export(export_file)
+        pd.testing.assert_frame_equal(df, Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id()))
+
+    def test_invalid_download_parameters(self):
+        '''This method tests the validation of the download parameters.'''
+        with self.assertRaises(AssertionError):
+            Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), chunk_size=0)
+        with self.assertRaises(AssertionError):
+            Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), progress='yes')
+
+    def test_async_streamed_download(self):
+        '''This method tests that the async client streams the export file in chunks too.'''
+        calls = []
+        async def export():
+            try:
+                return await AsyncResponses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), chunk_size=2048,
+                                                                                     progress=lambda done, total: calls.append(done))
+            finally:
+                await AsyncCredentials.close_async_transport()
+        AsyncCredentials.configure_async_transport(rate_limiter=False)
+        df = asyncio.run(export())
+        self.assertEqual(len(df), 302)
+        self.assertGreater(len(calls), 1)
+
+    def test_async_parse_off_the_loop(self):
+        '''This method tests that the async client parses the export file outside of the event loop thread.'''
+        responses = AsyncResponses(config=self.config)
+        threads = []
+        read_export = responses._read_export
+        def record(*args):
+            threads.append(threading.get_ident())
+            return read_export(*args)
+        responses._read_export = record
+        async def export():
+            try:
+                return threading.get_ident(), await responses.get_survey_responses(survey=self.fake.survey_id())
+            finally:
+                await AsyncCredentials.close_async_transport()
+        AsyncCredentials.configure_async_transport(rate_limiter=False)
+        loop_thread, df = asyncio.run(export())
+        self.assertEqual(len(df), 302)
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+
+class TestIterSurveyResponses(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 250}
+
+    def test_batches(self):
+        '''This method tests that the responses are yielded in batches of chunksize rows without the header rows.'''
+        batches = list(Responses(config=self.config).iter_survey_responses(survey=self.fake.survey_id(), chunksize=100))
+        self.assertEqual([len(batch) for batch in batches], [100, 100, 50])
+        self.assertEqual(batches[0]['ResponseId'][0], 'R_000000000000000')
+        self.assertEqual(batches[2]['ResponseId'].iloc[-1], 'R_000000000000249')
+        df = Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id())
+        self.assertEqual(list(pd.concat(batches)['ResponseId']), list(df['ResponseId'][2:]))
+
+    def test_records_and_filters(self):
+        '''This method tests the records batches and that the export filters are passed on.'''
+        batches = list(Responses(config=self.config).iter_survey_responses(survey=self.fake.survey_id(), chunksize=4, records=True, limit=10))
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 2])
+        self.assertEqual(batches[0][1]['ResponseId'], 'R_000000000000001')
+
+    def test_closing_early_closes_the_file(self):
+        '''This method tests that a generator closed before it is exhausted closes its export file.'''
+        with tempfile.TemporaryDirectory() as directory:
+            generator = Responses(config=self.config).iter_survey_responses(survey=self.fake.survey_id(), chunksize=10, path=f'{directory}/export.zip')
+            self.assertEqual(len(next(generator)), 10)
+            generator.close()
+            self.assertTrue(os.path.exists(f'{directory}/export.zip'))
+        with self.assertRaises(AssertionError):
+            Responses(config=self.config).iter_survey_responses(survey=self.fake.survey_id(), chunksize=0)
+
+    def test_async_batches(self):
+        '''This method tests that the async iterator runs the export when awaited and reads each batch off the loop thread.'''
+        responses = AsyncResponses(config=self.config)
+        iter_export, threads = responses._iter_export, []
+        def spy(*args):
+            for batch in iter_export(*args):
+                threads.append(threading.get_ident())
+                yield batch
+        responses._iter_export = spy
+        async def export():
+            try:
+                batches = await responses.iter_survey_responses(survey=self.fake.survey_id(), chunksize=200)
+                self.assertTrue(inspect.isasyncgen(batches))
+                return [len(batch) async for batch in batches]
+            finally:
+                await AsyncCredentials.close_async_transport()
+        AsyncCredentials.configure_async_transport(rate_limiter=False)
+        self.assertEqual(asyncio.run(export()), [200, 50])
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.get_ident(), threads)
+
+class TestExportFormats(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 40}
+
+    def test_tsv_matches_csv(self):
+        '''This method tests that a UTF-16 tsv export is read into the same DataFrame as a csv export.'''
+        responses = Responses(config=self.config)
+        tsv = responses.get_survey_responses(survey=self.fake.survey_id(), format='tsv')
+        pd.testing.assert_frame_equal(tsv, responses.get_survey_responses(survey=self.fake.survey_id()))
+
+    def test_record_formats(self):
+        '''This method tests that json and ndjson exports keep their JSON types and have a row per response.'''
+        responses = Responses(config=self.config)
+        for file_format in ('json', 'ndjson'):
+            df = responses.get_survey_responses(survey=self.fake.survey_id(), format=file_format)
+            self.assertEqual(len(df), 40)
+            self.assertEqual(df['responseId'][7], 'R_000000000000007')
+            self.assertEqual(df['QID1'].dtype, 'int64')
+            self.assertTrue(pd.isna(df['QID4_TEXT'][1]))
+        xml = responses.get_survey_responses(survey=self.fake.survey_id(), format='xml')
+        self.assertEqual((len(xml), xml['_recordId'][7], xml['QID1'][7]), (40, 'R_000000000000007', '3'))
+        self.assertEqual(self.fake.stats()['statuses'].get(400), None)
+
+    def test_iter_formats(self):
+        '''This method tests that every format is read in batches.'''
+        responses = Responses(config=self.config)
+        for file_format in ('csv', 'tsv', 'json', 'ndjson', 'xml'):
+            batches = list(responses.iter_survey_responses(survey=self.fake.survey_id(), format=file_format, chunksize=15))
+            self.assertEqual([len(batch) for batch in batches], [15, 15, 10], file_format)
+            self.assertEqual(list(batches[2].index), list(range(30, 40)), file_format)
+        records = list(responses.iter_survey_responses(survey=self.fake.survey_id(), format='ndjson', chunksize=25, records=True))
+        self.assertEqual(records[1][0]['responseId'], 'R_000000000000025')
+
+    def test_unknown_parameter(self):
+        '''This method tests that an unknown export parameter is refused with the list of every valid one.'''
+        with self.assertRaises(AssertionError) as refused:
+            Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), fromat='tsv')
+        for key in ('format', 'breakoutSets', 'sortByLastModifiedDate', 'filterId', 'embeddedDataIds', 'questionIds', 'surveyMetadataIds'):
+            self.assertIn(f"'{key}'", str(refused.exception))
+
+    def test_invalid_formats(self):
+        '''This method tests that an unknown format is refused before an export is started.'''
+        with self.assertRaises(AssertionError):
+            Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), format='xlsx')
+        self.assertEqual(self.fake.stats()['requests'], 0)
+
+    @unittest.skipUnless(importlib.util.find_spec('pyreadstat') is None, 'pyreadstat is installed.')
+    def test_spss_without_pyreadstat(self):
+        '''This method tests that an spss export without pyreadstat is refused before an export is started.'''
+        with self.assertRaises(ImportError):
+            Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), format='spss')
+        self.assertEqual(self.fake.stats()['requests'], 0)
+
+    def test_streaming_json_parser(self):
+        '''This method tests the streaming json and ndjson record parsers on records split across reads.'''
+        records = [{'responseId': f'R_{index}', 'values': {'text': 'a ] } [ { , "' * index}} for index in range(50)]
+        document = json.dumps({'meta': {'responses': 'no'}, 'responses': records}, indent=2).encode('utf-8')
+        self.assertEqual(list(Parser().json_records(io.BytesIO(document), chunk_size=16)), records)
+        self.assertEqual(list(Parser().json_records(io.BytesIO(b'{"responses": []}'))), [])
+        lines = b'\n'.join(json.dumps(record).encode('utf-8') for record in records) + b'\n\n'
+        self.assertEqual(list(Parser().ndjson_records(io.BytesIO(lines))), records)
+        with self.assertRaises(ValueError):
+            list(Parser().json_records(io.BytesIO(b'{"responses": [{"a": 1}, {"b": ')))
+
+@unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+class TestArrowExport(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 50}
+
+    def test_record_batches(self):
+        '''This method tests that an export is read as record batches of batch_size rows typed from its header rows.'''
+        import pyarrow as pa
+        for file_format in ('csv', 'tsv'):
+            batches = list(Responses(config=self.config).iter_survey_record_batches(survey=self.fake.survey_id(), batch_size=20,
+                                                                                   format=file_format, schema={'QID1': 'int64'}))
+            self.assertEqual([batch.num_rows for batch in batches], [20, 20, 10], file_format)
+            schema = batches[0].schema
+            self.assertEqual(schema.field('StartDate').type, pa.timestamp('s'))
+            self.assertEqual(schema.field('Progress').type, pa.int64())
+            self.assertEqual(schema.field('Q1').type, pa.int64())
+            self.assertEqual(schema.field('Q4_TEXT').type, pa.string())
+            self.assertEqual(schema.field('Q1').metadata[b'import_id'], b'QID1')
+            self.assertEqual(batches[0].column('ResponseId')[7].as_py(), 'R_000000000000007')
+
+    def test_parquet_file(self):
+        '''This method tests that an export is written to a Parquet file with the given codec and row group size.'''
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as directory:
+            destination = os.path.join(directory, 'responses.parquet')
+            written = Responses(config=self.config).write_survey_responses_to_parquet(survey=self.fake.survey_id(), destination=destination,
+                                                                                     compression='zstd', row_group_size=15)
+            metadata = pq.ParquetFile(destination).metadata
+            self.assertEqual((written, metadata.num_rows, metadata.num_row_groups), (50, 50, 4))
+            self.assertEqual(metadata.row_group(0).column(0).compression, 'ZSTD')
+            pd.testing.assert_series_equal(pq.read_table(destination).to_pandas()['ResponseId'],
+                                           Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id())['ResponseId'][2:].reset_index(drop=True))
+
+    def test_partitioned_dataset(self):
+        '''This method tests that partition_cols writes a Hive-partitioned dataset.'''
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as directory:
+            written = Responses(config=self.config).write_survey_responses_to_parquet(survey=self.fake.survey_id(), destination=directory,
+                                                                                     partition_cols=['Q3'])
+            self.assertEqual(written, 50)
+            self.assertTrue(all(name.startswith('Q3=') for name in os.listdir(directory)))
+            self.assertEqual(pq.read_table(directory).num_rows, 50)
+
+    def test_validation(self):
+        '''This method tests the parameter checks of the Arrow and Parquet methods.'''
+        responses = Responses(config=self.config)
+        with self.assertRaises(AssertionError):
+            responses.iter_survey_record_batches(survey=self.fake.survey_id(), format='json')
+        with self.assertRaises(AssertionError):
+            responses.iter_survey_record_batches(survey=self.fake.survey_id(), batch_size=0)
+        with self.assertRaises(AssertionError):
+            responses.write_survey_responses_to_parquet(survey=self.fake.survey_id(), destination='out.parquet', compression='lzma')
+
+    def test_async_parquet(self):
+        '''This method tests that the async client writes Parquet too.'''
+        import pyarrow.parquet as pq
+        async def export(destination):
+            try:
+                return await AsyncResponses(config=self.config).write_survey_responses_to_parquet(survey=self.fake.survey_id(), destination=destination)
+            finally:
+                await AsyncCredentials.close_async_transport()
+        AsyncCredentials.configure_async_transport(rate_limiter=False)
+        with tempfile.TemporaryDirectory() as directory:
+            destination = os.path.join(directory, 'responses.parquet')
+            self.assertEqual(asyncio.run(export(destination)), 50)
+            self.assertEqual(pq.ParquetFile(destination).metadata.num_rows, 50)
+
+class TestExportJob(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 30, 'export_polls': 3}
+
+    def test_poll_schedule(self):
+        '''This method tests that the poll interval follows the speed of percentComplete, and grows while it stalls.'''
+        schedule = PollSchedule(initial=0.5, maximum=10, minimum=0.1, factor=2)
+        self.assertEqual(schedule.next_interval(0, now=0), 0.5)
+        self.assertEqual(schedule.next_interval(10, now=1), 4.5)
+        self.assertEqual(schedule.next_interval(10, now=2), 9)
+        self.assertEqual(schedule.next_interval(10, now=3), 10)
+        self.assertEqual(schedule.next_interval(90, now=4), 0.1875)
+        self.assertEqual(schedule.next_interval(99.9, now=5), 0.1)
+
+    def test_status_wait_result(self):
+        '''This method tests that an export job is checked only when asked to, and reads the same responses as get_survey_responses.'''
+        job = Responses(config=self.config).start_export(survey=self.fake.survey_id())
+        self.assertIsInstance(job, ExportJob)
+        self.assertEqual(self.fake.stats()['families'].get('export_progress'), None)
+        self.assertEqual(job.status(), 'inProgress')
+        self.assertFalse(job.done())
+        self.assertIs(job.wait(timeout=30), job)
+        self.assertEqual((job.status(), job.percent_complete, job.polls), ('complete', 100.0, 3))
+        self.assertTrue(job.download_url().endswith(f'{job.progress_id}-file/file'))
+        pd.testing.assert_frame_equal(job.result(), Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id()))
+        self.assertFalse(job.cancel())
+
+    def test_adaptive_polling(self):
+        '''This method tests that waiting for a slow export sleeps between its progress checks.'''
+        with FakeQualtrics(responses=5, export_seconds=1.5) as fake:
+            job = Responses(config=fake.config()).start_export(survey=fake.survey_id())
+            job.wait(timeout=30)
+            self.assertLess(fake.stats()['families']['export_progress'], 15)
+
+    def test_timeout_and_cancel(self):
+        '''This method tests that wait() times out, and that cancel() from another thread stops it at once.'''
+        with FakeQualtrics(responses=5, export_seconds=60) as fake:
+            job = Responses(config=fake.config()).start_export(survey=fake.survey_id())
+            with self.assertRaises(TimeoutError):
+                job.wait(timeout=0.3)
+            threading.Timer(0.3, job.cancel).start()
+            started = time.monotonic()
+            with self.assertRaises(QualtricsExportError):
+                job.wait()
+            self.assertLess(time.monotonic() - started, 5)
+            self.assertEqual(job.status(), 'cancelled')
+
+    def test_concurrent_checks(self):
+        '''This method tests that waiters of one job share a progress check in flight, and that only the one that sent
+        it moves the PollSchedule on.'''
+        with FakeQualtrics(responses=5, export_seconds=60, latency=0.3) as fake:
+            job = Responses(config=fake.config()).start_export(survey=fake.survey_id())
+            fake.reset()
+            checks = [threading.Thread(target=job.status) for _ in range(3)]
+            for check in checks:
+                check.start()
+            for check in checks:
+                check.join()
+            self.assertEqual(fake.stats()['families'], {'export_progress': 1})
+            interval = job.schedule.interval
+            self.assertEqual(job._next_wait(None, checked=False), interval)
+            self.assertGreater(job._next_wait(None, checked=True), interval)
+            async def statuses():
+                try:
+                    job = await AsyncResponses(config=fake.config()).start_export(survey=fake.survey_id())
+                    fake.reset()
+                    return await asyncio.gather(job.status(), job.status(), job.status())
+                finally:
+                    await AsyncCredentials.close_async_transport()
+            AsyncCredentials.configure_async_transport(rate_limiter=False)
+            self.assertEqual(asyncio.run(statuses()), ['inProgress'] * 3)
+            self.assertEqual(fake.stats()['families'], {'export_progress': 1})
+
+    def test_refused_progress_check(self):
+        '''This method tests that a Qualtrics error on a progress check is raised by every export path.'''
+        Credentials.configure_transport(rate_limiter=False, retry_policy=False)
+        for export in (lambda responses: responses.get_survey_responses(survey=self.fake.survey_id()),
+                       lambda responses: responses.iter_survey_responses(survey=self.fake.survey_id())):
+            self.fake.fail(400, family='export_progress')
+            with self.assertRaises(Qualtrics400Error):
+                export(Responses(config=self.config))
+        async def export():
+            try:
+                return await AsyncResponses(config=self.config).get_survey_responses(survey=self.fake.survey_id())
+            finally:
+                await AsyncCredentials.close_async_transport()
+        AsyncCredentials.configure_async_transport(rate_limiter=False, retry_policy=False)
+        self.fake.fail(400, family='export_progress')
+        with self.assertRaises(Qualtrics400Error):
+            asyncio.run(export())
+
+    def test_cancel_during_status(self):
+        '''This method tests that cancel() does not wait for a progress check in flight on another thread.'''
+        with FakeQualtrics(responses=5, export_seconds=60, latency=1) as fake:
+            job = Responses(config=fake.config()).start_export(survey=fake.survey_id())
+            checking = threading.Thread(target=job.status)
+            checking.start()
+            time.sleep(0.2)
+            started = time.monotonic()
+            self.assertTrue(job.cancel())
+            self.assertLess(time.monotonic() - started, 0.5)
+            self.assertEqual(job.status(), 'cancelled')
+            checking.join()
+        self.assertEqual(job.status(), 'cancelled')
+
+    def test_async_job(self):
+        '''This method tests that the async export job is awaited, and can be cancelled while it is being waited on.'''
+        async def export(slow_fake):
+            try:
+                job = await AsyncResponses(config=self.config).start_export(survey=self.fake.survey_id())
+                self.assertIsInstance(job, AsyncExportJob)
+                df = await job.result(timeout=30)
+                slow = await AsyncResponses(config=slow_fake.config()).start_export(survey=slow_fake.survey_id())
+                asyncio.get_running_loop().call_later(0.3, slow.cancel)
+                with self.assertRaises(QualtricsExportError):
+                    await slow.wait(timeout=30)
+                return job, df
+            finally:
+                await AsyncCredentials.close_async_transport()
+        AsyncCredentials.configure_async_transport(rate_limiter=False)
+        with FakeQualtrics(responses=5, export_seconds=60) as slow_fake:
+            job, df = asyncio.run(export(slow_fake))
+        self.assertEqual((job.polls, len(df)), (3, 32))
+
+class TestExportMany(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 20, 'export_seconds': 0.5}
+
+    def test_export_many(self):
+        '''This method tests that exports run concurrently and each survey is yielded once with its responses.'''
+        surveys = [self.fake.survey_id(index) for index in range(6)]
+        started = time.monotonic()
+        results = dict(Responses(config=self.config).export_many(surveys, max_concurrency=6))
+        self.assertLess(time.monotonic() - started, 6 * 0.5)
+        self.assertEqual(sorted(results), surveys)
+        self.assertTrue(all(len(df) == 22 for df in results.values()))
+        self.assertEqual(self.fake.stats()['families']['export_file'], 6)
+
+    def test_error_isolation(self):
+        '''This method tests that a survey whose export fails is yielded with its exception, and the others still complete.'''
+        self.fake.fail(400, times=1, family='export_start')
+        surveys = [self.fake.survey_id(index) for index in range(3)] + ['SV_bad']
+        with redirect_stdout(io.StringIO()):
+            results = dict(Responses(config=self.config).export_many(surveys, max_concurrency=2))
+        self.assertEqual(len(results), 4)
+        self.assertIsInstance(results['SV_bad'], AssertionError)
+        errors = [survey for survey, result in results.items() if isinstance(result, QualtricsExportError)]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(sum(isinstance(result, pd.DataFrame) for result in results.values()), 2)
+
+    def test_validation(self):
+        '''This method tests the parameter checks of export_many.'''
+        with self.assertRaises(AssertionError):
+            Responses(config=self.config).export_many(self.fake.survey_id(), max_concurrency=2)
+        with self.assertRaises(AssertionError):
+            Responses(config=self.config).export_many([self.fake.survey_id()], max_concurrency=0)
+
+    def test_async_export_many(self):
+        '''This method tests that the async client yields every survey as its export completes.'''
+        async def export(surveys):
+            try:
+                return [item async for item in await AsyncResponses(config=self.config).export_many(surveys + ['SV_bad'], max_concurrency=3)]
+            finally:
+                await AsyncCredentials.close_async_transport()
+        AsyncCredentials.configure_async_transport(rate_limiter=False)
+        surveys = [self.fake.survey_id(index) for index in range(4)]
+        results = dict(asyncio.run(export(surveys)))
+        self.assertIsInstance(results.pop('SV_bad'), AssertionError)
+        self.assertEqual(sorted(results), surveys)
+        self.assertTrue(all(len(df) == 22 for df in results.values()))
+
+class TestSyncSurveyResponses(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 100}
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_watermark_stores(self):
+        '''This method tests that both watermark stores keep, replace and forget the state of a survey.'''
+        for store in (JSONWatermarkStore(os.path.join(self.directory.name, 'state.json')), SQLiteWatermarkStore(os.path.join(self.directory.name, 'state.db'))):
+            self.assertEqual(store.get('SV_1'), None)
+            store.set('SV_1', {'watermark': '2024-01-01T00:00:00Z'})
+            store.set('SV_1', {'watermark': '2024-01-02T00:00:00Z'})
+            store.set('SV_2', {'watermark': '2024-01-03T00:00:00Z'})
+            self.assertEqual(store.get('SV_1'), {'watermark': '2024-01-02T00:00:00Z'})
+            store.delete('SV_1')
+            self.assertEqual(list(store.read()), ['SV_2'])
+
+    def test_incremental_sync(self):
+        '''This method tests that a second sync exports only the responses after the watermark minus the overlap, and merges them without duplicates.'''
+        responses = Responses(config=self.config)
+        store = JSONWatermarkStore(os.path.join(self.directory.name, 'state.json'))
+        snapshot = os.path.join(self.directory.name, 'snapshot.csv')
+        first = responses.sync_survey_responses(survey=self.fake.survey_id(), store=store, snapshot=snapshot, overlap=600)
+        self.assertEqual(len(first), 100)
+        self.assertEqual(store.get(self.fake.survey_id())['watermark'], '2024-01-01T01:39:00Z')
+        self.fake.sizes['responses'] = 130
+        merged = responses.sync_survey_responses(survey=self.fake.survey_id(), store=store, snapshot=snapshot, overlap=600)
+        self.assertEqual(store.get(self.fake.survey_id())['exported'], 41)
+        self.assertEqual(len(merged), 130)
+        self.assertTrue(merged['ResponseId'].is_unique)
+        pd.testing.assert_frame_equal(pd.read_csv(snapshot), merged)
+        self.assertEqual(store.get(self.fake.survey_id())['watermark'], '2024-01-01T02:09:00Z')
+        delta = responses.sync_survey_responses(survey=self.fake.survey_id(), store=store, overlap=0)
+        self.assertEqual(list(delta['ResponseId']), ['R_000000000000129'])
+
+    def test_validation(self):
+        '''This method tests the parameter checks of sync_survey_responses.'''
+        store = JSONWatermarkStore(os.path.join(self.directory.name, 'state.json'))
+        with self.assertRaises(AssertionError):
+            Responses(config=self.config).sync_survey_responses(survey=self.fake.survey_id(), store=store, startDate='2024-01-01')
+        with self.assertRaises(AssertionError):
+            Responses(config=self.config).sync_survey_responses(survey=self.fake.survey_id(), store=store, overlap=-1)
+        with self.assertRaises(AssertionError):
+            Responses(config=self.config).sync_survey_responses(survey=self.fake.survey_id(), store=None)
+
+    def test_async_sync(self):
+        '''This method tests that the async client syncs with a SQLite store.'''
+        store = SQLiteWatermarkStore(os.path.join(self.directory.name, 'state.db'))
+        async def sync():
+            try:
+                responses = AsyncResponses(config=self.config)
+                await responses.sync_survey_responses(survey=self.fake.survey_id(), store=store)
+                self.fake.sizes['responses'] = 110
+                return await responses.sync_survey_responses(survey=self.fake.survey_id(), store=store, overlap=0)
+            finally:
+                await AsyncCredentials.close_async_transport()
+        AsyncCredentials.configure_async_transport(rate_limiter=False)
+        delta = asyncio.run(sync())
+        self.assertEqual(len(delta), 11)
+
+class TestShardedExport(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 120}
+
+    def test_windows(self):
+        '''This method tests that a date range is split into contiguous windows, of equal length or of equal response counts.'''
+        responses = Responses(config=self.config)
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 1, 1)
+        windows = responses._interval_windows(start, end, 4)
+        self.assertEqual([window[0].minute for window in windows], [0, 15, 30, 45])
+        self.assertEqual(windows[-1][1], end)
+        recorded = [start + timedelta(minutes=minute) for minute in [1, 2, 3, 4, 5, 6, 50, 55]]
+        windows = responses._count_windows(start, end, 4, recorded)
+        self.assertEqual([sum(low <= date < high for date in recorded) for low, high in windows], [2, 2, 2, 2])
+        self.assertEqual(responses._count_windows(start, end, 4, []), [(start, end)])
+
+    def test_sharded_export(self):
+        '''This method tests that both kinds of sharded export return the same DataFrame as a single export.'''
+        responses = Responses(config=self.config)
+        dates = {'startDate': '2024-01-01T00:00:00Z', 'endDate': '2024-01-01T03:00:00Z'}
+        single = responses.get_survey_responses(survey=self.fake.survey_id(), **dates)
+        for shard_by in ('interval', 'count'):
+            self.fake.reset()
+            sharded = responses.get_survey_responses(survey=self.fake.survey_id(), shards=3, shard_by=shard_by, **dates)
+            pd.testing.assert_frame_equal(sharded, single)
+            self.assertEqual(self.fake.stats()['families']['export_start'], 3 if shard_by == 'interval' else 4)
+        ndjson = responses.get_survey_responses(survey=self.fake.survey_id(), shards=5, format='ndjson', **dates)
+        self.assertEqual(list(ndjson['responseId']), [f'R_{index:015d}' for index in range(120)])
+
+    def test_validation(self):
+        '''This method tests the parameter checks of sharded exports.'''
+        responses = Responses(config=self.config)
+        for kwargs in ({'shards': 2}, {'shards': 0, 'startDate': '2024-01-01'}, {'shards': 2, 'shard_by': 'size', 'startDate': '2024-01-01'},
+                       {'shards': 2, 'startDate': '2024-01-01', 'limit': 10}, {'shards': 2, 'startDate': '2024-01-01', 'path': 'export.zip'}):
+            with self.assertRaises(AssertionError):
+                responses.get_survey_responses(survey=self.fake.survey_id(), **kwargs)
+
+    def test_async_sharded_export(self):
+        '''This method tests that the async client runs the shards of an export concurrently.'''
+        async def export():
+            try:
+                return await AsyncResponses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), shards=4, shard_by='count',
+                                                                                     startDate='2024-01-01', endDate='2024-01-02')
+            finally:
+                await AsyncCredentials.close_async_transport()
+        AsyncCredentials.configure_async_transport(rate_limiter=False)
+        df = asyncio.run(export())
+        self.assertEqual(len(df), 122)
+        self.assertTrue(df['ResponseId'][2:].is_unique)
+
+class TestSurveyDefinition(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 10}
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        Responses.definition_cache = SurveyDefinitionCache(self.directory.name)
+
+    def tearDown(self):
+        Responses.definition_cache = None
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_questions_from_definition(self):
+        '''This method tests that get_survey_questions reads the survey definition instead of exporting responses.'''
+        questions = Responses(config=self.config).get_survey_questions(survey=self.fake.survey_id())
+        self.assertEqual(list(questions.index), ['Q1', 'Q2', 'Q3', 'Q4_TEXT'])
+        self.assertEqual(questions['Questions']['Q3'], 'Which department did you contact?')
+        self.assertEqual((questions['QuestionID']['Q4_TEXT'], questions['Type']['Q4_TEXT']), ('QID4', 'TE'))
+        self.assertEqual(questions['Choices']['Q3'], {'Sales': 'Sales', 'Support': 'Support', 'Billing': 'Billing'})
+        self.assertEqual(self.fake.stats()['families'], {'surveys': 1})
+
+    def test_version_aware_cache(self):
+        '''This method tests that a cached definition is reused, checked against LastModified once stale, and refetched once the survey changed.'''
+        responses = Responses(config=self.config)
+        first = responses.get_survey_definition(survey=self.fake.survey_id())
+        self.assertIs(responses.get_survey_definition(survey=self.fake.survey_id()), first)
+        self.assertEqual(self.fake.stats()['requests'], 1)
+        Responses.definition_cache = SurveyDefinitionCache(self.directory.name, max_age=0)
+        self.assertEqual(responses.get_survey_definition(survey=self.fake.survey_id()), first)
+        self.assertEqual(self.fake.stats()['families'], {'surveys': 1, 'default': 1})
+        self.fake.last_modified = '2024-02-01T00:00:00Z'
+        self.assertEqual(responses.get_survey_definition(survey=self.fake.survey_id())['last_modified'], '2024-02-01T00:00:00Z')
+        self.assertEqual(self.fake.stats()['families'], {'surveys': 2, 'default': 2})
+        responses.get_survey_definition(survey=self.fake.survey_id(), refresh=True)
+        self.assertEqual(self.fake.stats()['families']['surveys'], 3)
+
+    def test_export_fallback(self):
+        '''This method tests that export keyword arguments still read the questions from a 2-response export.'''
+        questions = Responses(config=self.config).get_survey_questions(survey=self.fake.survey_id(), useLabels=True)
+        self.assertEqual(questions['Questions']['StartDate'], 'Start Date')
+        self.assertEqual(self.fake.stats()['families'].get('surveys'), None)
+
+    def test_baseline_shape(self):
+        '''This method tests that from_definition=False returns the export-based frame of earlier releases.'''
+        questions = Responses(config=self.config).get_survey_questions(survey=self.fake.survey_id(), from_definition=False)
+        self.assertEqual(list(questions.columns), ['Questions'])
+        self.assertEqual(list(questions.index), [column for column, _, _ in FakeQualtrics.columns])
+
+    def test_cache_keyed_by_token(self):
+        '''This method tests that a client with another API token does not read the definitions cached by this one.'''
+        Responses(config=self.config).get_survey_definition(survey=self.fake.survey_id())
+        other = ClientConfig('X' * 40, 'fake', FakeQualtrics.directory_id, api_url=self.fake.api_url)
+        with redirect_stdout(io.StringIO()):
+            self.assertIsNone(Responses(config=other).get_survey_definition(survey=self.fake.survey_id()))
+        self.assertEqual(self.fake.stats()['statuses'].get(401), 1)
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+
+    def test_async_definition(self):
+        '''This method tests that the async client shares the definition cache.'''
+        async def definition():
+            try:
+                return await AsyncResponses(config=self.config).get_survey_questions(survey=self.fake.survey_id())
+            finally:
+                await AsyncCredentials.close_async_transport()
+        AsyncCredentials.configure_async_transport(rate_limiter=False)
+        pd.testing.assert_frame_equal(asyncio.run(definition()), Responses(config=self.config).get_survey_questions(survey=self.fake.survey_id()))
+        self.assertEqual(self.fake.stats()['requests'], 1)
+
+class TestSchemaDtypes(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 50}
+
+    def tearDown(self):
+        Responses.definition_cache = None
+        super().tearDown()
+
+    def test_schema_dtypes(self):
+        '''This method tests that dtypes=True reads the metadata and choice columns with the dtypes of the survey definition.'''
+        df = Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), dtypes=True)
+        self.assertEqual(len(df), 50)
+        self.assertEqual(str(df['Finished'].dtype), 'boolean')
+        self.assertEqual(str(df['Progress'].dtype), 'Int8')
+        self.assertEqual(str(df['Duration (in seconds)'].dtype), 'Int64')
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['RecordedDate']))
+        self.assertEqual(df['RecordedDate'][1], pd.Timestamp('2024-01-01 00:01:00', tz='UTC'))
+        self.assertEqual(list(df['Q3'].cat.categories), ['Sales', 'Support', 'Billing'])
+        self.assertFalse(isinstance(df['Q4_TEXT'].dtype, pd.CategoricalDtype))
+        self.assertEqual(self.fake.stats()['families']['surveys'], 1)
+
+    def test_schema_dates_keep_timezone(self):
+        '''This method tests that the date columns are timezone-aware: UTC by default, or the timeZone of the export.'''
+        responses = Responses(config=self.config)
+        df = responses.get_survey_responses(survey=self.fake.survey_id(), dtypes=True)
+        self.assertEqual([str(df[column].dt.tz) for column in ('StartDate', 'EndDate', 'RecordedDate')], ['UTC'] * 3)
+        local = responses.get_survey_responses(survey=self.fake.survey_id(), dtypes=True, timeZone='America/Denver')
+        self.assertEqual(str(local['RecordedDate'].dt.tz), 'America/Denver')
+        self.assertEqual(local['RecordedDate'][1], pd.Timestamp('2024-01-01 00:01:00', tz='America/Denver'))
+
+    def test_schema_matches_untyped(self):
+        '''This method tests that the typed DataFrame holds the same values as the untyped one, in less memory.'''
+        responses = Responses(config=self.config)
+        untyped = responses.get_survey_responses(survey=self.fake.survey_id()).iloc[2:].reset_index(drop=True)
+        typed = responses.get_survey_responses(survey=self.fake.survey_id(), dtypes=True)
+        self.assertEqual(list(typed['ResponseId']), list(untyped['ResponseId']))
+        self.assertEqual(list(typed['Q1'].astype(str)), list(untyped['Q1'].astype(str)))
+        self.assertLess(typed.memory_usage(deep=True).sum(), untyped.memory_usage(deep=True).sum())
+
+    def test_dtype_overrides(self):
+        '''This method tests that a dict of dtypes overrides the schema, in iter_survey_responses as well.'''
+        batches = list(Responses(config=self.config).iter_survey_responses(survey=self.fake.survey_id(), chunksize=20, dtypes={'Q1': 'Int8', 'StartDate': 'str'}))
+        self.assertEqual([len(batch) for batch in batches], [20, 20, 10])
+        self.assertEqual(str(batches[0]['Q1'].dtype), 'Int8')
+        self.assertFalse(pd.api.types.is_datetime64_any_dtype(batches[0]['StartDate']))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(batches[0]['EndDate']))
+
+    def test_async_schema_dtypes(self):
+        '''This method tests dtypes=True with AsyncResponses.'''
+        async def export():
+            return await AsyncResponses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), dtypes=True)
+        df = asyncio.run(export())
+        self.assertEqual(str(df['Finished'].dtype), 'boolean')
+
+    def test_dtypes_validation(self):
+        '''This method tests that dtypes only applies to csv and tsv exports, without shards.'''
+        responses = Responses(config=self.config)
+        with self.assertRaises(AssertionError):
+            responses.get_survey_responses(survey=self.fake.survey_id(), dtypes=True, format='json')
+        with self.assertRaises(AssertionError):
+            responses.get_survey_responses(survey=self.fake.survey_id(), dtypes='yes')
+        with self.assertRaises(AssertionError):
+            responses.get_survey_responses(survey=self.fake.survey_id(), dtypes=True, shards=2, startDate='2024-01-01')
+
+class TestExportHeader(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 30}
+
+    def tearDown(self):
+        Responses.definition_cache = None
+        super().tearDown()
+
+    def test_header_attrs(self):
+        '''This method tests that header='attrs' reads the header rows into df.attrs and the responses with their own types.'''
+        responses = Responses(config=self.config)
+        legacy = responses.get_survey_responses(survey=self.fake.survey_id())
+        df = responses.get_survey_responses(survey=self.fake.survey_id(), header='attrs')
+        self.assertEqual(len(df), 30)
+        self.assertEqual(list(df.columns), list(legacy.columns))
+        self.assertEqual(str(df['Progress'].dtype), 'int64')
+        self.assertEqual(df.attrs['columns']['Q3'], {'question': legacy['Q3'][0], 'import_id': 'QID3'})
+        self.assertEqual(list(df['ResponseId']), list(legacy['ResponseId'][2:]))
+
+    def test_header_multiindex(self):
+        '''This method tests that header='multiindex' makes the header rows the levels of the column labels.'''
+        df = Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), header='multiindex', format='tsv')
+        self.assertEqual(df.columns.names, ['name', 'question', 'import_id'])
+        self.assertEqual(df.columns.get_level_values('import_id')[list(df.columns.get_level_values('name')).index('Q3')], 'QID3')
+        self.assertEqual(len(df['Q3'].columns), 1)
+        self.assertEqual(len(df), 30)
+
+    def test_header_with_dtypes_and_batches(self):
+        '''This method tests that the header layout is kept on every batch of iter_survey_responses, together with dtypes.'''
+        batches = list(Responses(config=self.config).iter_survey_responses(survey=self.fake.survey_id(), chunksize=20, dtypes=True, header='attrs'))
+        self.assertEqual([len(batch) for batch in batches], [20, 10])
+        self.assertTrue(all(batch.attrs['columns']['Q1']['import_id'] == 'QID1' for batch in batches))
+        self.assertEqual(str(batches[1]['Finished'].dtype), 'boolean')
+
+    def test_async_header(self):
+        '''This method tests header='attrs' with AsyncResponses.'''
+        async def export():
+            return await AsyncResponses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), header='attrs')
+        self.assertEqual(len(asyncio.run(export())), 30)
+
+    def test_header_validation(self):
+        '''This method tests that header only applies to csv and tsv exports, without shards.'''
+        responses = Responses(config=self.config)
+        with self.assertRaises(AssertionError):
+            responses.get_survey_responses(survey=self.fake.survey_id(), header='rows')
+        with self.assertRaises(AssertionError):
+            responses.get_survey_responses(survey=self.fake.survey_id(), header='attrs', format='json')
+        with self.assertRaises(AssertionError):
+            responses.get_survey_responses(survey=self.fake.survey_id(), header='attrs', shards=2, startDate='2024-01-01')
+
+class TestResumableDownload(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 2000}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Credentials.configure_transport(rate_limiter=False)
+        cls.expected = Responses(config=cls.config).get_survey_responses(survey=cls.fake.survey_id())
+
+    def test_resume_with_range(self):
+        '''This method tests that a download that drops mid-stream is resumed with a Range request, without a new export.'''
+        self.fake.drop(5000, times=2)
+        df = Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), chunk_size=1000)
+        self.assertTrue(df.equals(self.expected))
+        stats = self.fake.stats()
+        self.assertEqual(stats['families']['export_start'], 1)
+        self.assertEqual(stats['statuses'].get(206), 2)
+
+    def test_full_refetch_without_ranges(self):
+        '''This method tests that a server that ignores Range has the same file downloaded again in full.'''
+        self.fake.accept_ranges = False
+        self.fake.drop(5000)
+        df = Responses(config=self.config).get_survey_responses(survey=self.fake.survey_id())
+        self.assertTrue(df.equals(self.expected))
+        self.assertEqual(self.fake.stats()['families']['export_file'], 2)
+        self.assertEqual(self.fake.stats()['families']['export_start'], 1)
+
+    def test_give_up_after_attempts(self):
+        '''This method tests that a download that keeps dropping raises once download_attempts requests were made.'''
+        responses = Responses(config=self.config)
+        responses.download_attempts = 3
+        self.fake.drop(100, times=3)
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            responses.get_survey_responses(survey=self.fake.survey_id())
+        self.assertEqual(self.fake.stats()['families']['export_file'], 3)
+
+    def test_partial_file_resumed_by_job(self):
+        '''This method tests that the partial file of a failed download is resumed by the next result() of the same job.'''
+        responses = Responses(config=self.config)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.zip')
+            job = responses.start_export(survey=self.fake.survey_id())
+            responses.download_attempts = 1
+            self.fake.drop(5000)
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                job.result(path=path, chunk_size=1000)
+            partial = [name for name in os.listdir(directory) if name.endswith('.part')]
+            self.assertEqual(len(partial), 1)
+            self.assertEqual(os.path.getsize(os.path.join(directory, partial[0])), 5000)
+            df = job.result(path=path, chunk_size=1000)
+            self.assertTrue(df.equals(self.expected))
+            self.assertEqual(os.listdir(directory), ['export.zip'])
+            self.assertEqual(self.fake.stats()['statuses'].get(206), 1)
+
+    def test_resume_at_end_of_file(self):
+        '''This method tests that a resumed download of a partial file that is already complete reads no 416 body into it.'''
+        responses = Responses(config=self.config)
+        responses.download_attempts = 1
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.zip')
+            job = responses.start_export(survey=self.fake.survey_id()).wait()
+            with responses._download_export(job.download_url(), job.headers) as export_file:
+                content = export_file.read()
+            with open(responses._partial_path(path, job.download_url()), 'wb') as partial_file:
+                partial_file.write(content)
+            self.assertTrue(job.result(path=path).equals(self.expected))
+            self.assertEqual(os.path.getsize(path), len(content))
+        self.assertEqual(self.fake.stats()['statuses'].get(416), 1)
+
+    def test_verify_download(self):
+        '''This method tests that a truncated or non-zip export file fails the download checks.'''
+        responses = Responses(config=self.config)
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, 'w') as survey_zip:
+            survey_zip.writestr('export.csv', 'a,b\n1,2\n')
+        size = content.tell()
+        self.assertTrue(responses._verify_download(content, size, size))
+        self.assertFalse(responses._verify_download(content, size, size + 1))
+        self.assertFalse(responses._verify_download(io.BytesIO(content.getvalue()[:-10]), size - 10, None))
+
+    def test_async_resume(self):
+        '''This method tests that AsyncResponses resumes a dropped download with a Range request.'''
+        self.fake.drop(5000)
+        async def export():
+            return await AsyncResponses(config=self.config).get_survey_responses(survey=self.fake.survey_id(), chunk_size=1000)
+        self.assertTrue(asyncio.run(export()).equals(self.expected))
+        self.assertEqual(self.fake.stats()['statuses'].get(206), 1)
+
+class TestExportCache(FakeQualtricsTestCase):
+
+    fake_options = {'responses': 200}
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        Responses.export_cache = ExportCache(self.directory.name)
+
+    def tearDown(self):
+        Responses.export_cache = None
+        Responses.definition_cache = None
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_repeat_export_served_from_cache(self):
+        '''This method tests that a repeat export with the same arguments skips the create, poll and download requests.'''
+        responses = Responses(config=self.config)
+        first = responses.get_survey_responses(survey=self.fake.survey_id(), limit=50)
+        self.fake.reset()
+        second = responses.get_survey_responses(survey=self.fake.survey_id(), limit=50)
+        self.assertTrue(first.equals(second))
+        self.assertEqual(self.fake.stats()['families'], {'surveys': 1})
+        responses.get_survey_responses(survey=self.fake.survey_id(), limit=40)
+        self.assertEqual(self.fake.stats()['families']['export_start'], 1)
+
+    def test_freshness_check(self):
+        '''This method tests that an entry exported before new responses came in is exported again.'''
+        responses = Responses(config=self.config)
+        self.assertEqual(len(responses.get_survey_responses(survey=self.fake.survey_id(), header='attrs')), 200)
+        self.fake.sizes['responses'] = 210
+        self.assertEqual(len(responses.get_survey_responses(survey=self.fake.survey_id(), header='attrs')), 210)
+        Responses.export_cache = ExportCache(self.directory.name, check_freshness=False)
+        self.fake.reset()
+        self.fake.sizes['responses'] = 220
+        self.assertEqual(len(responses.get_survey_responses(survey=self.fake.survey_id(), header='attrs')), 210)
+        self.assertEqual(self.fake.stats()['requests'], 0)
+
+    def test_ttl(self):
+        '''This method tests that an entry is not served once it is older than the ttl.'''
+        Responses.export_cache = ExportCache(self.directory.name, ttl=0.2)
+        responses = Responses(config=self.config)
+        responses.get_survey_responses(survey=self.fake.survey_id())
+        time.sleep(0.3)
+        responses.get_survey_responses(survey=self.fake.survey_id())
+        self.assertEqual(self.fake.stats()['families']['export_start'], 2)
+
+    def test_lru_eviction(self):
+        '''This method tests that the least recently used entries are deleted once the cache is larger than max_bytes.'''
+        cache = ExportCache(self.directory.name, max_bytes=250)
+        for key in ('a', 'b'):
+            cache.set(key, io.BytesIO(b'x' * 100))
+            time.sleep(0.01)
+        self.assertIsNotNone(cache.get('a'))
+        time.sleep(0.01)
+        cache.set('c', io.BytesIO(b'x' * 100))
+        self.assertEqual([cache.get(key) is not None for key in ('a', 'b', 'c')], [True, False, True])
+        self.assertIsNone(cache.set('d', io.BytesIO(b'x' * 300)))
+        self.assertNotEqual(cache.key('SV_1', {'format': 'csv', 'limit': 1}), cache.key('SV_1', {'format': 'csv', 'limit': 2}))
+        self.assertEqual(cache.key('SV_1', {'a': 1, 'b': 2}), cache.key('SV_1', {'b': 2, 'a': 1}))
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'needs pyarrow')
+    def test_parquet_store(self):
+        '''This method tests that a Parquet cache keeps the typed DataFrame, keyed by the dtypes and header parameters.'''
+        Responses.export_cache = ExportCache(self.directory.name, store='parquet')
+        responses = Responses(config=self.config)
+        first = responses.get_survey_responses(survey=self.fake.survey_id(), dtypes=True, header='attrs')
+        second = responses.get_survey_responses(survey=self.fake.survey_id(), dtypes=True, header='attrs')
+        self.assertTrue(first.equals(second))
+        self.assertEqual(second.attrs['columns']['Q1']['import_id'], 'QID1')
+        self.assertEqual(str(second['Finished'].dtype), 'boolean')
+        self.assertEqual(self.fake.stats()['families']['export_start'], 1)
+        responses.get_survey_responses(survey=self.fake.survey_id(), dtypes=True)
+        self.assertEqual(self.fake.stats()['families']['export_start'], 2)
+
+    def test_async_export_cache(self):
+        '''This method tests that AsyncResponses answers a repeat export from the cache.'''
+        async def export():
+            responses = AsyncResponses(config=self.config)
+            await responses.get_survey_responses(survey=self.fake.survey_id())
+            return await responses.get_survey_responses(survey=self.fake.survey_id())
+        self.assertEqual(len(asyncio.run(export())), 202)
+        self.assertEqual(self.fake.stats()['families']['export_start'], 1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,59 @@
+'''
+Benchmark: memory and parse time of a csv export read with and without the dtypes of the survey definition.
+
+Exports a survey with `size` responses from the local FakeQualtrics server, and reads it with
+Responses().get_survey_responses() as strings (the default) and with dtypes=True. Reports the p50 time to parse the
+downloaded export (the 'parse' span) and the deep memory usage of the DataFrame, and the reduction of each.
+
+Run from the repository root:
+    python -m benchmarks.bench_dtypes --size 200000
+'''
+import argparse
+import time
+from benchmarks.bench_suite import percentile
+
+
+def run(size, repeat):
+    '''This function reads the export of a survey with and without dtypes and returns the measurements of each.'''
+    from QualtricsAPI.Setup import Credentials
+    from QualtricsAPI.Survey import Responses
+    from QualtricsAPI.tests.fake_server import FakeQualtrics
+
+    Credentials.configure_transport(rate_limiter=False)
+    results = {}
+    with FakeQualtrics(responses=size) as fake:
+        responses = Responses(config=fake.config())
+        for mode, options in (('untyped', False), ('dtypes', True)):
+            export = responses.start_export(survey=fake.survey_id()).wait()
+            export_file = responses._download_export(export.download_url(), export.headers, None, 1024 ** 2, None)
+            schema = None
+            if options:
+                schema = responses._response_schema(responses.get_survey_definition(survey=fake.survey_id()), True, {'format': 'csv'})
+            seconds = []
+            for _ in range(repeat):
+                export_file.seek(0)
+                start = time.perf_counter()
+                df = responses._read_export(export_file, 'csv', schema)
+                seconds.append(time.perf_counter() - start)
+            export_file.close()
+            results[mode] = {'p50_seconds': percentile(seconds, 50), 'memory_mb': df.memory_usage(deep=True).sum() / 1024 ** 2}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3, help='the number of timed parses of each mode (default: 3)')
+    args = parser.parse_args()
+
+    results = run(args.size, args.repeat)
+    untyped = results['untyped']
+    print(f"{'mode':<8} {'size':>9} {'p50 s':>9} {'memory MB':>10}")
+    for mode, result in results.items():
+        print(f"{mode:<8} {args.size:>9} {result['p50_seconds']:>9.3f} {result['memory_mb']:>10.1f}")
+    typed = results['dtypes']
+    print(f"memory reduction: {1 - typed['memory_mb'] / untyped['memory_mb']:.1%}, "
+          f"parse time change: {typed['p50_seconds'] / untyped['p50_seconds'] - 1:+.1%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+'''
+Benchmark: parse time and memory of each export format.
+
+Exports a survey with `size` responses from the local FakeQualtrics server in every format, and reports the size of the
+export file, the p50 time to download and parse it with Responses().get_survey_responses() (or to read it batch by batch
+with iter_survey_responses()), and the peak RSS of the process. Every (format, mode) runs in a fresh interpreter so its
+peak RSS is its own.
+
+Run from the repository root:
+    python -m benchmarks.bench_formats --size 200000
+    python -m benchmarks.bench_formats --size 200000 --formats csv ndjson --iterate
+'''
+import argparse
+import json
+import subprocess
+import sys
+import time
+from benchmarks.bench_suite import peak_rss_mb, percentile
+
+FORMATS = ['csv', 'tsv', 'json', 'ndjson', 'xml']
+
+
+def run_format(file_format, size, repeat, iterate):
+    '''This function exports and parses one format in the current interpreter and returns its measurements.'''
+    from QualtricsAPI.Setup import Credentials
+    from QualtricsAPI.Survey import Responses
+    from QualtricsAPI.tests.fake_server import FakeQualtrics
+
+    Credentials.configure_transport(rate_limiter=False)
+    with FakeQualtrics(responses=size) as fake:
+        responses = Responses(config=fake.config())
+        seconds = []
+        for _ in range(repeat):
+            fake.reset()
+            start = time.perf_counter()
+            if iterate:
+                rows = sum(len(batch) for batch in responses.iter_survey_responses(survey=fake.survey_id(), format=file_format, chunksize=50000))
+            else:
+                rows = len(responses.get_survey_responses(survey=fake.survey_id(), format=file_format))
+                rows -= 2 if file_format in ('csv', 'tsv') else 0
+            seconds.append(time.perf_counter() - start)
+            assert rows == size, f'{file_format} returned {rows} rows instead of {size}'
+        file_bytes = fake.stats()['bytes_sent']
+    p50 = percentile(seconds, 50)
+    return {'format': file_format, 'size': size, 'mode': 'iterate' if iterate else 'dataframe', 'p50_seconds': round(p50, 4),
+            'rows_per_second': round(size / p50, 1) if p50 else None, 'peak_rss_mb': peak_rss_mb(), 'response_bytes': file_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3, help='the number of timed runs of every format (default: 3)')
+    parser.add_argument('--iterate', action='store_true', help='read the export with iter_survey_responses() instead')
+    parser.add_argument('--child', nargs=4, metavar=('FORMAT', 'SIZE', 'REPEAT', 'ITERATE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        file_format, size, repeat, iterate = args.child
+        print(json.dumps(run_format(file_format, int(size), int(repeat), iterate == '1')))
+        return
+
+    print(f"{'format':<8} {'mode':<10} {'size':>9} {'rows/s':>12} {'p50 s':>9} {'rss MB':>8} {'bytes sent':>12}")
+    for file_format in args.formats:
+        command = [sys.executable, '-m', 'benchmarks.bench_formats', '--child', file_format, str(args.size), str(args.repeat), '1' if args.iterate else '0']
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{file_format:<8} failed: {completed.stderr.strip().splitlines()[-1]}")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f"{file_format:<8} {result['mode']:<10} {args.size:>9} {result['rows_per_second'] or 0:>12,.0f} {result['p50_seconds']:>9.3f} "
+              f"{result['peak_rss_mb'] or 0:>8.1f} {result['response_bytes']:>12,}")
+
+if __name__ == '__main__':
+    main()
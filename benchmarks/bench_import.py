@@ -0,0 +1,69 @@
+'''
+Benchmark: the import time of the package.
+
+Times "import QualtricsAPI" and the imports of a short-lived script (Credentials and Responses) in fresh interpreters,
+and lists the heavy modules (pandas, numpy) each one pulled in. Neither should import pandas or numpy: they are only
+loaded once a method that builds a DataFrame is called. Credentials should not import asyncio either, which is only
+loaded by the Async* classes.
+
+Run from the repository root:
+    python -m benchmarks.bench_import --repeat 10
+    python -m benchmarks.bench_import --max-ms 300
+
+With --max-ms it exits 1 when the median import time of a case is above the budget (or the tighter budget of the case in
+BUDGETS), or when a case imports one of its heavy modules.
+'''
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CASES = {
+    'import QualtricsAPI': 'import QualtricsAPI',
+    'Credentials': 'from QualtricsAPI import Credentials',
+    'Responses': 'from QualtricsAPI.Survey import Responses',
+    'all modules': 'from QualtricsAPI import Credentials, Responses, MailingList, XMDirectory, Messages',
+}
+HEAVY = ['pandas', 'numpy']
+# The modules that a case must not import, on top of HEAVY.
+LAZY = {'Credentials': ['asyncio']}
+# Budgets in ms of the cases that must stay below --max-ms. Credentials is mostly the import of requests.
+BUDGETS = {'Credentials': 175}
+MEASURE = '''
+import sys, time, json
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'ms': elapsed * 1000, 'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+'''
+
+
+def measure(statement, heavy=HEAVY):
+    '''This function imports a statement in a fresh interpreter and returns its import time and the heavy modules it loaded.'''
+    code = MEASURE.format(statement=statement, heavy=heavy)
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='the number of fresh interpreters per case (default: 5)')
+    parser.add_argument('--max-ms', type=float, help='fail when the median import time of a case is above this budget')
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'case':<20} {'median ms':>10} {'min ms':>8}  heavy modules")
+    for case, statement in CASES.items():
+        runs = [measure(statement, HEAVY + LAZY.get(case, [])) for _ in range(args.repeat)]
+        times = [run['ms'] for run in runs]
+        heavy = runs[-1]['heavy']
+        median = statistics.median(times)
+        print(f"{case:<20} {median:>10.1f} {min(times):>8.1f}  {', '.join(heavy) or '-'}")
+        if args.max_ms is not None and (median > min(args.max_ms, BUDGETS.get(case, args.max_ms)) or heavy):
+            failed = True
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
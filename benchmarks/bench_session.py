@@ -0,0 +1,45 @@
+'''
+Benchmark: pooled keep-alive session vs. a new connection per request.
+
+Runs XMDirectory().list_contacts_in_directory() against the local FakeQualtrics server, which serves 1,000 pages of one
+contact each, and counts how many TCP connections the client opened. Against "{data_center}.qualtrics.com" every one of
+those connections also pays a TLS handshake, so the savings there are larger than the wall time shown here.
+
+Run from the repository root:
+    python -m benchmarks.bench_session --pages 1000
+'''
+import argparse
+import contextlib
+import io
+import time
+from QualtricsAPI.Setup import Credentials
+from QualtricsAPI.XM import XMDirectory
+from QualtricsAPI.tests.fake_server import FakeQualtrics
+
+
+def run(fake, keep_alive, pages):
+    Credentials.configure_transport(keep_alive=keep_alive, rate_limiter=False)
+    fake.reset()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        contacts = XMDirectory(config=fake.config()).list_contacts_in_directory()
+    elapsed = time.perf_counter() - start
+    assert len(contacts) == pages
+    return elapsed, fake.stats()['connections']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=1000)
+    args = parser.parse_args()
+
+    with FakeQualtrics(contacts=args.pages, max_page_size=1) as fake:
+        try:
+            for label, keep_alive in (('new connection per request', False), ('pooled keep-alive session', True)):
+                elapsed, connections = run(fake, keep_alive, args.pages)
+                print(f'{label:<28} pages={args.pages:<6} connections={connections:<6} seconds={elapsed:.2f}')
+        finally:
+            Credentials.configure_transport()
+
+if __name__ == '__main__':
+    main()
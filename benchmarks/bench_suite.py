@@ -0,0 +1,203 @@
+'''
+Benchmark suite for the hot paths of the package.
+
+Runs every case against the local FakeQualtrics server (or in memory for the parser) at each dataset size, and reports
+the throughput (rows per second), the p50 and p99 wall time of a run, the peak RSS of the process and the number of
+HTTP requests a run sent. Every (case, size) runs in a fresh interpreter so its peak RSS is its own.
+
+    get_survey_responses        Responses().get_survey_responses() of a survey with `size` responses.
+    list_contacts_in_directory  XMDirectory().list_contacts_in_directory() of a directory with `size` contacts.
+    list_distributions          Distributions().list_distributions() of a survey with `size` distributions.
+    json_parser                 Parser().json_parser() over a page of `size` contacts.
+    bulk_update                 Responses().bulk_update_many_responses_from_dataframe() of `size` responses.
+
+Results can be saved as a JSON baseline and later runs compared against it:
+
+    python -m benchmarks.bench_suite --sizes 1000 100000 1000000 --save benchmarks/baselines/0.6.2.json
+    python -m benchmarks.bench_suite --sizes 1000 100000 --compare benchmarks/baselines/0.6.2.json
+
+The 1,000,000 row cases take minutes each. Use --cases and --sizes to run a subset.
+'''
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+CASES = ['get_survey_responses', 'list_contacts_in_directory', 'list_distributions', 'json_parser', 'bulk_update']
+SIZES = [1000, 100000, 1000000]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return round(peak / 1024 ** (2 if sys.platform == 'darwin' else 1), 1)
+
+
+def percentile(values, share):
+    '''The nearest-rank percentile of a list of values.'''
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * share // 100) - 1)]
+
+
+def fake_server(case, size):
+    from QualtricsAPI.tests.fake_server import FakeQualtrics
+    sizes = {'get_survey_responses': {'responses': size}, 'list_contacts_in_directory': {'contacts': size},
+             'list_distributions': {'distributions': size}, 'bulk_update': {}}
+    return FakeQualtrics(**sizes[case])
+
+
+def setup_case(case, size, fake):
+    '''This function builds the input of a case and returns a callable that runs it once and returns its row count.'''
+    import pandas as pd
+    from QualtricsAPI.JSON import Parser
+    from QualtricsAPI.Survey import Responses, Distributions
+    from QualtricsAPI.XM import XMDirectory
+
+    if case == 'json_parser':
+        keys = ['contactId', 'firstName', 'lastName', 'email', 'phone', 'unsubscribed', 'language', 'extRef']
+        elements = [{'contactId': f'CID_{index:015d}', 'firstName': 'First', 'lastName': 'Last', 'email': 'first.last@example.com',
+                     'phone': None, 'unsubscribed': False, 'language': 'EN', 'extRef': None, 'embeddedData': {'Department': 'Sales'}}
+                    for index in range(size)]
+        response = {'result': {'elements': elements, 'nextPage': None}, 'meta': {'httpStatus': '200 - OK'}}
+        return lambda: len(Parser().json_parser(response=response, keys=keys, arr=True))
+
+    config = fake.config()
+    survey = fake.survey_id()
+    if case == 'get_survey_responses':
+        return lambda: len(Responses(config=config).get_survey_responses(survey=survey)) - 2
+    if case == 'list_contacts_in_directory':
+        return lambda: len(XMDirectory(config=config).list_contacts_in_directory())
+    if case == 'list_distributions':
+        return lambda: len(Distributions(config=config).list_distributions(survey=survey))
+    if case == 'bulk_update':
+        df = pd.DataFrame({'ResponseId': [f'R_{index:015d}' for index in range(size)],
+                           'Department': [f'D{index % 5}' for index in range(size)], 'Score': [str(index % 10) for index in range(size)]})
+        def bulk_update():
+            Responses(config=config).bulk_update_many_responses_from_dataframe(survey=survey, df=df, update_cols=['Department', 'Score'])
+            return fake.stats()['updated_responses']
+        return bulk_update
+    raise ValueError(f'Unknown case {case}')
+
+
+def run_case(case, size, repeat):
+    '''This function runs one case in the current interpreter and returns its measurements.'''
+    from QualtricsAPI.Setup import Credentials
+
+    Credentials.configure_transport(rate_limiter=False)
+    fake = None if case == 'json_parser' else fake_server(case, size).start()
+    try:
+        run = setup_case(case, size, fake)
+        seconds, requests, families = [], [], {}
+        for _ in range(repeat):
+            if fake is not None:
+                fake.reset()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                rows = run()
+            seconds.append(time.perf_counter() - start)
+            assert rows == size, f'{case} returned {rows} rows instead of {size}'
+            if fake is not None:
+                stats = fake.stats()
+                requests.append(stats['requests'])
+                families = stats['families']
+    finally:
+        if fake is not None:
+            fake.stop()
+    p50 = percentile(seconds, 50)
+    return {'case': case, 'size': size, 'repeat': repeat, 'seconds': [round(value, 4) for value in seconds],
+            'p50_seconds': round(p50, 4), 'p99_seconds': round(percentile(seconds, 99), 4),
+            'rows_per_second': round(size / p50, 1) if p50 else None, 'peak_rss_mb': peak_rss_mb(),
+            'requests': requests[-1] if requests else 0, 'requests_by_family': families}
+
+
+def run_isolated(case, size, repeat):
+    '''This function runs one case in a fresh interpreter, so its peak RSS is not inflated by the cases before it.'''
+    command = [sys.executable, '-m', 'benchmarks.bench_suite', '--child', case, str(size), str(repeat)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'case': case, 'size': size, 'repeat': repeat, 'error': completed.stderr.strip().splitlines()[-1]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'created': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'), 'commit': commit,
+            'python': platform.python_version(), 'platform': platform.platform(), 'processor': platform.machine()}
+
+
+def compare(results, baseline, tolerance):
+    '''This function prints how each result moved against a baseline and returns the regressions.'''
+    previous = {(result['case'], result['size']): result for result in baseline['results'] if 'error' not in result}
+    regressions = []
+    for result in results:
+        before = previous.get((result['case'], result['size']))
+        if before is None or 'error' in result:
+            continue
+        change = result['p50_seconds'] / before['p50_seconds'] - 1 if before['p50_seconds'] else 0
+        flag = 'REGRESSION' if change > tolerance else ''
+        print(f"{result['case']:<28} {result['size']:>9}  p50 {before['p50_seconds']:>9.3f}s -> {result['p50_seconds']:>9.3f}s "
+              f"({change:+.1%})  requests {before['requests']} -> {result['requests']}  {flag}")
+        if flag:
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=CASES)
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3, help='the number of timed runs of every case (default: 3)')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='compare the results with this JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='the p50 slowdown reported as a regression (default: 0.1)')
+    parser.add_argument('--child', nargs=3, metavar=('CASE', 'SIZE', 'REPEAT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        case, size, repeat = args.child
+        print(json.dumps(run_case(case, int(size), int(repeat))))
+        return
+
+    results = []
+    print(f"{'case':<28} {'size':>9} {'rows/s':>12} {'p50 s':>9} {'p99 s':>9} {'rss MB':>8} {'requests':>9}")
+    for case in args.cases:
+        for size in args.sizes:
+            result = run_isolated(case, size, args.repeat)
+            results.append(result)
+            if 'error' in result:
+                print(f"{case:<28} {size:>9} failed: {result['error']}")
+                continue
+            print(f"{case:<28} {size:>9} {result['rows_per_second'] or 0:>12,.0f} {result['p50_seconds']:>9.3f} "
+                  f"{result['p99_seconds']:>9.3f} {result['peak_rss_mb'] or 0:>8.1f} {result['requests']:>9}")
+
+    report = {'environment': environment(), 'results': results}
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print(f'Saved {len(results)} results to {args.save}')
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -13,10 +13,10 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/Jaseibert/QualtricsAPI",
     license='MIT',
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['benchmarks', 'benchmarks.*']),
+    python_requires='>=3.7',
     keywords='qualtrics api python research survey',
     classifiers=[
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
@@ -31,4 +31,10 @@ setuptools.setup(
         'requests',
         'python-dateutil'
     ],
+    extras_require={
+        'async': ['httpx'],
+        'otel': ['opentelemetry-api'],
+        'spss': ['pyreadstat'],
+        'parquet': ['pyarrow']
+    },
 )